@@ -0,0 +1,125 @@
+"""
+Benchmark de la búsqueda de productos (ProductoModel.buscar_productos).
+
+Llena una base nueva en un directorio temporal (no toca
+database/nailstock.db) y compara, para varias búsquedas, el LIKE '%x%'
+anterior con el índice FTS5 y con la alternativa sin FTS5:
+
+    python benchmarks/busqueda_productos.py [--productos 50000]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+REPETICIONES = 20
+BUSQUEDAS = ("tornillo", "tor 3/8", "perforacion", "galv madera", "martillo 16", "xyz")
+
+ARTICULOS = ("Tornillo", "Tuerca", "Rondana", "Taquete", "Clavo", "Martillo", "Taladro",
+             "Broca", "Llave", "Pinza", "Cable", "Tubo", "Codo", "Pintura", "Brocha")
+MEDIDAS = ("1/4", "3/8", "1/2", "5/8", "3/4", "1", "16 oz", "2.5 mm", "10 m", "1.5 kW")
+DETALLES = ("galvanizado", "para madera", "para concreto", "acero inoxidable", "cabeza hexagonal",
+            "de perforación", "mango de fibra", "uso rudo", "cobre", "PVC")
+CATEGORIAS = ("Tornillería", "Herramientas", "Electricidad", "Plomería", "Pinturas")
+
+# La consulta que se usaba antes del índice de texto completo
+_LIKE_ANTERIOR = """
+    SELECT p.id, p.nombre, p.categoria, p.precio_compra, p.precio_venta,
+           p.stock, p.stock_minimo, p.unidad, pr.nombre as proveedor_nombre
+    FROM productos p
+    LEFT JOIN proveedores pr ON p.proveedor_id = pr.id
+    WHERE p.activo = 1 AND (p.nombre LIKE ? OR p.descripcion LIKE ?)
+    ORDER BY p.nombre
+"""
+
+
+def preparar_base(num_productos):
+    """Crea la base en un directorio temporal con un catálogo de prueba."""
+    directorio = tempfile.mkdtemp(prefix="nailstock-bench-")
+    os.chdir(directorio)
+    os.mkdir("database")
+
+    # La conexión se abre al importar, con la ruta relativa al directorio actual
+    from nailstock.database.db_connection import get_db_writer
+
+    def llenar(conn):
+        filas = []
+        for i in range(num_productos):
+            articulo = random.choice(ARTICULOS)
+            detalle = random.sample(DETALLES, 2)
+            filas.append((
+                f"{articulo} {random.choice(MEDIDAS)} {detalle[0]} {i:05d}",
+                f"{articulo} {detalle[0]}, {detalle[1]}. Presentación por pieza.",
+                random.choice(CATEGORIAS),
+            ))
+        conn.executemany(
+            "INSERT INTO productos (nombre, descripcion, categoria, precio_compra, precio_venta, "
+            "stock, unidad) VALUES (?, ?, ?, 10, 15, 100, 'pz')",
+            filas
+        )
+
+    inicio = time.perf_counter()
+    get_db_writer().ejecutar(llenar)
+    return directorio, time.perf_counter() - inicio
+
+
+def medir(funcion):
+    inicio = time.perf_counter()
+    for _ in range(REPETICIONES):
+        resultado = funcion()
+    return (time.perf_counter() - inicio) / REPETICIONES * 1000, len(resultado)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--productos", type=int, default=50000, help="productos en catálogo")
+    args = parser.parse_args(argv)
+
+    directorio, segundos = preparar_base(args.productos)
+    from nailstock.database.db_connection import get_db_connection
+    from nailstock.database.consultas import consultas
+    from nailstock.models.producto_model import ProductoModel
+    from nailstock.utils.busqueda import consulta_fts, LIMITE_RESULTADOS
+
+    print(f"Base temporal: {directorio}")
+    print(f"{args.productos} productos insertados en {segundos:.1f} s (con el índice FTS5)")
+    with get_db_connection() as conn:
+        if not ProductoModel._hay_indice_texto(conn):
+            print("Este SQLite no tiene FTS5: solo se mide LIKE")
+
+    def like_anterior(termino):
+        with get_db_connection() as conn:
+            return conn.execute(_LIKE_ANTERIOR, (f"%{termino}%", f"%{termino}%")).fetchall()
+
+    def like_palabras(termino):
+        with get_db_connection() as conn:
+            return consultas.todos(conn, "productos.buscar",
+                                   (json.dumps(termino.split()), LIMITE_RESULTADOS))
+
+    def fts(termino):
+        with get_db_connection() as conn:
+            return consultas.todos(conn, "productos.buscar_fts",
+                                   (consulta_fts(termino), LIMITE_RESULTADOS))
+
+    metodos = [("LIKE anterior", like_anterior), ("LIKE por palabra", like_palabras)]
+    if ProductoModel._indice_texto:
+        metodos.append(("FTS5", fts))
+
+    print(f"{'búsqueda':<16}" + "".join(f"{nombre:>22}" for nombre, _ in metodos))
+    for termino in BUSQUEDAS:
+        celdas = []
+        for _, funcion in metodos:
+            ms, filas = medir(lambda: funcion(termino))
+            celdas.append(f"{ms:9.2f} ms ({filas:>5})")
+        print(f"{termino!r:<16}" + "".join(f"{celda:>22}" for celda in celdas))
+    print(f"(entre paréntesis, filas devueltas; las búsquedas nuevas se limitan a {LIMITE_RESULTADOS})")
+
+
+if __name__ == "__main__":
+    main()
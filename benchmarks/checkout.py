@@ -0,0 +1,97 @@
+"""
+Benchmark del registro de ventas (VentaModel.agregar_venta / encolar_venta).
+
+Mide ventas por segundo para carritos de 1, 10 y 100 líneas sobre una base
+de datos nueva en un directorio temporal (no toca database/nailstock.db):
+
+    python benchmarks/checkout.py [--ventas 300] [--productos 500]
+
+- secuencial: una venta a la vez, esperando cada commit (un cajero).
+- en cola: todas las ventas encoladas de una vez; el escritor las agrupa
+  en transacciones de hasta EscritorDB.MAX_LOTE ventas (varios cajeros).
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+TAMANOS_CARRITO = (1, 10, 100)
+
+
+def preparar_base(num_productos):
+    """Crea la base en un directorio temporal y la llena con datos de prueba."""
+    directorio = tempfile.mkdtemp(prefix="nailstock-bench-")
+    os.chdir(directorio)
+    os.mkdir("database")
+
+    # La conexión se abre al importar, con la ruta relativa al directorio actual
+    from nailstock.database.db_connection import get_db_writer
+    from nailstock.models.producto_model import ProductoModel
+    from nailstock.models.cliente_model import ClienteModel
+
+    def llenar(conn):
+        conn.executemany(
+            "INSERT INTO productos (nombre, precio_compra, precio_venta, stock, unidad) "
+            "VALUES (?, 10, 15, 100000000, 'pz')",
+            [(f"Producto {i:05d}",) for i in range(num_productos)]
+        )
+
+    get_db_writer().ejecutar(llenar)
+    cliente_id = ClienteModel.agregar_cliente("Cliente benchmark", None, None, None)
+    productos = [p.id for p in ProductoModel.obtener_productos()]
+    return directorio, cliente_id, productos
+
+
+def carrito(productos, lineas):
+    return [
+        {'producto_id': producto_id, 'cantidad': 1, 'precio_unitario': 15.0}
+        for producto_id in random.sample(productos, lineas)
+    ]
+
+
+def medir(funcion, num_ventas):
+    inicio = time.perf_counter()
+    funcion(num_ventas)
+    segundos = time.perf_counter() - inicio
+    return num_ventas / segundos
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--ventas", type=int, default=300, help="ventas por medición")
+    parser.add_argument("--productos", type=int, default=500, help="productos en catálogo")
+    args = parser.parse_args(argv)
+
+    directorio, cliente_id, productos = preparar_base(args.productos)
+    from nailstock.models.venta_model import VentaModel
+
+    print(f"Base temporal: {directorio}")
+    print(f"{'líneas':>7} {'secuencial':>14} {'en cola':>14} {'líneas/s (cola)':>17}")
+
+    for lineas in TAMANOS_CARRITO:
+        carritos = [carrito(productos, lineas) for _ in range(args.ventas)]
+
+        def secuencial(n):
+            for i in range(n):
+                VentaModel.agregar_venta(cliente_id, carritos[i])
+
+        def en_cola(n):
+            futures = [VentaModel.encolar_venta(cliente_id, carritos[i]) for i in range(n)]
+            for future in futures:
+                future.result()
+
+        ventas_seg_secuencial = medir(secuencial, args.ventas)
+        ventas_seg_cola = medir(en_cola, args.ventas)
+        print(f"{lineas:>7} {ventas_seg_secuencial:>10,.0f} v/s {ventas_seg_cola:>10,.0f} v/s "
+              f"{ventas_seg_cola * lineas:>15,.0f}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""
+Benchmark de la lectura del escáner en ventas (CodigoModel.producto_por_codigo).
+
+Llena una base nueva en un directorio temporal (no toca
+database/nailstock.db) con productos que tienen código y una caja con su
+código de barras, y compara lo que cuesta agregar una línea a la venta:
+antes, recargar los productos disponibles y recorrerlos para encontrar el
+elegido; ahora, el mapa de códigos en memoria, y solo con consultas:
+
+    python benchmarks/codigos.py [--productos 50000]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+REPETICIONES = 200
+
+
+def preparar_base(num_productos):
+    """Crea la base en un directorio temporal con un catálogo de prueba."""
+    directorio = tempfile.mkdtemp(prefix="nailstock-bench-")
+    os.chdir(directorio)
+    os.mkdir("database")
+
+    # La conexión se abre al importar, con la ruta relativa al directorio actual
+    from nailstock.database.db_connection import get_db_writer
+
+    def llenar(conn):
+        conn.executemany(
+            "INSERT INTO productos (nombre, codigo, categoria, precio_compra, precio_venta, "
+            "stock, unidad) VALUES (?, ?, 'Tornillería', 10, 15, 1000, 'pz')",
+            ((f"Tornillo {i:06d}", f"75{i:011d}") for i in range(1, num_productos + 1))
+        )
+        conn.executemany(
+            "INSERT INTO codigos_barras (codigo, producto_id, cantidad) VALUES (?, ?, 12)",
+            ((f"76{i:011d}", i) for i in range(1, num_productos + 1))
+        )
+
+    inicio = time.perf_counter()
+    get_db_writer().ejecutar(llenar)
+    return directorio, time.perf_counter() - inicio
+
+
+def medir(funcion, codigos, repeticiones=REPETICIONES):
+    inicio = time.perf_counter()
+    for i in range(repeticiones):
+        funcion(codigos[i % len(codigos)])
+    return (time.perf_counter() - inicio) / repeticiones * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--productos", type=int, default=50000, help="productos en catálogo")
+    args = parser.parse_args(argv)
+
+    directorio, segundos = preparar_base(args.productos)
+    from nailstock.database.db_connection import get_db_connection
+    from nailstock.database.consultas import consultas
+    from nailstock.models.codigo_model import CodigoModel
+    from nailstock.models.reserva_model import ReservaModel
+
+    print(f"Base temporal: {directorio}")
+    print(f"{args.productos} productos con código y caja insertados en {segundos:.1f} s")
+
+    inicio = time.perf_counter()
+    mapa = CodigoModel.cargar_codigos()
+    print(f"Mapa de {len(mapa)} códigos construido en {time.perf_counter() - inicio:.2f} s")
+
+    ids = random.sample(range(1, args.productos + 1), 50)
+    codigos = [f"7{random.choice('56')}{i:011d}" for i in ids]
+
+    def recargar_y_recorrer(codigo):
+        # Lo que costaba cada línea: la lista completa y el ciclo de aceptar()
+        producto_id = int(codigo[2:])
+        for producto in ReservaModel.obtener_productos_disponibles():
+            if producto.id == producto_id:
+                return producto
+
+    def solo_consultas(codigo):
+        with get_db_connection() as conn:
+            entrada = consultas.uno(conn, "codigos.buscar", (codigo,))
+            return consultas.uno(conn, "codigos.producto_venta", entrada)
+
+    metodos = [("recargar y recorrer", recargar_y_recorrer, 5),
+               ("solo consultas", solo_consultas, REPETICIONES),
+               ("mapa en memoria", CodigoModel.producto_por_codigo, REPETICIONES)]
+    for nombre, funcion, repeticiones in metodos:
+        print(f"{nombre:<22}{medir(funcion, codigos, repeticiones):10.3f} ms por lectura")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Prueba de estrés con varias cajas (procesos) sobre un mismo nailstock.db.
+
+Cada proceso es una terminal con su propio escritor: reserva stock para
+carritos aleatorios sobre pocos productos muy disputados, registra la
+venta o abandona el carrito, y reporta sus contadores de contención.
+Al final se verifica que el stock cuadre con las ventas registradas y que
+no queden reservas ni stock negativo:
+
+    python benchmarks/estres_terminales.py [--terminales 4] [--carritos 200]
+
+Usa una base de datos nueva en un directorio temporal.
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(RAIZ))
+
+
+def preparar_base(num_productos, stock_inicial):
+    directorio = tempfile.mkdtemp(prefix="nailstock-estres-")
+    os.chdir(directorio)
+    os.mkdir("database")
+
+    from nailstock.database.db_connection import get_db_writer, drain_db_connections
+    from nailstock.models.cliente_model import ClienteModel
+
+    def llenar(conn):
+        conn.executemany(
+            "INSERT INTO productos (nombre, precio_compra, precio_venta, stock, unidad) "
+            "VALUES (?, 10, 15, ?, 'pz')",
+            [(f"Producto {i:03d}", stock_inicial) for i in range(num_productos)]
+        )
+
+    get_db_writer().ejecutar(llenar)
+    cliente_id = ClienteModel.agregar_cliente("Cliente estrés", None, None, None)
+    drain_db_connections()
+    return directorio, cliente_id
+
+
+def terminal(numero, directorio, cliente_id, num_carritos, num_productos, resultados):
+    os.chdir(directorio)
+    os.environ["NAILSTOCK_TERMINAL"] = f"T{numero}"
+    sys.path.insert(0, str(RAIZ))
+
+    from nailstock.models.reserva_model import ReservaModel, StockInsuficienteError
+    from nailstock.models.venta_model import VentaModel
+    from nailstock.database.reintentos import metricas_contencion
+
+    # Los IDs de productos van de 1 a num_productos en la base nueva
+    productos = list(range(1, num_productos + 1))
+    contadores = {'ventas': 0, 'sin_stock': 0, 'abandonados': 0, 'errores': 0}
+
+    for _ in range(num_carritos):
+        carrito = []
+        try:
+            for producto_id in random.sample(productos, random.randint(1, 5)):
+                cantidad = random.randint(1, 3)
+                ReservaModel.reservar(producto_id, cantidad)
+                carrito.append({'producto_id': producto_id, 'cantidad': cantidad,
+                                'precio_unitario': 15.0})
+
+            if carrito and random.random() < 0.8:
+                VentaModel.agregar_venta(cliente_id, carrito)
+                contadores['ventas'] += 1
+            else:
+                ReservaModel.liberar_todo()
+                contadores['abandonados'] += 1
+        except StockInsuficienteError:
+            ReservaModel.liberar_todo()
+            contadores['sin_stock'] += 1
+        except Exception:
+            ReservaModel.liberar_todo()
+            contadores['errores'] += 1
+
+    contadores.update(metricas_contencion.resumen())
+    resultados.put((numero, contadores))
+
+
+def verificar(directorio, stock_inicial):
+    conn = sqlite3.connect(os.path.join(directorio, "database", "nailstock.db"))
+    descuadres = conn.execute('''
+        SELECT p.id, p.stock, ? - COALESCE(SUM(dv.cantidad), 0)
+        FROM productos p
+        LEFT JOIN detalle_venta dv ON dv.producto_id = p.id
+        GROUP BY p.id
+        HAVING p.stock <> ? - COALESCE(SUM(dv.cantidad), 0)
+    ''', (stock_inicial, stock_inicial)).fetchall()
+    negativos = conn.execute("SELECT COUNT(*) FROM productos WHERE stock < 0").fetchone()[0]
+    reservas = conn.execute("SELECT COUNT(*) FROM reservas_stock").fetchone()[0]
+    conn.close()
+    return descuadres, negativos, reservas
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Estrés de varias cajas sobre una base")
+    parser.add_argument("--terminales", type=int, default=4)
+    parser.add_argument("--carritos", type=int, default=200, help="carritos por terminal")
+    parser.add_argument("--productos", type=int, default=10)
+    parser.add_argument("--stock", type=int, default=300, help="stock inicial por producto")
+    args = parser.parse_args(argv)
+
+    directorio, cliente_id = preparar_base(args.productos, args.stock)
+    print(f"Base temporal: {directorio}")
+
+    contexto = multiprocessing.get_context("spawn")
+    resultados = contexto.Queue()
+    procesos = [
+        contexto.Process(target=terminal, args=(n, directorio, cliente_id, args.carritos,
+                                                args.productos, resultados))
+        for n in range(args.terminales)
+    ]
+
+    inicio = time.perf_counter()
+    for proceso in procesos:
+        proceso.start()
+    por_terminal = dict(resultados.get() for _ in procesos)
+    for proceso in procesos:
+        proceso.join()
+    segundos = time.perf_counter() - inicio
+
+    totales = {}
+    for numero in sorted(por_terminal):
+        contadores = por_terminal[numero]
+        print(f"T{numero}: {contadores['ventas']} ventas, {contadores['sin_stock']} sin stock, "
+              f"{contadores['abandonados']} abandonados, {contadores['errores']} errores | "
+              f"{contadores['esperas']} esperas, {contadores['reintentos']} reintentos, "
+              f"espera máx. {contadores['espera_maxima_ms']:.0f} ms")
+        for clave, valor in contadores.items():
+            totales[clave] = totales.get(clave, 0) + valor
+
+    print(f"Total: {totales['ventas']} ventas en {segundos:.1f} s "
+          f"({totales['ventas'] / segundos:,.0f} ventas/s), "
+          f"{totales['transacciones']} transacciones, {totales['reintentos']} reintentos, "
+          f"{totales['agotados']} agotados")
+
+    descuadres, negativos, reservas = verificar(directorio, args.stock)
+    print(f"Descuadres de stock: {len(descuadres)}, stock negativo: {negativos}, "
+          f"reservas pendientes: {reservas}")
+    return 1 if descuadres or negativos or reservas or totales['errores'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+"""
+Benchmark del reporte de ventas por periodo (Reportes.generar_reporte_ventas_por_periodo).
+
+Llena una base nueva en un directorio temporal (no toca
+database/nailstock.db) con un año de ventas y compara el reporte, que lee
+los resúmenes mantenidos por triggers, con las mismas estadísticas
+calculadas agrupando las ventas:
+
+    python benchmarks/reportes.py [--ventas 200000] [--productos 500]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+INICIO = date(2024, 1, 1)
+DIAS = 366
+REPETICIONES = 20
+
+# Lo que calculaba el reporte antes de los resúmenes
+_ESTADISTICAS_CRUDAS = '''
+    SELECT COUNT(*), SUM(total), AVG(total), MIN(total), MAX(total)
+    FROM ventas WHERE fecha_venta >= ? AND fecha_venta < ?
+'''
+_VENTAS_POR_DIA_CRUDAS = '''
+    SELECT DATE(fecha_venta), COUNT(*), SUM(total)
+    FROM ventas WHERE fecha_venta >= ? AND fecha_venta < ?
+    GROUP BY DATE(fecha_venta) ORDER BY DATE(fecha_venta)
+'''
+_POPULARES_CRUDOS = '''
+    SELECT p.nombre, SUM(dv.cantidad) as total_vendido, SUM(dv.subtotal)
+    FROM ventas v
+    JOIN detalle_venta dv ON dv.venta_id = v.id
+    JOIN productos p ON dv.producto_id = p.id
+    WHERE v.fecha_venta >= ? AND v.fecha_venta < ?
+    GROUP BY p.id ORDER BY total_vendido DESC LIMIT 10
+'''
+
+
+def preparar_base(num_ventas, num_productos):
+    """Crea la base en un directorio temporal con un año de ventas."""
+    directorio = tempfile.mkdtemp(prefix="nailstock-bench-")
+    os.chdir(directorio)
+    os.mkdir("database")
+
+    # La conexión se abre al importar, con la ruta relativa al directorio actual
+    from nailstock.database.db_connection import get_db_writer
+    from nailstock.models.cliente_model import ClienteModel
+
+    cliente_id = ClienteModel.agregar_cliente("Cliente benchmark", None, None, None)
+
+    def llenar(conn):
+        conn.executemany(
+            "INSERT INTO productos (nombre, precio_compra, precio_venta, stock, unidad) "
+            "VALUES (?, 10, 15, 0, 'pz')",
+            [(f"Producto {i:05d}",) for i in range(num_productos)]
+        )
+        productos = [fila[0] for fila in conn.execute("SELECT id FROM productos")]
+        for _ in range(num_ventas):
+            fecha = (datetime.combine(INICIO, datetime.min.time())
+                     + timedelta(days=random.randrange(DIAS), seconds=random.randrange(86400)))
+            lineas = [(producto_id, random.randint(1, 5), random.choice((9.5, 15.0, 99.9)))
+                      for producto_id in random.sample(productos, random.randint(1, 4))]
+            venta_id = conn.execute(
+                "INSERT INTO ventas (cliente_id, total, fecha_venta) VALUES (?, ?, ?)",
+                (cliente_id, sum(c * p for _, c, p in lineas), fecha.isoformat(" ", "seconds"))
+            ).lastrowid
+            conn.executemany(
+                "INSERT INTO detalle_venta (venta_id, producto_id, cantidad, precio_unitario, subtotal) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(venta_id, producto_id, c, p, c * p) for producto_id, c, p in lineas]
+            )
+
+    inicio = time.perf_counter()
+    get_db_writer().ejecutar(llenar)
+    return directorio, time.perf_counter() - inicio
+
+
+def medir(funcion):
+    inicio = time.perf_counter()
+    for _ in range(REPETICIONES):
+        funcion()
+    return (time.perf_counter() - inicio) / REPETICIONES * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--ventas", type=int, default=200000, help="ventas en el año")
+    parser.add_argument("--productos", type=int, default=500, help="productos en catálogo")
+    args = parser.parse_args(argv)
+
+    directorio, segundos = preparar_base(args.ventas, args.productos)
+    from nailstock.database.db_connection import get_db_connection
+    from nailstock.database.consultas import consultas
+    from nailstock.utils.reportes import Reportes
+    from nailstock.models.resumen_model import ResumenVentasModel
+
+    print(f"Base temporal: {directorio}")
+    print(f"{args.ventas} ventas insertadas en {segundos:.1f} s (con los triggers de resúmenes)")
+
+    fin = (INICIO + timedelta(days=DIAS - 1)).isoformat()
+    rango = (INICIO.isoformat(), (INICIO + timedelta(days=DIAS)).isoformat())
+
+    def crudo(*sqls):
+        def consultar():
+            with get_db_connection() as conn:
+                for sql in sqls:
+                    conn.execute(sql, rango).fetchall()
+        return consultar
+
+    def resumen(*nombres):
+        def consultar():
+            with get_db_connection() as conn:
+                for nombre in nombres:
+                    consultas.todos(conn, nombre, rango)
+        return consultar
+
+    mediciones = (
+        ("estadísticas y por día",
+         crudo(_ESTADISTICAS_CRUDAS, _VENTAS_POR_DIA_CRUDAS),
+         resumen("reportes.estadisticas_periodo", "reportes.ventas_por_dia")),
+        ("productos más vendidos", crudo(_POPULARES_CRUDOS), resumen("reportes.productos_populares")),
+    )
+
+    print(f"{'reporte anual (ms)':<24} {'agrupando ventas':>17} {'resúmenes':>10}")
+    for nombre, agrupando, resumido in mediciones:
+        print(f"{nombre:<24} {medir(agrupando):>17.2f} {medir(resumido):>10.2f}")
+    print(f"{'reporte completo':<24} {'':>17} "
+          f"{medir(lambda: Reportes.generar_reporte_ventas_por_periodo(INICIO.isoformat(), fin)):>10.2f}")
+
+    diferencias = ResumenVentasModel.verificar_ventas_diarias()
+    print(f"Verificación del resumen diario: {len(diferencias)} días con diferencias")
+
+
+if __name__ == "__main__":
+    main()
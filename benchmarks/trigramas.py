@@ -0,0 +1,92 @@
+"""
+Benchmark del índice de trigramas de nombres (utils.trigramas.IndiceTrigramas),
+el que usa ProductoModel.buscar_parecidos.
+
+Todo en memoria, sin base de datos: construye el índice con un catálogo
+de prueba y mide la memoria, las búsquedas con errores de escritura y las
+altas, cambios y bajas incrementales:
+
+    python benchmarks/trigramas.py [--productos 100000]
+"""
+import argparse
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from nailstock.utils.trigramas import IndiceTrigramas
+
+REPETICIONES = 200
+BUSQUEDAS = ("desarmador", "dezarmador", "desarmado", "tornilo galbanizado", "martiyo",
+             "taladro percusion", "rondana 3/8", "xyzw",
+             # Peor caso: palabras frecuentes que ningún nombre tiene juntas
+             "tornillo desarmador")
+
+ARTICULOS = ("Tornillo", "Tuerca", "Rondana", "Taquete", "Clavo", "Martillo", "Taladro",
+             "Broca", "Llave", "Pinza", "Cable", "Tubo", "Codo", "Pintura", "Brocha",
+             "Desarmador", "Segueta", "Flexómetro", "Nivel", "Lija")
+MEDIDAS = ("1/4", "3/8", "1/2", "5/8", "3/4", "1", "16 oz", "2.5 mm", "10 m", "1.5 kW")
+DETALLES = ("galvanizado", "madera", "concreto", "inoxidable", "hexagonal", "percusión",
+            "fibra", "rudo", "cobre", "PVC", "plano", "cruz")
+MARCAS = ("Truper", "Pretul", "Stanley", "Urrea", "Surtek", "Fiero")
+
+
+def nombres(cantidad):
+    for i in range(1, cantidad + 1):
+        yield i, (f"{random.choice(ARTICULOS)} {random.choice(DETALLES)} "
+                  f"{random.choice(MEDIDAS)} {random.choice(MARCAS)} {i:06d}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--productos", type=int, default=100000, help="productos en catálogo")
+    args = parser.parse_args(argv)
+
+    catalogo = list(nombres(args.productos))
+
+    inicio = time.perf_counter()
+    indice = IndiceTrigramas()
+    indice.cargar(catalogo)
+    segundos = time.perf_counter() - inicio
+
+    # La memoria, en una segunda construcción (tracemalloc la hace más lenta)
+    tracemalloc.start()
+    copia = IndiceTrigramas()
+    copia.cargar(catalogo)
+    memoria, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{len(indice)} nombres indexados en {segundos:.2f} s, "
+          f"{memoria / 1024 / 1024:.1f} MiB ({len(indice._indices)} palabras distintas)")
+
+    print(f"{'búsqueda':<24}{'tiempo':>12}  mejor resultado")
+    for termino in BUSQUEDAS:
+        inicio = time.perf_counter()
+        for _ in range(REPETICIONES):
+            resultado = indice.buscar(termino, 20)
+        ms = (time.perf_counter() - inicio) / REPETICIONES * 1000
+        mejor = ""
+        if resultado:
+            producto_id, similitud = resultado[0]
+            mejor = f"{catalogo[producto_id - 1][1]} ({similitud:.2f})"
+        print(f"{termino!r:<24}{ms:9.3f} ms  {mejor}")
+
+    # Cambios incrementales, como los que hacen agregar/actualizar/eliminar producto
+    cambios = 10000
+    inicio = time.perf_counter()
+    for producto_id, nombre in nombres(cambios):
+        indice.agregar(args.productos + producto_id, nombre)
+    for producto_id, nombre in nombres(cambios):
+        indice.renombrar(producto_id, nombre + " reforzado")
+    for producto_id in range(1, cambios + 1):
+        indice.quitar(args.productos + producto_id)
+    segundos = time.perf_counter() - inicio
+    print(f"{3 * cambios} altas, cambios y bajas en {segundos:.2f} s "
+          f"({segundos / (3 * cambios) * 1e6:.1f} µs cada uno)")
+
+
+if __name__ == "__main__":
+    main()
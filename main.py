@@ -41,7 +41,7 @@ if os.name == "nt":
         sys.exit(0)  # Terminar el proceso actual (no admin)
 # --- Fin de comprobación de administrador ---
 from PyQt6.QtWidgets import QApplication
-from nailstock.database.db_connection import DBConnection
+from nailstock.database.db_connection import get_db
 from nailstock.views.login_view import LoginView
 from nailstock.views.main_window import MainWindow
 
@@ -53,13 +53,14 @@ class NailStackApp:
 
         - Crea la instancia de QApplication (requerida por cualquier app PyQt).
         - Configura nombre, versión y organización de la aplicación.
-        - Inicializa la conexión a la base de datos.
+        - Obtiene la conexión a la base de datos (el esquema se migra una
+          sola vez, al importar el módulo de conexión).
         """
         self.app = QApplication(sys.argv)
         self.app.setApplicationName("NailStack")
         self.app.setApplicationVersion("1.0.0")
         self.app.setOrganizationName("Ferretería NailStack")
-        self.db_connection = DBConnection()
+        self.db_connection = get_db()
 
     def show_login(self):
         """
@@ -3,7 +3,11 @@ from ..models.cliente_model import ClienteModel
 class ClienteController:
     @staticmethod
     def agregar_cliente(nombre, telefono, direccion, rfc):
-        return ClienteModel.agregar_cliente(
+        return ClienteController.encolar_cliente(nombre, telefono, direccion, rfc).result()
+    
+    @staticmethod
+    def encolar_cliente(nombre, telefono, direccion, rfc):
+        return ClienteModel.encolar_cliente(
             nombre.strip() if nombre else None,
             telefono.strip() if telefono else None,
             direccion.strip() if direccion else None,
@@ -12,7 +16,13 @@ class ClienteController:
     
     @staticmethod
     def actualizar_cliente(cliente_id, nombre, telefono, direccion, rfc):        
-        return ClienteModel.actualizar_cliente(
+        return ClienteController.encolar_actualizacion(
+            cliente_id, nombre, telefono, direccion, rfc
+        ).result()
+    
+    @staticmethod
+    def encolar_actualizacion(cliente_id, nombre, telefono, direccion, rfc):
+        return ClienteModel.encolar_actualizacion(
             cliente_id,
             nombre.strip() if nombre else None,
             telefono.strip() if telefono else None,
@@ -22,16 +32,6 @@ class ClienteController:
     
     @staticmethod
     def buscar_clientes(termino):
-        clientes = ClienteModel.obtener_clientes()
-        if not termino:
-            return clientes
-        
-        termino_lower = termino.lower()
-        resultados = []
-        for cliente in clientes:
-            if ((cliente[1] and termino_lower in cliente[1].lower()) or  # nombre
-                (cliente[2] and termino_lower in cliente[2].lower()) or  # telefonom
-                (cliente[4] and termino_lower in cliente[4].lower())):   # rfc
-                resultados.append(cliente)
-        
-        return resultados
\ No newline at end of file
+        if not termino or not termino.strip():
+            return ClienteModel.obtener_clientes()
+        return ClienteModel.buscar_clientes(termino)
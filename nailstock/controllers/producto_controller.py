@@ -3,16 +3,38 @@ from ..models.producto_model import ProductoModel
 class ProductoController:
     @staticmethod
     def agregar_producto(nombre, descripcion, categoria, precio_compra, precio_venta, 
-                        stock, stock_minimo, unidad, proveedor_id):
-        return ProductoModel.agregar_producto(
+                        stock, stock_minimo, unidad, proveedor_id, codigo=None,
+                        presentaciones=()):
+        return ProductoController.encolar_producto(
             nombre, descripcion, categoria, precio_compra, precio_venta,
-            stock, stock_minimo, unidad, proveedor_id
+            stock, stock_minimo, unidad, proveedor_id, codigo, presentaciones
+        ).result()
+    
+    @staticmethod
+    def encolar_producto(nombre, descripcion, categoria, precio_compra, precio_venta, 
+                         stock, stock_minimo, unidad, proveedor_id, codigo=None,
+                         presentaciones=()):
+        return ProductoModel.encolar_producto(
+            nombre, descripcion, categoria, precio_compra, precio_venta,
+            stock, stock_minimo, unidad, proveedor_id,
+            codigo.strip() if codigo and codigo.strip() else None, presentaciones
         )
     
     @staticmethod
     def actualizar_producto(producto_id, nombre, descripcion, categoria, precio_compra, 
-                           precio_venta, stock, stock_minimo, unidad, proveedor_id):
-        return ProductoModel.actualizar_producto(
+                           precio_venta, stock, stock_minimo, unidad, proveedor_id, codigo=None,
+                           presentaciones=()):
+        return ProductoController.encolar_actualizacion(
+            producto_id, nombre, descripcion, categoria, precio_compra, precio_venta,
+            stock, stock_minimo, unidad, proveedor_id, codigo, presentaciones
+        ).result()
+    
+    @staticmethod
+    def encolar_actualizacion(producto_id, nombre, descripcion, categoria, precio_compra, 
+                              precio_venta, stock, stock_minimo, unidad, proveedor_id,
+                              codigo=None, presentaciones=()):
+        return ProductoModel.encolar_actualizacion(
             producto_id, nombre, descripcion, categoria, precio_compra, precio_venta,
-            stock, stock_minimo, unidad, proveedor_id
+            stock, stock_minimo, unidad, proveedor_id,
+            codigo.strip() if codigo and codigo.strip() else None, presentaciones
         )
\ No newline at end of file
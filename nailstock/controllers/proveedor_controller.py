@@ -3,7 +3,13 @@ from ..models.proveedor_model import ProveedorModel
 class ProveedorController:
     @staticmethod
     def agregar_proveedor(nombre, telefono, direccion, correo, rfc, observaciones):
-        return ProveedorModel.agregar_proveedor(
+        return ProveedorController.encolar_proveedor(
+            nombre, telefono, direccion, correo, rfc, observaciones
+        ).result()
+    
+    @staticmethod
+    def encolar_proveedor(nombre, telefono, direccion, correo, rfc, observaciones):
+        return ProveedorModel.encolar_proveedor(
             nombre.strip(),
             telefono.strip() if telefono else None,
             direccion.strip() if direccion else None,
@@ -14,7 +20,14 @@ class ProveedorController:
     
     @staticmethod
     def actualizar_proveedor(proveedor_id, nombre, telefono, direccion, correo, rfc, observaciones):   
-        return ProveedorModel.actualizar_proveedor(
+        return ProveedorController.encolar_actualizacion(
+            proveedor_id, nombre, telefono, direccion, correo, rfc, observaciones
+        ).result()
+    
+    @staticmethod
+    def encolar_actualizacion(proveedor_id, nombre, telefono, direccion, correo, rfc,
+                              observaciones):
+        return ProveedorModel.encolar_actualizacion(
             proveedor_id,
             nombre.strip(),
             telefono.strip() if telefono else None,
@@ -26,17 +39,6 @@ class ProveedorController:
     
     @staticmethod
     def buscar_proveedores(termino):
-        proveedores = ProveedorModel.obtener_proveedores()
-        if not termino:
-            return proveedores
-        
-        termino_lower = termino.lower()
-        resultados = []
-        for proveedor in proveedores:
-            if (termino_lower in proveedor[1].lower() or  # nombre
-                (proveedor[2] and termino_lower in proveedor[2].lower()) or  # telefono
-                (proveedor[4] and termino_lower in proveedor[4].lower()) or  # correo
-                (proveedor[5] and termino_lower in proveedor[5].lower())):   # rfc
-                resultados.append(proveedor)
-        
-        return resultados
\ No newline at end of file
+        if not termino or not termino.strip():
+            return ProveedorModel.obtener_proveedores()
+        return ProveedorModel.buscar_proveedores(termino)
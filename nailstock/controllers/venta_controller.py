@@ -5,6 +5,11 @@ class VentaController:
     def registrar_venta(cliente_id, productos):
         return VentaModel.agregar_venta(cliente_id, productos)
     
+    @staticmethod
+    def encolar_venta(cliente_id, productos):
+        # Copia del carrito: la vista puede modificarlo mientras el escritor trabaja
+        return VentaModel.encolar_venta(cliente_id, [dict(item) for item in productos])
+    
     @staticmethod
     def calcular_total(productos):
         return sum(item['cantidad'] * item['precio_unitario'] for item in productos)
\ No newline at end of file
@@ -1,6 +1,7 @@
-import shutil
+import sqlite3
 from datetime import datetime
 from pathlib import Path
+from .db_connection import drain_db_connections
 
 def crear_respaldo(ruta_destino=None):
     """
@@ -29,8 +30,10 @@ def crear_respaldo(ruta_destino=None):
     # Crear la carpeta de destino si no existe (ej. "backups/")
     Path(ruta_destino).parent.mkdir(parents=True, exist_ok=True)
 
-    # Crear copia de la base de datos (copy2 conserva metadata del archivo)
-    shutil.copy2(db_path, ruta_destino)
+    # Copiar con la API de respaldo de SQLite: a diferencia de copiar el
+    # archivo, incluye lo que aún está en el WAL y es consistente aunque haya
+    # otras conexiones escribiendo
+    _copiar_base_datos(db_path, ruta_destino)
 
     return ruta_destino
 
@@ -58,7 +61,20 @@ def restaurar_respaldo(ruta_respaldo):
     # Antes de modificar la base de datos actual, crear un respaldo de seguridad
     crear_respaldo(f"backups/pre_restore_{datetime.now().strftime('%Y%m%d_%H%M%S')}.db")
 
+    # Cerrar las conexiones del pool para que ninguna quede apuntando al
+    # archivo que se va a reemplazar
+    drain_db_connections()
+
     # Sobrescribir la base de datos con el respaldo elegido
-    shutil.copy2(ruta_respaldo, db_path)
+    _copiar_base_datos(ruta_respaldo, db_path)
+
+    return True
 
-    return True
\ No newline at end of file
+def _copiar_base_datos(origen, destino):
+    origen_conn = sqlite3.connect(str(origen))
+    destino_conn = sqlite3.connect(str(destino))
+    try:
+        origen_conn.backup(destino_conn)
+    finally:
+        destino_conn.close()
+        origen_conn.close()
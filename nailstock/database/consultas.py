@@ -0,0 +1,1371 @@
+import threading
+import time
+from .db_connection import sql_tracer
+from ..models.filas import (ProductoResumen, Producto, Cliente, Proveedor, Venta,
+                            DetalleVenta, ProductoStock, ProductoVendido, AjusteMasivo,
+                            ProductoDisponible, Movimiento, StockKardex, DiaVentasDiferente,
+                            InventarioCategoria, AlertaStock,
+                            ProductoEncontrado, CodigoBarras, ProductoEscaneado)
+
+class Consulta:
+    """SQL registrado bajo un nombre, con sus estadísticas de uso."""
+
+    __slots__ = ("nombre", "sql", "critica", "ejemplo", "fila",
+                 "llamadas", "tiempo_total", "filas")
+
+    def __init__(self, nombre, sql, critica=False, ejemplo=(), fila=None):
+        self.nombre = nombre
+        self.sql = sql
+        self.critica = critica
+        self.ejemplo = ejemplo
+        self.fila = fila
+        self.llamadas = 0
+        self.tiempo_total = 0.0
+        self.filas = 0
+
+
+class RegistroConsultas:
+    """
+    Registro central de consultas SQL con nombre.
+
+    - Todo el SQL de la aplicación se registra aquí y se ejecuta por nombre,
+      así cada consulta siempre envía exactamente el mismo texto y SQLite
+      reutiliza la sentencia preparada del caché de la conexión
+      (`cached_statements`).
+    - Por cada consulta se acumulan llamadas, tiempo total y filas.
+    - Las consultas marcadas como críticas se verifican con
+      EXPLAIN QUERY PLAN (ver planes.py) usando sus parámetros de ejemplo.
+    - Una consulta puede declarar su clase de fila (models/filas.py): sus
+      resultados se devuelven como objetos con atributos en lugar de tuplas.
+    """
+
+    def __init__(self):
+        self._consultas = {}
+        self._lock = threading.Lock()
+
+    def registrar(self, nombre, sql, critica=False, ejemplo=(), fila=None):
+        if nombre in self._consultas:
+            raise ValueError(f"Consulta registrada dos veces: {nombre}")
+        self._consultas[nombre] = Consulta(nombre, sql, critica, ejemplo, fila)
+
+    def sql(self, nombre):
+        return self._consultas[nombre].sql
+
+    def criticas(self):
+        return [consulta for consulta in self._consultas.values() if consulta.critica]
+
+    def __len__(self):
+        return len(self._consultas)
+
+    def ejecutar(self, conn, nombre, params=()):
+        """Ejecuta una sentencia (INSERT/UPDATE/DELETE) y devuelve el cursor."""
+        consulta = self._consultas[nombre]
+        inicio = time.perf_counter()
+        cursor = conn.execute(consulta.sql, params)
+        self._anotar(consulta, inicio, max(cursor.rowcount, 0), params)
+        return cursor
+
+    def ejecutar_muchos(self, conn, nombre, filas_params):
+        """Ejecuta una sentencia una vez por cada juego de parámetros."""
+        consulta = self._consultas[nombre]
+        inicio = time.perf_counter()
+        if sql_tracer.enabled:
+            # Materializar para poder describir la forma de los parámetros
+            filas_params = list(filas_params)
+        cursor = conn.executemany(consulta.sql, filas_params)
+        self._anotar(consulta, inicio, max(cursor.rowcount, 0), filas_params)
+        return cursor
+
+    def todos(self, conn, nombre, params=()):
+        """Ejecuta una consulta y devuelve todas las filas."""
+        consulta = self._consultas[nombre]
+        inicio = time.perf_counter()
+        filas = self._cursor(conn, consulta).execute(consulta.sql, params).fetchall()
+        self._anotar(consulta, inicio, len(filas), params)
+        return filas
+
+    def uno(self, conn, nombre, params=()):
+        """Ejecuta una consulta y devuelve la primera fila (o None)."""
+        consulta = self._consultas[nombre]
+        inicio = time.perf_counter()
+        fila = self._cursor(conn, consulta).execute(consulta.sql, params).fetchone()
+        self._anotar(consulta, inicio, 0 if fila is None else 1, params)
+        return fila
+
+    @staticmethod
+    def _cursor(conn, consulta):
+        cursor = conn.cursor()
+        if consulta.fila is not None:
+            cursor.row_factory = consulta.fila.desde_fila
+        return cursor
+
+    def _anotar(self, consulta, inicio, filas, params):
+        duracion = time.perf_counter() - inicio
+        with self._lock:
+            consulta.llamadas += 1
+            consulta.tiempo_total += duracion
+            consulta.filas += filas
+
+        if sql_tracer.enabled:
+            sql_tracer.record(consulta.sql, params, duracion)
+
+    def estadisticas(self):
+        """
+        Devuelve las estadísticas de las consultas usadas, de la que más
+        tiempo total acumula a la que menos.
+        """
+        with self._lock:
+            usadas = [
+                {
+                    'nombre': consulta.nombre,
+                    'llamadas': consulta.llamadas,
+                    'tiempo_total': consulta.tiempo_total,
+                    'tiempo_promedio': consulta.tiempo_total / consulta.llamadas,
+                    'filas': consulta.filas,
+                }
+                for consulta in self._consultas.values() if consulta.llamadas
+            ]
+        return sorted(usadas, key=lambda e: e['tiempo_total'], reverse=True)
+
+    def reiniciar_estadisticas(self):
+        with self._lock:
+            for consulta in self._consultas.values():
+                consulta.llamadas = 0
+                consulta.tiempo_total = 0.0
+                consulta.filas = 0
+
+
+consultas = RegistroConsultas()
+registrar = consultas.registrar
+
+# Parámetros de ejemplo para verificar las consultas de periodo
+_PERIODO_EJEMPLO = ("2024-01-01", "2024-02-01")
+
+# --- Productos ---
+
+registrar("productos.insertar", '''
+    INSERT INTO productos (nombre, descripcion, categoria, precio_compra,
+                         precio_venta, stock, stock_minimo, unidad, proveedor_id, codigo)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+''')
+
+# Consultas separadas por estado: el índice parcial de productos activos
+# solo se usa si la condición es literal (activo = 1)
+# Los listados traen solo las columnas de ProductoResumen; la descripción
+# y el proveedor_id se cargan por ID al editar (productos.por_id)
+registrar("productos.listar_activos", '''
+    SELECT p.id, p.nombre, p.categoria, p.precio_compra, p.precio_venta,
+           p.stock, p.stock_minimo, p.unidad, pr.nombre as proveedor_nombre
+    FROM productos p
+    LEFT JOIN proveedores pr ON p.proveedor_id = pr.id
+    WHERE p.activo = 1
+    ORDER BY p.nombre
+''', critica=True, fila=ProductoResumen)
+
+registrar("productos.listar_inactivos", '''
+    SELECT p.id, p.nombre, p.categoria, p.precio_compra, p.precio_venta,
+           p.stock, p.stock_minimo, p.unidad, pr.nombre as proveedor_nombre
+    FROM productos p
+    LEFT JOIN proveedores pr ON p.proveedor_id = pr.id
+    WHERE p.activo = 0
+    ORDER BY p.nombre
+''', fila=ProductoResumen)
+
+registrar("productos.por_id", '''
+    SELECT p.id, p.codigo, p.nombre, p.descripcion, p.categoria, p.precio_compra,
+           p.precio_venta, p.stock, p.stock_minimo, p.unidad, p.proveedor_id,
+           pr.nombre as proveedor_nombre
+    FROM productos p
+    LEFT JOIN proveedores pr ON p.proveedor_id = pr.id
+    WHERE p.id = ?
+''', critica=True, ejemplo=(1,), fila=Producto)
+
+registrar("productos.actualizar", '''
+    UPDATE productos
+    SET nombre = ?, descripcion = ?, categoria = ?, precio_compra = ?,
+        precio_venta = ?, stock = ?, stock_minimo = ?, unidad = ?, proveedor_id = ?,
+        codigo = ?
+    WHERE id = ?
+''')
+
+registrar("productos.desactivar", '''
+    UPDATE productos SET activo = 0 WHERE id = ?
+''')
+
+# Búsqueda de texto completo (0015_busqueda_productos.py). ?1: expresión
+# MATCH (utils.busqueda.consulta_fts); ?2: máximo de resultados. Ordenada
+# por relevancia (rank = bm25 con pesos por columna), con el nombre
+# resaltado y un fragmento de la descripción.
+registrar("productos.buscar_fts", '''
+    SELECT p.id, p.nombre, p.categoria, p.precio_compra, p.precio_venta,
+           p.stock, p.stock_minimo, p.unidad, pr.nombre as proveedor_nombre,
+           highlight(productos_fts, 0, '[', ']') as nombre_resaltado,
+           snippet(productos_fts, 1, '[', ']', '…', 10) as fragmento
+    FROM productos_fts
+    JOIN productos p ON p.id = productos_fts.rowid
+    LEFT JOIN proveedores pr ON p.proveedor_id = pr.id
+    WHERE productos_fts MATCH ?1 AND p.activo = 1
+    ORDER BY productos_fts.rank
+    LIMIT ?2
+''', fila=ProductoEncontrado)
+
+registrar("productos.hay_fts", '''
+    SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'productos_fts'
+''')
+
+# Sin FTS5: cada palabra de ?1 (arreglo JSON) debe aparecer en el nombre, la
+# descripción o la categoría. Recorre los productos activos.
+registrar("productos.buscar", '''
+    SELECT p.id, p.nombre, p.categoria, p.precio_compra, p.precio_venta,
+           p.stock, p.stock_minimo, p.unidad, pr.nombre as proveedor_nombre,
+           p.nombre as nombre_resaltado, p.descripcion as fragmento
+    FROM productos p
+    LEFT JOIN proveedores pr ON p.proveedor_id = pr.id
+    WHERE p.activo = 1 AND NOT EXISTS (
+        SELECT 1 FROM json_each(?1) t
+        WHERE p.nombre NOT LIKE '%' || t.value || '%'
+          AND COALESCE(p.descripcion, '') NOT LIKE '%' || t.value || '%'
+          AND COALESCE(p.categoria, '') NOT LIKE '%' || t.value || '%'
+    )
+    ORDER BY p.nombre
+    LIMIT ?2
+''', fila=ProductoEncontrado)
+
+# Productos activos de una lista de IDs (arreglo JSON), en el orden de la
+# lista: los nombres parecidos que encontró el índice de trigramas
+# (ProductoModel.buscar_parecidos)
+registrar("productos.por_ids", '''
+    SELECT p.id, p.nombre, p.categoria, p.precio_compra, p.precio_venta,
+           p.stock, p.stock_minimo, p.unidad, pr.nombre as proveedor_nombre,
+           p.nombre as nombre_resaltado, NULL as fragmento
+    FROM json_each(?1) ids
+    JOIN productos p ON p.id = ids.value
+    LEFT JOIN proveedores pr ON p.proveedor_id = pr.id
+    WHERE p.activo = 1
+    ORDER BY ids.key
+''', critica=True, ejemplo=("[1, 2, 3]",), fila=ProductoEncontrado)
+
+# --- Códigos de productos (0016_codigos_productos.sql) ---
+
+# Código -> (producto, piezas) de los productos activos, para el mapa en
+# memoria del escáner (CodigoModel); el código del producto es de una pieza
+_CODIGOS = '''
+    SELECT p.codigo, p.id, 1
+    FROM productos p
+    WHERE p.activo = 1 AND p.codigo IS NOT NULL{producto}
+    UNION ALL
+    SELECT c.codigo, c.producto_id, c.cantidad
+    FROM codigos_barras c
+    JOIN productos p ON p.id = c.producto_id
+    WHERE p.activo = 1{producto}
+'''
+
+registrar("codigos.listar", _CODIGOS.format(producto=""))
+
+registrar("codigos.de_producto", _CODIGOS.format(producto=" AND p.id = ?1"),
+          critica=True, ejemplo=(1,))
+
+# Un código que no está en el mapa (lo dio de alta otra caja)
+registrar("codigos.buscar", '''
+    SELECT p.id, 1 FROM productos p WHERE p.codigo = ?1 AND p.activo = 1
+    UNION ALL
+    SELECT c.producto_id, c.cantidad
+    FROM codigos_barras c
+    JOIN productos p ON p.id = c.producto_id
+    WHERE c.codigo = ?1 AND p.activo = 1
+''', critica=True, ejemplo=("7501000000000",))
+
+# Dueño de un código, activo o no: para avisar antes de chocar con el índice único
+registrar("codigos.dueno", '''
+    SELECT p.id, p.nombre FROM productos p WHERE p.codigo = ?1
+    UNION ALL
+    SELECT p.id, p.nombre
+    FROM codigos_barras c
+    JOIN productos p ON p.id = c.producto_id
+    WHERE c.codigo = ?1
+''', critica=True, ejemplo=("7501000000000",))
+
+registrar("codigos.por_producto", '''
+    SELECT codigo, cantidad FROM codigos_barras
+    WHERE producto_id = ?
+    ORDER BY cantidad, codigo
+''', critica=True, ejemplo=(1,), fila=CodigoBarras)
+
+registrar("codigos.insertar", '''
+    INSERT INTO codigos_barras (codigo, producto_id, cantidad) VALUES (?, ?, ?)
+''')
+
+registrar("codigos.borrar_producto", '''
+    DELETE FROM codigos_barras WHERE producto_id = ?
+''')
+
+# Lo que la caja necesita para agregar la línea; ?2: piezas del código
+registrar("codigos.producto_venta", '''
+    SELECT p.id, p.nombre, p.precio_venta, ?2
+    FROM productos p
+    WHERE p.id = ?1 AND p.activo = 1
+''', critica=True, ejemplo=(1, 1), fila=ProductoEscaneado)
+
+# --- Clientes ---
+
+registrar("clientes.insertar", '''
+    INSERT INTO clientes (nombre, telefono, direccion, rfc, telefono_busqueda, rfc_busqueda)
+    VALUES (?, ?, ?, ?, ?, ?)
+''')
+
+registrar("clientes.listar", '''
+    SELECT id, nombre, telefono, direccion, rfc FROM clientes ORDER BY nombre
+''', fila=Cliente)
+
+registrar("clientes.por_id", '''
+    SELECT id, nombre, telefono, direccion, rfc FROM clientes WHERE id = ?
+''', critica=True, ejemplo=(1,), fila=Cliente)
+
+registrar("clientes.actualizar", '''
+    UPDATE clientes
+    SET nombre = ?, telefono = ?, direccion = ?, rfc = ?,
+        telefono_busqueda = ?, rfc_busqueda = ?
+    WHERE id = ?
+''')
+
+registrar("clientes.contar_ventas", '''
+    SELECT COUNT(*) FROM ventas WHERE cliente_id = ?
+''', critica=True, ejemplo=(1,))
+
+registrar("clientes.eliminar", '''
+    DELETE FROM clientes WHERE id = ?
+''')
+
+# --- Proveedores ---
+
+registrar("proveedores.insertar", '''
+    INSERT INTO proveedores (nombre, telefono, direccion, correo, rfc, observaciones,
+                             telefono_busqueda, rfc_busqueda, correo_busqueda)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+''')
+
+registrar("proveedores.listar", '''
+    SELECT id, nombre, telefono, direccion, correo, rfc, observaciones
+    FROM proveedores ORDER BY nombre
+''', fila=Proveedor)
+
+registrar("proveedores.por_id", '''
+    SELECT id, nombre, telefono, direccion, correo, rfc, observaciones
+    FROM proveedores WHERE id = ?
+''', critica=True, ejemplo=(1,), fila=Proveedor)
+
+registrar("proveedores.actualizar", '''
+    UPDATE proveedores
+    SET nombre = ?, telefono = ?, direccion = ?, correo = ?, rfc = ?, observaciones = ?,
+        telefono_busqueda = ?, rfc_busqueda = ?, correo_busqueda = ?
+    WHERE id = ?
+''')
+
+registrar("proveedores.contar_productos", '''
+    SELECT COUNT(*) FROM productos WHERE proveedor_id = ?
+''', critica=True, ejemplo=(1,))
+
+registrar("proveedores.eliminar", '''
+    DELETE FROM proveedores WHERE id = ?
+''')
+
+# --- Búsqueda de clientes y proveedores ---
+
+# Palabras normalizadas de cada registro (0014_busqueda_clientes_proveedores.py).
+# Se reemplazan completas al agregar o actualizar el registro.
+registrar("busqueda.borrar_palabras", '''
+    DELETE FROM palabras_busqueda WHERE tabla = ? AND registro_id = ?
+''')
+
+registrar("busqueda.insertar_palabra", '''
+    INSERT OR IGNORE INTO palabras_busqueda (tabla, palabra, registro_id) VALUES (?, ?, ?)
+''')
+
+# ?1: términos normalizados como arreglo JSON (utils.busqueda.terminos);
+# ?2: máximo de resultados. Cada término debe ser prefijo de una palabra del
+# registro o de una de sus columnas *_busqueda. Los rangos [término,
+# término + U+10FFFF) se resuelven con los índices, así el costo depende
+# de cuántos registros coinciden y no del tamaño de la tabla.
+_TERMINOS_BUSQUEDA = '''
+    WITH terminos AS (
+        SELECT key AS termino, value AS desde, value || char(1114111) AS hasta
+        FROM json_each(?1)
+    ),
+    coincidencias AS (
+        SELECT terminos.termino, p.registro_id AS id
+        FROM terminos
+        JOIN palabras_busqueda p
+          ON p.tabla = '{tabla}' AND p.palabra >= terminos.desde AND p.palabra < terminos.hasta
+'''
+
+_COINCIDENCIA_COLUMNA = '''
+        UNION
+        SELECT terminos.termino, r.id
+        FROM terminos
+        JOIN {tabla} r ON r.{columna} >= terminos.desde AND r.{columna} < terminos.hasta
+'''
+
+def _consulta_busqueda(tabla, columnas_busqueda, columnas):
+    partes = [_TERMINOS_BUSQUEDA.format(tabla=tabla)]
+    partes += [_COINCIDENCIA_COLUMNA.format(tabla=tabla, columna=columna)
+               for columna in columnas_busqueda]
+    partes.append(f'''
+    )
+    SELECT {columnas}
+    FROM {tabla}
+    WHERE id IN (
+        SELECT id FROM coincidencias
+        GROUP BY id
+        HAVING COUNT(DISTINCT termino) = json_array_length(?1)
+    )
+    ORDER BY nombre
+    LIMIT ?2
+''')
+    return "".join(partes)
+
+_BUSQUEDA_EJEMPLO = ('["juan", "55"]', 100)
+
+registrar("clientes.buscar", _consulta_busqueda(
+    "clientes", ("telefono_busqueda", "rfc_busqueda"),
+    "id, nombre, telefono, direccion, rfc"
+), critica=True, ejemplo=_BUSQUEDA_EJEMPLO, fila=Cliente)
+
+registrar("proveedores.buscar", _consulta_busqueda(
+    "proveedores", ("telefono_busqueda", "rfc_busqueda", "correo_busqueda"),
+    "id, nombre, telefono, direccion, correo, rfc, observaciones"
+), critica=True, ejemplo=_BUSQUEDA_EJEMPLO, fila=Proveedor)
+
+# --- Ventas ---
+
+registrar("ventas.insertar", '''
+    INSERT INTO ventas (cliente_id, total)
+    VALUES (?, ?)
+''')
+
+registrar("ventas.insertar_detalle", '''
+    INSERT INTO detalle_venta (venta_id, producto_id, cantidad, precio_unitario, subtotal)
+    VALUES (?, ?, ?, ?, ?)
+''')
+
+# El carrito llega como un arreglo JSON [[producto_id, cantidad], ...] ya
+# agrupado por producto: un solo texto SQL sirve para cualquier tamaño de
+# carrito y se reutiliza la sentencia preparada.
+# Lo reservado por carritos vigentes de otras terminales no está disponible.
+# Parámetros: (carrito, terminal, ahora)
+registrar("ventas.faltantes", '''
+    WITH carrito(producto_id, cantidad) AS (
+        SELECT json_extract(value, '$[0]'), json_extract(value, '$[1]')
+        FROM json_each(?)
+    )
+    SELECT c.producto_id, p.nombre, c.cantidad,
+           p.stock - COALESCE(r.reservado, 0) as disponible, p.activo
+    FROM carrito c
+    LEFT JOIN productos p ON p.id = c.producto_id
+    LEFT JOIN (
+        SELECT producto_id, SUM(cantidad) as reservado
+        FROM reservas_stock
+        WHERE terminal <> ? AND expira > ?
+        GROUP BY producto_id
+    ) r ON r.producto_id = c.producto_id
+    WHERE p.id IS NULL OR p.activo = 0 OR p.stock - COALESCE(r.reservado, 0) < c.cantidad
+''')
+
+registrar("ventas.descontar_stock", '''
+    UPDATE productos SET stock = stock - c.cantidad
+    FROM (
+        SELECT json_extract(value, '$[0]') AS producto_id,
+               json_extract(value, '$[1]') AS cantidad
+        FROM json_each(?)
+    ) AS c
+    WHERE productos.id = c.producto_id
+''')
+
+registrar("ventas.listar", '''
+    SELECT v.id, v.cliente_id, c.nombre as cliente_nombre, v.total, v.fecha_venta
+    FROM ventas v
+    JOIN clientes c ON v.cliente_id = c.id
+    ORDER BY v.fecha_venta DESC
+''', fila=Venta)
+
+# Los filtros por periodo usan el rango semiabierto [inicio, fin) sobre
+# fecha_venta (ver utils.helpers.rango_fechas); DATE(fecha_venta)
+# impediría usar idx_ventas_fecha.
+registrar("ventas.listar_periodo", '''
+    SELECT v.id, v.cliente_id, c.nombre as cliente_nombre, v.total, v.fecha_venta
+    FROM ventas v
+    JOIN clientes c ON v.cliente_id = c.id
+    WHERE v.fecha_venta >= ? AND v.fecha_venta < ?
+    ORDER BY v.fecha_venta DESC
+''', critica=True, ejemplo=_PERIODO_EJEMPLO, fila=Venta)
+
+registrar("ventas.detalle", '''
+    SELECT dv.producto_id, p.nombre as producto_nombre, p.unidad,
+           dv.cantidad, dv.precio_unitario, dv.subtotal
+    FROM detalle_venta dv
+    JOIN productos p ON dv.producto_id = p.id
+    WHERE dv.venta_id = ?
+''', critica=True, ejemplo=(1,), fila=DetalleVenta)
+
+registrar("ventas.eliminar", '''
+    DELETE FROM ventas WHERE id = ?
+''')
+
+# --- Reportes ---
+
+registrar("reportes.productos_csv", '''
+    SELECT p.id, p.codigo, p.nombre, p.descripcion, p.categoria, p.precio_compra,
+           p.precio_venta, p.stock, p.stock_minimo, p.unidad,
+           pr.nombre as proveedor, p.fecha_creacion
+    FROM productos p
+    LEFT JOIN proveedores pr ON p.proveedor_id = pr.id
+    WHERE p.activo = 1
+    ORDER BY p.nombre
+''')
+
+registrar("reportes.ventas_csv", '''
+    SELECT v.id, c.nombre as cliente,
+           v.total, v.fecha_venta
+    FROM ventas v
+    JOIN clientes c ON v.cliente_id = c.id
+    ORDER BY v.fecha_venta DESC
+''')
+
+registrar("reportes.ventas_csv_periodo", '''
+    SELECT v.id, c.nombre as cliente,
+           v.total, v.fecha_venta
+    FROM ventas v
+    JOIN clientes c ON v.cliente_id = c.id
+    WHERE v.fecha_venta >= ? AND v.fecha_venta < ?
+    ORDER BY v.fecha_venta DESC
+''', critica=True, ejemplo=_PERIODO_EJEMPLO)
+
+registrar("reportes.clientes_csv", '''
+    SELECT id, nombre, telefono, direccion, rfc, fecha_creacion
+    FROM clientes ORDER BY nombre
+''')
+
+# Leen el resumen diario (0011_ventas_diarias.sql), que incluye las ventas
+# archivadas. El promedio se deriva de la suma y el número de ventas.
+registrar("reportes.estadisticas_periodo", '''
+    SELECT
+        SUM(ventas) as total_ventas,
+        SUM(total) as ingresos_totales,
+        SUM(total) / SUM(ventas) as promedio_venta,
+        MIN(minimo) as venta_minima,
+        MAX(maximo) as venta_maxima
+    FROM ventas_diarias
+    WHERE dia >= ? AND dia < ?
+''', critica=True, ejemplo=_PERIODO_EJEMPLO)
+
+registrar("reportes.ventas_por_dia", '''
+    SELECT dia, ventas, total
+    FROM ventas_diarias
+    WHERE dia >= ? AND dia < ?
+    ORDER BY dia
+''', critica=True, ejemplo=_PERIODO_EJEMPLO)
+
+# Lee el resumen por producto y día (0010_ventas_producto_dia.sql), que
+# incluye las ventas archivadas. `dia` es DATE(fecha_venta), así el mismo
+# rango semiabierto de fechas sirve para filtrarlo.
+registrar("reportes.productos_populares", '''
+    SELECT p.nombre, SUM(a.unidades) as total_vendido, SUM(a.ingresos) as ingresos
+    FROM ventas_producto_dia a
+    JOIN productos p ON a.producto_id = p.id
+    WHERE a.dia >= ? AND a.dia < ?
+    GROUP BY a.producto_id
+    ORDER BY total_vendido DESC
+    LIMIT 10
+''', critica=True, ejemplo=_PERIODO_EJEMPLO, fila=ProductoVendido)
+
+# Los productos con stock bajo son los que tienen una alerta abierta
+# (0013_alertas_stock.sql): se leen del índice de alertas abiertas en lugar
+# de recorrer el catálogo
+registrar("reportes.stock_bajo", '''
+    SELECT p.nombre, p.stock, p.stock_minimo, p.unidad
+    FROM alertas_stock a
+    JOIN productos p ON p.id = a.producto_id
+    WHERE a.resuelta = 0
+    ORDER BY p.stock ASC
+''', critica=True, fila=ProductoStock)
+
+registrar("reportes.sin_stock", '''
+    SELECT nombre, stock, stock_minimo, unidad
+    FROM productos
+    WHERE activo = 1 AND stock = 0
+    ORDER BY nombre
+''', fila=ProductoStock)
+
+# Leen los resúmenes de inventario (0012_valor_inventario.sql): una fila
+# para el total y una por categoría
+registrar("reportes.resumen_inventario", '''
+    SELECT productos, valor, stock_bajo, sin_stock
+    FROM inventario_resumen
+    WHERE id = 1
+''')
+
+registrar("reportes.valor_por_categoria", '''
+    SELECT categoria, productos, valor, stock_bajo, sin_stock
+    FROM inventario_categoria
+    ORDER BY valor DESC
+''', fila=InventarioCategoria)
+
+# --- Alertas de stock bajo ---
+
+registrar("alertas.contar_pendientes", '''
+    SELECT COUNT(*) FROM alertas_stock WHERE resuelta = 0 AND vista = 0
+''', critica=True)
+
+_ALERTAS_ABIERTAS = '''
+    SELECT a.id, a.producto_id, p.nombre, p.stock, p.stock_minimo, p.unidad, a.fecha, a.vista
+    FROM alertas_stock a
+    JOIN productos p ON p.id = a.producto_id
+    WHERE a.resuelta = 0
+'''
+
+registrar("alertas.abiertas", _ALERTAS_ABIERTAS + '''
+    ORDER BY a.vista, a.fecha DESC
+''', critica=True, fila=AlertaStock)
+
+registrar("alertas.pendientes", _ALERTAS_ABIERTAS + '''
+      AND a.vista = 0
+    ORDER BY a.fecha DESC
+''', critica=True, fila=AlertaStock)
+
+registrar("alertas.marcar_vistas", '''
+    UPDATE alertas_stock SET vista = 1 WHERE resuelta = 0 AND vista = 0
+''')
+
+registrar("alertas.marcar_vistas_ids", '''
+    UPDATE alertas_stock SET vista = 1
+    WHERE resuelta = 0 AND id IN (SELECT value FROM json_each(?))
+''')
+
+# --- Importación masiva ---
+
+# Tabla de paso en la conexión del escritor: cada lote se carga aquí con
+# executemany y luego se aplica a productos con dos sentencias por conjunto
+registrar("importacion.crear_staging", '''
+    CREATE TEMP TABLE IF NOT EXISTS staging_productos (
+        nombre TEXT NOT NULL,
+        descripcion TEXT,
+        categoria TEXT,
+        precio_compra REAL NOT NULL,
+        precio_venta REAL NOT NULL,
+        stock INTEGER NOT NULL,
+        stock_minimo INTEGER NOT NULL,
+        unidad TEXT NOT NULL,
+        proveedor_id INTEGER,
+        codigo TEXT
+    )
+''')
+
+registrar("importacion.limpiar_staging", '''
+    DELETE FROM temp.staging_productos
+''')
+
+registrar("importacion.cargar_staging", '''
+    INSERT INTO temp.staging_productos (nombre, descripcion, categoria, precio_compra,
+                                        precio_venta, stock, stock_minimo, unidad, proveedor_id,
+                                        codigo)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+''')
+
+# Códigos del lote que no se pueden aplicar: ya son el código de barras de
+# una presentación, o son de un producto con otro nombre o proveedor que el
+# de la fila (un código no renombra ni cambia de proveedor a su producto).
+# Devuelve (código, producto dueño, es_presentacion)
+registrar("importacion.codigos_ocupados", '''
+    SELECT s.codigo, p.nombre, 1
+    FROM temp.staging_productos s
+    JOIN codigos_barras cb ON cb.codigo = s.codigo
+    JOIN productos p ON p.id = cb.producto_id
+    UNION ALL
+    SELECT s.codigo, p.nombre, 0
+    FROM temp.staging_productos s
+    JOIN productos p ON p.codigo = s.codigo
+    WHERE p.nombre <> s.nombre OR p.proveedor_id IS NOT s.proveedor_id
+''')
+
+registrar("importacion.quitar_de_staging", '''
+    DELETE FROM temp.staging_productos WHERE codigo = ?
+''')
+
+# Las filas con código se aplican al producto con ese código, que ya tiene
+# su nombre y proveedor (ver codigos_ocupados); las demás, por nombre +
+# proveedor
+registrar("importacion.actualizar_por_codigo", '''
+    UPDATE productos
+    SET descripcion = s.descripcion, categoria = s.categoria,
+        precio_compra = s.precio_compra, precio_venta = s.precio_venta,
+        stock = s.stock, stock_minimo = s.stock_minimo, unidad = s.unidad,
+        activo = 1
+    FROM temp.staging_productos s
+    WHERE s.codigo IS NOT NULL AND productos.codigo = s.codigo
+''')
+
+# "IS" para que un proveedor NULL coincida con NULL. Una fila con un código
+# que aún no existe se lo asigna al producto con su nombre, si no tenía
+registrar("importacion.actualizar_existentes", '''
+    UPDATE productos
+    SET descripcion = s.descripcion, categoria = s.categoria,
+        precio_compra = s.precio_compra, precio_venta = s.precio_venta,
+        stock = s.stock, stock_minimo = s.stock_minimo, unidad = s.unidad,
+        codigo = COALESCE(s.codigo, productos.codigo), activo = 1
+    FROM temp.staging_productos s
+    WHERE productos.nombre = s.nombre AND productos.proveedor_id IS s.proveedor_id
+      AND (s.codigo IS NULL OR (
+          productos.codigo IS NULL
+          AND NOT EXISTS (SELECT 1 FROM productos p WHERE p.codigo = s.codigo)
+      ))
+''')
+
+registrar("importacion.insertar_nuevos", '''
+    INSERT INTO productos (nombre, descripcion, categoria, precio_compra,
+                           precio_venta, stock, stock_minimo, unidad, proveedor_id, codigo)
+    SELECT s.nombre, s.descripcion, s.categoria, s.precio_compra,
+           s.precio_venta, s.stock, s.stock_minimo, s.unidad, s.proveedor_id, s.codigo
+    FROM temp.staging_productos s
+    WHERE CASE WHEN s.codigo IS NOT NULL
+               THEN NOT EXISTS (SELECT 1 FROM productos p WHERE p.codigo = s.codigo)
+               ELSE NOT EXISTS (
+                   SELECT 1 FROM productos p
+                   WHERE p.nombre = s.nombre AND p.proveedor_id IS s.proveedor_id
+               )
+          END
+''')
+
+# --- Ajustes masivos ---
+
+registrar("ajustes.insertar", '''
+    INSERT INTO ajustes_masivos (tipo, valor, categoria, proveedor_id)
+    VALUES (?, ?, ?, ?)
+''')
+
+registrar("ajustes.fijar_afectados", '''
+    UPDATE ajustes_masivos SET productos_afectados = ? WHERE id = ?
+''')
+
+registrar("ajustes.listar", '''
+    SELECT id, tipo, valor, categoria, proveedor_id, productos_afectados, revertido, fecha
+    FROM ajustes_masivos
+    ORDER BY id DESC
+    LIMIT ?
+''', fila=AjusteMasivo)
+
+registrar("ajustes.ultimo", '''
+    SELECT id, tipo, valor, categoria, proveedor_id, productos_afectados, revertido, fecha
+    FROM ajustes_masivos
+    WHERE revertido = 0
+    ORDER BY id DESC
+    LIMIT 1
+''', fila=AjusteMasivo)
+
+registrar("ajustes.marcar_revertido", '''
+    UPDATE ajustes_masivos SET revertido = 1 WHERE id = ?
+''')
+
+# Un filtro por variante, para que cada una use su índice (categoría
+# parcial, proveedor) en lugar de condiciones "? IS NULL OR ..."
+_FILTROS_AJUSTE = {
+    'todos': "activo = 1",
+    'categoria': "activo = 1 AND categoria = ?",
+    'proveedor': "activo = 1 AND proveedor_id = ?",
+    'categoria_proveedor': "activo = 1 AND categoria = ? AND proveedor_id = ?",
+}
+
+for _filtro, _condicion in _FILTROS_AJUSTE.items():
+    registrar(f"ajustes.contar_{_filtro}", f'''
+        SELECT COUNT(*) FROM productos WHERE {_condicion}
+    ''')
+
+    # La foto previa también define el conjunto de productos del ajuste
+    registrar(f"ajustes.snapshot_{_filtro}", f'''
+        INSERT INTO ajustes_masivos_snapshot (ajuste_id, producto_id, precio_compra,
+                                              precio_venta, stock)
+        SELECT ?, id, precio_compra, precio_venta, stock
+        FROM productos
+        WHERE {_condicion}
+    ''')
+
+# Actualizaciones por conjunto: un solo UPDATE sobre los productos de la
+# foto previa. Parámetros: (valor, ajuste_id)
+_PRODUCTOS_DEL_AJUSTE = "id IN (SELECT producto_id FROM ajustes_masivos_snapshot WHERE ajuste_id = ?)"
+
+registrar("ajustes.precio_venta_porcentaje", f'''
+    UPDATE productos SET precio_venta = MAX(ROUND(precio_venta * (1 + ? / 100.0), 2), 0)
+    WHERE {_PRODUCTOS_DEL_AJUSTE}
+''')
+
+registrar("ajustes.precio_compra_porcentaje", f'''
+    UPDATE productos SET precio_compra = MAX(ROUND(precio_compra * (1 + ? / 100.0), 2), 0)
+    WHERE {_PRODUCTOS_DEL_AJUSTE}
+''')
+
+registrar("ajustes.precio_venta_monto", f'''
+    UPDATE productos SET precio_venta = MAX(ROUND(precio_venta + ?, 2), 0)
+    WHERE {_PRODUCTOS_DEL_AJUSTE}
+''')
+
+registrar("ajustes.precio_compra_monto", f'''
+    UPDATE productos SET precio_compra = MAX(ROUND(precio_compra + ?, 2), 0)
+    WHERE {_PRODUCTOS_DEL_AJUSTE}
+''')
+
+registrar("ajustes.margen", f'''
+    UPDATE productos SET precio_venta = ROUND(precio_compra * (1 + ? / 100.0), 2)
+    WHERE {_PRODUCTOS_DEL_AJUSTE}
+''')
+
+registrar("ajustes.stock_diferencia", f'''
+    UPDATE productos SET stock = MAX(stock + ?, 0)
+    WHERE {_PRODUCTOS_DEL_AJUSTE}
+''')
+
+registrar("ajustes.stock_fijo", f'''
+    UPDATE productos SET stock = ?
+    WHERE {_PRODUCTOS_DEL_AJUSTE}
+''')
+
+registrar("ajustes.registrar_stock_ajustado", '''
+    UPDATE ajustes_masivos_snapshot SET stock_ajustado = p.stock
+    FROM productos p
+    WHERE ajustes_masivos_snapshot.ajuste_id = ?
+      AND p.id = ajustes_masivos_snapshot.producto_id
+''')
+
+registrar("ajustes.revertir_precios", '''
+    UPDATE productos SET precio_compra = s.precio_compra, precio_venta = s.precio_venta
+    FROM ajustes_masivos_snapshot s
+    WHERE s.ajuste_id = ? AND productos.id = s.producto_id
+''')
+
+# Deshace solo la diferencia aplicada, sin perder las ventas posteriores
+registrar("ajustes.revertir_stock", '''
+    UPDATE productos SET stock = MAX(productos.stock - (s.stock_ajustado - s.stock), 0)
+    FROM ajustes_masivos_snapshot s
+    WHERE s.ajuste_id = ? AND productos.id = s.producto_id
+      AND s.stock_ajustado IS NOT NULL
+''')
+
+# --- Paginación por clave ---
+
+# Cada página busca a partir de la última clave de la anterior
+# ((nombre, id) o (fecha_venta, id)) en lugar de usar OFFSET, así el costo
+# no crece con el número de página y las inserciones concurrentes no
+# desplazan filas entre páginas. El último parámetro es el tamaño de
+# página + 1 (ver models/paginacion.py).
+_PAGINA_EJEMPLO = ("", 0, 101)
+_PAGINA_VENTAS_EJEMPLO = ("9999-12-31", 0, 101)
+
+registrar("productos.pagina_activos", '''
+    SELECT p.id, p.nombre, p.categoria, p.precio_compra, p.precio_venta,
+           p.stock, p.stock_minimo, p.unidad, pr.nombre as proveedor_nombre
+    FROM productos p
+    LEFT JOIN proveedores pr ON p.proveedor_id = pr.id
+    WHERE p.activo = 1 AND (p.nombre, p.id) > (?, ?)
+    ORDER BY p.nombre, p.id
+    LIMIT ?
+''', critica=True, ejemplo=_PAGINA_EJEMPLO, fila=ProductoResumen)
+
+registrar("productos.pagina_inactivos", '''
+    SELECT p.id, p.nombre, p.categoria, p.precio_compra, p.precio_venta,
+           p.stock, p.stock_minimo, p.unidad, pr.nombre as proveedor_nombre
+    FROM productos p
+    LEFT JOIN proveedores pr ON p.proveedor_id = pr.id
+    WHERE p.activo = 0 AND (p.nombre, p.id) > (?, ?)
+    ORDER BY p.nombre, p.id
+    LIMIT ?
+''', fila=ProductoResumen)
+
+registrar("productos.pagina_categoria", '''
+    SELECT p.id, p.nombre, p.categoria, p.precio_compra, p.precio_venta,
+           p.stock, p.stock_minimo, p.unidad, pr.nombre as proveedor_nombre
+    FROM productos p
+    LEFT JOIN proveedores pr ON p.proveedor_id = pr.id
+    WHERE p.activo = 1 AND p.categoria = ? AND (p.nombre, p.id) > (?, ?)
+    ORDER BY p.nombre, p.id
+    LIMIT ?
+''', critica=True, ejemplo=("Herramientas", *_PAGINA_EJEMPLO), fila=ProductoResumen)
+
+registrar("productos.categorias", '''
+    SELECT DISTINCT categoria FROM productos
+    WHERE activo = 1 AND categoria IS NOT NULL
+    ORDER BY categoria
+''', critica=True)
+
+registrar("clientes.pagina", '''
+    SELECT id, nombre, telefono, direccion, rfc FROM clientes
+    WHERE (nombre, id) > (?, ?)
+    ORDER BY nombre, id
+    LIMIT ?
+''', critica=True, ejemplo=_PAGINA_EJEMPLO, fila=Cliente)
+
+registrar("proveedores.pagina", '''
+    SELECT id, nombre, telefono, direccion, correo, rfc, observaciones
+    FROM proveedores
+    WHERE (nombre, id) > (?, ?)
+    ORDER BY nombre, id
+    LIMIT ?
+''', critica=True, ejemplo=_PAGINA_EJEMPLO, fila=Proveedor)
+
+registrar("ventas.pagina", '''
+    SELECT v.id, v.cliente_id, c.nombre as cliente_nombre, v.total, v.fecha_venta
+    FROM ventas v
+    JOIN clientes c ON v.cliente_id = c.id
+    WHERE (v.fecha_venta, v.id) < (?, ?)
+    ORDER BY v.fecha_venta DESC, v.id DESC
+    LIMIT ?
+''', critica=True, ejemplo=_PAGINA_VENTAS_EJEMPLO, fila=Venta)
+
+registrar("ventas.pagina_periodo", '''
+    SELECT v.id, v.cliente_id, c.nombre as cliente_nombre, v.total, v.fecha_venta
+    FROM ventas v
+    JOIN clientes c ON v.cliente_id = c.id
+    WHERE v.fecha_venta >= ? AND v.fecha_venta < ? AND (v.fecha_venta, v.id) < (?, ?)
+    ORDER BY v.fecha_venta DESC, v.id DESC
+    LIMIT ?
+''', critica=True, ejemplo=(*_PERIODO_EJEMPLO, *_PAGINA_VENTAS_EJEMPLO), fila=Venta)
+
+# --- Reservas de stock ---
+
+registrar("reservas.limpiar_vencidas", '''
+    DELETE FROM reservas_stock WHERE expira <= ?
+''')
+
+# Parámetros: (ahora, producto_id)
+registrar("reservas.disponible", '''
+    SELECT p.nombre, p.stock - COALESCE((
+        SELECT SUM(r.cantidad) FROM reservas_stock r
+        WHERE r.producto_id = p.id AND r.expira > ?
+    ), 0) as disponible
+    FROM productos p
+    WHERE p.id = ? AND p.activo = 1
+''', critica=True, ejemplo=(0, 1))
+
+registrar("reservas.reservar", '''
+    INSERT INTO reservas_stock (terminal, producto_id, cantidad, expira)
+    VALUES (?, ?, ?, ?)
+    ON CONFLICT (terminal, producto_id)
+    DO UPDATE SET cantidad = cantidad + excluded.cantidad, expira = excluded.expira
+''')
+
+registrar("reservas.renovar", '''
+    UPDATE reservas_stock SET expira = ? WHERE terminal = ?
+''')
+
+registrar("reservas.liberar", '''
+    UPDATE reservas_stock SET cantidad = cantidad - ?
+    WHERE terminal = ? AND producto_id = ?
+''')
+
+registrar("reservas.borrar_vacias", '''
+    DELETE FROM reservas_stock WHERE terminal = ? AND cantidad <= 0
+''')
+
+registrar("reservas.liberar_terminal", '''
+    DELETE FROM reservas_stock WHERE terminal = ?
+''')
+
+# Stock disponible = stock menos lo reservado por todos los carritos
+# vigentes (el de esta terminal ya está en su propio carrito)
+registrar("productos.listar_disponibles", '''
+    SELECT p.id, p.nombre, p.precio_venta, p.stock,
+           p.stock - COALESCE(r.reservado, 0) as disponible
+    FROM productos p
+    LEFT JOIN (
+        SELECT producto_id, SUM(cantidad) as reservado
+        FROM reservas_stock
+        WHERE expira > ?
+        GROUP BY producto_id
+    ) r ON r.producto_id = p.id
+    WHERE p.activo = 1
+    ORDER BY p.nombre
+''', critica=True, ejemplo=(0,), fila=ProductoDisponible)
+
+# --- Archivo de ventas (base histórica adjunta como "historico") ---
+
+# Esquema de la base histórica. Guarda el nombre del cliente con la venta:
+# un cliente sin ventas en la base principal se puede eliminar, y sus
+# ventas archivadas no deben perder a quién se vendieron.
+registrar("archivo.crear_ventas", '''
+    CREATE TABLE IF NOT EXISTS historico.ventas (
+        id INTEGER PRIMARY KEY,
+        cliente_id INTEGER NOT NULL,
+        cliente_nombre TEXT,
+        total REAL NOT NULL,
+        fecha_venta DATETIME
+    )
+''')
+
+registrar("archivo.crear_detalle", '''
+    CREATE TABLE IF NOT EXISTS historico.detalle_venta (
+        id INTEGER PRIMARY KEY,
+        venta_id INTEGER NOT NULL,
+        producto_id INTEGER NOT NULL,
+        cantidad INTEGER NOT NULL,
+        precio_unitario REAL NOT NULL,
+        subtotal REAL NOT NULL
+    )
+''')
+
+registrar("archivo.crear_idx_ventas_fecha", '''
+    CREATE INDEX IF NOT EXISTS historico.idx_ventas_fecha ON ventas (fecha_venta)
+''')
+
+registrar("archivo.crear_idx_detalle_venta", '''
+    CREATE INDEX IF NOT EXISTS historico.idx_detalle_venta_venta
+    ON detalle_venta (venta_id, producto_id, cantidad, subtotal)
+''')
+
+ESQUEMA_HISTORICO = ("archivo.crear_ventas", "archivo.crear_detalle",
+                     "archivo.crear_idx_ventas_fecha", "archivo.crear_idx_detalle_venta")
+
+registrar("archivo.estado", '''
+    SELECT corte, ventas, detalles, fecha_actualizacion FROM archivo_ventas WHERE id = 1
+''')
+
+registrar("archivo.ids_lote", '''
+    SELECT id FROM main.ventas
+    WHERE fecha_venta < ?
+    ORDER BY fecha_venta
+    LIMIT ?
+''', critica=True, ejemplo=("2024-01-01", 1000))
+
+# Los lotes se pasan como un arreglo JSON de IDs de venta. INSERT OR IGNORE:
+# si una corrida anterior se interrumpió después de escribir en la base
+# histórica, repetir el lote no duplica nada.
+registrar("archivo.copiar_ventas", '''
+    INSERT OR IGNORE INTO historico.ventas (id, cliente_id, cliente_nombre, total, fecha_venta)
+    SELECT v.id, v.cliente_id, c.nombre, v.total, v.fecha_venta
+    FROM main.ventas v
+    LEFT JOIN main.clientes c ON c.id = v.cliente_id
+    WHERE v.id IN (SELECT value FROM json_each(?))
+''')
+
+registrar("archivo.copiar_detalle", '''
+    INSERT OR IGNORE INTO historico.detalle_venta
+        (id, venta_id, producto_id, cantidad, precio_unitario, subtotal)
+    SELECT id, venta_id, producto_id, cantidad, precio_unitario, subtotal
+    FROM main.detalle_venta
+    WHERE venta_id IN (SELECT value FROM json_each(?))
+''')
+
+# Del lote copiado, las ventas que ya están en la base histórica: solo esas
+# se borran de la principal
+registrar("archivo.ids_archivados", '''
+    SELECT id FROM historico.ventas WHERE id IN (SELECT value FROM json_each(?))
+''')
+
+registrar("archivo.contar_lote", '''
+    SELECT COUNT(*), (SELECT COUNT(*) FROM main.detalle_venta
+                      WHERE venta_id IN (SELECT value FROM json_each(?1)))
+    FROM main.ventas
+    WHERE id IN (SELECT value FROM json_each(?1))
+''')
+
+# El detalle se borra en cascada; con la bandera 'archivando' encendida el
+# trigger no devuelve la mercancía al stock
+registrar("archivo.borrar_ventas", '''
+    DELETE FROM main.ventas WHERE id IN (SELECT value FROM json_each(?))
+''')
+
+registrar("archivo.registrar_lote", '''
+    INSERT INTO archivo_ventas (id, corte, ventas, detalles, fecha_actualizacion)
+    VALUES (1, ?1, ?2, ?3, CURRENT_TIMESTAMP)
+    ON CONFLICT (id) DO UPDATE SET
+        corte = MAX(corte, excluded.corte),
+        ventas = ventas + excluded.ventas,
+        detalles = detalles + excluded.detalles,
+        fecha_actualizacion = excluded.fecha_actualizacion
+''')
+
+registrar("control.archivando", '''
+    UPDATE control_triggers SET activo = ? WHERE nombre = 'archivando'
+''')
+
+# Variantes de los reportes que suman la base histórica. Usan parámetros
+# numerados (?1, ?2) para recibir el mismo rango que las consultas normales
+# y aplicarlo a las dos bases.
+registrar("reportes.ventas_csv_historico", '''
+    SELECT id, cliente, total, fecha_venta FROM (
+        SELECT v.id, c.nombre as cliente, v.total, v.fecha_venta
+        FROM main.ventas v
+        JOIN main.clientes c ON v.cliente_id = c.id
+        UNION ALL
+        SELECT id, cliente_nombre, total, fecha_venta
+        FROM historico.ventas
+    )
+    ORDER BY fecha_venta DESC
+''')
+
+registrar("reportes.ventas_csv_periodo_historico", '''
+    SELECT id, cliente, total, fecha_venta FROM (
+        SELECT v.id, c.nombre as cliente, v.total, v.fecha_venta
+        FROM main.ventas v
+        JOIN main.clientes c ON v.cliente_id = c.id
+        WHERE v.fecha_venta >= ?1 AND v.fecha_venta < ?2
+        UNION ALL
+        SELECT id, cliente_nombre, total, fecha_venta
+        FROM historico.ventas
+        WHERE fecha_venta >= ?1 AND fecha_venta < ?2
+    )
+    ORDER BY fecha_venta DESC
+''', critica=True, ejemplo=_PERIODO_EJEMPLO)
+
+# --- Kardex (movimientos de stock) ---
+
+# Las escrituras que cambian el stock por conjunto (edición, importación,
+# ajustes masivos) guardan aquí el stock previo de los productos que van a
+# tocar y después anotan la diferencia real de cada uno
+registrar("kardex.crear_previo", '''
+    CREATE TEMP TABLE IF NOT EXISTS stock_previo (
+        producto_id INTEGER PRIMARY KEY,
+        stock INTEGER NOT NULL
+    )
+''')
+
+registrar("kardex.previo_producto", '''
+    INSERT OR IGNORE INTO temp.stock_previo (producto_id, stock)
+    SELECT id, stock FROM productos WHERE id = ?
+''')
+
+registrar("kardex.previo_importacion", '''
+    INSERT OR IGNORE INTO temp.stock_previo (producto_id, stock)
+    SELECT p.id, p.stock
+    FROM temp.staging_productos s
+    JOIN productos p ON p.nombre = s.nombre AND p.proveedor_id IS s.proveedor_id
+    UNION ALL
+    SELECT p.id, p.stock
+    FROM temp.staging_productos s
+    JOIN productos p ON p.codigo = s.codigo
+''')
+
+registrar("kardex.previo_ajuste", '''
+    INSERT OR IGNORE INTO temp.stock_previo (producto_id, stock)
+    SELECT p.id, p.stock
+    FROM ajustes_masivos_snapshot s
+    JOIN productos p ON p.id = s.producto_id
+    WHERE s.ajuste_id = ?
+''')
+
+registrar("kardex.registrar_diferencias", '''
+    INSERT INTO movimientos_stock (producto_id, tipo, cantidad, referencia, nota)
+    SELECT t.producto_id, ?, p.stock - t.stock, ?, ?
+    FROM temp.stock_previo t
+    JOIN productos p ON p.id = t.producto_id
+    WHERE p.stock <> t.stock
+''')
+
+registrar("kardex.limpiar_previo", '''
+    DELETE FROM temp.stock_previo
+''')
+
+# Mismo carrito agrupado (JSON) que ventas.descontar_stock
+registrar("kardex.registrar_venta", '''
+    INSERT INTO movimientos_stock (producto_id, tipo, cantidad, referencia)
+    SELECT json_extract(value, '$[0]'), 'venta', -json_extract(value, '$[1]'), ?
+    FROM json_each(?)
+''')
+
+registrar("kardex.sumar_stock", '''
+    UPDATE productos SET stock = stock + ? WHERE id = ? AND activo = 1
+''')
+
+registrar("kardex.insertar", '''
+    INSERT INTO movimientos_stock (producto_id, tipo, cantidad, referencia, nota)
+    VALUES (?, ?, ?, ?, ?)
+''')
+
+# Saldo después de cada movimiento, a partir del saldo actual (?1) hacia atrás
+registrar("kardex.movimientos_producto", '''
+    SELECT id, tipo, cantidad, referencia, nota, fecha,
+           ?1 - COALESCE(SUM(cantidad) OVER (
+               ORDER BY id DESC ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING
+           ), 0) as saldo
+    FROM movimientos_stock
+    WHERE producto_id = ?2
+    ORDER BY id DESC
+    LIMIT ?3
+''', critica=True, ejemplo=(0, 1, 50), fila=Movimiento)
+
+registrar("kardex.ultimo_movimiento", '''
+    SELECT COALESCE(MAX(id), 0) FROM movimientos_stock
+''')
+
+registrar("kardex.ultimo_snapshot", '''
+    SELECT id, fecha, ultimo_movimiento FROM snapshots_stock
+    ORDER BY id DESC LIMIT 1
+''')
+
+registrar("kardex.dias_desde_snapshot", '''
+    SELECT julianday('now') - julianday(MAX(fecha)) FROM snapshots_stock
+''')
+
+registrar("kardex.snapshot_a_fecha", '''
+    SELECT id, fecha, ultimo_movimiento FROM snapshots_stock
+    WHERE fecha < ?
+    ORDER BY fecha DESC, id DESC
+    LIMIT 1
+''', critica=True, ejemplo=("2024-01-01",))
+
+registrar("kardex.insertar_snapshot", '''
+    INSERT INTO snapshots_stock (ultimo_movimiento) VALUES (?)
+''')
+
+# Stock de un producto según el kardex al inicio de una fecha: foto
+# (?1, con movimientos hasta ?2) + movimientos posteriores con fecha < ?4
+registrar("kardex.stock_producto", '''
+    SELECT COALESCE((SELECT stock FROM snapshots_stock_detalle
+                     WHERE snapshot_id = ?1 AND producto_id = ?3), 0)
+         + COALESCE((SELECT SUM(cantidad) FROM movimientos_stock
+                     WHERE producto_id = ?3 AND id > ?2 AND fecha < ?4), 0)
+''', critica=True, ejemplo=(1, 0, 1, "2024-01-01"))
+
+# Lo mismo para todos los productos, junto al stock de la tabla. Parámetros:
+# ?1 foto, ?2 último movimiento incluido en la foto, ?3 último movimiento a
+# sumar, ?4 fecha límite (exclusiva, como los rangos de ventas)
+_STOCK_KARDEX = '''
+    SELECT p.id, p.nombre, p.stock, COALESCE(d.stock, 0) + COALESCE(m.delta, 0) as stock_kardex
+    FROM productos p
+    LEFT JOIN snapshots_stock_detalle d ON d.snapshot_id = ?1 AND d.producto_id = p.id
+    LEFT JOIN (
+        SELECT producto_id, SUM(cantidad) as delta
+        FROM movimientos_stock
+        WHERE id > ?2 AND id <= ?3 AND fecha < ?4
+        GROUP BY producto_id
+    ) m ON m.producto_id = p.id
+'''
+
+registrar("kardex.stock_a_fecha", _STOCK_KARDEX + '''
+    ORDER BY p.nombre
+''', fila=StockKardex)
+
+registrar("kardex.snapshot_detalle", f'''
+    INSERT INTO snapshots_stock_detalle (snapshot_id, producto_id, stock)
+    SELECT ?5, id, stock_kardex FROM ({_STOCK_KARDEX})
+    WHERE stock_kardex <> 0
+''')
+
+registrar("kardex.conciliar", _STOCK_KARDEX + '''
+    WHERE p.stock <> COALESCE(d.stock, 0) + COALESCE(m.delta, 0)
+    ORDER BY p.nombre
+''', fila=StockKardex)
+
+registrar("kardex.corregir", f'''
+    INSERT INTO movimientos_stock (producto_id, tipo, cantidad, nota)
+    SELECT id, 'conciliacion', stock - stock_kardex, ?5
+    FROM ({_STOCK_KARDEX})
+    WHERE stock <> stock_kardex
+''')
+
+# --- Resúmenes mantenidos por triggers ---
+
+registrar("resumenes.vaciar_ventas_producto_dia", '''
+    DELETE FROM ventas_producto_dia
+''')
+
+registrar("resumenes.reconstruir_ventas_producto_dia", '''
+    INSERT INTO ventas_producto_dia (dia, producto_id, unidades, ingresos)
+    SELECT DATE(v.fecha_venta), dv.producto_id, SUM(dv.cantidad), SUM(dv.subtotal)
+    FROM main.ventas v
+    JOIN main.detalle_venta dv ON dv.venta_id = v.id
+    GROUP BY DATE(v.fecha_venta), dv.producto_id
+''')
+
+# Suma las ventas archivadas (base histórica adjunta) a lo reconstruido
+registrar("resumenes.reconstruir_ventas_producto_dia_historico", '''
+    INSERT INTO ventas_producto_dia (dia, producto_id, unidades, ingresos)
+    SELECT DATE(v.fecha_venta), dv.producto_id, SUM(dv.cantidad), SUM(dv.subtotal)
+    FROM historico.ventas v
+    JOIN historico.detalle_venta dv ON dv.venta_id = v.id
+    WHERE true
+    GROUP BY DATE(v.fecha_venta), dv.producto_id
+    ON CONFLICT (dia, producto_id) DO UPDATE SET
+        unidades = unidades + excluded.unidades,
+        ingresos = ingresos + excluded.ingresos
+''')
+
+registrar("resumenes.vaciar_ventas_diarias", '''
+    DELETE FROM ventas_diarias
+''')
+
+registrar("resumenes.reconstruir_ventas_diarias", '''
+    INSERT INTO ventas_diarias (dia, ventas, total, minimo, maximo)
+    SELECT DATE(fecha_venta), COUNT(*), SUM(total), MIN(total), MAX(total)
+    FROM main.ventas
+    GROUP BY DATE(fecha_venta)
+''')
+
+registrar("resumenes.contar_ventas_diarias", '''
+    SELECT COUNT(*) FROM ventas_diarias
+''')
+
+registrar("resumenes.reconstruir_ventas_diarias_historico", '''
+    INSERT INTO ventas_diarias (dia, ventas, total, minimo, maximo)
+    SELECT DATE(fecha_venta), COUNT(*), SUM(total), MIN(total), MAX(total)
+    FROM historico.ventas
+    WHERE true
+    GROUP BY DATE(fecha_venta)
+    ON CONFLICT (dia) DO UPDATE SET
+        ventas = ventas + excluded.ventas,
+        total = total + excluded.total,
+        minimo = MIN(minimo, excluded.minimo),
+        maximo = MAX(maximo, excluded.maximo)
+''')
+
+# Días en que el resumen no coincide con las ventas. Los totales se suman
+# y restan como REAL, así que se comparan con tolerancia de medio centavo.
+_VERIFICAR_VENTAS_DIARIAS = '''
+    WITH crudo AS (
+        SELECT DATE(fecha_venta) AS dia, COUNT(*) AS ventas, SUM(total) AS total,
+               MIN(total) AS minimo, MAX(total) AS maximo
+        FROM ({ventas})
+        GROUP BY DATE(fecha_venta)
+    )
+    SELECT d.dia, c.ventas, c.total, c.minimo, c.maximo,
+           r.ventas, r.total, r.minimo, r.maximo
+    FROM (SELECT dia FROM crudo UNION SELECT dia FROM ventas_diarias) d
+    LEFT JOIN crudo c ON c.dia = d.dia
+    LEFT JOIN ventas_diarias r ON r.dia = d.dia
+    WHERE c.ventas IS NOT r.ventas
+       OR ABS(COALESCE(c.total, 0) - COALESCE(r.total, 0)) > 0.005
+       OR c.minimo IS NOT r.minimo
+       OR c.maximo IS NOT r.maximo
+    ORDER BY d.dia
+'''
+
+registrar("resumenes.verificar_ventas_diarias", _VERIFICAR_VENTAS_DIARIAS.format(
+    ventas="SELECT fecha_venta, total FROM main.ventas"
+), fila=DiaVentasDiferente)
+
+registrar("resumenes.verificar_ventas_diarias_historico", _VERIFICAR_VENTAS_DIARIAS.format(
+    ventas="SELECT fecha_venta, total FROM main.ventas "
+           "UNION ALL SELECT fecha_venta, total FROM historico.ventas"
+), fila=DiaVentasDiferente)
+
+_INVENTARIO_POR_CATEGORIA = '''
+    SELECT COALESCE(categoria, ''), COUNT(*), SUM(stock * precio_compra),
+           SUM(IFNULL(stock <= stock_minimo, 0)), SUM(stock = 0)
+    FROM productos
+    WHERE activo = 1
+    GROUP BY COALESCE(categoria, '')
+'''
+
+registrar("resumenes.inventario_por_categoria_productos", _INVENTARIO_POR_CATEGORIA + '''
+    ORDER BY 3 DESC
+''', fila=InventarioCategoria)
+
+registrar("resumenes.vaciar_inventario", '''
+    DELETE FROM inventario_categoria
+''')
+
+registrar("resumenes.reconstruir_inventario_categoria", '''
+    INSERT INTO inventario_categoria (categoria, productos, valor, stock_bajo, sin_stock)
+''' + _INVENTARIO_POR_CATEGORIA)
+
+registrar("resumenes.reconstruir_inventario_resumen", '''
+    INSERT OR REPLACE INTO inventario_resumen (id, productos, valor, stock_bajo, sin_stock)
+    SELECT 1, COALESCE(SUM(productos), 0), COALESCE(SUM(valor), 0),
+           COALESCE(SUM(stock_bajo), 0), COALESCE(SUM(sin_stock), 0)
+    FROM inventario_categoria
+''')
@@ -1,46 +1,397 @@
 import sqlite3
+import threading
+import queue
+import json
+import logging
+import re
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler
 from pathlib import Path
 import os
 import sys
+from .migraciones import aplicar_migraciones
+from .escritor import EscritorDB
 
 def resource_path(relative_path: str) -> str:
     try:
         base_path = sys._MEIPASS
     except Exception:
-        base_path = os.path.abspath(".")  
+        # Fuera del ejecutable, los recursos viven junto a este módulo
+        base_path = os.path.dirname(os.path.abspath(__file__))
 
     return os.path.join(base_path, relative_path)
 
 
+# Perfiles de PRAGMAs según el tipo de instalación. Se elige con la variable
+# de entorno NAILSTOCK_DB_PROFILE; si no existe se usa DEFAULT_PROFILE.
+# cache_size negativo = tamaño en KiB; mmap_size en bytes; busy_timeout en ms.
+PRAGMA_PROFILES = {
+    # Caja: commits cortos y frecuentes, lecturas concurrentes de reportes
+    "pos-terminal": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -16000,
+        "mmap_size": 64 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+    # Oficina: consultas grandes de reportes sobre todo el historial
+    "back-office": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -64000,
+        "mmap_size": 256 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "busy_timeout": 10000,
+    },
+    # Carga masiva: prioriza velocidad de escritura sobre durabilidad
+    "bulk-import": {
+        "journal_mode": "WAL",
+        "synchronous": "OFF",
+        "cache_size": -128000,
+        "mmap_size": 256 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "busy_timeout": 30000,
+    },
+}
+
+DEFAULT_PROFILE = "pos-terminal"
+
+
+class SQLTracer:
+    """
+    Instrumentación opcional de SQL.
+
+    Se activa con NAILSTOCK_SQL_TRACE=1. Cuando está desactivada no se
+    instala ningún callback y el registro de consultas solo revisa el
+    atributo `enabled`, así que puede quedarse en las versiones de
+    producción.
+
+    - `set_trace_callback` en cada conexión cuenta todas las sentencias que
+      ejecuta SQLite, incluidas las de triggers y migraciones.
+    - El registro de consultas (consultas.py) informa la duración de cada
+      ejecución con `record()`, que alimenta un histograma de latencias por
+      sentencia normalizada.
+    - Las ejecuciones que superan el umbral (NAILSTOCK_SLOW_QUERY_MS,
+      100 ms por defecto) se escriben en un log rotativo con la forma de
+      los parámetros (tipos y longitudes, nunca los valores).
+    """
+
+    # Cubetas del histograma: potencias de 2 en microsegundos (1 µs .. ~8 s)
+    BUCKETS = 24
+
+    _LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+    _SPACES = re.compile(r"\s+")
+
+    def __init__(self, enabled=False, slow_ms=100.0, log_path="database/logs/consultas_lentas.log"):
+        self.enabled = enabled
+        self.slow_ms = slow_ms
+        self.log_path = log_path
+        self._stats = {}
+        self._traced = {}
+        self._lock = threading.Lock()
+        self._logger = None
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            enabled=os.environ.get("NAILSTOCK_SQL_TRACE") == "1",
+            slow_ms=float(os.environ.get("NAILSTOCK_SLOW_QUERY_MS", "100")),
+        )
+
+    def normalize(self, sql):
+        """Quita literales y espacios repetidos para agrupar sentencias iguales."""
+        return self._SPACES.sub(" ", self._LITERALS.sub("?", sql)).strip()
+
+    def install(self, conn):
+        if self.enabled:
+            conn.set_trace_callback(self._trace)
+
+    def _trace(self, sql):
+        clave = self.normalize(sql)
+        with self._lock:
+            self._traced[clave] = self._traced.get(clave, 0) + 1
+
+    def record(self, sql, params, duration):
+        """Registra la duración (en segundos) de una ejecución."""
+        clave = self.normalize(sql)
+        micros = int(duration * 1_000_000)
+        bucket = min(micros.bit_length(), self.BUCKETS - 1)
+
+        with self._lock:
+            stats = self._stats.get(clave)
+            if stats is None:
+                stats = self._stats[clave] = {'count': 0, 'total': 0.0, 'max': 0.0,
+                                              'buckets': [0] * self.BUCKETS}
+            stats['count'] += 1
+            stats['total'] += duration
+            stats['max'] = max(stats['max'], duration)
+            stats['buckets'][bucket] += 1
+
+        if duration * 1000 >= self.slow_ms:
+            self._log_slow(clave, params, duration)
+
+    def _log_slow(self, clave, params, duration):
+        if self._logger is None:
+            Path(self.log_path).parent.mkdir(parents=True, exist_ok=True)
+            logger = logging.getLogger("nailstock.sql.lento")
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+            handler = RotatingFileHandler(self.log_path, maxBytes=1_000_000, backupCount=3,
+                                          encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+            logger.addHandler(handler)
+            self._logger = logger
+
+        self._logger.info("%.1f ms | %s | params=%s", duration * 1000, clave,
+                          self.param_shape(params))
+
+    @staticmethod
+    def param_shape(params):
+        """Describe los parámetros sin revelar sus valores: (int, str[12], None)."""
+        if isinstance(params, list) and params and isinstance(params[0], (tuple, list)):
+            # executemany: forma de la primera fila y número de filas
+            return f"{SQLTracer.param_shape(params[0])} x{len(params)}"
+
+        formas = []
+        for valor in params:
+            if valor is None:
+                formas.append("None")
+            elif isinstance(valor, (str, bytes)):
+                formas.append(f"{type(valor).__name__}[{len(valor)}]")
+            else:
+                formas.append(type(valor).__name__)
+        return f"({', '.join(formas)})"
+
+    def summary(self):
+        """
+        Devuelve las sentencias medidas, de la que más tiempo acumula a la que
+        menos, con percentiles aproximados tomados del histograma.
+        """
+        with self._lock:
+            resumen = []
+            for clave, stats in self._stats.items():
+                resumen.append({
+                    'sql': clave,
+                    'count': stats['count'],
+                    'total_ms': stats['total'] * 1000,
+                    'max_ms': stats['max'] * 1000,
+                    'p50_ms': self._percentile(stats, 0.50),
+                    'p95_ms': self._percentile(stats, 0.95),
+                    'histogram_us': {f"<{2 ** i}": n for i, n in enumerate(stats['buckets']) if n},
+                })
+            ejecutadas = dict(self._traced)
+
+        resumen.sort(key=lambda e: e['total_ms'], reverse=True)
+        return {'timed': resumen, 'traced': ejecutadas}
+
+    @staticmethod
+    def _percentile(stats, fraccion):
+        objetivo = stats['count'] * fraccion
+        acumulado = 0
+        for i, n in enumerate(stats['buckets']):
+            acumulado += n
+            if acumulado >= objetivo:
+                # Límite superior de la cubeta, en ms
+                return (2 ** i) / 1000
+        return stats['max'] * 1000
+
+    def export_summary(self, path):
+        """Escribe el resumen en un archivo JSON y devuelve la ruta."""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.summary(), f, ensure_ascii=False, indent=2)
+        return path
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self._traced.clear()
+
+
+sql_tracer = SQLTracer.from_env()
+
+
+class ConnectionPool:
+    """
+    Pool acotado de conexiones SQLite reutilizables.
+
+    - Cada conexión se crea y configura (PRAGMAs) una sola vez.
+    - Como máximo `max_size` conexiones pueden estar prestadas a la vez.
+    - Si un hilo ya tiene una conexión prestada, las llamadas anidadas
+      reutilizan esa misma conexión en lugar de pedir otra.
+    - `drain()` cierra todas las conexiones (por ejemplo, antes de restaurar
+      un respaldo); las que estén en uso se cierran al devolverse.
+    """
+
+    # Sentencias preparadas que cada conexión mantiene en caché. Debe superar
+    # el número de consultas del registro (consultas.py) para que ninguna se
+    # vuelva a compilar.
+    STATEMENT_CACHE_SIZE = 256
+
+    def __init__(self, db_path, max_size=5, timeout=10.0, pragmas=None):
+        self.db_path = db_path
+        self.pragmas = pragmas or {}
+        self.max_size = max_size
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._generation = 0
+
+    def new_connection(self):
+        """Abre una conexión nueva con la configuración del pool, fuera del pool."""
+        # check_same_thread=False: la conexión puede pasar de un hilo a otro
+        # a través del pool, pero nunca la usan dos hilos al mismo tiempo.
+        conn = sqlite3.connect(str(self.db_path), check_same_thread=False,
+                               cached_statements=self.STATEMENT_CACHE_SIZE)
+        conn.execute("PRAGMA foreign_keys = ON")
+        for nombre, valor in self.pragmas.items():
+            conn.execute(f"PRAGMA {nombre} = {valor}")
+        sql_tracer.install(conn)
+        return conn
+
+    def _acquire(self):
+        if not self._slots.acquire(timeout=self.timeout):
+            raise TimeoutError("No hay conexiones disponibles a la base de datos")
+
+        try:
+            while True:
+                try:
+                    conn, generation = self._idle.get_nowait()
+                except queue.Empty:
+                    with self._lock:
+                        generation = self._generation
+                    return self.new_connection(), generation
+
+                if generation == self._generation:
+                    return conn, generation
+
+                # Conexión de antes de un drain(): se descarta
+                conn.close()
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def _release(self, conn, generation):
+        try:
+            # Nunca devolver al pool una conexión con una transacción abierta
+            if conn.in_transaction:
+                conn.rollback()
+
+            with self._lock:
+                reusable = generation == self._generation
+
+            if reusable:
+                self._idle.put((conn, generation))
+            else:
+                conn.close()
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def connection(self):
+        """
+        Presta una conexión del pool durante el bloque `with`.
+
+        Si el bloque termina con una excepción, se hace rollback de la
+        transacción pendiente antes de devolver la conexión.
+        """
+        if getattr(self._local, "depth", 0):
+            # Llamada anidada en el mismo hilo: reutilizar la conexión prestada
+            self._local.depth += 1
+            try:
+                yield self._local.conn
+            finally:
+                self._local.depth -= 1
+            return
+
+        conn, generation = self._acquire()
+        self._local.conn = conn
+        self._local.depth = 1
+
+        try:
+            yield conn
+        except BaseException:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+        finally:
+            self._local.conn = None
+            self._local.depth = 0
+            self._release(conn, generation)
+
+    def drain(self):
+        """Cierra todas las conexiones del pool."""
+        with self._lock:
+            self._generation += 1
+
+        while True:
+            try:
+                conn, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+
+
 class DBConnection:
-    def __init__(self):
+    POOL_SIZE = 5
+
+    def __init__(self, profile=None):
         self.db_path = Path("database/nailstock.db")
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
-        self._create_tables()
-    
-    def get_connection(self):
-        conn = sqlite3.connect(str(self.db_path))
-        conn.execute("PRAGMA foreign_keys = ON")
-        return conn
-    
-    def _create_tables(self):
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
 
-            sql_file_path = resource_path("create_tables.sql")
+        self.profile = profile or os.environ.get("NAILSTOCK_DB_PROFILE", DEFAULT_PROFILE)
+        if self.profile not in PRAGMA_PROFILES:
+            raise ValueError(f"Perfil de base de datos desconocido: {self.profile}")
 
-            if not os.path.exists(sql_file_path):
-                return
+        pragmas = dict(PRAGMA_PROFILES[self.profile])
+        # journal_mode es persistente en el archivo: se fija una sola vez aquí
+        journal_mode = pragmas.pop("journal_mode")
 
-            with open(sql_file_path, "r", encoding="utf-8") as f:
-                script = f.read()
+        self.pool = ConnectionPool(self.db_path, self.POOL_SIZE, pragmas=pragmas)
+        # Las lecturas usan el pool (varias a la vez gracias a WAL); todas las
+        # escrituras pasan por un único hilo escritor
+        self.writer = EscritorDB(self.pool.new_connection)
+        with self.get_connection() as conn:
+            self.journal_mode = conn.execute(f"PRAGMA journal_mode = {journal_mode}").fetchone()[0]
+        self._migrate()
 
-            cursor.executescript(script)
-            conn.commit()
+    def get_connection(self):
+        """Devuelve un context manager que presta una conexión del pool."""
+        return self.pool.connection()
+
+    def _migrate(self):
+        with self.get_connection() as conn:
+            self.schema_version = aplicar_migraciones(conn, resource_path("migrations"))
 
 
 # Instancia global
 _db_connection = DBConnection()
 
+def get_db():
+    """Devuelve la instancia global de DBConnection."""
+    return _db_connection
+
 def get_db_connection():
+    """
+    Uso:
+        with get_db_connection() as conn:
+            ...
+    """
     return _db_connection.get_connection()
+
+def get_db_writer():
+    """
+    Devuelve el escritor de la instancia global.
+
+    Uso:
+        get_db_writer().ejecutar(funcion, *args)   # espera el resultado
+        get_db_writer().enviar(funcion, *args)     # devuelve un Future
+    """
+    return _db_connection.writer
+
+def drain_db_connections():
+    """Cierra todas las conexiones abiertas de la instancia global."""
+    _db_connection.writer.drain()
+    _db_connection.pool.drain()
@@ -0,0 +1,167 @@
+import queue
+import threading
+from concurrent.futures import Future
+from .reintentos import PoliticaReintentos
+
+class _Tarea:
+    __slots__ = ("funcion", "args", "kwargs", "future", "agrupable", "transaccion")
+
+    def __init__(self, funcion, args, kwargs, agrupable, transaccion=True):
+        self.funcion = funcion
+        self.args = args
+        self.kwargs = kwargs
+        self.future = Future()
+        self.agrupable = agrupable
+        self.transaccion = transaccion
+
+
+class EscritorDB:
+    """
+    Hilo único por el que pasan todas las escrituras a la base de datos.
+
+    - Las escrituras se encolan con `enviar()`, que devuelve un Future; así
+      el hilo de la interfaz no espera a SQLite ni al bloqueo de escritura.
+    - Solo este hilo escribe, por lo que las escrituras de la aplicación
+      nunca compiten entre sí por el bloqueo ("database is locked").
+    - Las tareas agrupables que llegan juntas se ejecutan en una sola
+      transacción (un solo commit/fsync), cada una dentro de su propio
+      SAVEPOINT: si una falla, solo se deshace esa tarea.
+    - Si otra terminal (otro proceso) tiene el bloqueo de escritura, el
+      BEGIN IMMEDIATE se reintenta con espera aleatoria creciente
+      (ver reintentos.py).
+
+    Cada tarea es una función `funcion(conn, *args, **kwargs)` que usa la
+    conexión recibida y no debe hacer commit ni rollback.
+    """
+
+    MAX_LOTE = 50
+
+    def __init__(self, connection_factory):
+        self._connection_factory = connection_factory
+        self._cola = queue.Queue()
+        self._conn = None
+        self._hilo = None
+        self._lock = threading.Lock()
+        self.reintentos = PoliticaReintentos()
+
+    def enviar(self, funcion, *args, agrupable=True, **kwargs):
+        """
+        Encola una escritura y devuelve un Future con su resultado.
+
+        :param agrupable: False si la tarea debe ir sola en su transacción
+                          (por ejemplo, cargas masivas).
+        """
+        self._iniciar()
+        tarea = _Tarea(funcion, args, kwargs, agrupable)
+        self._cola.put(tarea)
+        return tarea.future
+
+    def ejecutar(self, funcion, *args, **kwargs):
+        """Encola una escritura y espera su resultado."""
+        if threading.current_thread() is self._hilo:
+            # Llamada desde otra tarea del escritor: ya estamos en la transacción
+            return funcion(self._conn, *args, **kwargs)
+        return self.enviar(funcion, *args, **kwargs).result()
+
+    def ejecutar_sin_transaccion(self, funcion, *args):
+        """
+        Ejecuta `funcion(conn, *args)` en el hilo escritor fuera de toda
+        transacción y espera su resultado. Para sentencias que SQLite no
+        permite dentro de una transacción: ATTACH, DETACH, VACUUM.
+        """
+        self._iniciar()
+        tarea = _Tarea(funcion, args, {}, agrupable=False, transaccion=False)
+        self._cola.put(tarea)
+        return tarea.future.result()
+
+    def drain(self):
+        """Cierra la conexión de escritura (se reabre en la siguiente tarea)."""
+        if self._hilo is not None:
+            # Una tarea sin función indica al hilo que cierre su conexión
+            self.enviar(None, agrupable=False).result()
+
+    def _iniciar(self):
+        with self._lock:
+            if self._hilo is None:
+                self._hilo = threading.Thread(target=self._bucle, name="nailstock-escritor",
+                                              daemon=True)
+                self._hilo.start()
+
+    def _bucle(self):
+        siguiente = None
+        while True:
+            tarea = siguiente or self._cola.get()
+            siguiente = None
+
+            if tarea.funcion is None:
+                self._cerrar_conexion()
+                tarea.future.set_result(True)
+                continue
+
+            if not tarea.transaccion:
+                self._ejecutar_suelta(tarea)
+                continue
+
+            lote = [tarea]
+
+            # Juntar las tareas agrupables que ya están esperando
+            while tarea.agrupable and len(lote) < self.MAX_LOTE:
+                try:
+                    pendiente = self._cola.get_nowait()
+                except queue.Empty:
+                    break
+                if not pendiente.agrupable:
+                    siguiente = pendiente
+                    break
+                lote.append(pendiente)
+
+            self._ejecutar_lote(lote)
+
+    def _conexion(self):
+        if self._conn is None:
+            self._conn = self._connection_factory()
+            # Transacciones explícitas: BEGIN/SAVEPOINT/COMMIT los maneja el escritor
+            self._conn.isolation_level = None
+        return self._conn
+
+    def _ejecutar_suelta(self, tarea):
+        try:
+            tarea.future.set_result(tarea.funcion(self._conexion(), *tarea.args))
+        except Exception as e:
+            tarea.future.set_exception(e)
+
+    def _ejecutar_lote(self, lote):
+        conn = self._conexion()
+        resultados = []
+
+        try:
+            self.reintentos.ejecutar(conn.execute, "BEGIN IMMEDIATE")
+            for tarea in lote:
+                conn.execute("SAVEPOINT tarea")
+                try:
+                    resultado = tarea.funcion(conn, *tarea.args, **tarea.kwargs)
+                    conn.execute("RELEASE tarea")
+                    resultados.append((tarea, resultado, None))
+                except Exception as e:
+                    conn.execute("ROLLBACK TO tarea")
+                    conn.execute("RELEASE tarea")
+                    resultados.append((tarea, None, e))
+            conn.execute("COMMIT")
+        except Exception as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            for tarea in lote:
+                tarea.future.set_exception(e)
+            return
+
+        # Los resultados se entregan solo cuando el commit ya se hizo
+        for tarea, resultado, error in resultados:
+            if error is not None:
+                tarea.future.set_exception(error)
+            else:
+                tarea.future.set_result(resultado)
+
+    def _cerrar_conexion(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
@@ -0,0 +1,114 @@
+import importlib.util
+import os
+import re
+import sqlite3
+
+# Los archivos de migración se llaman "NNNN_descripcion.sql" y se aplican en
+# orden numérico. El número es la versión que queda en PRAGMA user_version.
+# Las que necesitan Python (p. ej. para normalizar texto al llenar una
+# columna nueva) se llaman "NNNN_descripcion.py" y definen `migrar(conn)`,
+# que se ejecuta dentro de la misma transacción.
+_PATRON_MIGRACION = re.compile(r"^(\d+)_.+\.(sql|py)$")
+
+def listar_migraciones(directorio):
+    """
+    Devuelve las migraciones disponibles ordenadas por versión.
+
+    :param directorio: Carpeta que contiene los archivos de migración.
+    :return: Lista de tuplas (version, ruta).
+    """
+    if not os.path.isdir(directorio):
+        return []
+
+    migraciones = []
+    for nombre in os.listdir(directorio):
+        coincidencia = _PATRON_MIGRACION.match(nombre)
+        if coincidencia:
+            migraciones.append((int(coincidencia.group(1)), os.path.join(directorio, nombre)))
+
+    migraciones.sort()
+    return migraciones
+
+def version_actual(conn):
+    """Devuelve la versión del esquema guardada en la base de datos."""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+def aplicar_migraciones(conn, directorio):
+    """
+    Lleva el esquema de la base de datos a la última versión disponible.
+
+    - Si la versión guardada ya es la última, no hace nada más que leer
+      `PRAGMA user_version` (camino rápido en cada arranque).
+    - Cada migración pendiente se ejecuta en su propia transacción junto con
+      la actualización de `user_version`; si falla, se hace rollback y la
+      base de datos queda en la versión anterior.
+
+    :param conn: Conexión SQLite abierta.
+    :param directorio: Carpeta que contiene los archivos de migración.
+    :return: Versión final del esquema.
+    """
+    migraciones = listar_migraciones(directorio)
+    actual = version_actual(conn)
+
+    if not migraciones or actual >= migraciones[-1][0]:
+        return actual
+
+    for version, ruta in migraciones:
+        if version > actual:
+            _aplicar_migracion(conn, version, ruta)
+
+    return version_actual(conn)
+
+def _aplicar_migracion(conn, version, ruta):
+    migrar = _cargar_migracion(ruta)
+
+    # BEGIN IMMEDIATE toma el bloqueo de escritura desde el inicio, así dos
+    # instancias que arrancan a la vez no aplican la misma migración.
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        if version_actual(conn) >= version:
+            # Otra instancia ya la aplicó mientras esperábamos el bloqueo
+            conn.rollback()
+            return
+
+        migrar(conn)
+
+        conn.execute(f"PRAGMA user_version = {int(version)}")
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        raise Exception(f"Error aplicando la migración {os.path.basename(ruta)}: {e}") from e
+
+def _cargar_migracion(ruta):
+    """Devuelve una función (conn) que ejecuta la migración."""
+    if ruta.endswith(".py"):
+        nombre = "nailstock_migracion_" + os.path.splitext(os.path.basename(ruta))[0]
+        spec = importlib.util.spec_from_file_location(nombre, ruta)
+        modulo = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(modulo)
+        return modulo.migrar
+
+    with open(ruta, "r", encoding="utf-8") as f:
+        sentencias = _dividir_sentencias(f.read())
+
+    def migrar(conn):
+        for sentencia in sentencias:
+            conn.execute(sentencia)
+
+    return migrar
+
+def _dividir_sentencias(script):
+    # executescript() hace COMMIT por su cuenta, así que el script se divide
+    # en sentencias para ejecutarlas dentro de una sola transacción.
+    # sqlite3.complete_statement reconoce correctamente los BEGIN...END de
+    # los triggers.
+    sentencias = []
+    pendiente = ""
+
+    for linea in script.splitlines(keepends=True):
+        pendiente += linea
+        if sqlite3.complete_statement(pendiente):
+            sentencias.append(pendiente.strip())
+            pendiente = ""
+
+    return sentencias
@@ -0,0 +1,29 @@
+-- Índices secundarios para las consultas más frecuentes
+
+-- Listado y búsqueda de productos activos ordenados por nombre.
+-- Índice parcial: solo incluye los productos activos.
+CREATE INDEX IF NOT EXISTS idx_productos_activos_nombre
+ON productos (nombre)
+WHERE activo = 1;
+
+-- Verificación de productos asociados al eliminar un proveedor
+CREATE INDEX IF NOT EXISTS idx_productos_proveedor
+ON productos (proveedor_id);
+
+-- Verificación de ventas asociadas al eliminar un cliente
+CREATE INDEX IF NOT EXISTS idx_ventas_cliente
+ON ventas (cliente_id);
+
+-- Listado de ventas por fecha y filtros por periodo
+CREATE INDEX IF NOT EXISTS idx_ventas_fecha
+ON ventas (fecha_venta);
+
+-- Detalle de una venta, borrado en cascada y productos más vendidos.
+-- Incluye producto, cantidad y subtotal para que el reporte de productos
+-- más vendidos no tenga que leer la tabla.
+CREATE INDEX IF NOT EXISTS idx_detalle_venta_venta
+ON detalle_venta (venta_id, producto_id, cantidad, subtotal);
+
+-- Clave foránea hacia productos
+CREATE INDEX IF NOT EXISTS idx_detalle_venta_producto
+ON detalle_venta (producto_id);
@@ -0,0 +1,5 @@
+-- Clave natural de productos para la importación masiva (upsert por
+-- nombre + proveedor). No es UNIQUE porque los datos existentes pueden
+-- tener nombres repetidos con el mismo proveedor.
+CREATE INDEX IF NOT EXISTS idx_productos_nombre_proveedor
+ON productos (nombre, proveedor_id);
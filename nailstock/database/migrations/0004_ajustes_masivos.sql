@@ -0,0 +1,32 @@
+-- Ajustes masivos de precio y stock, con la foto previa de cada producto
+-- afectado para poder deshacerlos
+
+CREATE TABLE IF NOT EXISTS ajustes_masivos (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    tipo TEXT NOT NULL,
+    valor REAL NOT NULL,
+    categoria TEXT,
+    proveedor_id INTEGER,
+    productos_afectados INTEGER NOT NULL DEFAULT 0,
+    revertido INTEGER NOT NULL DEFAULT 0,
+    fecha DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Valores anteriores al ajuste. stock_ajustado guarda el stock que dejó el
+-- ajuste, para que deshacer una corrección de stock solo revierta la
+-- diferencia y respete las ventas registradas después.
+CREATE TABLE IF NOT EXISTS ajustes_masivos_snapshot (
+    ajuste_id INTEGER NOT NULL,
+    producto_id INTEGER NOT NULL,
+    precio_compra REAL NOT NULL,
+    precio_venta REAL NOT NULL,
+    stock INTEGER NOT NULL,
+    stock_ajustado INTEGER,
+    PRIMARY KEY (ajuste_id, producto_id),
+    FOREIGN KEY (ajuste_id) REFERENCES ajustes_masivos (id) ON DELETE CASCADE
+) WITHOUT ROWID;
+
+-- Filtro por categoría de los ajustes masivos
+CREATE INDEX IF NOT EXISTS idx_productos_activos_categoria
+ON productos (categoria)
+WHERE activo = 1;
@@ -0,0 +1,17 @@
+-- Índices para la paginación por clave (keyset). Cada índice incluye
+-- implícitamente el rowid (id), así que sirve para buscar por
+-- (nombre, id) y recorrer en ese orden sin ordenar en memoria.
+
+CREATE INDEX IF NOT EXISTS idx_clientes_nombre
+ON clientes (nombre);
+
+CREATE INDEX IF NOT EXISTS idx_proveedores_nombre
+ON proveedores (nombre);
+
+-- Productos activos de una categoría ordenados por nombre. Reemplaza al
+-- índice por categoría de los ajustes masivos, que es su prefijo.
+CREATE INDEX IF NOT EXISTS idx_productos_activos_categoria_nombre
+ON productos (categoria, nombre)
+WHERE activo = 1;
+
+DROP INDEX IF EXISTS idx_productos_activos_categoria;
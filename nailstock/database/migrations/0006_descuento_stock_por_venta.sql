@@ -0,0 +1,5 @@
+-- El stock de una venta se descuenta en VentaModel con un solo UPDATE
+-- agregado por producto, después de verificar la disponibilidad de todo
+-- el carrito. El trigger por línea ya no se usa.
+-- prevenir_stock_negativo se conserva como última defensa.
+DROP TRIGGER IF EXISTS disminuir_stock_venta;
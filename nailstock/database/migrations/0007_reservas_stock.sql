@@ -0,0 +1,14 @@
+-- Reservas de stock de los carritos abiertos en cada terminal (caja).
+-- Vencen solas: una caja que se cierra sin vender no bloquea el stock.
+CREATE TABLE IF NOT EXISTS reservas_stock (
+    terminal TEXT NOT NULL,
+    producto_id INTEGER NOT NULL,
+    cantidad INTEGER NOT NULL,
+    expira REAL NOT NULL,  -- segundos Unix
+    PRIMARY KEY (terminal, producto_id),
+    FOREIGN KEY (producto_id) REFERENCES productos (id)
+) WITHOUT ROWID;
+
+-- Suma de lo reservado por producto (disponibilidad)
+CREATE INDEX IF NOT EXISTS idx_reservas_stock_producto
+ON reservas_stock (producto_id, expira);
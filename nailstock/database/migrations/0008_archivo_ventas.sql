@@ -0,0 +1,35 @@
+-- Archivo de ventas antiguas en una base de datos histórica aparte
+-- (ver utils/archivo.py)
+
+-- Banderas para que los triggers se salten su efecto durante operaciones
+-- de mantenimiento. Se activan y desactivan dentro de la misma transacción,
+-- así ninguna otra conexión las ve encendidas.
+CREATE TABLE IF NOT EXISTS control_triggers (
+    nombre TEXT PRIMARY KEY,
+    activo INTEGER NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+
+INSERT OR IGNORE INTO control_triggers (nombre, activo) VALUES ('archivando', 0);
+
+-- Estado del archivo: las ventas con fecha_venta < corte pueden estar en la
+-- base histórica. Una sola fila.
+CREATE TABLE IF NOT EXISTS archivo_ventas (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    corte DATETIME NOT NULL,
+    ventas INTEGER NOT NULL DEFAULT 0,
+    detalles INTEGER NOT NULL DEFAULT 0,
+    fecha_actualizacion DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Mover una venta al archivo no devuelve su mercancía al stock
+DROP TRIGGER IF EXISTS aumentar_stock_eliminar_venta;
+
+CREATE TRIGGER aumentar_stock_eliminar_venta
+AFTER DELETE ON detalle_venta
+FOR EACH ROW
+WHEN (SELECT activo FROM control_triggers WHERE nombre = 'archivando') = 0
+BEGIN
+    UPDATE productos
+    SET stock = stock + OLD.cantidad
+    WHERE id = OLD.producto_id;
+END;
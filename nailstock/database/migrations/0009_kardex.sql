@@ -0,0 +1,85 @@
+-- Kardex: bitácora de movimientos de stock, solo de inserción
+-- (ver models/kardex_model.py)
+
+-- cantidad con signo: positiva entra al stock, negativa sale.
+-- referencia: venta o ajuste masivo que originó el movimiento, según el tipo.
+CREATE TABLE IF NOT EXISTS movimientos_stock (
+    id INTEGER PRIMARY KEY,
+    producto_id INTEGER NOT NULL,
+    tipo TEXT NOT NULL,
+    cantidad INTEGER NOT NULL,
+    referencia INTEGER,
+    nota TEXT,
+    fecha DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (producto_id) REFERENCES productos (id)
+);
+
+-- Movimientos de un producto en orden (el rowid va implícito en el índice,
+-- así "producto_id = ? AND id > ?" es una búsqueda por rango)
+CREATE INDEX IF NOT EXISTS idx_movimientos_stock_producto
+ON movimientos_stock (producto_id);
+
+CREATE TRIGGER IF NOT EXISTS movimientos_stock_sin_cambios
+BEFORE UPDATE ON movimientos_stock
+BEGIN
+    SELECT RAISE(ABORT, 'Los movimientos de stock no se pueden modificar');
+END;
+
+CREATE TRIGGER IF NOT EXISTS movimientos_stock_sin_borrado
+BEFORE DELETE ON movimientos_stock
+BEGIN
+    SELECT RAISE(ABORT, 'Los movimientos de stock no se pueden eliminar');
+END;
+
+-- Fotos periódicas del stock según el kardex. El stock de un producto en
+-- una fecha es el de la última foto anterior más los movimientos
+-- posteriores a `ultimo_movimiento`. Los productos con stock 0 no se guardan.
+CREATE TABLE IF NOT EXISTS snapshots_stock (
+    id INTEGER PRIMARY KEY,
+    fecha DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    ultimo_movimiento INTEGER NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_snapshots_stock_fecha
+ON snapshots_stock (fecha);
+
+CREATE TABLE IF NOT EXISTS snapshots_stock_detalle (
+    snapshot_id INTEGER NOT NULL,
+    producto_id INTEGER NOT NULL,
+    stock INTEGER NOT NULL,
+    PRIMARY KEY (snapshot_id, producto_id),
+    FOREIGN KEY (snapshot_id) REFERENCES snapshots_stock (id)
+) WITHOUT ROWID;
+
+-- Punto de partida: el stock actual de cada producto
+INSERT INTO snapshots_stock (id, ultimo_movimiento) VALUES (1, 0);
+
+INSERT INTO snapshots_stock_detalle (snapshot_id, producto_id, stock)
+SELECT 1, id, stock FROM productos WHERE stock <> 0;
+
+-- Stock con el que se da de alta un producto (formulario o importación)
+CREATE TRIGGER IF NOT EXISTS kardex_producto_nuevo
+AFTER INSERT ON productos
+FOR EACH ROW
+WHEN NEW.stock <> 0
+BEGIN
+    INSERT INTO movimientos_stock (producto_id, tipo, cantidad)
+    VALUES (NEW.id, 'inicial', NEW.stock);
+END;
+
+-- Eliminar una venta devuelve la mercancía y lo anota en el kardex
+-- (salvo al archivarla, ver 0008_archivo_ventas.sql)
+DROP TRIGGER IF EXISTS aumentar_stock_eliminar_venta;
+
+CREATE TRIGGER aumentar_stock_eliminar_venta
+AFTER DELETE ON detalle_venta
+FOR EACH ROW
+WHEN (SELECT activo FROM control_triggers WHERE nombre = 'archivando') = 0
+BEGIN
+    UPDATE productos
+    SET stock = stock + OLD.cantidad
+    WHERE id = OLD.producto_id;
+
+    INSERT INTO movimientos_stock (producto_id, tipo, cantidad, referencia)
+    VALUES (OLD.producto_id, 'devolucion', OLD.cantidad, OLD.venta_id);
+END;
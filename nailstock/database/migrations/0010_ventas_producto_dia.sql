@@ -0,0 +1,55 @@
+-- Unidades e ingresos por producto y día, mantenidos por triggers sobre
+-- detalle_venta. El reporte de productos más vendidos lee esta tabla en
+-- lugar de agrupar todas las líneas de venta del periodo.
+-- Las ventas archivadas (0008) siguen contando: al archivarlas no se restan.
+CREATE TABLE IF NOT EXISTS ventas_producto_dia (
+    dia TEXT NOT NULL,
+    producto_id INTEGER NOT NULL,
+    unidades INTEGER NOT NULL,
+    ingresos REAL NOT NULL,
+    PRIMARY KEY (dia, producto_id)
+) WITHOUT ROWID;
+
+INSERT INTO ventas_producto_dia (dia, producto_id, unidades, ingresos)
+SELECT DATE(v.fecha_venta), dv.producto_id, SUM(dv.cantidad), SUM(dv.subtotal)
+FROM ventas v
+JOIN detalle_venta dv ON dv.venta_id = v.id
+GROUP BY DATE(v.fecha_venta), dv.producto_id;
+
+-- Al eliminar una venta, el borrado en cascada de su detalle ocurre cuando
+-- la venta ya no existe y los triggers del detalle no podrían leer su
+-- fecha: el detalle se borra antes, explícitamente.
+CREATE TRIGGER IF NOT EXISTS borrar_detalle_antes_de_venta
+BEFORE DELETE ON ventas
+FOR EACH ROW
+BEGIN
+    DELETE FROM detalle_venta WHERE venta_id = OLD.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS ventas_producto_dia_sumar
+AFTER INSERT ON detalle_venta
+FOR EACH ROW
+BEGIN
+    INSERT INTO ventas_producto_dia (dia, producto_id, unidades, ingresos)
+    SELECT DATE(fecha_venta), NEW.producto_id, NEW.cantidad, NEW.subtotal
+    FROM ventas WHERE id = NEW.venta_id
+    ON CONFLICT (dia, producto_id) DO UPDATE SET
+        unidades = unidades + excluded.unidades,
+        ingresos = ingresos + excluded.ingresos;
+END;
+
+CREATE TRIGGER IF NOT EXISTS ventas_producto_dia_restar
+AFTER DELETE ON detalle_venta
+FOR EACH ROW
+WHEN (SELECT activo FROM control_triggers WHERE nombre = 'archivando') = 0
+BEGIN
+    UPDATE ventas_producto_dia
+    SET unidades = unidades - OLD.cantidad, ingresos = ingresos - OLD.subtotal
+    WHERE producto_id = OLD.producto_id
+      AND dia = (SELECT DATE(fecha_venta) FROM ventas WHERE id = OLD.venta_id);
+
+    DELETE FROM ventas_producto_dia
+    WHERE producto_id = OLD.producto_id
+      AND dia = (SELECT DATE(fecha_venta) FROM ventas WHERE id = OLD.venta_id)
+      AND unidades = 0;
+END;
@@ -0,0 +1,54 @@
+-- Número de ventas, total, mínimo y máximo por día, mantenidos por
+-- triggers sobre ventas. Las estadísticas del periodo y la serie de ventas
+-- por día se derivan de aquí de forma exacta: el promedio es la suma de
+-- totales entre la suma de ventas, y el mínimo y el máximo del periodo son
+-- los de sus días.
+-- Como en ventas_producto_dia (0010), las ventas archivadas siguen contando.
+CREATE TABLE IF NOT EXISTS ventas_diarias (
+    dia TEXT PRIMARY KEY,
+    ventas INTEGER NOT NULL,
+    total REAL NOT NULL,
+    minimo REAL NOT NULL,
+    maximo REAL NOT NULL
+) WITHOUT ROWID;
+
+INSERT INTO ventas_diarias (dia, ventas, total, minimo, maximo)
+SELECT DATE(fecha_venta), COUNT(*), SUM(total), MIN(total), MAX(total)
+FROM ventas
+GROUP BY DATE(fecha_venta);
+
+CREATE TRIGGER IF NOT EXISTS ventas_diarias_sumar
+AFTER INSERT ON ventas
+FOR EACH ROW
+BEGIN
+    INSERT INTO ventas_diarias (dia, ventas, total, minimo, maximo)
+    VALUES (DATE(NEW.fecha_venta), 1, NEW.total, NEW.total, NEW.total)
+    ON CONFLICT (dia) DO UPDATE SET
+        ventas = ventas + 1,
+        total = total + excluded.total,
+        minimo = MIN(minimo, excluded.minimo),
+        maximo = MAX(maximo, excluded.maximo);
+END;
+
+-- El mínimo y el máximo no se pueden "restar": se recalculan con las
+-- ventas que quedan ese día (por idx_ventas_fecha). El corte del archivo
+-- es siempre un inicio de día, así que un día nunca queda repartido entre
+-- las dos bases.
+CREATE TRIGGER IF NOT EXISTS ventas_diarias_restar
+AFTER DELETE ON ventas
+FOR EACH ROW
+WHEN (SELECT activo FROM control_triggers WHERE nombre = 'archivando') = 0
+BEGIN
+    UPDATE ventas_diarias
+    SET ventas = ventas - 1,
+        total = total - OLD.total,
+        minimo = COALESCE((SELECT MIN(total) FROM ventas
+                           WHERE fecha_venta >= ventas_diarias.dia
+                             AND fecha_venta < DATE(ventas_diarias.dia, '+1 day')), 0),
+        maximo = COALESCE((SELECT MAX(total) FROM ventas
+                           WHERE fecha_venta >= ventas_diarias.dia
+                             AND fecha_venta < DATE(ventas_diarias.dia, '+1 day')), 0)
+    WHERE dia = DATE(OLD.fecha_venta);
+
+    DELETE FROM ventas_diarias WHERE dia = DATE(OLD.fecha_venta) AND ventas = 0;
+END;
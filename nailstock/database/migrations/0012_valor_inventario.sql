@@ -0,0 +1,142 @@
+-- Valor del inventario y conteos de stock bajo / sin stock de los productos
+-- activos, en total y por categoría, mantenidos por triggers sobre
+-- productos. Un tablero los puede consultar cada pocos segundos leyendo
+-- una fila, sin recorrer el catálogo.
+-- Criterios (los de reportes.stock_bajo y reportes.sin_stock):
+--   stock bajo: stock <= stock_minimo (stock_minimo NULL no cuenta)
+--   sin stock:  stock = 0
+CREATE TABLE IF NOT EXISTS inventario_resumen (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    productos INTEGER NOT NULL,
+    valor REAL NOT NULL,
+    stock_bajo INTEGER NOT NULL,
+    sin_stock INTEGER NOT NULL
+);
+
+-- categoria '' agrupa a los productos sin categoría
+CREATE TABLE IF NOT EXISTS inventario_categoria (
+    categoria TEXT PRIMARY KEY,
+    productos INTEGER NOT NULL,
+    valor REAL NOT NULL,
+    stock_bajo INTEGER NOT NULL,
+    sin_stock INTEGER NOT NULL
+) WITHOUT ROWID;
+
+INSERT OR IGNORE INTO inventario_resumen (id, productos, valor, stock_bajo, sin_stock)
+SELECT 1, COUNT(*), COALESCE(SUM(stock * precio_compra), 0),
+       COALESCE(SUM(IFNULL(stock <= stock_minimo, 0)), 0), COALESCE(SUM(stock = 0), 0)
+FROM productos
+WHERE activo = 1;
+
+INSERT OR IGNORE INTO inventario_categoria (categoria, productos, valor, stock_bajo, sin_stock)
+SELECT COALESCE(categoria, ''), COUNT(*), SUM(stock * precio_compra),
+       SUM(IFNULL(stock <= stock_minimo, 0)), SUM(stock = 0)
+FROM productos
+WHERE activo = 1
+GROUP BY COALESCE(categoria, '');
+
+CREATE TRIGGER IF NOT EXISTS inventario_producto_nuevo
+AFTER INSERT ON productos
+FOR EACH ROW
+WHEN NEW.activo = 1
+BEGIN
+    UPDATE inventario_resumen
+    SET productos = productos + 1,
+        valor = valor + NEW.stock * NEW.precio_compra,
+        stock_bajo = stock_bajo + IFNULL(NEW.stock <= NEW.stock_minimo, 0),
+        sin_stock = sin_stock + (NEW.stock = 0)
+    WHERE id = 1;
+
+    INSERT INTO inventario_categoria (categoria, productos, valor, stock_bajo, sin_stock)
+    VALUES (COALESCE(NEW.categoria, ''), 1, NEW.stock * NEW.precio_compra,
+            IFNULL(NEW.stock <= NEW.stock_minimo, 0), NEW.stock = 0)
+    ON CONFLICT (categoria) DO UPDATE SET
+        productos = productos + 1,
+        valor = valor + excluded.valor,
+        stock_bajo = stock_bajo + excluded.stock_bajo,
+        sin_stock = sin_stock + excluded.sin_stock;
+END;
+
+-- Caso común (ventas, ediciones de stock o precio): el producto sigue
+-- activo y en la misma categoría, basta sumar la diferencia.
+CREATE TRIGGER IF NOT EXISTS inventario_producto_modificado
+AFTER UPDATE OF stock, precio_compra, stock_minimo, categoria, activo ON productos
+FOR EACH ROW
+WHEN OLD.activo = 1 AND NEW.activo = 1 AND OLD.categoria IS NEW.categoria
+BEGIN
+    UPDATE inventario_resumen
+    SET valor = valor + NEW.stock * NEW.precio_compra - OLD.stock * OLD.precio_compra,
+        stock_bajo = stock_bajo + IFNULL(NEW.stock <= NEW.stock_minimo, 0)
+                                - IFNULL(OLD.stock <= OLD.stock_minimo, 0),
+        sin_stock = sin_stock + (NEW.stock = 0) - (OLD.stock = 0)
+    WHERE id = 1;
+
+    UPDATE inventario_categoria
+    SET valor = valor + NEW.stock * NEW.precio_compra - OLD.stock * OLD.precio_compra,
+        stock_bajo = stock_bajo + IFNULL(NEW.stock <= NEW.stock_minimo, 0)
+                                - IFNULL(OLD.stock <= OLD.stock_minimo, 0),
+        sin_stock = sin_stock + (NEW.stock = 0) - (OLD.stock = 0)
+    WHERE categoria = COALESCE(NEW.categoria, '');
+END;
+
+-- Cambio de categoría, baja o reactivación: se resta lo que aportaba la
+-- fila anterior y se suma lo que aporta la nueva.
+CREATE TRIGGER IF NOT EXISTS inventario_producto_movido
+AFTER UPDATE OF categoria, activo ON productos
+FOR EACH ROW
+WHEN (OLD.activo = 1 OR NEW.activo = 1)
+     AND NOT (OLD.activo = 1 AND NEW.activo = 1 AND OLD.categoria IS NEW.categoria)
+BEGIN
+    UPDATE inventario_resumen
+    SET productos = productos - (OLD.activo = 1) + (NEW.activo = 1),
+        valor = valor - (OLD.activo = 1) * OLD.stock * OLD.precio_compra
+                      + (NEW.activo = 1) * NEW.stock * NEW.precio_compra,
+        stock_bajo = stock_bajo - (OLD.activo = 1) * IFNULL(OLD.stock <= OLD.stock_minimo, 0)
+                                + (NEW.activo = 1) * IFNULL(NEW.stock <= NEW.stock_minimo, 0),
+        sin_stock = sin_stock - (OLD.activo = 1) * (OLD.stock = 0)
+                              + (NEW.activo = 1) * (NEW.stock = 0)
+    WHERE id = 1;
+
+    UPDATE inventario_categoria
+    SET productos = productos - 1,
+        valor = valor - OLD.stock * OLD.precio_compra,
+        stock_bajo = stock_bajo - IFNULL(OLD.stock <= OLD.stock_minimo, 0),
+        sin_stock = sin_stock - (OLD.stock = 0)
+    WHERE categoria = COALESCE(OLD.categoria, '') AND OLD.activo = 1;
+
+    INSERT INTO inventario_categoria (categoria, productos, valor, stock_bajo, sin_stock)
+    SELECT COALESCE(NEW.categoria, ''), 1, NEW.stock * NEW.precio_compra,
+           IFNULL(NEW.stock <= NEW.stock_minimo, 0), NEW.stock = 0
+    WHERE NEW.activo = 1
+    ON CONFLICT (categoria) DO UPDATE SET
+        productos = productos + 1,
+        valor = valor + excluded.valor,
+        stock_bajo = stock_bajo + excluded.stock_bajo,
+        sin_stock = sin_stock + excluded.sin_stock;
+
+    DELETE FROM inventario_categoria
+    WHERE categoria = COALESCE(OLD.categoria, '') AND productos = 0;
+END;
+
+CREATE TRIGGER IF NOT EXISTS inventario_producto_eliminado
+AFTER DELETE ON productos
+FOR EACH ROW
+WHEN OLD.activo = 1
+BEGIN
+    UPDATE inventario_resumen
+    SET productos = productos - 1,
+        valor = valor - OLD.stock * OLD.precio_compra,
+        stock_bajo = stock_bajo - IFNULL(OLD.stock <= OLD.stock_minimo, 0),
+        sin_stock = sin_stock - (OLD.stock = 0)
+    WHERE id = 1;
+
+    UPDATE inventario_categoria
+    SET productos = productos - 1,
+        valor = valor - OLD.stock * OLD.precio_compra,
+        stock_bajo = stock_bajo - IFNULL(OLD.stock <= OLD.stock_minimo, 0),
+        sin_stock = sin_stock - (OLD.stock = 0)
+    WHERE categoria = COALESCE(OLD.categoria, '');
+
+    DELETE FROM inventario_categoria
+    WHERE categoria = COALESCE(OLD.categoria, '') AND productos = 0;
+END;
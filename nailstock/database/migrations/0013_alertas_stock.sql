@@ -0,0 +1,64 @@
+-- Alertas de stock bajo, alimentadas por triggers sobre productos.
+-- Se abre una alerta cuando un producto activo cruza hacia stock <=
+-- stock_minimo (por una venta, una edición o un ajuste) y se resuelve sola
+-- cuando vuelve a quedar por encima, se desactiva o se elimina.
+-- `vista` la marca quien ya la revisó: el aviso de la ventana principal
+-- cuenta las abiertas sin ver.
+CREATE TABLE IF NOT EXISTS alertas_stock (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    producto_id INTEGER NOT NULL,
+    stock INTEGER NOT NULL,
+    stock_minimo INTEGER NOT NULL,
+    fecha DATETIME DEFAULT CURRENT_TIMESTAMP,
+    vista INTEGER NOT NULL DEFAULT 0,
+    resuelta INTEGER NOT NULL DEFAULT 0,
+    fecha_resuelta DATETIME
+);
+
+-- Una sola alerta abierta por producto; las consultas de alertas abiertas
+-- solo recorren este índice, nunca el historial de resueltas
+CREATE UNIQUE INDEX IF NOT EXISTS idx_alertas_stock_abiertas
+ON alertas_stock (producto_id) WHERE resuelta = 0;
+
+INSERT OR IGNORE INTO alertas_stock (producto_id, stock, stock_minimo)
+SELECT id, stock, stock_minimo
+FROM productos
+WHERE activo = 1 AND stock <= stock_minimo;
+
+CREATE TRIGGER IF NOT EXISTS alerta_stock_producto_nuevo
+AFTER INSERT ON productos
+FOR EACH ROW
+WHEN NEW.activo = 1 AND NEW.stock <= NEW.stock_minimo
+BEGIN
+    INSERT OR IGNORE INTO alertas_stock (producto_id, stock, stock_minimo)
+    VALUES (NEW.id, NEW.stock, NEW.stock_minimo);
+END;
+
+CREATE TRIGGER IF NOT EXISTS alerta_stock_bajo
+AFTER UPDATE OF stock, stock_minimo, activo ON productos
+FOR EACH ROW
+WHEN NEW.activo = 1 AND NEW.stock <= NEW.stock_minimo
+     AND NOT (OLD.activo = 1 AND IFNULL(OLD.stock <= OLD.stock_minimo, 0))
+BEGIN
+    INSERT OR IGNORE INTO alertas_stock (producto_id, stock, stock_minimo)
+    VALUES (NEW.id, NEW.stock, NEW.stock_minimo);
+END;
+
+CREATE TRIGGER IF NOT EXISTS alerta_stock_repuesto
+AFTER UPDATE OF stock, stock_minimo, activo ON productos
+FOR EACH ROW
+WHEN OLD.activo = 1 AND OLD.stock <= OLD.stock_minimo
+     AND NOT (NEW.activo = 1 AND IFNULL(NEW.stock <= NEW.stock_minimo, 0))
+BEGIN
+    UPDATE alertas_stock SET resuelta = 1, fecha_resuelta = CURRENT_TIMESTAMP
+    WHERE producto_id = NEW.id AND resuelta = 0;
+END;
+
+CREATE TRIGGER IF NOT EXISTS alerta_stock_producto_eliminado
+AFTER DELETE ON productos
+FOR EACH ROW
+WHEN OLD.activo = 1 AND OLD.stock <= OLD.stock_minimo
+BEGIN
+    UPDATE alertas_stock SET resuelta = 1, fecha_resuelta = CURRENT_TIMESTAMP
+    WHERE producto_id = OLD.id AND resuelta = 0;
+END;
@@ -0,0 +1,94 @@
+"""
+Búsqueda de clientes y proveedores en SQLite en lugar de filtrar toda la
+tabla en Python.
+
+- Columnas sombra normalizadas (ver utils/busqueda.py): telefono_busqueda
+  (solo dígitos) y rfc_busqueda (sin acentos ni separadores), con índices
+  para buscarlas por prefijo; proveedores también correo_busqueda.
+- palabras_busqueda: cada palabra normalizada del nombre (y del correo de
+  los proveedores) con el registro al que pertenece, para encontrar
+  "Pérez" en "Juan Pérez" por prefijo de palabra.
+
+Los modelos las mantienen al agregar y actualizar; al eliminar las borran
+los triggers. Es una migración en Python porque SQLite no sabe quitar
+acentos.
+"""
+from nailstock.utils.busqueda import normalizar, normalizar_telefono, palabras
+
+_ESQUEMA = (
+    "ALTER TABLE clientes ADD COLUMN telefono_busqueda TEXT",
+    "ALTER TABLE clientes ADD COLUMN rfc_busqueda TEXT",
+    "ALTER TABLE proveedores ADD COLUMN telefono_busqueda TEXT",
+    "ALTER TABLE proveedores ADD COLUMN rfc_busqueda TEXT",
+    "ALTER TABLE proveedores ADD COLUMN correo_busqueda TEXT",
+
+    "CREATE INDEX IF NOT EXISTS idx_clientes_telefono_busqueda ON clientes (telefono_busqueda)",
+    "CREATE INDEX IF NOT EXISTS idx_clientes_rfc_busqueda ON clientes (rfc_busqueda)",
+    "CREATE INDEX IF NOT EXISTS idx_proveedores_telefono_busqueda ON proveedores (telefono_busqueda)",
+    "CREATE INDEX IF NOT EXISTS idx_proveedores_rfc_busqueda ON proveedores (rfc_busqueda)",
+    "CREATE INDEX IF NOT EXISTS idx_proveedores_correo_busqueda ON proveedores (correo_busqueda)",
+
+    # tabla: 'clientes' o 'proveedores'
+    """
+    CREATE TABLE IF NOT EXISTS palabras_busqueda (
+        tabla TEXT NOT NULL,
+        palabra TEXT NOT NULL,
+        registro_id INTEGER NOT NULL,
+        PRIMARY KEY (tabla, palabra, registro_id)
+    ) WITHOUT ROWID
+    """,
+    # Para borrar las palabras de un registro
+    """
+    CREATE INDEX IF NOT EXISTS idx_palabras_busqueda_registro
+    ON palabras_busqueda (tabla, registro_id)
+    """,
+
+    """
+    CREATE TRIGGER IF NOT EXISTS palabras_busqueda_cliente_eliminado
+    AFTER DELETE ON clientes
+    FOR EACH ROW
+    BEGIN
+        DELETE FROM palabras_busqueda WHERE tabla = 'clientes' AND registro_id = OLD.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS palabras_busqueda_proveedor_eliminado
+    AFTER DELETE ON proveedores
+    FOR EACH ROW
+    BEGIN
+        DELETE FROM palabras_busqueda WHERE tabla = 'proveedores' AND registro_id = OLD.id;
+    END
+    """,
+)
+
+def migrar(conn):
+    for sentencia in _ESQUEMA:
+        conn.execute(sentencia)
+
+    clientes = conn.execute("SELECT id, nombre, telefono, rfc FROM clientes").fetchall()
+    conn.executemany(
+        "UPDATE clientes SET telefono_busqueda = ?, rfc_busqueda = ? WHERE id = ?",
+        [(normalizar_telefono(telefono), normalizar(rfc), id)
+         for id, _, telefono, rfc in clientes]
+    )
+    conn.executemany(
+        "INSERT OR IGNORE INTO palabras_busqueda (tabla, palabra, registro_id) "
+        "VALUES ('clientes', ?, ?)",
+        [(palabra, id) for id, nombre, _, _ in clientes for palabra in palabras(nombre)]
+    )
+
+    proveedores = conn.execute(
+        "SELECT id, nombre, telefono, correo, rfc FROM proveedores"
+    ).fetchall()
+    conn.executemany(
+        "UPDATE proveedores SET telefono_busqueda = ?, rfc_busqueda = ?, correo_busqueda = ? "
+        "WHERE id = ?",
+        [(normalizar_telefono(telefono), normalizar(rfc), normalizar(correo), id)
+         for id, _, telefono, correo, rfc in proveedores]
+    )
+    conn.executemany(
+        "INSERT OR IGNORE INTO palabras_busqueda (tabla, palabra, registro_id) "
+        "VALUES ('proveedores', ?, ?)",
+        [(palabra, id) for id, nombre, _, correo, _ in proveedores
+         for palabra in palabras(nombre, correo)]
+    )
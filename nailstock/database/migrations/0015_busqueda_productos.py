@@ -0,0 +1,76 @@
+"""
+Índice de texto completo (FTS5) de productos: nombre, descripción y
+categoría, con contenido externo (lee de productos, no duplica el texto) y
+sincronizado por triggers.
+
+- unicode61 con remove_diacritics: "perforación" se encuentra con "perforacion".
+- tokenchars "/.": medidas como "3/8" o "1.5" quedan como una sola palabra.
+- prefix: índices de prefijos de 1 a 3 caracteres para las búsquedas
+  mientras se escribe ("tor*").
+- rank: bm25 con más peso para el nombre que para la descripción y la
+  categoría.
+
+Es una migración en Python porque SQLite puede estar compilado sin FTS5;
+en ese caso no se crea nada y la búsqueda usa LIKE (ver
+ProductoModel.buscar_productos).
+"""
+import sqlite3
+
+_ESQUEMA = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS productos_fts USING fts5(
+        nombre, descripcion, categoria,
+        content='productos', content_rowid='id',
+        tokenize="unicode61 remove_diacritics 2 tokenchars '/.'",
+        prefix='1 2 3'
+    )
+    """,
+    "INSERT INTO productos_fts (productos_fts) VALUES ('rebuild')",
+    "INSERT INTO productos_fts (productos_fts, rank) VALUES ('rank', 'bm25(10.0, 2.0, 1.0)')",
+
+    """
+    CREATE TRIGGER IF NOT EXISTS productos_fts_insertar
+    AFTER INSERT ON productos
+    FOR EACH ROW
+    BEGIN
+        INSERT INTO productos_fts (rowid, nombre, descripcion, categoria)
+        VALUES (NEW.id, NEW.nombre, NEW.descripcion, NEW.categoria);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS productos_fts_eliminar
+    AFTER DELETE ON productos
+    FOR EACH ROW
+    BEGIN
+        INSERT INTO productos_fts (productos_fts, rowid, nombre, descripcion, categoria)
+        VALUES ('delete', OLD.id, OLD.nombre, OLD.descripcion, OLD.categoria);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS productos_fts_actualizar
+    AFTER UPDATE OF nombre, descripcion, categoria ON productos
+    FOR EACH ROW
+    BEGIN
+        INSERT INTO productos_fts (productos_fts, rowid, nombre, descripcion, categoria)
+        VALUES ('delete', OLD.id, OLD.nombre, OLD.descripcion, OLD.categoria);
+        INSERT INTO productos_fts (rowid, nombre, descripcion, categoria)
+        VALUES (NEW.id, NEW.nombre, NEW.descripcion, NEW.categoria);
+    END
+    """,
+)
+
+def fts5_disponible(conn):
+    """Indica si este SQLite tiene FTS5."""
+    try:
+        conn.execute("CREATE VIRTUAL TABLE temp.prueba_fts5 USING fts5(texto)")
+    except sqlite3.OperationalError:
+        return False
+    conn.execute("DROP TABLE temp.prueba_fts5")
+    return True
+
+def migrar(conn):
+    if not fts5_disponible(conn):
+        return
+
+    for sentencia in _ESQUEMA:
+        conn.execute(sentencia)
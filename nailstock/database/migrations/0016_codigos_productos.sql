@@ -0,0 +1,47 @@
+-- Código de cada producto (SKU o código de barras de la pieza) y códigos de
+-- barras adicionales, uno por presentación (caja de 12, bolsa de 100...),
+-- para vender con el escáner. Un código identifica a un solo producto: el
+-- índice único y la clave primaria cubren cada tabla y los triggers revisan
+-- la otra.
+ALTER TABLE productos ADD COLUMN codigo TEXT;
+
+-- Parcial: los productos sin código no chocan entre sí
+CREATE UNIQUE INDEX IF NOT EXISTS idx_productos_codigo
+ON productos (codigo) WHERE codigo IS NOT NULL;
+
+-- cantidad: piezas del producto que trae la presentación
+CREATE TABLE IF NOT EXISTS codigos_barras (
+    codigo TEXT PRIMARY KEY,
+    producto_id INTEGER NOT NULL,
+    cantidad INTEGER NOT NULL DEFAULT 1 CHECK (cantidad > 0),
+    FOREIGN KEY (producto_id) REFERENCES productos (id)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_codigos_barras_producto
+ON codigos_barras (producto_id);
+
+CREATE TRIGGER IF NOT EXISTS codigos_barras_unico
+BEFORE INSERT ON codigos_barras
+FOR EACH ROW
+WHEN EXISTS (SELECT 1 FROM productos WHERE codigo = NEW.codigo)
+BEGIN
+    SELECT RAISE(ABORT, 'El código ya pertenece a otro producto');
+END;
+
+CREATE TRIGGER IF NOT EXISTS codigo_producto_unico_nuevo
+BEFORE INSERT ON productos
+FOR EACH ROW
+WHEN NEW.codigo IS NOT NULL
+ AND EXISTS (SELECT 1 FROM codigos_barras WHERE codigo = NEW.codigo)
+BEGIN
+    SELECT RAISE(ABORT, 'El código ya pertenece a otro producto');
+END;
+
+CREATE TRIGGER IF NOT EXISTS codigo_producto_unico_modificado
+BEFORE UPDATE OF codigo ON productos
+FOR EACH ROW
+WHEN NEW.codigo IS NOT NULL
+ AND EXISTS (SELECT 1 FROM codigos_barras WHERE codigo = NEW.codigo)
+BEGIN
+    SELECT RAISE(ABORT, 'El código ya pertenece a otro producto');
+END;
@@ -0,0 +1,9 @@
+-- 0016 revisa los códigos de barras al insertarlos; un UPDATE de
+-- codigos_barras.codigo también podía repetir el código de un producto.
+CREATE TRIGGER IF NOT EXISTS codigos_barras_unico_modificado
+BEFORE UPDATE OF codigo ON codigos_barras
+FOR EACH ROW
+WHEN EXISTS (SELECT 1 FROM productos WHERE codigo = NEW.codigo)
+BEGIN
+    SELECT RAISE(ABORT, 'El código ya pertenece a otro producto');
+END;
@@ -0,0 +1,109 @@
+import sys
+from contextlib import contextmanager
+from .consultas import consultas, ESQUEMA_HISTORICO
+from .db_connection import get_db_connection
+
+def plan_consulta(conn, sql, params=()):
+    """Devuelve las líneas de EXPLAIN QUERY PLAN de una consulta."""
+    return [fila[3] for fila in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+
+# Consultas críticas que pueden recorrer un índice completo, con el índice
+# permitido. Todos son parciales o de tablas que se mantienen pequeñas: el
+# recorrido lee solo las filas que la consulta necesita, en orden. Un SCAN
+# de cualquier otro índice (también COVERING) cuenta como recorrido completo.
+RECORRIDOS_PERMITIDOS = {
+    # Listado completo de productos activos, ordenado por nombre
+    "productos.listar_activos": {"idx_productos_activos_nombre"},
+    "productos.listar_disponibles": {"idx_productos_activos_nombre",
+                                     # Solo los carritos abiertos
+                                     "idx_reservas_stock_producto"},
+    # Solo las alertas abiertas (resuelta = 0)
+    "reportes.stock_bajo": {"idx_alertas_stock_abiertas"},
+    "alertas.contar_pendientes": {"idx_alertas_stock_abiertas"},
+    "alertas.abiertas": {"idx_alertas_stock_abiertas"},
+    "alertas.pendientes": {"idx_alertas_stock_abiertas"},
+}
+
+def es_recorrido_completo(detalle, subconsultas=(), permitidos=()):
+    """
+    Indica si una línea del plan recorre una tabla o un índice completo.
+
+    Todo "SCAN" cuenta, también "SCAN p USING [COVERING] INDEX ...", salvo
+    los índices en `permitidos` (ver RECORRIDOS_PERMITIDOS). Recorrer el
+    resultado de una subconsulta (ya filtrada por sus propios índices,
+    p. ej. un UNION ALL), la fila constante de un SELECT sin FROM o una
+    tabla virtual como json_each(?) (el arreglo que llega como parámetro)
+    no cuenta.
+    """
+    if not detalle.startswith("SCAN ") or "VIRTUAL TABLE" in detalle:
+        return False
+    objeto, _, uso = detalle[len("SCAN "):].partition(" USING ")
+    if uso:
+        return not (" INDEX " in f" {uso}" and uso.rsplit(" ", 1)[-1] in permitidos)
+    return objeto != "CONSTANT ROW" and objeto not in subconsultas
+
+def subconsultas_del_plan(plan):
+    """Nombres de las subconsultas que el plan evalúa aparte (CO-ROUTINE / MATERIALIZE)."""
+    return {detalle.split(" ", 1)[1] for detalle in plan
+            if detalle.startswith(("CO-ROUTINE ", "MATERIALIZE "))}
+
+def verificar_planes(conn):
+    """
+    Ejecuta EXPLAIN QUERY PLAN sobre cada consulta crítica.
+
+    :param conn: Conexión a una base de datos con el esquema actual.
+    :return: Diccionario {nombre_consulta: [líneas con recorrido completo]}
+             solo con las consultas que fallan.
+    """
+    fallas = {}
+    for consulta in consultas.criticas():
+        plan = plan_consulta(conn, consulta.sql, consulta.ejemplo)
+        subconsultas = subconsultas_del_plan(plan)
+        permitidos = RECORRIDOS_PERMITIDOS.get(consulta.nombre, ())
+        recorridos = [detalle for detalle in plan
+                      if es_recorrido_completo(detalle, subconsultas, permitidos)]
+        if recorridos:
+            fallas[consulta.nombre] = recorridos
+    return fallas
+
+@contextmanager
+def historico_vacio(conn):
+    """
+    Adjunta una base histórica vacía en memoria: los reportes que incluyen
+    ventas archivadas se verifican contra ella.
+    """
+    conn.execute("ATTACH DATABASE ':memory:' AS historico")
+    try:
+        for nombre in ESQUEMA_HISTORICO:
+            consultas.ejecutar(conn, nombre)
+        yield conn
+    finally:
+        conn.execute("DETACH DATABASE historico")
+
+def verificar_base(conn):
+    """verificar_planes() sobre una base con el esquema actual, con la histórica vacía."""
+    with historico_vacio(conn):
+        return verificar_planes(conn)
+
+def main():
+    """
+    Verificación desde la línea de comandos:
+
+        python -m nailstock.database.planes
+
+    Termina con código 1 si alguna consulta crítica recorre una tabla completa.
+    La misma verificación corre con las pruebas (tests/test_planes.py).
+    """
+    with get_db_connection() as conn:
+        fallas = verificar_base(conn)
+
+    for nombre, recorridos in fallas.items():
+        print(f"[FALLA] {nombre}: {'; '.join(recorridos)}")
+
+    if not fallas:
+        print(f"OK: {len(consultas.criticas())} consultas críticas usan índices")
+    return 1 if fallas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+import random
+import sqlite3
+import threading
+import time
+
+def es_error_bloqueo(error):
+    """Indica si el error es SQLITE_BUSY / SQLITE_LOCKED ("database is locked")."""
+    if not isinstance(error, sqlite3.OperationalError):
+        return False
+    mensaje = str(error).lower()
+    return "locked" in mensaje or "busy" in mensaje
+
+
+class MetricasContencion:
+    """
+    Contadores de contención por el bloqueo de escritura, para ver qué tan
+    seguido otra terminal tiene tomada la base de datos.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reiniciar()
+
+    def reiniciar(self):
+        with self._lock:
+            self.transacciones = 0
+            self.esperas = 0          # transacciones que tuvieron que esperar el bloqueo
+            self.espera_total = 0.0   # segundos esperando el bloqueo
+            self.espera_maxima = 0.0
+            self.reintentos = 0
+            self.agotados = 0         # se acabaron los reintentos
+
+    def anotar_espera(self, segundos, reintentos, agotado=False):
+        with self._lock:
+            self.transacciones += 1
+            if segundos >= 0.001 or reintentos:
+                self.esperas += 1
+            self.espera_total += segundos
+            self.espera_maxima = max(self.espera_maxima, segundos)
+            self.reintentos += reintentos
+            if agotado:
+                self.agotados += 1
+
+    def resumen(self):
+        with self._lock:
+            return {
+                'transacciones': self.transacciones,
+                'esperas': self.esperas,
+                'espera_total_ms': self.espera_total * 1000,
+                'espera_maxima_ms': self.espera_maxima * 1000,
+                'reintentos': self.reintentos,
+                'agotados': self.agotados,
+            }
+
+
+metricas_contencion = MetricasContencion()
+
+
+class PoliticaReintentos:
+    """
+    Reintentos acotados con espera exponencial y jitter ante SQLITE_BUSY.
+
+    Se suma al busy_timeout de la conexión: SQLite ya espera hasta ese
+    tiempo dentro de cada intento; la espera aleatoria entre intentos evita
+    que varias terminales vuelvan a chocar al mismo tiempo.
+    """
+
+    def __init__(self, intentos=5, espera_base=0.05, espera_maxima=1.0):
+        self.intentos = intentos
+        self.espera_base = espera_base
+        self.espera_maxima = espera_maxima
+
+    def espera(self, intento):
+        # "Full jitter": aleatoria entre 0 y el tope exponencial del intento
+        tope = min(self.espera_maxima, self.espera_base * (2 ** intento))
+        return random.uniform(0, tope)
+
+    def ejecutar(self, funcion, *args, metricas=metricas_contencion):
+        """
+        Ejecuta funcion(*args) reintentando solo los errores de bloqueo.
+
+        Si se agotan los intentos lanza una excepción con un mensaje
+        entendible para el usuario, encadenada al error original.
+        """
+        inicio = time.perf_counter()
+        intento = 0
+        while True:
+            try:
+                resultado = funcion(*args)
+            except sqlite3.OperationalError as e:
+                if not es_error_bloqueo(e):
+                    raise
+                if intento + 1 >= self.intentos:
+                    metricas.anotar_espera(time.perf_counter() - inicio, intento, agotado=True)
+                    raise Exception(
+                        "La base de datos está ocupada por otra terminal. "
+                        "Intenta de nuevo en unos segundos."
+                    ) from e
+                time.sleep(self.espera(intento))
+                intento += 1
+                continue
+
+            metricas.anotar_espera(time.perf_counter() - inicio, intento)
+            return resultado
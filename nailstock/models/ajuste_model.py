@@ -0,0 +1,140 @@
+from ..database.db_connection import get_db_connection, get_db_writer
+from ..database.consultas import consultas
+from .kardex_model import KardexModel
+
+class AjusteMasivoModel:
+    """
+    Ajustes masivos de precio y stock sobre los productos activos de una
+    categoría, de un proveedor, de ambos o de todo el catálogo.
+
+    Cada ajuste corre en una sola transacción del escritor: guarda la foto
+    previa de los productos afectados en ajustes_masivos_snapshot y aplica
+    un único UPDATE por conjunto sobre ellos. El último ajuste se puede
+    deshacer a partir de esa foto.
+    """
+
+    # tipo -> (descripción, es ajuste de stock)
+    TIPOS = {
+        'precio_venta_porcentaje': ("Precio de venta: porcentaje", False),
+        'precio_compra_porcentaje': ("Precio de compra: porcentaje", False),
+        'precio_venta_monto': ("Precio de venta: monto fijo", False),
+        'precio_compra_monto': ("Precio de compra: monto fijo", False),
+        'margen': ("Recalcular precio de venta con margen (%)", False),
+        'stock_diferencia': ("Stock: sumar o restar", True),
+        'stock_fijo': ("Stock: fijar cantidad", True),
+    }
+
+    @staticmethod
+    def contar_productos(categoria=None, proveedor_id=None):
+        """Vista previa: cuántos productos afectaría un ajuste con este filtro."""
+        filtro, params = AjusteMasivoModel._filtro(categoria, proveedor_id)
+        with get_db_connection() as conn:
+            return consultas.uno(conn, f"ajustes.contar_{filtro}", params)[0]
+
+    @staticmethod
+    def aplicar_ajuste(tipo, valor, categoria=None, proveedor_id=None):
+        """
+        Aplica un ajuste masivo.
+
+        :param tipo: Una de las claves de TIPOS.
+        :param valor: Porcentaje, monto o cantidad según el tipo.
+        :return: ID del ajuste registrado.
+        """
+        return AjusteMasivoModel.encolar_ajuste(tipo, valor, categoria, proveedor_id).result()
+
+    @staticmethod
+    def encolar_ajuste(tipo, valor, categoria=None, proveedor_id=None):
+        """
+        Valida el ajuste y lo encola en el escritor; devuelve un Future con
+        el ID. Un valor inválido se reporta aquí, antes de encolar.
+        """
+        if tipo not in AjusteMasivoModel.TIPOS:
+            raise Exception(f"Tipo de ajuste desconocido: {tipo}")
+        if tipo in ('margen', 'stock_fijo') and valor < 0:
+            raise Exception("El valor no puede ser negativo para este tipo de ajuste")
+        if AjusteMasivoModel.TIPOS[tipo][1]:
+            valor = int(valor)
+
+        return get_db_writer().enviar(
+            AjusteMasivoModel._aplicar_ajuste, tipo, valor, categoria, proveedor_id
+        )
+
+    @staticmethod
+    def _aplicar_ajuste(conn, tipo, valor, categoria, proveedor_id):
+        filtro, params = AjusteMasivoModel._filtro(categoria, proveedor_id)
+
+        cursor = consultas.ejecutar(conn, "ajustes.insertar",
+                                    (tipo, valor, categoria, proveedor_id))
+        ajuste_id = cursor.lastrowid
+
+        afectados = consultas.ejecutar(conn, f"ajustes.snapshot_{filtro}",
+                                       (ajuste_id, *params)).rowcount
+        if afectados == 0:
+            raise Exception("Ningún producto coincide con el filtro")
+
+        es_stock = AjusteMasivoModel.TIPOS[tipo][1]
+        if es_stock:
+            KardexModel._guardar_stock_previo(conn, "kardex.previo_ajuste", (ajuste_id,))
+
+        consultas.ejecutar(conn, f"ajustes.{tipo}", (valor, ajuste_id))
+
+        if es_stock:
+            consultas.ejecutar(conn, "ajustes.registrar_stock_ajustado", (ajuste_id,))
+            KardexModel._registrar_diferencias(conn, 'ajuste_masivo', ajuste_id)
+
+        consultas.ejecutar(conn, "ajustes.fijar_afectados", (afectados, ajuste_id))
+        return ajuste_id
+
+    @staticmethod
+    def obtener_ajustes(limite=50):
+        with get_db_connection() as conn:
+            return consultas.todos(conn, "ajustes.listar", (limite,))
+
+    @staticmethod
+    def obtener_ultimo_ajuste():
+        """Último ajuste que todavía se puede deshacer (o None)."""
+        with get_db_connection() as conn:
+            return consultas.uno(conn, "ajustes.ultimo")
+
+    @staticmethod
+    def deshacer_ultimo_ajuste():
+        """
+        Deshace el ajuste más reciente que no se haya deshecho.
+
+        Solo se deshace el último para no pisar ajustes posteriores sobre
+        los mismos productos. Los precios vuelven a su valor previo; en los
+        ajustes de stock se revierte la diferencia aplicada.
+
+        :return: El AjusteMasivo deshecho.
+        """
+        return AjusteMasivoModel.encolar_deshacer().result()
+
+    @staticmethod
+    def encolar_deshacer():
+        return get_db_writer().enviar(AjusteMasivoModel._deshacer_ultimo_ajuste)
+
+    @staticmethod
+    def _deshacer_ultimo_ajuste(conn):
+        ajuste = consultas.uno(conn, "ajustes.ultimo")
+        if ajuste is None:
+            raise Exception("No hay ajustes para deshacer")
+
+        if AjusteMasivoModel.TIPOS[ajuste.tipo][1]:
+            KardexModel._guardar_stock_previo(conn, "kardex.previo_ajuste", (ajuste.id,))
+            consultas.ejecutar(conn, "ajustes.revertir_stock", (ajuste.id,))
+            KardexModel._registrar_diferencias(conn, 'ajuste_masivo', ajuste.id, "Deshecho")
+        else:
+            consultas.ejecutar(conn, "ajustes.revertir_precios", (ajuste.id,))
+
+        consultas.ejecutar(conn, "ajustes.marcar_revertido", (ajuste.id,))
+        return ajuste
+
+    @staticmethod
+    def _filtro(categoria, proveedor_id):
+        if categoria and proveedor_id:
+            return 'categoria_proveedor', (categoria, proveedor_id)
+        if categoria:
+            return 'categoria', (categoria,)
+        if proveedor_id:
+            return 'proveedor', (proveedor_id,)
+        return 'todos', ()
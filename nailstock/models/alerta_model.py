@@ -0,0 +1,56 @@
+import json
+from ..database.db_connection import get_db_connection, get_db_writer
+from ..database.consultas import consultas
+
+class AlertaStockModel:
+    """
+    Alertas de stock bajo (alertas_stock).
+
+    Las abren y resuelven los triggers sobre productos en la misma
+    transacción que cambia el stock, así la lista de reabastecimiento está
+    al día con cada venta sin generar ningún reporte. Una alerta abierta
+    está "pendiente" mientras nadie la haya marcado como vista.
+    """
+
+    # Cada cuánto consulta la ventana principal el número de pendientes (ms)
+    INTERVALO_CONSULTA = 5000
+
+    @staticmethod
+    def contar_pendientes():
+        """Número de alertas abiertas sin ver."""
+        with get_db_connection() as conn:
+            return consultas.uno(conn, "alertas.contar_pendientes")[0]
+
+    @staticmethod
+    def obtener_pendientes():
+        """Alertas abiertas sin ver, de la más reciente a la más antigua."""
+        with get_db_connection() as conn:
+            return consultas.todos(conn, "alertas.pendientes")
+
+    @staticmethod
+    def obtener_abiertas():
+        """Todas las alertas abiertas (productos con stock bajo): primero las no vistas."""
+        with get_db_connection() as conn:
+            return consultas.todos(conn, "alertas.abiertas")
+
+    @staticmethod
+    def marcar_vistas(alerta_ids=None):
+        """
+        Marca como vistas las alertas indicadas, o todas las pendientes si
+        no se indican. Siguen abiertas hasta que se reponga el stock.
+
+        :return: Número de alertas marcadas.
+        """
+        return AlertaStockModel.encolar_vistas(alerta_ids).result()
+
+    @staticmethod
+    def encolar_vistas(alerta_ids=None):
+        """Como marcar_vistas, sin esperar: devuelve un Future con el número."""
+        return get_db_writer().enviar(AlertaStockModel._marcar_vistas, alerta_ids)
+
+    @staticmethod
+    def _marcar_vistas(conn, alerta_ids):
+        if alerta_ids is None:
+            return consultas.ejecutar(conn, "alertas.marcar_vistas").rowcount
+        return consultas.ejecutar(conn, "alertas.marcar_vistas_ids",
+                                  (json.dumps(list(alerta_ids)),)).rowcount
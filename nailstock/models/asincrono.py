@@ -0,0 +1,59 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from .producto_model import ProductoModel
+from .cliente_model import ClienteModel
+from .proveedor_model import ProveedorModel
+from .venta_model import VentaModel
+from .kardex_model import KardexModel
+from .codigo_model import CodigoModel
+from .resumen_model import ResumenVentasModel, ResumenInventarioModel
+from ..utils.reportes import Reportes
+from ..utils.importacion import ImportacionProductos
+from ..utils.archivo import ArchivoVentas
+
+# Menos hilos que conexiones en el pool, para que las llamadas síncronas
+# de la interfaz siempre encuentren una conexión libre
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="nailstock-async")
+
+class FachadaAsync:
+    """
+    Expone los métodos estáticos públicos de un modelo como corrutinas.
+
+    Cada llamada se ejecuta en un hilo del executor, así varias búsquedas o
+    reportes pueden avanzar a la vez sin bloquear el bucle de eventos.
+
+    Uso:
+        productos = await ProductoModelAsync.buscar_productos("tornillo")
+    """
+
+    def __init__(self, modelo):
+        self._modelo = modelo
+
+    def __getattr__(self, nombre):
+        if nombre.startswith("_"):
+            raise AttributeError(nombre)
+
+        metodo = getattr(self._modelo, nombre)
+
+        @functools.wraps(metodo)
+        async def llamada(*args, **kwargs):
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(_executor, functools.partial(metodo, *args, **kwargs))
+
+        # Guardar la corrutina para no volver a construirla
+        setattr(self, nombre, llamada)
+        return llamada
+
+
+ProductoModelAsync = FachadaAsync(ProductoModel)
+ClienteModelAsync = FachadaAsync(ClienteModel)
+ProveedorModelAsync = FachadaAsync(ProveedorModel)
+VentaModelAsync = FachadaAsync(VentaModel)
+KardexModelAsync = FachadaAsync(KardexModel)
+CodigoModelAsync = FachadaAsync(CodigoModel)
+ResumenVentasAsync = FachadaAsync(ResumenVentasModel)
+ResumenInventarioAsync = FachadaAsync(ResumenInventarioModel)
+ReportesAsync = FachadaAsync(Reportes)
+ImportacionAsync = FachadaAsync(ImportacionProductos)
+ArchivoAsync = FachadaAsync(ArchivoVentas)
@@ -1,74 +1,99 @@
-from ..database.db_connection import get_db_connection
+from ..database.db_connection import get_db_connection, get_db_writer
+from ..database.consultas import consultas
+from .paginacion import leer_pagina, clave_nombre, INICIO_NOMBRE, TAMANO_PAGINA
+from ..utils.busqueda import (normalizar, normalizar_telefono, palabras, terminos,
+                              LIMITE_RESULTADOS)
 
 class ClienteModel:
     @staticmethod
     def agregar_cliente(nombre, telefono, direccion, rfc):
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO clientes (nombre, telefono, direccion, rfc)
-            VALUES (?, ?, ?, ?)
-        ''', (nombre, telefono, direccion, rfc))
-        
-        cliente_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
-        
-        return cliente_id
+        return ClienteModel.encolar_cliente(nombre, telefono, direccion, rfc).result()
+    
+    @staticmethod
+    def encolar_cliente(nombre, telefono, direccion, rfc):
+        """Encola el alta en el escritor y devuelve un Future con el ID."""
+        return get_db_writer().enviar(
+            ClienteModel._agregar_cliente, nombre, telefono, direccion, rfc
+        )
+    
+    @staticmethod
+    def _agregar_cliente(conn, nombre, telefono, direccion, rfc):
+        cursor = consultas.ejecutar(conn, "clientes.insertar", (
+            nombre, telefono, direccion, rfc, normalizar_telefono(telefono), normalizar(rfc)
+        ))
+        ClienteModel._guardar_palabras(conn, cursor.lastrowid, nombre)
+        return cursor.lastrowid
     
     @staticmethod
     def obtener_clientes():
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT * FROM clientes ORDER BY nombre')
-        clientes = cursor.fetchall()
-        conn.close()
-        
-        return clientes
+        with get_db_connection() as conn:
+            return consultas.todos(conn, "clientes.listar")
+    
+    @staticmethod
+    def obtener_clientes_pagina(token=None, tamano=TAMANO_PAGINA):
+        """Página de clientes ordenados por nombre; ver models.paginacion."""
+        with get_db_connection() as conn:
+            return leer_pagina(conn, "clientes.pagina", (), token, INICIO_NOMBRE,
+                               clave_nombre, tamano)
+    
+    @staticmethod
+    def buscar_clientes(termino, limite=LIMITE_RESULTADOS):
+        """
+        Clientes cuyo nombre, teléfono o RFC coinciden con todas las palabras
+        de `termino` (por prefijo, sin distinguir mayúsculas ni acentos),
+        ordenados por nombre y limitados a `limite`.
+        """
+        with get_db_connection() as conn:
+            return consultas.todos(conn, "clientes.buscar", (terminos(termino), limite))
     
     @staticmethod
     def obtener_cliente_por_id(cliente_id):
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT * FROM clientes WHERE id = ?', (cliente_id,))
-        cliente = cursor.fetchone()
-        conn.close()
-        
-        return cliente
+        with get_db_connection() as conn:
+            return consultas.uno(conn, "clientes.por_id", (cliente_id,))
     
     @staticmethod
     def actualizar_cliente(cliente_id, nombre, telefono, direccion, rfc):
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            UPDATE clientes 
-            SET nombre = ?, telefono = ?, direccion = ?, rfc = ?
-            WHERE id = ?
-        ''', (nombre, telefono, direccion, rfc, cliente_id))
-        
-        conn.commit()
-        conn.close()
-        
+        return ClienteModel.encolar_actualizacion(
+            cliente_id, nombre, telefono, direccion, rfc
+        ).result()
+    
+    @staticmethod
+    def encolar_actualizacion(cliente_id, nombre, telefono, direccion, rfc):
+        return get_db_writer().enviar(
+            ClienteModel._actualizar_cliente, cliente_id, nombre, telefono, direccion, rfc
+        )
+    
+    @staticmethod
+    def _actualizar_cliente(conn, cliente_id, nombre, telefono, direccion, rfc):
+        consultas.ejecutar(conn, "clientes.actualizar", (
+            nombre, telefono, direccion, rfc, normalizar_telefono(telefono), normalizar(rfc),
+            cliente_id
+        ))
+        ClienteModel._guardar_palabras(conn, cliente_id, nombre)
         return True
     
+    @staticmethod
+    def _guardar_palabras(conn, cliente_id, nombre):
+        # Palabras del nombre para la búsqueda; las del registro anterior se reemplazan
+        consultas.ejecutar(conn, "busqueda.borrar_palabras", ('clientes', cliente_id))
+        consultas.ejecutar_muchos(conn, "busqueda.insertar_palabra",
+                                  [('clientes', palabra, cliente_id) for palabra in palabras(nombre)])
+    
     @staticmethod
     def eliminar_cliente(cliente_id):
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
+        return ClienteModel.encolar_eliminacion(cliente_id).result()
+    
+    @staticmethod
+    def encolar_eliminacion(cliente_id):
+        return get_db_writer().enviar(ClienteModel._eliminar_cliente, cliente_id)
+    
+    @staticmethod
+    def _eliminar_cliente(conn, cliente_id):
         # Verificar si hay ventas asociadas
-        cursor.execute('SELECT COUNT(*) FROM ventas WHERE cliente_id = ?', (cliente_id,))
-        count = cursor.fetchone()[0]
+        count = consultas.uno(conn, "clientes.contar_ventas", (cliente_id,))[0]
         
         if count > 0:
             raise Exception("No se puede eliminar el cliente porque tiene ventas asociadas")
         
-        cursor.execute('DELETE FROM clientes WHERE id = ?', (cliente_id,))
-        conn.commit()
-        conn.close()
-        
-        return True
\ No newline at end of file
+        consultas.ejecutar(conn, "clientes.eliminar", (cliente_id,))
+        return True
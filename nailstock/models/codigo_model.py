@@ -0,0 +1,124 @@
+import threading
+from ..database.db_connection import get_db_connection
+from ..database.consultas import consultas
+
+class CodigoModel:
+    """
+    Códigos de los productos para vender con el escáner.
+
+    Cada producto puede tener su código (productos.codigo, una pieza) y
+    códigos de barras por presentación (codigos_barras: la caja de 12 suma
+    12 piezas). La caja resuelve cada lectura del escáner con un mapa en
+    memoria código -> (producto_id, piezas) y después solo lee el producto
+    por su ID, para tener el precio vigente. El mapa se construye una vez y
+    ProductoModel lo mantiene al agregar, actualizar y eliminar productos;
+    un código que no está (lo dio de alta otra caja) se busca en la base y
+    se agrega.
+    """
+
+    _mapa = None           # código -> (producto_id, piezas)
+    _por_producto = {}     # producto_id -> [códigos]
+    _lock = threading.Lock()
+
+    @staticmethod
+    def producto_por_codigo(codigo):
+        """
+        Producto activo con ese código, como ProductoEscaneado (con las
+        piezas que trae la presentación), o None si no existe.
+        """
+        entrada = CodigoModel.cargar_codigos().get(codigo)
+        with get_db_connection() as conn:
+            if entrada is None:
+                entrada = consultas.uno(conn, "codigos.buscar", (codigo,))
+                if entrada is None:
+                    return None
+                with CodigoModel._lock:
+                    if CodigoModel._mapa is not None:
+                        CodigoModel._agregar(codigo, *entrada)
+            return consultas.uno(conn, "codigos.producto_venta", entrada)
+
+    @staticmethod
+    def cargar_codigos():
+        """Devuelve el mapa de códigos, construyéndolo si aún no existe."""
+        mapa = CodigoModel._mapa
+        if mapa is None:
+            with CodigoModel._lock:
+                if CodigoModel._mapa is None:
+                    with get_db_connection() as conn:
+                        filas = consultas.todos(conn, "codigos.listar")
+                    por_producto = {}
+                    for codigo, producto_id, _ in filas:
+                        por_producto.setdefault(producto_id, []).append(codigo)
+                    # Se publica ya completo: las lecturas no toman el lock
+                    CodigoModel._por_producto = por_producto
+                    CodigoModel._mapa = {codigo: (producto_id, piezas)
+                                         for codigo, producto_id, piezas in filas}
+                mapa = CodigoModel._mapa
+        return mapa
+
+    @staticmethod
+    def descartar_codigos():
+        """Cambios masivos (importación): el mapa se vuelve a construir al usarlo."""
+        with CodigoModel._lock:
+            CodigoModel._mapa = None
+            CodigoModel._por_producto = {}
+
+    @staticmethod
+    def obtener_codigos_barras(producto_id):
+        """Códigos por presentación del producto (sin su código de una pieza)."""
+        with get_db_connection() as conn:
+            return consultas.todos(conn, "codigos.por_producto", (producto_id,))
+
+    @staticmethod
+    def _validar_codigos(conn, producto_id, codigo, presentaciones):
+        """
+        Tarea del escritor, antes de guardar el producto: ningún código se
+        repite ni es de otro producto. producto_id es None si es nuevo.
+        """
+        codigos = [codigo] if codigo else []
+        codigos.extend(codigo_barras for codigo_barras, _ in presentaciones)
+        if len(set(codigos)) != len(codigos):
+            raise Exception("Hay códigos repetidos en el producto")
+
+        for codigo_revisar in codigos:
+            dueno = consultas.uno(conn, "codigos.dueno", (codigo_revisar,))
+            if dueno is not None and dueno[0] != producto_id:
+                raise Exception(f"El código {codigo_revisar} ya pertenece a: {dueno[1]}")
+
+    @staticmethod
+    def _insertar_presentaciones(conn, producto_id, presentaciones):
+        consultas.ejecutar_muchos(conn, "codigos.insertar", [
+            (codigo_barras, producto_id, piezas) for codigo_barras, piezas in presentaciones
+        ])
+
+    @staticmethod
+    def _leer_producto(conn, producto_id):
+        """Códigos del producto, leídos en la tarea del escritor que lo guarda."""
+        return consultas.todos(conn, "codigos.de_producto", (producto_id,))
+
+    @staticmethod
+    def _refrescar_producto(producto_id, filas):
+        """Reemplaza en el mapa los códigos del producto después de guardarlo."""
+        with CodigoModel._lock:
+            if CodigoModel._mapa is not None:
+                CodigoModel._quitar(producto_id)
+                for codigo, producto_id, piezas in filas:
+                    CodigoModel._agregar(codigo, producto_id, piezas)
+
+    @staticmethod
+    def _quitar_producto(producto_id):
+        with CodigoModel._lock:
+            if CodigoModel._mapa is not None:
+                CodigoModel._quitar(producto_id)
+
+    # Con el lock tomado
+
+    @staticmethod
+    def _agregar(codigo, producto_id, piezas):
+        CodigoModel._mapa[codigo] = (producto_id, piezas)
+        CodigoModel._por_producto.setdefault(producto_id, []).append(codigo)
+
+    @staticmethod
+    def _quitar(producto_id):
+        for codigo in CodigoModel._por_producto.pop(producto_id, ()):
+            CodigoModel._mapa.pop(codigo, None)
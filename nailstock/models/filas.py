@@ -0,0 +1,292 @@
+class Fila:
+    """
+    Base de las filas tipadas que devuelven las consultas.
+
+    Cada subclase declara en `__slots__` sus columnas, en el mismo orden en
+    que las selecciona su consulta; sin `__dict__` por instancia, una fila
+    ocupa bastante menos memoria que un sqlite3.Row o un diccionario.
+    Las consultas se asocian a su clase en database/consultas.py.
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def desde_fila(cls, cursor, fila):
+        """Usada como `row_factory` del cursor."""
+        return cls(*fila)
+
+    @classmethod
+    def campos(cls):
+        """Columnas de la fila, con las heredadas primero (cada clase declara solo las suyas)."""
+        return tuple(campo for clase in reversed(cls.__mro__)
+                     for campo in getattr(clase, "__slots__", ()))
+
+    def __repr__(self):
+        campos = ", ".join(f"{campo}={getattr(self, campo)!r}" for campo in self.campos())
+        return f"{type(self).__name__}({campos})"
+
+
+class ProductoResumen(Fila):
+    """Producto tal como se muestra en los listados y en el punto de venta."""
+
+    __slots__ = ("id", "nombre", "categoria", "precio_compra", "precio_venta",
+                 "stock", "stock_minimo", "unidad", "proveedor_nombre")
+
+    def __init__(self, id, nombre, categoria, precio_compra, precio_venta,
+                 stock, stock_minimo, unidad, proveedor_nombre):
+        self.id = id
+        self.nombre = nombre
+        self.categoria = categoria
+        self.precio_compra = precio_compra
+        self.precio_venta = precio_venta
+        self.stock = stock
+        self.stock_minimo = stock_minimo
+        self.unidad = unidad
+        self.proveedor_nombre = proveedor_nombre
+
+    @property
+    def stock_bajo(self):
+        # Mismo criterio que las alertas de stock: sin stock mínimo no hay alerta
+        return self.stock_minimo is not None and self.stock <= self.stock_minimo
+
+
+class ProductoEncontrado(ProductoResumen):
+    """
+    Resultado de la búsqueda de productos: el producto como en los listados
+    más el nombre con las coincidencias entre corchetes y un fragmento de la
+    descripción.
+    """
+
+    __slots__ = ("nombre_resaltado", "fragmento")
+
+    def __init__(self, id, nombre, categoria, precio_compra, precio_venta,
+                 stock, stock_minimo, unidad, proveedor_nombre, nombre_resaltado, fragmento):
+        super().__init__(id, nombre, categoria, precio_compra, precio_venta,
+                         stock, stock_minimo, unidad, proveedor_nombre)
+        self.nombre_resaltado = nombre_resaltado
+        self.fragmento = fragmento
+
+
+class Producto(Fila):
+    """Producto completo, para el formulario de edición."""
+
+    __slots__ = ("id", "codigo", "nombre", "descripcion", "categoria", "precio_compra",
+                 "precio_venta", "stock", "stock_minimo", "unidad", "proveedor_id",
+                 "proveedor_nombre")
+
+    def __init__(self, id, codigo, nombre, descripcion, categoria, precio_compra, precio_venta,
+                 stock, stock_minimo, unidad, proveedor_id, proveedor_nombre):
+        self.id = id
+        self.codigo = codigo
+        self.nombre = nombre
+        self.descripcion = descripcion
+        self.categoria = categoria
+        self.precio_compra = precio_compra
+        self.precio_venta = precio_venta
+        self.stock = stock
+        self.stock_minimo = stock_minimo
+        self.unidad = unidad
+        self.proveedor_id = proveedor_id
+        self.proveedor_nombre = proveedor_nombre
+
+
+class Cliente(Fila):
+    __slots__ = ("id", "nombre", "telefono", "direccion", "rfc")
+
+    def __init__(self, id, nombre, telefono, direccion, rfc):
+        self.id = id
+        self.nombre = nombre
+        self.telefono = telefono
+        self.direccion = direccion
+        self.rfc = rfc
+
+
+class Proveedor(Fila):
+    __slots__ = ("id", "nombre", "telefono", "direccion", "correo", "rfc", "observaciones")
+
+    def __init__(self, id, nombre, telefono, direccion, correo, rfc, observaciones):
+        self.id = id
+        self.nombre = nombre
+        self.telefono = telefono
+        self.direccion = direccion
+        self.correo = correo
+        self.rfc = rfc
+        self.observaciones = observaciones
+
+
+class Venta(Fila):
+    __slots__ = ("id", "cliente_id", "cliente_nombre", "total", "fecha_venta")
+
+    def __init__(self, id, cliente_id, cliente_nombre, total, fecha_venta):
+        self.id = id
+        self.cliente_id = cliente_id
+        self.cliente_nombre = cliente_nombre
+        self.total = total
+        self.fecha_venta = fecha_venta
+
+
+class DetalleVenta(Fila):
+    __slots__ = ("producto_id", "producto_nombre", "unidad", "cantidad",
+                 "precio_unitario", "subtotal")
+
+    def __init__(self, producto_id, producto_nombre, unidad, cantidad,
+                 precio_unitario, subtotal):
+        self.producto_id = producto_id
+        self.producto_nombre = producto_nombre
+        self.unidad = unidad
+        self.cantidad = cantidad
+        self.precio_unitario = precio_unitario
+        self.subtotal = subtotal
+
+
+class ProductoStock(Fila):
+    """Fila de los reportes de stock bajo y sin stock."""
+
+    __slots__ = ("nombre", "stock", "stock_minimo", "unidad")
+
+    def __init__(self, nombre, stock, stock_minimo, unidad):
+        self.nombre = nombre
+        self.stock = stock
+        self.stock_minimo = stock_minimo
+        self.unidad = unidad
+
+
+class ProductoVendido(Fila):
+    """Fila del reporte de productos más vendidos."""
+
+    __slots__ = ("nombre", "total_vendido", "ingresos")
+
+    def __init__(self, nombre, total_vendido, ingresos):
+        self.nombre = nombre
+        self.total_vendido = total_vendido
+        self.ingresos = ingresos
+
+
+class AjusteMasivo(Fila):
+    __slots__ = ("id", "tipo", "valor", "categoria", "proveedor_id",
+                 "productos_afectados", "revertido", "fecha")
+
+    def __init__(self, id, tipo, valor, categoria, proveedor_id,
+                 productos_afectados, revertido, fecha):
+        self.id = id
+        self.tipo = tipo
+        self.valor = valor
+        self.categoria = categoria
+        self.proveedor_id = proveedor_id
+        self.productos_afectados = productos_afectados
+        self.revertido = revertido
+        self.fecha = fecha
+
+
+class ProductoDisponible(Fila):
+    """Producto en el punto de venta, con el stock que no está reservado."""
+
+    __slots__ = ("id", "nombre", "precio_venta", "stock", "disponible")
+
+    def __init__(self, id, nombre, precio_venta, stock, disponible):
+        self.id = id
+        self.nombre = nombre
+        self.precio_venta = precio_venta
+        self.stock = stock
+        self.disponible = disponible
+
+
+class CodigoBarras(Fila):
+    """Código de barras de una presentación del producto y las piezas que trae."""
+
+    __slots__ = ("codigo", "cantidad")
+
+    def __init__(self, codigo, cantidad):
+        self.codigo = codigo
+        self.cantidad = cantidad
+
+
+class ProductoEscaneado(Fila):
+    """Producto leído con el escáner en la caja, con las piezas que trae el código."""
+
+    __slots__ = ("id", "nombre", "precio_venta", "cantidad")
+
+    def __init__(self, id, nombre, precio_venta, cantidad):
+        self.id = id
+        self.nombre = nombre
+        self.precio_venta = precio_venta
+        self.cantidad = cantidad
+
+
+class Movimiento(Fila):
+    """Movimiento del kardex con el saldo que dejó."""
+
+    __slots__ = ("id", "tipo", "cantidad", "referencia", "nota", "fecha", "saldo")
+
+    def __init__(self, id, tipo, cantidad, referencia, nota, fecha, saldo):
+        self.id = id
+        self.tipo = tipo
+        self.cantidad = cantidad
+        self.referencia = referencia
+        self.nota = nota
+        self.fecha = fecha
+        self.saldo = saldo
+
+
+class StockKardex(Fila):
+    """Stock de un producto en la tabla frente al que resulta del kardex."""
+
+    __slots__ = ("id", "nombre", "stock", "stock_kardex")
+
+    def __init__(self, id, nombre, stock, stock_kardex):
+        self.id = id
+        self.nombre = nombre
+        self.stock = stock
+        self.stock_kardex = stock_kardex
+
+    @property
+    def diferencia(self):
+        return self.stock - self.stock_kardex
+
+
+class DiaVentasDiferente(Fila):
+    """Día en que el resumen diario de ventas no coincide con las ventas."""
+
+    __slots__ = ("dia", "ventas", "total", "minimo", "maximo",
+                 "ventas_resumen", "total_resumen", "minimo_resumen", "maximo_resumen")
+
+    def __init__(self, dia, ventas, total, minimo, maximo,
+                 ventas_resumen, total_resumen, minimo_resumen, maximo_resumen):
+        self.dia = dia
+        self.ventas = ventas
+        self.total = total
+        self.minimo = minimo
+        self.maximo = maximo
+        self.ventas_resumen = ventas_resumen
+        self.total_resumen = total_resumen
+        self.minimo_resumen = minimo_resumen
+        self.maximo_resumen = maximo_resumen
+
+
+class InventarioCategoria(Fila):
+    """Valor del inventario y conteos de stock de una categoría ('' = sin categoría)."""
+
+    __slots__ = ("categoria", "productos", "valor", "stock_bajo", "sin_stock")
+
+    def __init__(self, categoria, productos, valor, stock_bajo, sin_stock):
+        self.categoria = categoria
+        self.productos = productos
+        self.valor = valor
+        self.stock_bajo = stock_bajo
+        self.sin_stock = sin_stock
+
+
+class AlertaStock(Fila):
+    """Alerta abierta de stock bajo, con el stock actual del producto."""
+
+    __slots__ = ("id", "producto_id", "nombre", "stock", "stock_minimo", "unidad", "fecha", "vista")
+
+    def __init__(self, id, producto_id, nombre, stock, stock_minimo, unidad, fecha, vista):
+        self.id = id
+        self.producto_id = producto_id
+        self.nombre = nombre
+        self.stock = stock
+        self.stock_minimo = stock_minimo
+        self.unidad = unidad
+        self.fecha = fecha
+        self.vista = vista
@@ -0,0 +1,167 @@
+from datetime import date, timedelta
+from ..database.db_connection import get_db_connection, get_db_writer
+from ..database.consultas import consultas
+
+# Límites abiertos para las consultas de stock según el kardex
+_SIN_LIMITE_ID = 2 ** 63 - 1
+_SIN_LIMITE_FECHA = "9999-12-31"
+
+class KardexModel:
+    """
+    Kardex: bitácora de solo inserción de los movimientos de stock.
+
+    - Las ventas, la edición de productos, la importación, los ajustes
+      masivos y las entradas de mercancía anotan su movimiento en la misma
+      transacción en que cambian `productos.stock`; el alta de productos y
+      la eliminación de ventas los anotan sus triggers.
+    - Las fotos periódicas (snapshots_stock) guardan el stock de cada
+      producto según el kardex, así el stock en una fecha se calcula con la
+      foto anterior más los movimientos posteriores, sin recorrer todo el
+      historial.
+    - `conciliar()` compara en una sola consulta `productos.stock` con el
+      kardex para encontrar diferencias.
+    """
+
+    # tipo -> descripción
+    TIPOS = {
+        'inicial': "Stock inicial",
+        'venta': "Venta",
+        'devolucion': "Devolución (venta eliminada)",
+        'entrada': "Entrada de mercancía",
+        'ajuste': "Ajuste manual",
+        'ajuste_masivo': "Ajuste masivo",
+        'importacion': "Importación",
+        'conciliacion': "Conciliación",
+    }
+
+    # Días entre fotos automáticas
+    DIAS_ENTRE_SNAPSHOTS = 7
+
+    @staticmethod
+    def registrar_entrada(producto_id, cantidad, nota=None):
+        """Entrada de mercancía (compra a proveedor): suma stock y lo anota."""
+        return KardexModel.encolar_entrada(producto_id, cantidad, nota).result()
+
+    @staticmethod
+    def encolar_entrada(producto_id, cantidad, nota=None):
+        if cantidad <= 0:
+            raise Exception("La cantidad debe ser mayor a cero")
+        return get_db_writer().enviar(KardexModel._registrar_entrada, producto_id,
+                                      int(cantidad), nota)
+
+    @staticmethod
+    def _registrar_entrada(conn, producto_id, cantidad, nota):
+        if consultas.ejecutar(conn, "kardex.sumar_stock", (cantidad, producto_id)).rowcount == 0:
+            raise Exception("El producto no existe o está inactivo")
+        consultas.ejecutar(conn, "kardex.insertar", (producto_id, 'entrada', cantidad, None, nota))
+        return True
+
+    @staticmethod
+    def obtener_movimientos(producto_id, limite=100):
+        """Últimos movimientos de un producto, del más reciente al más antiguo, con su saldo."""
+        with get_db_connection() as conn:
+            saldo = KardexModel._stock_producto(conn, producto_id, _SIN_LIMITE_FECHA)
+            return consultas.todos(conn, "kardex.movimientos_producto",
+                                   (saldo, producto_id, limite))
+
+    @staticmethod
+    def stock_en_fecha(producto_id, fecha):
+        """
+        Stock de un producto al cierre del día `fecha` ('YYYY-MM-DD').
+
+        :return: La cantidad, o None si la fecha es anterior al inicio del kardex.
+        """
+        with get_db_connection() as conn:
+            return KardexModel._stock_producto(conn, producto_id, KardexModel._dia_siguiente(fecha))
+
+    @staticmethod
+    def stock_en_fecha_todos(fecha):
+        """
+        Stock de todos los productos al cierre del día `fecha`: lista de
+        StockKardex (stock_kardex es el de esa fecha), o None si la fecha es
+        anterior al inicio del kardex.
+        """
+        limite = KardexModel._dia_siguiente(fecha)
+        with get_db_connection() as conn:
+            snapshot = consultas.uno(conn, "kardex.snapshot_a_fecha", (limite,))
+            if snapshot is None:
+                return None
+            return consultas.todos(conn, "kardex.stock_a_fecha",
+                                   (snapshot[0], snapshot[2], _SIN_LIMITE_ID, limite))
+
+    @staticmethod
+    def _stock_producto(conn, producto_id, limite):
+        snapshot = consultas.uno(conn, "kardex.snapshot_a_fecha", (limite,))
+        if snapshot is None:
+            return None
+        return consultas.uno(conn, "kardex.stock_producto",
+                             (snapshot[0], snapshot[2], producto_id, limite))[0]
+
+    @staticmethod
+    def _dia_siguiente(fecha):
+        return (date.fromisoformat(fecha) + timedelta(days=1)).isoformat()
+
+    @staticmethod
+    def conciliar():
+        """Productos cuyo `stock` no coincide con el kardex (lista de StockKardex)."""
+        with get_db_connection() as conn:
+            snapshot = consultas.uno(conn, "kardex.ultimo_snapshot")
+            return consultas.todos(conn, "kardex.conciliar",
+                                   (snapshot[0], snapshot[2], _SIN_LIMITE_ID, _SIN_LIMITE_FECHA))
+
+    @staticmethod
+    def corregir_diferencias(nota="Conciliación"):
+        """
+        Anota un movimiento de conciliación por cada diferencia, para que el
+        kardex explique el stock actual. No modifica `productos.stock`.
+
+        :return: Número de productos corregidos.
+        """
+        return get_db_writer().ejecutar(KardexModel._corregir_diferencias, nota)
+
+    @staticmethod
+    def _corregir_diferencias(conn, nota):
+        snapshot = consultas.uno(conn, "kardex.ultimo_snapshot")
+        return consultas.ejecutar(conn, "kardex.corregir", (
+            snapshot[0], snapshot[2], _SIN_LIMITE_ID, _SIN_LIMITE_FECHA, nota
+        )).rowcount
+
+    @staticmethod
+    def tomar_snapshot():
+        """Guarda una foto del stock según el kardex. Devuelve su ID."""
+        return get_db_writer().ejecutar(KardexModel._tomar_snapshot)
+
+    @staticmethod
+    def tomar_snapshot_si_hace_falta():
+        """Toma una foto si la última tiene más de DIAS_ENTRE_SNAPSHOTS días."""
+        with get_db_connection() as conn:
+            dias = consultas.uno(conn, "kardex.dias_desde_snapshot")[0]
+        if dias < KardexModel.DIAS_ENTRE_SNAPSHOTS:
+            return None
+        return KardexModel.tomar_snapshot()
+
+    @staticmethod
+    def _tomar_snapshot(conn):
+        anterior = consultas.uno(conn, "kardex.ultimo_snapshot")
+        ultimo_movimiento = consultas.uno(conn, "kardex.ultimo_movimiento")[0]
+        snapshot_id = consultas.ejecutar(conn, "kardex.insertar_snapshot",
+                                         (ultimo_movimiento,)).lastrowid
+        consultas.ejecutar(conn, "kardex.snapshot_detalle", (
+            anterior[0], anterior[2], ultimo_movimiento, _SIN_LIMITE_FECHA, snapshot_id
+        ))
+        return snapshot_id
+
+    # Para las escrituras que cambian el stock de varios productos con una
+    # sola sentencia: guardar el stock previo, aplicar el cambio y anotar
+    # la diferencia real de cada producto. Se llaman dentro de la tarea del
+    # escritor que hace el cambio.
+
+    @staticmethod
+    def _guardar_stock_previo(conn, nombre_consulta, params=()):
+        consultas.ejecutar(conn, "kardex.crear_previo")
+        consultas.ejecutar(conn, nombre_consulta, params)
+
+    @staticmethod
+    def _registrar_diferencias(conn, tipo, referencia=None, nota=None):
+        consultas.ejecutar(conn, "kardex.registrar_diferencias", (tipo, referencia, nota))
+        consultas.ejecutar(conn, "kardex.limpiar_previo")
@@ -0,0 +1,72 @@
+import base64
+import json
+from ..database.consultas import consultas
+
+# Clave inicial de cada recorrido: antes de cualquier nombre, o después de
+# cualquier fecha para las ventas (que se listan de la más reciente a la
+# más antigua)
+INICIO_NOMBRE = ("", 0)
+INICIO_FECHA = ("9999-12-31", 0)
+
+TAMANO_PAGINA = 100
+
+
+class Pagina:
+    """
+    Una página de resultados y el token para pedir la siguiente.
+
+    `siguiente` es None en la última página. El token es opaco para quien
+    lo recibe: solo hay que devolverlo tal cual al pedir la página siguiente.
+    """
+
+    __slots__ = ("filas", "siguiente")
+
+    def __init__(self, filas, siguiente):
+        self.filas = filas
+        self.siguiente = siguiente
+
+    def __iter__(self):
+        return iter(self.filas)
+
+    def __len__(self):
+        return len(self.filas)
+
+
+def codificar_token(clave):
+    return base64.urlsafe_b64encode(json.dumps(clave).encode()).decode().rstrip("=")
+
+def decodificar_token(token):
+    try:
+        relleno = "=" * (-len(token) % 4)
+        clave = json.loads(base64.urlsafe_b64decode(token + relleno))
+    except (ValueError, TypeError):
+        raise Exception("Token de paginación inválido")
+    if not isinstance(clave, list) or len(clave) != 2:
+        raise Exception("Token de paginación inválido")
+    return tuple(clave)
+
+def leer_pagina(conn, nombre_consulta, params, token, inicio, clave, tamano=TAMANO_PAGINA):
+    """
+    Lee una página con una consulta de paginación por clave.
+
+    :param params: Parámetros de la consulta anteriores a la clave (filtros).
+    :param token: Token de la página anterior, o None para la primera.
+    :param inicio: Clave inicial para la primera página.
+    :param clave: Función fila -> clave (valores de las columnas de orden).
+    """
+    desde = decodificar_token(token) if token else inicio
+
+    # Se pide una fila de más para saber si hay otra página sin un COUNT(*)
+    filas = consultas.todos(conn, nombre_consulta, (*params, *desde, tamano + 1))
+
+    siguiente = None
+    if len(filas) > tamano:
+        filas.pop()
+        siguiente = codificar_token(clave(filas[-1]))
+    return Pagina(filas, siguiente)
+
+def clave_nombre(fila):
+    return [fila.nombre, fila.id]
+
+def clave_fecha(fila):
+    return [fila.fecha_venta, fila.id]
@@ -1,111 +1,261 @@
-from ..database.db_connection import get_db_connection
+import json
+import threading
+from concurrent.futures import Future
+from ..database.db_connection import get_db_connection, get_db_writer
+from ..database.consultas import consultas
+from .kardex_model import KardexModel
+from .codigo_model import CodigoModel
+from .paginacion import leer_pagina, clave_nombre, INICIO_NOMBRE, TAMANO_PAGINA
+from ..utils.busqueda import consulta_fts, LIMITE_RESULTADOS
+from ..utils.trigramas import IndiceTrigramas
 
 class ProductoModel:
     @staticmethod
     def agregar_producto(nombre, descripcion, categoria, precio_compra, precio_venta, 
-                        stock, stock_minimo, unidad, proveedor_id):
-        conn = get_db_connection()
-        cursor = conn.cursor()
+                        stock, stock_minimo, unidad, proveedor_id, codigo=None,
+                        presentaciones=()):
+        """
+        :param codigo: código de una pieza (SKU o código de barras), opcional.
+        :param presentaciones: [(código de barras, piezas)] de las demás
+                               presentaciones (caja, bolsa...).
+        """
+        return ProductoModel.encolar_producto(
+            nombre, descripcion, categoria, precio_compra, precio_venta,
+            stock, stock_minimo, unidad, proveedor_id, codigo, presentaciones
+        ).result()
+    
+    @staticmethod
+    def encolar_producto(nombre, descripcion, categoria, precio_compra, precio_venta,
+                         stock, stock_minimo, unidad, proveedor_id, codigo=None,
+                         presentaciones=()):
+        """Encola el alta en el escritor y devuelve un Future con el ID."""
+        future = get_db_writer().enviar(
+            ProductoModel._agregar_producto,
+            nombre, descripcion, categoria, precio_compra, precio_venta,
+            stock, stock_minimo, unidad, proveedor_id, codigo, presentaciones
+        )
         
-        try:
-            cursor.execute('''
-                INSERT INTO productos (nombre, descripcion, categoria, precio_compra, 
-                                     precio_venta, stock, stock_minimo, unidad, proveedor_id)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (nombre, descripcion, categoria, precio_compra, precio_venta, 
-                  stock, stock_minimo, unidad, proveedor_id))
-            
-            producto_id = cursor.lastrowid
-            conn.commit()
+        def guardado(resultado):
+            producto_id, codigos = resultado
+            ProductoModel._actualizar_indice_nombres(IndiceTrigramas.agregar, producto_id, nombre)
+            CodigoModel._refrescar_producto(producto_id, codigos)
             return producto_id
-        finally:
-            conn.close()
+        
+        return ProductoModel._despues(future, guardado)
+    
+    @staticmethod
+    def _agregar_producto(conn, nombre, descripcion, categoria, precio_compra, precio_venta,
+                          stock, stock_minimo, unidad, proveedor_id, codigo=None,
+                          presentaciones=()):
+        CodigoModel._validar_codigos(conn, None, codigo, presentaciones)
+        cursor = consultas.ejecutar(conn, "productos.insertar", (
+            nombre, descripcion, categoria, precio_compra, precio_venta,
+            stock, stock_minimo, unidad, proveedor_id, codigo
+        ))
+        CodigoModel._insertar_presentaciones(conn, cursor.lastrowid, presentaciones)
+        return cursor.lastrowid, CodigoModel._leer_producto(conn, cursor.lastrowid)
     
     @staticmethod
     def obtener_productos(activo=True):
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        try:
-            cursor.execute('''
-                SELECT p.*, pr.nombre as proveedor_nombre 
-                FROM productos p 
-                LEFT JOIN proveedores pr ON p.proveedor_id = pr.id 
-                WHERE p.activo = ?
-                ORDER BY p.nombre
-            ''', (activo,))
-            
-            productos = cursor.fetchall()
-            return productos
-        finally:
-            conn.close()
+        with get_db_connection() as conn:
+            if activo:
+                return consultas.todos(conn, "productos.listar_activos")
+            return consultas.todos(conn, "productos.listar_inactivos")
+    
+    @staticmethod
+    def obtener_productos_pagina(token=None, tamano=TAMANO_PAGINA, activo=True, categoria=None):
+        """Página de productos ordenados por nombre; ver models.paginacion."""
+        with get_db_connection() as conn:
+            if categoria:
+                return leer_pagina(conn, "productos.pagina_categoria", (categoria,),
+                                   token, INICIO_NOMBRE, clave_nombre, tamano)
+            nombre = "productos.pagina_activos" if activo else "productos.pagina_inactivos"
+            return leer_pagina(conn, nombre, (), token, INICIO_NOMBRE, clave_nombre, tamano)
+    
+    @staticmethod
+    def obtener_categorias():
+        with get_db_connection() as conn:
+            return [fila[0] for fila in consultas.todos(conn, "productos.categorias")]
     
     @staticmethod
     def obtener_producto_por_id(producto_id):
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        try:
-            cursor.execute('''
-                SELECT p.*, pr.nombre as proveedor_nombre 
-                FROM productos p 
-                LEFT JOIN proveedores pr ON p.proveedor_id = pr.id 
-                WHERE p.id = ?
-            ''', (producto_id,))
-            
-            producto = cursor.fetchone()
-            return producto
-        finally:
-            conn.close()
+        with get_db_connection() as conn:
+            return consultas.uno(conn, "productos.por_id", (producto_id,))
     
     @staticmethod
     def actualizar_producto(producto_id, nombre, descripcion, categoria, precio_compra, 
-                           precio_venta, stock, stock_minimo, unidad, proveedor_id):
-        conn = get_db_connection()
-        cursor = conn.cursor()
+                           precio_venta, stock, stock_minimo, unidad, proveedor_id, codigo=None,
+                           presentaciones=()):
+        """Reemplaza también el código y las presentaciones (ver agregar_producto)."""
+        return ProductoModel.encolar_actualizacion(
+            producto_id, nombre, descripcion, categoria, precio_compra, precio_venta,
+            stock, stock_minimo, unidad, proveedor_id, codigo, presentaciones
+        ).result()
+    
+    @staticmethod
+    def encolar_actualizacion(producto_id, nombre, descripcion, categoria, precio_compra,
+                              precio_venta, stock, stock_minimo, unidad, proveedor_id,
+                              codigo=None, presentaciones=()):
+        future = get_db_writer().enviar(
+            ProductoModel._actualizar_producto,
+            producto_id, nombre, descripcion, categoria, precio_compra, precio_venta,
+            stock, stock_minimo, unidad, proveedor_id, codigo, presentaciones
+        )
         
-        try:
-            cursor.execute('''
-                UPDATE productos 
-                SET nombre = ?, descripcion = ?, categoria = ?, precio_compra = ?,
-                    precio_venta = ?, stock = ?, stock_minimo = ?, unidad = ?, proveedor_id = ?
-                WHERE id = ?
-            ''', (nombre, descripcion, categoria, precio_compra, precio_venta,
-                  stock, stock_minimo, unidad, proveedor_id, producto_id))
-            
-            conn.commit()
+        def guardado(codigos):
+            ProductoModel._actualizar_indice_nombres(IndiceTrigramas.renombrar, producto_id, nombre)
+            CodigoModel._refrescar_producto(producto_id, codigos)
             return True
-        finally:
-            conn.close()
+        
+        return ProductoModel._despues(future, guardado)
+    
+    @staticmethod
+    def _actualizar_producto(conn, producto_id, nombre, descripcion, categoria, precio_compra,
+                             precio_venta, stock, stock_minimo, unidad, proveedor_id, codigo=None,
+                             presentaciones=()):
+        CodigoModel._validar_codigos(conn, producto_id, codigo, presentaciones)
+        # Las presentaciones anteriores se borran antes: un código puede
+        # pasar de una presentación al código del producto
+        consultas.ejecutar(conn, "codigos.borrar_producto", (producto_id,))
+        
+        # Un cambio de stock desde el formulario queda en el kardex como ajuste
+        KardexModel._guardar_stock_previo(conn, "kardex.previo_producto", (producto_id,))
+        consultas.ejecutar(conn, "productos.actualizar", (
+            nombre, descripcion, categoria, precio_compra, precio_venta,
+            stock, stock_minimo, unidad, proveedor_id, codigo, producto_id
+        ))
+        KardexModel._registrar_diferencias(conn, 'ajuste')
+        
+        CodigoModel._insertar_presentaciones(conn, producto_id, presentaciones)
+        return CodigoModel._leer_producto(conn, producto_id)
     
     @staticmethod
     def eliminar_producto(producto_id):
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        return ProductoModel.encolar_eliminacion(producto_id).result()
+    
+    @staticmethod
+    def encolar_eliminacion(producto_id):
+        future = get_db_writer().enviar(ProductoModel._eliminar_producto, producto_id)
         
-        try:
-            # Inactivo, no se elimna realmente .
-            cursor.execute('UPDATE productos SET activo = 0 WHERE id = ?', (producto_id,))
-            conn.commit()
-            return True
-        finally:
-            conn.close()
+        def eliminado(resultado):
+            ProductoModel._actualizar_indice_nombres(IndiceTrigramas.quitar, producto_id)
+            CodigoModel._quitar_producto(producto_id)
+            return resultado
+        
+        return ProductoModel._despues(future, eliminado)
     
     @staticmethod
-    def buscar_productos(termino):
-        conn = get_db_connection()
-        cursor = conn.cursor()
+    def _despues(future, funcion):
+        """
+        Future con el resultado de `funcion(resultado de future)`. Mantiene
+        el índice de nombres y el mapa de códigos después del commit, en el
+        hilo del escritor (sin leer la base), y avisa cuando ya están al día.
+        """
+        siguiente = Future()
+        
+        def terminar(future):
+            try:
+                siguiente.set_result(funcion(future.result()))
+            except Exception as e:
+                siguiente.set_exception(e)
         
-        try:
-            cursor.execute('''
-                SELECT p.*, pr.nombre as proveedor_nombre 
-                FROM productos p 
-                LEFT JOIN proveedores pr ON p.proveedor_id = pr.id 
-                WHERE p.activo = 1 AND (p.nombre LIKE ? OR p.descripcion LIKE ?)
-                ORDER BY p.nombre
-            ''', (f'%{termino}%', f'%{termino}%'))
-            
-            productos = cursor.fetchall()
+        future.add_done_callback(terminar)
+        return siguiente
+    
+    @staticmethod
+    def _eliminar_producto(conn, producto_id):
+        # Inactivo, no se elimna realmente .
+        consultas.ejecutar(conn, "productos.desactivar", (producto_id,))
+        return True
+    
+    @staticmethod
+    def buscar_productos(termino, limite=LIMITE_RESULTADOS):
+        """
+        Productos activos que contienen todas las palabras de `termino` en el
+        nombre, la descripción o la categoría (cada palabra como prefijo:
+        "tor 3/8" encuentra "Tornillo 3/8"), de la más a la menos relevante.
+        Devuelve filas ProductoEncontrado.
+
+        Con FTS5 usa el índice productos_fts; si este SQLite no lo tiene,
+        recurre a LIKE (orden alfabético, sin ranking). Si ninguna palabra
+        coincide, devuelve los nombres parecidos (buscar_parecidos), para
+        que "dezarmador" encuentre "Desarmador".
+        """
+        expresion = consulta_fts(termino)
+        if expresion is None:
+            return []
+        with get_db_connection() as conn:
+            if ProductoModel._hay_indice_texto(conn):
+                productos = consultas.todos(conn, "productos.buscar_fts", (expresion, limite))
+            else:
+                productos = consultas.todos(conn, "productos.buscar",
+                                            (json.dumps(termino.split()), limite))
+        if productos:
             return productos
-        finally:
-            conn.close()
\ No newline at end of file
+
+        # Fuera de la conexión anterior: la primera vez construye el índice
+        parecidos = ProductoModel.buscar_parecidos(termino, limite)
+        if not parecidos:
+            return []
+        with get_db_connection() as conn:
+            return consultas.todos(conn, "productos.por_ids",
+                                   (json.dumps([producto_id for producto_id, _ in parecidos]),))
+    
+    @staticmethod
+    def buscar_parecidos(termino, limite=LIMITE_RESULTADOS):
+        """
+        Productos activos con el nombre parecido a `termino` aunque esté mal
+        escrito, según el índice de trigramas en memoria: lista de
+        (producto_id, similitud), del más al menos parecido. No consulta la
+        base salvo para construir el índice la primera vez.
+        """
+        return ProductoModel.cargar_indice_nombres().buscar(termino, limite)
+    
+    # Índice de trigramas de los nombres de productos activos. Se construye
+    # una vez (al abrir la ventana principal o en la primera búsqueda) y
+    # después lo mantienen agregar, actualizar y eliminar producto
+    _indice_nombres = None
+    _lock_indice_nombres = threading.Lock()
+    
+    @staticmethod
+    def cargar_indice_nombres():
+        """Devuelve el índice de nombres, construyéndolo si aún no existe."""
+        if ProductoModel._indice_nombres is None:
+            with ProductoModel._lock_indice_nombres:
+                if ProductoModel._indice_nombres is None:
+                    indice = IndiceTrigramas()
+                    indice.cargar((p.id, p.nombre) for p in ProductoModel.obtener_productos())
+                    ProductoModel._indice_nombres = indice
+        return ProductoModel._indice_nombres
+    
+    @staticmethod
+    def sincronizar_indice_nombres(productos):
+        """
+        Pone al día el índice, si ya existe, con (id, nombre) recién leídos
+        de la base: los productos que otra terminal agregó o renombró
+        aparecen en las búsquedas sin reconstruirlo.
+        """
+        ProductoModel._actualizar_indice_nombres(IndiceTrigramas.sincronizar, productos)
+    
+    @staticmethod
+    def descartar_indice_nombres():
+        """Cambios masivos (importación): el índice se vuelve a construir al usarlo."""
+        with ProductoModel._lock_indice_nombres:
+            ProductoModel._indice_nombres = None
+    
+    @staticmethod
+    def _actualizar_indice_nombres(operacion, *args):
+        # Con el lock de construcción: si el índice se está cargando, el
+        # cambio se aplica después y no se pierde
+        with ProductoModel._lock_indice_nombres:
+            if ProductoModel._indice_nombres is not None:
+                operacion(ProductoModel._indice_nombres, *args)
+    
+    # None hasta la primera búsqueda; el índice lo crea (o no) la migración
+    _indice_texto = None
+    
+    @staticmethod
+    def _hay_indice_texto(conn):
+        if ProductoModel._indice_texto is None:
+            ProductoModel._indice_texto = consultas.uno(conn, "productos.hay_fts") is not None
+        return ProductoModel._indice_texto
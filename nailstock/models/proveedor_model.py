@@ -1,74 +1,108 @@
-from ..database.db_connection import get_db_connection
+from ..database.db_connection import get_db_connection, get_db_writer
+from ..database.consultas import consultas
+from .paginacion import leer_pagina, clave_nombre, INICIO_NOMBRE, TAMANO_PAGINA
+from ..utils.busqueda import (normalizar, normalizar_telefono, palabras, terminos,
+                              LIMITE_RESULTADOS)
 
 class ProveedorModel:
     @staticmethod
     def agregar_proveedor(nombre, telefono, direccion, correo, rfc, observaciones):
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO proveedores (nombre, telefono, direccion, correo, rfc, observaciones)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (nombre, telefono, direccion, correo, rfc, observaciones))
-        
-        proveedor_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
-        
-        return proveedor_id
+        return ProveedorModel.encolar_proveedor(
+            nombre, telefono, direccion, correo, rfc, observaciones
+        ).result()
+    
+    @staticmethod
+    def encolar_proveedor(nombre, telefono, direccion, correo, rfc, observaciones):
+        """Encola el alta en el escritor y devuelve un Future con el ID."""
+        return get_db_writer().enviar(
+            ProveedorModel._agregar_proveedor,
+            nombre, telefono, direccion, correo, rfc, observaciones
+        )
+    
+    @staticmethod
+    def _agregar_proveedor(conn, nombre, telefono, direccion, correo, rfc, observaciones):
+        cursor = consultas.ejecutar(conn, "proveedores.insertar", (
+            nombre, telefono, direccion, correo, rfc, observaciones,
+            normalizar_telefono(telefono), normalizar(rfc), normalizar(correo)
+        ))
+        ProveedorModel._guardar_palabras(conn, cursor.lastrowid, nombre, correo)
+        return cursor.lastrowid
     
     @staticmethod
     def obtener_proveedores():
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT * FROM proveedores ORDER BY nombre')
-        proveedores = cursor.fetchall()
-        conn.close()
-        
-        return proveedores
+        with get_db_connection() as conn:
+            return consultas.todos(conn, "proveedores.listar")
+    
+    @staticmethod
+    def obtener_proveedores_pagina(token=None, tamano=TAMANO_PAGINA):
+        """Página de proveedores ordenados por nombre; ver models.paginacion."""
+        with get_db_connection() as conn:
+            return leer_pagina(conn, "proveedores.pagina", (), token, INICIO_NOMBRE,
+                               clave_nombre, tamano)
+    
+    @staticmethod
+    def buscar_proveedores(termino, limite=LIMITE_RESULTADOS):
+        """
+        Proveedores cuyo nombre, teléfono, correo o RFC coinciden con todas
+        las palabras de `termino` (por prefijo, sin distinguir mayúsculas ni
+        acentos), ordenados por nombre y limitados a `limite`.
+        """
+        with get_db_connection() as conn:
+            return consultas.todos(conn, "proveedores.buscar", (terminos(termino), limite))
     
     @staticmethod
     def obtener_proveedor_por_id(proveedor_id):
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT * FROM proveedores WHERE id = ?', (proveedor_id,))
-        proveedor = cursor.fetchone()
-        conn.close()
-        
-        return proveedor
+        with get_db_connection() as conn:
+            return consultas.uno(conn, "proveedores.por_id", (proveedor_id,))
     
     @staticmethod
     def actualizar_proveedor(proveedor_id, nombre, telefono, direccion, correo, rfc, observaciones):
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            UPDATE proveedores 
-            SET nombre = ?, telefono = ?, direccion = ?, correo = ?, rfc = ?, observaciones = ?
-            WHERE id = ?
-        ''', (nombre, telefono, direccion, correo, rfc, observaciones, proveedor_id))
-        
-        conn.commit()
-        conn.close()
-        
+        return ProveedorModel.encolar_actualizacion(
+            proveedor_id, nombre, telefono, direccion, correo, rfc, observaciones
+        ).result()
+    
+    @staticmethod
+    def encolar_actualizacion(proveedor_id, nombre, telefono, direccion, correo, rfc,
+                              observaciones):
+        return get_db_writer().enviar(
+            ProveedorModel._actualizar_proveedor,
+            proveedor_id, nombre, telefono, direccion, correo, rfc, observaciones
+        )
+    
+    @staticmethod
+    def _actualizar_proveedor(conn, proveedor_id, nombre, telefono, direccion, correo, rfc,
+                              observaciones):
+        consultas.ejecutar(conn, "proveedores.actualizar", (
+            nombre, telefono, direccion, correo, rfc, observaciones,
+            normalizar_telefono(telefono), normalizar(rfc), normalizar(correo), proveedor_id
+        ))
+        ProveedorModel._guardar_palabras(conn, proveedor_id, nombre, correo)
         return True
     
+    @staticmethod
+    def _guardar_palabras(conn, proveedor_id, nombre, correo):
+        # Palabras del nombre y del correo para la búsqueda; las del registro
+        # anterior se reemplazan
+        consultas.ejecutar(conn, "busqueda.borrar_palabras", ('proveedores', proveedor_id))
+        consultas.ejecutar_muchos(conn, "busqueda.insertar_palabra", [
+            ('proveedores', palabra, proveedor_id) for palabra in palabras(nombre, correo)
+        ])
+    
     @staticmethod
     def eliminar_proveedor(proveedor_id):
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
+        return ProveedorModel.encolar_eliminacion(proveedor_id).result()
+    
+    @staticmethod
+    def encolar_eliminacion(proveedor_id):
+        return get_db_writer().enviar(ProveedorModel._eliminar_proveedor, proveedor_id)
+    
+    @staticmethod
+    def _eliminar_proveedor(conn, proveedor_id):
         # Verificar si hay productos asociados
-        cursor.execute('SELECT COUNT(*) FROM productos WHERE proveedor_id = ?', (proveedor_id,))
-        count = cursor.fetchone()[0]
+        count = consultas.uno(conn, "proveedores.contar_productos", (proveedor_id,))[0]
         
         if count > 0:
             raise Exception("No se puede eliminar el proveedor porque tiene productos asociados")
         
-        cursor.execute('DELETE FROM proveedores WHERE id = ?', (proveedor_id,))
-        conn.commit()
-        conn.close()
-        
-        return True
\ No newline at end of file
+        consultas.ejecutar(conn, "proveedores.eliminar", (proveedor_id,))
+        return True
@@ -0,0 +1,127 @@
+import os
+import socket
+import time
+from ..database.db_connection import get_db_connection, get_db_writer
+from ..database.consultas import consultas
+
+class StockInsuficienteError(Exception):
+    """
+    El carrito pide más de lo disponible. `faltantes` tiene una entrada por
+    producto: {'producto_id', 'nombre', 'solicitado', 'disponible'}
+    (disponible es 0 si el producto no existe o está inactivo).
+    """
+
+    def __init__(self, faltantes):
+        self.faltantes = faltantes
+        lineas = []
+        for faltante in faltantes:
+            nombre = faltante['nombre'] or f"Producto {faltante['producto_id']}"
+            lineas.append(f"- {nombre}: solicitado {faltante['solicitado']}, "
+                          f"disponible {faltante['disponible']}")
+        super().__init__("Stock insuficiente:\n" + "\n".join(lineas))
+
+
+class ReservaModel:
+    """
+    Reservas de stock de corta duración para los carritos abiertos.
+
+    Cuando varias cajas comparten la base de datos, lo que una caja tiene en
+    su carrito queda reservado hasta que registra la venta, lo quita o la
+    reserva vence (TTL). Las demás cajas ven y venden solo el stock
+    disponible (stock menos reservas vigentes).
+
+    Cada proceso se identifica como una terminal (NAILSTOCK_TERMINAL o
+    equipo + PID).
+    """
+
+    TERMINAL = os.environ.get("NAILSTOCK_TERMINAL") or f"{socket.gethostname()}-{os.getpid()}"
+    TTL = 15 * 60  # segundos
+
+    @staticmethod
+    def reservar(producto_id, cantidad):
+        """
+        Reserva stock para el carrito de esta terminal y renueva el
+        vencimiento de sus demás reservas.
+
+        :raises StockInsuficienteError: si no hay suficiente disponible.
+        """
+        return ReservaModel.encolar_reserva(producto_id, cantidad).result()
+
+    @staticmethod
+    def encolar_reserva(producto_id, cantidad):
+        """
+        Encola la reserva en el escritor y devuelve un Future: la caja no
+        espera a que termine una escritura larga (una importación).
+        """
+        return get_db_writer().enviar(ReservaModel._reservar, producto_id, cantidad)
+
+    @staticmethod
+    def _reservar(conn, producto_id, cantidad):
+        ahora = time.time()
+        consultas.ejecutar(conn, "reservas.limpiar_vencidas", (ahora,))
+
+        fila = consultas.uno(conn, "reservas.disponible", (ahora, producto_id))
+        disponible = fila[1] if fila else 0
+        if cantidad > disponible:
+            raise StockInsuficienteError([{
+                'producto_id': producto_id,
+                'nombre': fila[0] if fila else None,
+                'solicitado': cantidad,
+                'disponible': max(disponible, 0),
+            }])
+
+        expira = ahora + ReservaModel.TTL
+        consultas.ejecutar(conn, "reservas.reservar",
+                           (ReservaModel.TERMINAL, producto_id, cantidad, expira))
+        consultas.ejecutar(conn, "reservas.renovar", (expira, ReservaModel.TERMINAL))
+        return True
+
+    @staticmethod
+    def liberar(producto_id, cantidad):
+        """Devuelve stock reservado (se quitó una línea del carrito)."""
+        return ReservaModel.encolar_liberacion(producto_id, cantidad).result()
+
+    @staticmethod
+    def encolar_liberacion(producto_id, cantidad):
+        """Como liberar(), sin esperar: devuelve un Future."""
+        return get_db_writer().enviar(ReservaModel._liberar, producto_id, cantidad)
+
+    @staticmethod
+    def _liberar(conn, producto_id, cantidad):
+        consultas.ejecutar(conn, "reservas.liberar",
+                           (cantidad, ReservaModel.TERMINAL, producto_id))
+        consultas.ejecutar(conn, "reservas.borrar_vacias", (ReservaModel.TERMINAL,))
+        return True
+
+    @staticmethod
+    def liberar_todo():
+        """Libera todas las reservas de esta terminal (carrito vaciado)."""
+        return get_db_writer().ejecutar(ReservaModel._liberar_todo)
+
+    @staticmethod
+    def _liberar_todo(conn):
+        consultas.ejecutar(conn, "reservas.liberar_terminal", (ReservaModel.TERMINAL,))
+        return True
+
+    @staticmethod
+    def encolar_inicio():
+        """
+        Al abrir la caja: borra las reservas vencidas (las de una terminal
+        que se cerró sin vender siguen apartando stock hasta que alguien
+        reserve) y las que aún tenga esta terminal de una sesión anterior
+        (con NAILSTOCK_TERMINAL fijo). Se encola antes de cualquier
+        reserva de la sesión; devuelve un Future.
+        """
+        return get_db_writer().enviar(ReservaModel._iniciar_terminal)
+
+    @staticmethod
+    def _iniciar_terminal(conn):
+        consultas.ejecutar(conn, "reservas.limpiar_vencidas", (time.time(),))
+        consultas.ejecutar(conn, "reservas.liberar_terminal", (ReservaModel.TERMINAL,))
+        return True
+
+    @staticmethod
+    def obtener_productos_disponibles():
+        """Productos activos con su stock disponible (sin lo reservado)."""
+        with get_db_connection() as conn:
+            return consultas.todos(conn, "productos.listar_disponibles", (time.time(),))
@@ -0,0 +1,123 @@
+from ..database.db_connection import get_db_connection, get_db_writer
+from ..database.consultas import consultas
+from ..utils.archivo import historico_adjunto, historico_en_escritor
+
+class ResumenVentasModel:
+    """
+    Resúmenes de ventas que mantienen los triggers de la base de datos.
+
+    - ventas_diarias: número de ventas, total, mínimo y máximo por día, para
+      las estadísticas del periodo y la serie de ventas por día.
+    - ventas_producto_dia: unidades e ingresos por producto y día, para el
+      reporte de productos más vendidos.
+
+    Los triggers los mantienen al día con cada venta registrada o eliminada;
+    `reconstruir_*` los vuelve a calcular desde las ventas (incluidas las
+    archivadas) si se sospecha que se desfasaron o tras restaurar datos, y
+    `verificar_ventas_diarias` los compara con las ventas.
+    """
+
+    @staticmethod
+    def reconstruir_ventas_diarias():
+        """Recalcula el resumen diario. Devuelve el número de días."""
+        with historico_en_escritor() as historico:
+            return get_db_writer().enviar(
+                ResumenVentasModel._reconstruir_ventas_diarias, historico, agrupable=False
+            ).result()
+
+    @staticmethod
+    def _reconstruir_ventas_diarias(conn, historico):
+        consultas.ejecutar(conn, "resumenes.vaciar_ventas_diarias")
+        consultas.ejecutar(conn, "resumenes.reconstruir_ventas_diarias")
+        if historico:
+            consultas.ejecutar(conn, "resumenes.reconstruir_ventas_diarias_historico")
+        return consultas.uno(conn, "resumenes.contar_ventas_diarias")[0]
+
+    @staticmethod
+    def verificar_ventas_diarias():
+        """
+        Compara el resumen diario con las ventas (incluidas las archivadas).
+
+        :return: Lista de DiaVentasDiferente; vacía si todo coincide.
+        """
+        with get_db_connection() as conn, historico_adjunto(conn) as historico:
+            sufijo = "_historico" if historico else ""
+            return consultas.todos(conn, "resumenes.verificar_ventas_diarias" + sufijo)
+
+    @staticmethod
+    def reconstruir_ventas_producto_dia():
+        """Recalcula el resumen por producto y día. Devuelve el número de filas."""
+        with historico_en_escritor() as historico:
+            return get_db_writer().enviar(
+                ResumenVentasModel._reconstruir_ventas_producto_dia, historico, agrupable=False
+            ).result()
+
+    @staticmethod
+    def _reconstruir_ventas_producto_dia(conn, historico):
+        consultas.ejecutar(conn, "resumenes.vaciar_ventas_producto_dia")
+        filas = consultas.ejecutar(conn, "resumenes.reconstruir_ventas_producto_dia").rowcount
+        if historico:
+            filas += consultas.ejecutar(conn, "resumenes.reconstruir_ventas_producto_dia_historico"
+                                        ).rowcount
+        return filas
+
+
+class ResumenInventarioModel:
+    """
+    Valor del inventario y conteos de stock bajo / sin stock de los
+    productos activos, en total (inventario_resumen) y por categoría
+    (inventario_categoria), que mantienen los triggers sobre productos.
+    """
+
+    # Tolerancia al comparar valores: se suman y restan como REAL
+    TOLERANCIA_VALOR = 0.005
+
+    @staticmethod
+    def reconstruir():
+        """Recalcula los resúmenes de inventario. Devuelve el número de categorías."""
+        return get_db_writer().ejecutar(ResumenInventarioModel._reconstruir)
+
+    @staticmethod
+    def _reconstruir(conn):
+        consultas.ejecutar(conn, "resumenes.vaciar_inventario")
+        categorias = consultas.ejecutar(conn, "resumenes.reconstruir_inventario_categoria").rowcount
+        consultas.ejecutar(conn, "resumenes.reconstruir_inventario_resumen")
+        return categorias
+
+    @staticmethod
+    def verificar():
+        """
+        Compara los resúmenes con los productos.
+
+        :return: Lista de (categoria, calculado, resumen) que no coinciden,
+                 con categoria None para el total; calculado y resumen son
+                 tuplas (productos, valor, stock_bajo, sin_stock) o None.
+        """
+        with get_db_connection() as conn:
+            calculado = {fila.categoria: fila for fila in
+                         consultas.todos(conn, "resumenes.inventario_por_categoria_productos")}
+            resumen = {fila.categoria: fila for fila in
+                       consultas.todos(conn, "reportes.valor_por_categoria")}
+            total = consultas.uno(conn, "reportes.resumen_inventario")
+
+        def valores(fila):
+            return (fila.productos, fila.valor, fila.stock_bajo, fila.sin_stock) if fila else None
+
+        diferencias = [
+            (categoria, valores(calculado.get(categoria)), valores(resumen.get(categoria)))
+            for categoria in sorted(calculado.keys() | resumen.keys())
+        ]
+        total_calculado = tuple(sum(columna) for columna in
+                                zip((0, 0, 0, 0), *(valores(f) for f in calculado.values())))
+        diferencias.append((None, total_calculado, tuple(total) if total else None))
+
+        return [(categoria, a, b) for categoria, a, b in diferencias
+                if not ResumenInventarioModel._coinciden(a, b)]
+
+    @staticmethod
+    def _coinciden(calculado, resumen):
+        if calculado is None or resumen is None:
+            return calculado == resumen
+        productos, valor, stock_bajo, sin_stock = calculado
+        return ((productos, stock_bajo, sin_stock) == (resumen[0], resumen[2], resumen[3])
+                and abs(valor - resumen[1]) <= ResumenInventarioModel.TOLERANCIA_VALOR)
@@ -1,96 +1,111 @@
-from ..database.db_connection import get_db_connection
+import json
+import time
+from ..database.db_connection import get_db_connection, get_db_writer
+from ..database.consultas import consultas
+from ..utils.helpers import rango_fechas
+from .paginacion import leer_pagina, clave_fecha, INICIO_FECHA, TAMANO_PAGINA
+from .reserva_model import ReservaModel, StockInsuficienteError
 
 class VentaModel:
     @staticmethod
     def agregar_venta(cliente_id, productos):
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        try:
-            # Calcular total
-            total = sum(item['cantidad'] * item['precio_unitario'] for item in productos)
-            
-            # Insertar venta
-            cursor.execute('''
-                INSERT INTO ventas (cliente_id, total)
-                VALUES (?, ?)
-            ''', (cliente_id, total))
-            
-            venta_id = cursor.lastrowid
-            
-            # Insertar detallesde venta
-            for producto in productos:
-                subtotal = producto['cantidad'] * producto['precio_unitario']
-                cursor.execute('''
-                    INSERT INTO detalle_venta (venta_id, producto_id, cantidad, precio_unitario, subtotal)
-                    VALUES (?, ?, ?, ?, ?)
-                ''', (venta_id, producto['producto_id'], producto['cantidad'], 
-                      producto['precio_unitario'], subtotal))
-            
-            conn.commit()
-            return venta_id
-            
-        except Exception as e:
-            conn.rollback()
-            raise e
-        finally:
-            conn.close()
+        return VentaModel.encolar_venta(cliente_id, productos).result()
     
     @staticmethod
-    def obtener_ventas(fecha_inicio=None, fecha_fin=None):
-        conn = get_db_connection()
-        cursor = conn.cursor()
+    def encolar_venta(cliente_id, productos):
+        """Encola la venta en el escritor y devuelve un Future con su ID."""
+        return get_db_writer().enviar(VentaModel._agregar_venta, cliente_id, productos)
+    
+    @staticmethod
+    def _agregar_venta(conn, cliente_id, productos):
+        """
+        Tarea del escritor: ya corre dentro de BEGIN IMMEDIATE, así que el
+        stock verificado no cambia antes de descontarlo.
+
+        1. Se borran las reservas vencidas y una consulta verifica la
+           disponibilidad de todo el carrito (sin contar lo reservado por
+           carritos de otras terminales).
+        2. Las líneas se insertan con executemany.
+        3. El stock se descuenta con un UPDATE por conjunto, una vez por
+           producto aunque aparezca en varias líneas, y la salida se anota
+           en el kardex.
+        4. Se liberan las reservas del carrito de esta terminal.
+        """
+        cantidades = {}
+        for producto in productos:
+            if producto['cantidad'] <= 0:
+                raise Exception("La cantidad debe ser mayor a cero")
+            producto_id = producto['producto_id']
+            cantidades[producto_id] = cantidades.get(producto_id, 0) + producto['cantidad']
+        carrito = json.dumps(list(cantidades.items()))
         
-        query = '''
-            SELECT v.*, c.nombre as cliente_nombre
-            FROM ventas v
-            JOIN clientes c ON v.cliente_id = c.id
-        '''
+        ahora = time.time()
+        consultas.ejecutar(conn, "reservas.limpiar_vencidas", (ahora,))
+        faltantes = consultas.todos(conn, "ventas.faltantes",
+                                    (carrito, ReservaModel.TERMINAL, ahora))
+        if faltantes:
+            raise StockInsuficienteError([
+                {
+                    'producto_id': producto_id,
+                    'nombre': nombre,
+                    'solicitado': solicitado,
+                    'disponible': max(disponible, 0) if disponible is not None and activo else 0,
+                }
+                for producto_id, nombre, solicitado, disponible, activo in faltantes
+            ])
         
-        params = []
+        # Calcular total
+        total = sum(item['cantidad'] * item['precio_unitario'] for item in productos)
         
-        if fecha_inicio and fecha_fin:
-            query += ' WHERE DATE(v.fecha_venta) BETWEEN ? AND ?'
-            params.extend([fecha_inicio, fecha_fin])
+        # Insertar venta
+        cursor = consultas.ejecutar(conn, "ventas.insertar", (cliente_id, total))
+        venta_id = cursor.lastrowid
         
-        query += ' ORDER BY v.fecha_venta DESC'
+        # Insertar detalles de venta
+        consultas.ejecutar_muchos(conn, "ventas.insertar_detalle", [
+            (venta_id, item['producto_id'], item['cantidad'], item['precio_unitario'],
+             item['cantidad'] * item['precio_unitario'])
+            for item in productos
+        ])
         
-        cursor.execute(query, params)
-        ventas = cursor.fetchall()
-        conn.close()
+        consultas.ejecutar(conn, "ventas.descontar_stock", (carrito,))
+        consultas.ejecutar(conn, "kardex.registrar_venta", (venta_id, carrito))
+        consultas.ejecutar(conn, "reservas.liberar_terminal", (ReservaModel.TERMINAL,))
         
-        return ventas
+        return venta_id
+    
+    @staticmethod
+    def obtener_ventas(fecha_inicio=None, fecha_fin=None):
+        with get_db_connection() as conn:
+            if fecha_inicio and fecha_fin:
+                return consultas.todos(conn, "ventas.listar_periodo",
+                                       rango_fechas(fecha_inicio, fecha_fin))
+            return consultas.todos(conn, "ventas.listar")
+    
+    @staticmethod
+    def obtener_ventas_pagina(token=None, tamano=TAMANO_PAGINA, fecha_inicio=None, fecha_fin=None):
+        """Página de ventas de la más reciente a la más antigua; ver models.paginacion."""
+        with get_db_connection() as conn:
+            if fecha_inicio and fecha_fin:
+                return leer_pagina(conn, "ventas.pagina_periodo", rango_fechas(fecha_inicio, fecha_fin),
+                                   token, INICIO_FECHA, clave_fecha, tamano)
+            return leer_pagina(conn, "ventas.pagina", (), token, INICIO_FECHA, clave_fecha, tamano)
     
     @staticmethod
     def obtener_detalle_venta(venta_id):
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT dv.*, p.nombre as producto_nombre, p.unidad
-            FROM detalle_venta dv
-            JOIN productos p ON dv.producto_id = p.id
-            WHERE dv.venta_id = ?
-        ''', (venta_id,))
-        
-        detalle = cursor.fetchall()
-        conn.close()
-        
-        return detalle
+        with get_db_connection() as conn:
+            return consultas.todos(conn, "ventas.detalle", (venta_id,))
     
     @staticmethod
     def eliminar_venta(venta_id):
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        try:
-            # Eliminar venta (los triggers se encargarán de restaurar el stock)
-            cursor.execute('DELETE FROM ventas WHERE id = ?', (venta_id,))
-            conn.commit()
-            return True
-            
-        except Exception as e:
-            conn.rollback()
-            raise e
-        finally:
-            conn.close()
+        return VentaModel.encolar_eliminacion(venta_id).result()
+    
+    @staticmethod
+    def encolar_eliminacion(venta_id):
+        return get_db_writer().enviar(VentaModel._eliminar_venta, venta_id)
+    
+    @staticmethod
+    def _eliminar_venta(conn, venta_id):
+        # Eliminar venta (los triggers se encargarán de restaurar el stock)
+        consultas.ejecutar(conn, "ventas.eliminar", (venta_id,))
+        return True
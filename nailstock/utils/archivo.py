@@ -0,0 +1,222 @@
+import argparse
+import json
+import sys
+from contextlib import contextmanager
+from datetime import date
+from pathlib import Path
+from ..database.db_connection import get_db_connection, get_db_writer
+from ..database.consultas import consultas, ESQUEMA_HISTORICO
+
+RUTA_HISTORICO = Path("database/nailstock_historico.db")
+
+
+class ArchivoVentas:
+    """
+    Archivo de ventas de periodos cerrados en una base histórica aparte.
+
+    - Las ventas anteriores al corte (inicio del mes de hace N meses) se
+      copian con su detalle a database/nailstock_historico.db y se borran
+      de la base principal, que queda pequeña para la caja y sus respaldos.
+    - Se procesan por lotes, cada uno en dos transacciones del escritor
+      (agrupable=False), así las ventas de la caja siguen registrándose
+      entre lote y lote: primero se copia y se confirma en la base
+      histórica, después se borra de la principal solo lo que ya está en
+      ella. Con la principal en WAL, SQLite no confirma una transacción
+      sobre las dos bases de forma atómica; en este orden un corte deja a
+      lo más ventas repetidas, que la siguiente corrida borra sin volver a
+      copiarlas (INSERT OR IGNORE).
+    - Durante el borrado se enciende la bandera 'archivando' de
+      control_triggers para que los triggers no devuelvan stock.
+    - Los reportes adjuntan la base histórica solo cuando el periodo pedido
+      empieza antes del corte (ver historico_adjunto).
+    """
+
+    TAMANO_LOTE = 1000
+
+    @staticmethod
+    def fecha_corte(meses):
+        """Primer día del mes de hace `meses` meses ('YYYY-MM-DD')."""
+        hoy = date.today()
+        indice = hoy.year * 12 + hoy.month - 1 - meses
+        return date(indice // 12, indice % 12 + 1, 1).isoformat()
+
+    @staticmethod
+    def estado():
+        """
+        Devuelve {'corte', 'ventas', 'detalles', 'fecha_actualizacion'}, o
+        None si nunca se ha archivado.
+        """
+        with get_db_connection() as conn:
+            fila = consultas.uno(conn, "archivo.estado")
+        if fila is None:
+            return None
+        return {'corte': fila[0], 'ventas': fila[1], 'detalles': fila[2],
+                'fecha_actualizacion': fila[3]}
+
+    @staticmethod
+    def archivar_ventas(meses, tamano_lote=None, progreso=None, compactar=False):
+        """
+        Mueve a la base histórica las ventas de hace más de `meses` meses.
+
+        :param progreso: Función opcional progreso(ventas, detalles) que se
+                         llama después de cada lote.
+        :param compactar: Hacer VACUUM de la base principal al terminar para
+                          que el archivo (y sus respaldos) se reduzca; sin
+                          esto las páginas libres solo se reutilizan.
+        :return: {'corte', 'ventas', 'detalles'} de esta corrida.
+        """
+        if meses < 1:
+            raise Exception("El archivo debe dejar al menos el mes actual en la base principal")
+
+        tamano_lote = tamano_lote or ArchivoVentas.TAMANO_LOTE
+        corte = ArchivoVentas.fecha_corte(meses)
+        escritor = get_db_writer()
+        ventas = detalles = 0
+
+        # ATTACH no se permite dentro de una transacción
+        escritor.ejecutar_sin_transaccion(_adjuntar, str(RUTA_HISTORICO))
+        try:
+            escritor.ejecutar(_crear_esquema)
+            while True:
+                ids = escritor.enviar(
+                    ArchivoVentas._copiar_lote, corte, tamano_lote, agrupable=False
+                ).result()
+                if not ids:
+                    break
+                lote_ventas, lote_detalles = escritor.enviar(
+                    ArchivoVentas._borrar_lote, corte, ids, agrupable=False
+                ).result()
+                ventas += lote_ventas
+                detalles += lote_detalles
+                if progreso:
+                    progreso(ventas, detalles)
+        finally:
+            escritor.ejecutar_sin_transaccion(_separar)
+
+        if compactar and ventas:
+            escritor.ejecutar_sin_transaccion(_compactar)
+
+        return {'corte': corte, 'ventas': ventas, 'detalles': detalles}
+
+    @staticmethod
+    def _copiar_lote(conn, corte, tamano_lote):
+        """Primera transacción del lote: solo escribe en la base histórica. Devuelve los IDs."""
+        ids = [fila[0] for fila in consultas.todos(conn, "archivo.ids_lote", (corte, tamano_lote))]
+        if ids:
+            lote = json.dumps(ids)
+            consultas.ejecutar(conn, "archivo.copiar_ventas", (lote,))
+            consultas.ejecutar(conn, "archivo.copiar_detalle", (lote,))
+        return ids
+
+    @staticmethod
+    def _borrar_lote(conn, corte, ids):
+        """
+        Segunda transacción: borra de la principal las ventas del lote que
+        la base histórica ya confirmó. Devuelve (ventas, detalles).
+        """
+        archivadas = [fila[0] for fila in
+                      consultas.todos(conn, "archivo.ids_archivados", (json.dumps(ids),))]
+        if not archivadas:
+            # Sin esto la corrida volvería a tomar el mismo lote sin fin
+            raise Exception("Las ventas del lote no quedaron en la base histórica")
+        lote = json.dumps(archivadas)
+        ventas, detalles = consultas.uno(conn, "archivo.contar_lote", (lote,))
+
+        consultas.ejecutar(conn, "control.archivando", (1,))
+        consultas.ejecutar(conn, "archivo.borrar_ventas", (lote,))
+        consultas.ejecutar(conn, "control.archivando", (0,))
+
+        # El estado se actualiza en la misma transacción que el lote: si la
+        # corrida se interrumpe, los reportes ya saben que hay ventas archivadas
+        consultas.ejecutar(conn, "archivo.registrar_lote", (corte, ventas, detalles))
+        return ventas, detalles
+
+
+def _adjuntar(conn, ruta):
+    conn.execute("ATTACH DATABASE ? AS historico", (ruta,))
+
+def _separar(conn):
+    conn.execute("DETACH DATABASE historico")
+
+def _compactar(conn):
+    conn.execute("VACUUM")
+
+def _crear_esquema(conn):
+    for nombre in ESQUEMA_HISTORICO:
+        consultas.ejecutar(conn, nombre)
+
+
+@contextmanager
+def historico_adjunto(conn, desde=None):
+    """
+    Adjunta la base histórica a una conexión de lectura solo si hace falta.
+
+    Hace falta cuando hay ventas archivadas y el periodo empieza antes del
+    corte (`desde` None = sin límite inicial). Devuelve True si quedó
+    adjunta; en ese caso se usan las consultas "..._historico".
+
+    Uso:
+        with get_db_connection() as conn, historico_adjunto(conn, inicio) as historico:
+            ...
+    """
+    fila = consultas.uno(conn, "archivo.estado")
+    necesaria = (fila is not None and fila[1] > 0 and (desde is None or desde < fila[0])
+                 and RUTA_HISTORICO.exists())
+    if not necesaria:
+        yield False
+        return
+
+    _adjuntar(conn, str(RUTA_HISTORICO))
+    try:
+        yield True
+    finally:
+        _separar(conn)
+
+
+@contextmanager
+def historico_en_escritor():
+    """
+    Adjunta la base histórica a la conexión del escritor durante el bloque,
+    si existe (para reconstrucciones que deben incluir las ventas
+    archivadas). Devuelve True si quedó adjunta.
+    """
+    if not RUTA_HISTORICO.exists():
+        yield False
+        return
+
+    escritor = get_db_writer()
+    escritor.ejecutar_sin_transaccion(_adjuntar, str(RUTA_HISTORICO))
+    try:
+        yield True
+    finally:
+        escritor.ejecutar_sin_transaccion(_separar)
+
+
+def main(argv=None):
+    """
+    Archivo sin interfaz:
+
+        python -m nailstock.utils.archivo --meses 12 [--lote 1000] [--compactar]
+    """
+    parser = argparse.ArgumentParser(prog="python -m nailstock.utils.archivo",
+                                     description="Archiva las ventas antiguas en la base histórica")
+    parser.add_argument("--meses", type=int, required=True,
+                        help="meses completos que se quedan en la base principal")
+    parser.add_argument("--lote", type=int, default=ArchivoVentas.TAMANO_LOTE,
+                        help="ventas por transacción")
+    parser.add_argument("--compactar", action="store_true",
+                        help="hacer VACUUM de la base principal al terminar")
+    args = parser.parse_args(argv)
+
+    def progreso(ventas, detalles):
+        print(f"\r{ventas} ventas archivadas ({detalles} líneas)", end="", file=sys.stderr)
+
+    resultado = ArchivoVentas.archivar_ventas(args.meses, args.lote, progreso, args.compactar)
+    print(file=sys.stderr)
+    print(f"Ventas anteriores a {resultado['corte']}: {resultado['ventas']} archivadas "
+          f"({resultado['detalles']} líneas de detalle) en {RUTA_HISTORICO}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
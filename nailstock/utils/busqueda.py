@@ -0,0 +1,65 @@
+import json
+import re
+import unicodedata
+
+# Normalización del texto para las búsquedas de clientes y proveedores, y
+# armado de las búsquedas de productos.
+# Se guarda ya normalizado (columnas *_busqueda y tabla palabras_busqueda,
+# ver la migración 0014), así SQLite compara por prefijo con los índices
+# sin funciones sobre la columna: "Pérez", "PEREZ" y "perez" se guardan y
+# se buscan como "perez".
+
+_NO_ALFANUMERICO = re.compile(r"[^0-9a-z]+")
+
+# Máximo de resultados de una búsqueda
+LIMITE_RESULTADOS = 100
+
+def sin_acentos(texto):
+    """Minúsculas y sin diacríticos ("Peña Núñez" -> "pena nunez")."""
+    descompuesto = unicodedata.normalize("NFKD", texto.casefold())
+    return "".join(c for c in descompuesto if not unicodedata.combining(c))
+
+def normalizar(texto):
+    """Forma de búsqueda de un valor completo: sin acentos, solo letras y dígitos."""
+    if not texto:
+        return None
+    return _NO_ALFANUMERICO.sub("", sin_acentos(texto)) or None
+
+def normalizar_telefono(telefono):
+    """Solo los dígitos ("(55) 1234-5678" -> "5512345678")."""
+    if not telefono:
+        return None
+    return "".join(c for c in telefono if c.isdigit()) or None
+
+def palabras(*textos):
+    """Palabras normalizadas de los textos, sin repetir (para palabras_busqueda)."""
+    resultado = set()
+    for texto in textos:
+        if texto:
+            resultado.update(p for p in _NO_ALFANUMERICO.split(sin_acentos(texto)) if p)
+    return resultado
+
+def terminos(busqueda):
+    """
+    Términos de una búsqueda como arreglo JSON para las consultas
+    "*.buscar": cada palabra escrita, normalizada. Cada término debe ser
+    prefijo de una palabra del nombre o del teléfono / RFC normalizados, así
+    "55-12" busca el teléfono 5512... y "pérez ju" a "Juan Pérez".
+    """
+    vistos = []
+    for termino in busqueda.split():
+        termino = normalizar(termino)
+        if termino and termino not in vistos:
+            vistos.append(termino)
+    return json.dumps(vistos)
+
+def consulta_fts(busqueda):
+    """
+    Expresión MATCH de FTS5 para buscar productos mientras se escribe: cada
+    palabra entre comillas (sin operadores de FTS5) y como prefijo, todas
+    obligatorias. "tor 3/8" -> '"tor"* "3/8"*'. None si no hay palabras.
+    """
+    palabras_busqueda = busqueda.split()
+    if not palabras_busqueda:
+        return None
+    return " ".join('"' + palabra.replace('"', '""') + '"*' for palabra in palabras_busqueda)
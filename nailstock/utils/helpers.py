@@ -1,5 +1,16 @@
+from datetime import date, timedelta
+
 def formato_moneda(valor):
     return f"${valor:,.2f}"
 
 def formato_porcentaje(valor):
-    return f"{valor:.1f}%"
\ No newline at end of file
+    return f"{valor:.1f}%"
+
+def rango_fechas(fecha_inicio, fecha_fin):
+    """
+    Convierte un periodo inclusivo de días ('YYYY-MM-DD') en el rango
+    semiabierto [inicio, día siguiente al fin) para filtrar `fecha_venta`
+    sin envolver la columna en DATE() y así poder usar su índice.
+    """
+    fin_exclusivo = date.fromisoformat(fecha_fin) + timedelta(days=1)
+    return fecha_inicio, fin_exclusivo.isoformat()
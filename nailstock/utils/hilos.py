@@ -0,0 +1,77 @@
+import asyncio
+import threading
+from PyQt6.QtCore import QObject, Qt, pyqtSignal
+
+class ResultadoFuture(QObject):
+    """
+    Entrega en el hilo de la interfaz el resultado de un Future que termina
+    en otro hilo (por ejemplo, una escritura encolada en el escritor).
+
+    Uso:
+        resultado = ResultadoFuture(future, self)
+        resultado.terminado.connect(self.al_terminar)
+        resultado.fallido.connect(self.al_fallar)
+    """
+
+    terminado = pyqtSignal(object)
+    fallido = pyqtSignal(object)
+    _listo = pyqtSignal(object)
+
+    def __init__(self, future, parent=None):
+        super().__init__(parent)
+        # Conexión en cola: el callback del Future se ejecuta en el hilo que
+        # lo completa, pero la entrega ocurre en el hilo de este objeto
+        self._listo.connect(self._entregar, Qt.ConnectionType.QueuedConnection)
+        future.add_done_callback(self._listo.emit)
+
+    def _entregar(self, future):
+        error = future.exception()
+        if error is not None:
+            self.fallido.emit(error)
+        else:
+            self.terminado.emit(future.result())
+        self.deleteLater()
+
+
+class Progreso(QObject):
+    """
+    Señal de avance que se puede emitir desde cualquier hilo; los slots
+    conectados se ejecutan en el hilo de la interfaz.
+
+    Uso:
+        progreso = Progreso(self)
+        progreso.avance.connect(self.al_avanzar)
+        ImportacionAsync.importar_productos(ruta, progreso=progreso.avance.emit)
+    """
+
+    avance = pyqtSignal(int, int)
+
+
+class PuenteAsyncio:
+    """
+    Bucle de asyncio en un hilo propio para ejecutar corrutinas desde Qt.
+
+    Qt conserva su bucle de eventos en el hilo principal; las corrutinas
+    (por ejemplo, las de models.asincrono) corren en este otro bucle y su
+    resultado vuelve a la interfaz como señales de ResultadoFuture.
+    """
+
+    def __init__(self):
+        self._loop = None
+        self._lock = threading.Lock()
+
+    def _obtener_loop(self):
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="nailstock-asyncio",
+                                 daemon=True).start()
+        return self._loop
+
+    def ejecutar(self, corrutina, parent=None):
+        """Programa la corrutina y devuelve un ResultadoFuture con su resultado."""
+        future = asyncio.run_coroutine_threadsafe(corrutina, self._obtener_loop())
+        return ResultadoFuture(future, parent)
+
+
+puente_asyncio = PuenteAsyncio()
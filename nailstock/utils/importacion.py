@@ -0,0 +1,338 @@
+import argparse
+import csv
+import json
+import sys
+import time
+import unicodedata
+from pathlib import Path
+from ..database.db_connection import get_db_connection, get_db_writer
+from ..database.consultas import consultas
+from ..models.kardex_model import KardexModel
+from ..models.producto_model import ProductoModel
+from ..models.codigo_model import CodigoModel
+
+# Nombres de columna aceptados (ya normalizados) para cada campo. Incluye los
+# encabezados que genera Reportes.exportar_productos_csv, así un archivo
+# exportado se puede volver a importar.
+_COLUMNAS = {
+    'nombre': 'nombre',
+    'descripcion': 'descripcion',
+    'categoria': 'categoria',
+    'precio_compra': 'precio_compra',
+    'precio_venta': 'precio_venta',
+    'stock': 'stock',
+    'stock_minimo': 'stock_minimo',
+    'unidad': 'unidad',
+    'proveedor_id': 'proveedor_id',
+    'proveedor': 'proveedor',
+    'codigo': 'codigo',
+    'codigo_de_barras': 'codigo',
+    'sku': 'codigo',
+}
+
+
+class ResultadoImportacion:
+    __slots__ = ("leidas", "insertadas", "actualizadas", "errores", "segundos")
+
+    def __init__(self):
+        self.leidas = 0
+        self.insertadas = 0
+        self.actualizadas = 0
+        self.errores = []  # [(línea, mensaje)]
+        self.segundos = 0.0
+
+    @property
+    def filas_por_segundo(self):
+        return self.leidas / self.segundos if self.segundos else 0.0
+
+    def resumen(self):
+        return (f"{self.leidas} filas leídas: {self.insertadas} nuevas, "
+                f"{self.actualizadas} actualizadas, {len(self.errores)} con errores "
+                f"({self.filas_por_segundo:,.0f} filas/s)")
+
+
+class ImportacionProductos:
+    """
+    Importación masiva de productos desde CSV o JSONL.
+
+    - El archivo se lee en streaming y se procesa por lotes: cada lote se
+      valida en Python y se envía al escritor como una sola transacción
+      (agrupable=False). Mientras el escritor aplica un lote se valida el
+      siguiente.
+    - Upsert por código si la fila lo trae y si no por la clave natural
+      nombre + proveedor: el lote se carga con executemany en una tabla
+      temporal y se aplica con UPDATE ... FROM para los existentes y un
+      INSERT ... WHERE NOT EXISTS para los nuevos.
+    - Las filas inválidas se reportan con su número de línea y no detienen
+      la importación; tampoco las que traen un código ocupado (de una
+      presentación, o de un producto con otro nombre o proveedor), que se
+      quitan del lote antes de aplicarlo.
+    """
+
+    TAMANO_LOTE = 2000
+
+    @staticmethod
+    def importar_productos(ruta_archivo, tamano_lote=None, progreso=None):
+        """
+        Importa productos desde un archivo .csv o .jsonl.
+
+        :param progreso: Función opcional progreso(filas_leidas, errores) que
+                         se llama después de cada lote.
+        :return: ResultadoImportacion
+        """
+        tamano_lote = tamano_lote or ImportacionProductos.TAMANO_LOTE
+        resultado = ResultadoImportacion()
+        inicio = time.perf_counter()
+
+        with get_db_connection() as conn:
+            proveedores = consultas.todos(conn, "proveedores.listar")
+        proveedores_por_nombre = {p.nombre.strip().lower(): p.id for p in proveedores}
+        proveedores_ids = {p.id for p in proveedores}
+
+        escritor = get_db_writer()
+        pendiente = None
+
+        for lote in ImportacionProductos._lotes(ruta_archivo, tamano_lote):
+            resultado.leidas += len(lote)
+            validas = ImportacionProductos._validar_lote(
+                lote, proveedores_por_nombre, proveedores_ids, resultado.errores
+            )
+
+            if pendiente is not None:
+                ImportacionProductos._esperar(pendiente, resultado)
+            pendiente = None
+
+            if validas:
+                future = escritor.enviar(ImportacionProductos._aplicar_lote,
+                                         [fila for _, fila in validas], agrupable=False)
+                pendiente = (future, validas)
+
+            if progreso:
+                progreso(resultado.leidas, len(resultado.errores))
+
+        if pendiente is not None:
+            ImportacionProductos._esperar(pendiente, resultado)
+
+        # Altas, cambios de nombre o código y reactivaciones en bloque: el
+        # índice de nombres y el mapa de códigos se reconstruyen al usarlos
+        if resultado.insertadas or resultado.actualizadas:
+            ProductoModel.descartar_indice_nombres()
+            CodigoModel.descartar_codigos()
+
+        resultado.segundos = time.perf_counter() - inicio
+        if progreso:
+            progreso(resultado.leidas, len(resultado.errores))
+        return resultado
+
+    @staticmethod
+    def _esperar(pendiente, resultado):
+        future, validas = pendiente
+        try:
+            insertadas, actualizadas, ocupados = future.result()
+            resultado.insertadas += insertadas
+            resultado.actualizadas += actualizadas
+            if ocupados:
+                lineas = {fila[9]: linea for linea, fila in validas if fila[9]}
+                for codigo, mensaje in ocupados.items():
+                    resultado.errores.append((lineas[codigo], mensaje))
+        except Exception as e:
+            # El lote completo se deshizo: reportar todas sus filas
+            for linea, _ in validas:
+                resultado.errores.append((linea, f"Lote no aplicado: {e}"))
+
+    @staticmethod
+    def _aplicar_lote(conn, filas):
+        """
+        Tarea del escritor: aplica un lote ya validado. Devuelve
+        (insertadas, actualizadas, {código ocupado: mensaje}).
+        """
+        consultas.ejecutar(conn, "importacion.crear_staging")
+        consultas.ejecutar(conn, "importacion.limpiar_staging")
+        consultas.ejecutar_muchos(conn, "importacion.cargar_staging", filas)
+
+        # Sin esto los triggers de códigos únicos abortarían el lote completo
+        ocupados = {}
+        for codigo, dueno, es_presentacion in consultas.todos(conn, "importacion.codigos_ocupados"):
+            if es_presentacion:
+                ocupados[codigo] = f"El código {codigo} ya es de una presentación de: {dueno}"
+            else:
+                ocupados.setdefault(codigo, f"El código {codigo} ya pertenece a: {dueno} "
+                                            "(la fila trae otro nombre o proveedor)")
+        consultas.ejecutar_muchos(conn, "importacion.quitar_de_staging",
+                                  [(codigo,) for codigo in ocupados])
+
+        KardexModel._guardar_stock_previo(conn, "kardex.previo_importacion")
+        actualizadas = consultas.ejecutar(conn, "importacion.actualizar_por_codigo").rowcount
+        actualizadas += consultas.ejecutar(conn, "importacion.actualizar_existentes").rowcount
+        KardexModel._registrar_diferencias(conn, 'importacion')
+        insertadas = consultas.ejecutar(conn, "importacion.insertar_nuevos").rowcount
+
+        consultas.ejecutar(conn, "importacion.limpiar_staging")
+        return insertadas, actualizadas, ocupados
+
+    @staticmethod
+    def _lotes(ruta_archivo, tamano_lote):
+        """Genera listas de (línea, registro) de hasta tamano_lote elementos."""
+        lote = []
+        for linea, registro in ImportacionProductos._leer_registros(ruta_archivo):
+            lote.append((linea, registro))
+            if len(lote) >= tamano_lote:
+                yield lote
+                lote = []
+        if lote:
+            yield lote
+
+    @staticmethod
+    def _leer_registros(ruta_archivo):
+        """
+        Lee el archivo registro por registro. Genera (línea, dict) con las
+        claves ya normalizadas; en JSONL una línea inválida genera
+        (línea, None).
+        """
+        extension = Path(ruta_archivo).suffix.lower()
+
+        with open(ruta_archivo, newline='', encoding='utf-8-sig') as archivo:
+            if extension in (".jsonl", ".ndjson"):
+                for linea, texto in enumerate(archivo, start=1):
+                    if not texto.strip():
+                        continue
+                    try:
+                        registro = json.loads(texto)
+                    except json.JSONDecodeError:
+                        yield linea, None
+                        continue
+                    yield linea, ImportacionProductos._normalizar_registro(registro)
+            elif extension == ".csv":
+                lector = csv.DictReader(archivo)
+                for registro in lector:
+                    yield lector.line_num, ImportacionProductos._normalizar_registro(registro)
+            else:
+                raise Exception(f"Formato no soportado: {extension} (usa .csv o .jsonl)")
+
+    @staticmethod
+    def _normalizar_registro(registro):
+        if not isinstance(registro, dict):
+            return None
+        normalizado = {}
+        for clave, valor in registro.items():
+            campo = _COLUMNAS.get(_normalizar_columna(clave))
+            if campo:
+                normalizado[campo] = valor.strip() if isinstance(valor, str) else valor
+        return normalizado
+
+    @staticmethod
+    def _validar_lote(lote, proveedores_por_nombre, proveedores_ids, errores):
+        """
+        Valida un lote y devuelve [(línea, tupla_parámetros)].
+
+        Si el mismo código (o, sin código, la misma clave natural) aparece
+        varias veces en el lote, gana la última fila (igual que si se
+        importaran en orden) y las anteriores se reportan como errores.
+        """
+        validas = {}
+        for linea, registro in lote:
+            if registro is None:
+                errores.append((linea, "Registro con formato inválido"))
+                continue
+            try:
+                fila = ImportacionProductos._validar_registro(
+                    registro, proveedores_por_nombre, proveedores_ids
+                )
+            except Exception as e:
+                errores.append((linea, str(e)))
+                continue
+            clave = fila[9] or (fila[0], fila[8])
+            reemplazada = validas.pop(clave, None)
+            if reemplazada:
+                motivo = "mismo código" if fila[9] else "mismo nombre y proveedor"
+                errores.append((reemplazada[0], f"Fila reemplazada por la línea {linea} ({motivo})"))
+            validas[clave] = (linea, fila)
+        return list(validas.values())
+
+    @staticmethod
+    def _validar_registro(registro, proveedores_por_nombre, proveedores_ids):
+        nombre = registro.get('nombre')
+        if not nombre:
+            raise Exception("El nombre es obligatorio")
+
+        unidad = registro.get('unidad')
+        if not unidad:
+            raise Exception("La unidad es obligatoria")
+
+        precio_compra = _numero(registro.get('precio_compra'), "precio_compra", float)
+        precio_venta = _numero(registro.get('precio_venta'), "precio_venta", float)
+        stock = _numero(registro.get('stock') or 0, "stock", int)
+        stock_minimo = _numero(registro.get('stock_minimo') or 0, "stock_minimo", int)
+
+        proveedor_id = registro.get('proveedor_id')
+        if proveedor_id not in (None, ""):
+            proveedor_id = _numero(proveedor_id, "proveedor_id", int)
+            if proveedor_id not in proveedores_ids:
+                raise Exception(f"No existe el proveedor con ID {proveedor_id}")
+        elif registro.get('proveedor'):
+            proveedor_id = proveedores_por_nombre.get(registro['proveedor'].lower())
+            if proveedor_id is None:
+                raise Exception(f"No existe el proveedor '{registro['proveedor']}'")
+        else:
+            proveedor_id = None
+
+        codigo = registro.get('codigo')
+        if codigo not in (None, ""):
+            codigo = str(codigo)
+        else:
+            codigo = None
+
+        return (nombre, registro.get('descripcion') or None, registro.get('categoria') or None,
+                precio_compra, precio_venta, stock, stock_minimo, unidad, proveedor_id, codigo)
+
+
+def _normalizar_columna(nombre):
+    """'Precio Compra' -> 'precio_compra', 'Categoría' -> 'categoria'."""
+    if not isinstance(nombre, str):
+        return ""
+    sin_acentos = unicodedata.normalize("NFKD", nombre).encode("ascii", "ignore").decode()
+    return "_".join(sin_acentos.lower().split())
+
+def _numero(valor, campo, tipo):
+    if valor in (None, ""):
+        raise Exception(f"El campo {campo} es obligatorio")
+    try:
+        numero = tipo(float(valor)) if tipo is int else tipo(valor)
+    except (TypeError, ValueError):
+        raise Exception(f"Valor inválido en {campo}: {valor!r}")
+    if numero < 0:
+        raise Exception(f"El campo {campo} no puede ser negativo")
+    return numero
+
+def main(argv=None):
+    """
+    Importación sin interfaz:
+
+        python -m nailstock.utils.importacion catalogo.csv [--lote 2000]
+
+    Termina con código 1 si alguna fila tuvo errores.
+    """
+    parser = argparse.ArgumentParser(prog="python -m nailstock.utils.importacion",
+                                     description="Importa productos desde CSV o JSONL")
+    parser.add_argument("archivo")
+    parser.add_argument("--lote", type=int, default=ImportacionProductos.TAMANO_LOTE,
+                        help="filas por transacción")
+    args = parser.parse_args(argv)
+
+    def progreso(leidas, errores):
+        print(f"\r{leidas} filas procesadas, {errores} errores", end="", file=sys.stderr)
+
+    resultado = ImportacionProductos.importar_productos(args.archivo, args.lote, progreso)
+    print(file=sys.stderr)
+
+    for linea, mensaje in resultado.errores[:50]:
+        print(f"[ERROR] línea {linea}: {mensaje}")
+    if len(resultado.errores) > 50:
+        print(f"... y {len(resultado.errores) - 50} errores más")
+
+    print(resultado.resumen())
+    return 1 if resultado.errores else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,62 @@
+import argparse
+import sys
+from ..models.kardex_model import KardexModel
+
+def main(argv=None):
+    """
+    Mantenimiento del kardex sin interfaz:
+
+        python -m nailstock.utils.kardex conciliar [--corregir]
+        python -m nailstock.utils.kardex snapshot
+        python -m nailstock.utils.kardex stock 2024-06-30 [--producto ID]
+
+    `conciliar` termina con código 1 si encuentra diferencias (y no se
+    pidió corregirlas).
+    """
+    parser = argparse.ArgumentParser(prog="python -m nailstock.utils.kardex",
+                                     description="Kardex de movimientos de stock")
+    comandos = parser.add_subparsers(dest="comando", required=True)
+
+    conciliar = comandos.add_parser("conciliar", help="comparar productos.stock con el kardex")
+    conciliar.add_argument("--corregir", action="store_true",
+                           help="anotar movimientos de conciliación por las diferencias")
+
+    comandos.add_parser("snapshot", help="guardar una foto del stock según el kardex")
+
+    stock = comandos.add_parser("stock", help="stock al cierre de una fecha (YYYY-MM-DD)")
+    stock.add_argument("fecha")
+    stock.add_argument("--producto", type=int)
+
+    args = parser.parse_args(argv)
+
+    if args.comando == "conciliar":
+        diferencias = KardexModel.conciliar()
+        for fila in diferencias:
+            print(f"{fila.id}\t{fila.nombre}\tstock {fila.stock}\tkardex {fila.stock_kardex}\t"
+                  f"diferencia {fila.diferencia:+d}")
+        print(f"{len(diferencias)} productos con diferencias")
+        if diferencias and args.corregir:
+            print(f"{KardexModel.corregir_diferencias()} movimientos de conciliación anotados")
+            return 0
+        return 1 if diferencias else 0
+
+    if args.comando == "snapshot":
+        print(f"Foto {KardexModel.tomar_snapshot()} guardada")
+        return 0
+
+    if args.producto is not None:
+        cantidad = KardexModel.stock_en_fecha(args.producto, args.fecha)
+        print("Sin historial para esa fecha" if cantidad is None else cantidad)
+        return 0
+
+    filas = KardexModel.stock_en_fecha_todos(args.fecha)
+    if filas is None:
+        print("Sin historial para esa fecha")
+        return 0
+    for fila in filas:
+        print(f"{fila.id}\t{fila.nombre}\t{fila.stock_kardex}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
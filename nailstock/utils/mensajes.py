@@ -17,6 +17,14 @@ class Mensajes:
         msg.setText(mensaje)
         msg.exec()
     
+    @staticmethod
+    def mostrar_info(mensaje, parent=None, titulo="Información"):
+        msg = QMessageBox(parent)
+        msg.setIcon(QMessageBox.Icon.Information)
+        msg.setWindowTitle(titulo)
+        msg.setText(mensaje)
+        msg.exec()
+    
     @staticmethod
     def mostrar_advertencia(mensaje, parent=None):
         msg = QMessageBox(parent)
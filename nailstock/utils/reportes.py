@@ -1,30 +1,20 @@
 from ..database.db_connection import get_db_connection
+from ..database.consultas import consultas
+from .helpers import rango_fechas
+from .archivo import historico_adjunto
 import csv
 
 class Reportes:
     @staticmethod
     def exportar_productos_csv(ruta_archivo):
         """Exporta todos los productos a un archivo CSV"""
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT p.id, p.nombre, p.descripcion, p.categoria, p.precio_compra, 
-                   p.precio_venta, p.stock, p.stock_minimo, p.unidad, 
-                   pr.nombre as proveedor, p.fecha_creacion
-            FROM productos p 
-            LEFT JOIN proveedores pr ON p.proveedor_id = pr.id 
-            WHERE p.activo = 1
-            ORDER BY p.nombre
-        ''')
-        
-        productos = cursor.fetchall()
-        conn.close()
+        with get_db_connection() as conn:
+            productos = consultas.todos(conn, "reportes.productos_csv")
         
         with open(ruta_archivo, 'w', newline='', encoding='utf-8') as archivo:
             writer = csv.writer(archivo)
             writer.writerow([
-                'ID', 'Nombre', 'Descripción', 'Categoría', 'Precio Compra', 
+                'ID', 'Código', 'Nombre', 'Descripción', 'Categoría', 'Precio Compra', 
                 'Precio Venta', 'Stock', 'Stock Mínimo', 'Unidad', 'Proveedor', 'Fecha Creación'
             ])
             
@@ -35,27 +25,16 @@ class Reportes:
     
     @staticmethod
     def exportar_ventas_csv(ruta_archivo, fecha_inicio=None, fecha_fin=None):
-        """Exporta ventas a un archivo CSV"""
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        query = '''
-            SELECT v.id, c.nombre as cliente, 
-                   v.total, v.fecha_venta
-            FROM ventas v
-            JOIN clientes c ON v.cliente_id = c.id
-        '''
+        """Exporta ventas a un archivo CSV (incluye las archivadas del periodo)"""
+        desde = fecha_inicio if fecha_inicio and fecha_fin else None
         
-        params = []
-        if fecha_inicio and fecha_fin:
-            query += ' WHERE DATE(v.fecha_venta) BETWEEN ? AND ?'
-            params.extend([fecha_inicio, fecha_fin])
-        
-        query += ' ORDER BY v.fecha_venta DESC'
-        
-        cursor.execute(query, params)
-        ventas = cursor.fetchall()
-        conn.close()
+        with get_db_connection() as conn, historico_adjunto(conn, desde) as historico:
+            sufijo = "_historico" if historico else ""
+            if fecha_inicio and fecha_fin:
+                ventas = consultas.todos(conn, "reportes.ventas_csv_periodo" + sufijo,
+                                         rango_fechas(fecha_inicio, fecha_fin))
+            else:
+                ventas = consultas.todos(conn, "reportes.ventas_csv" + sufijo)
         
         with open(ruta_archivo, 'w', newline='', encoding='utf-8') as archivo:
             writer = csv.writer(archivo)
@@ -71,12 +50,8 @@ class Reportes:
     @staticmethod
     def exportar_clientes_csv(ruta_archivo):
         """Exporta todos los clientes a un archivo CSV"""
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT * FROM clientes ORDER BY nombre')
-        clientes = cursor.fetchall()
-        conn.close()
+        with get_db_connection() as conn:
+            clientes = consultas.todos(conn, "reportes.clientes_csv")
         
         with open(ruta_archivo, 'w', newline='', encoding='utf-8') as archivo:
             writer = csv.writer(archivo)
@@ -90,48 +65,18 @@ class Reportes:
     @staticmethod
     def generar_reporte_ventas_por_periodo(fecha_inicio, fecha_fin):
         """Genera un reporte de ventas por periodo con estadísticas"""
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        rango = rango_fechas(fecha_inicio, fecha_fin)
         
-        cursor.execute('''
-            SELECT 
-                COUNT(*) as total_ventas,
-                SUM(total) as ingresos_totales,
-                AVG(total) as promedio_venta,
-                MIN(total) as venta_minima,
-                MAX(total) as venta_maxima
-            FROM ventas 
-            WHERE DATE(fecha_venta) BETWEEN ? AND ?
-        ''', (fecha_inicio, fecha_fin))
+        # Todo sale de los resúmenes que mantienen los triggers (por día y por
+        # producto y día), que ya incluyen las ventas archivadas
+        with get_db_connection() as conn:
+            estadisticas = consultas.uno(conn, "reportes.estadisticas_periodo", rango)
         
-        estadisticas = cursor.fetchone()
+            # Ventas por día
+            ventas_por_dia = consultas.todos(conn, "reportes.ventas_por_dia", rango)
         
-        # Ventas por día
-        cursor.execute('''
-            SELECT DATE(fecha_venta), COUNT(*), SUM(total)
-            FROM ventas 
-            WHERE DATE(fecha_venta) BETWEEN ? AND ?
-            GROUP BY DATE(fecha_venta)
-            ORDER BY DATE(fecha_venta)
-        ''', (fecha_inicio, fecha_fin))
-        
-        ventas_por_dia = cursor.fetchall()
-        
-        # Productos más vendidos
-        cursor.execute('''
-            SELECT p.nombre, SUM(dv.cantidad) as total_vendido, SUM(dv.subtotal) as ingresos
-            FROM detalle_venta dv
-            JOIN productos p ON dv.producto_id = p.id
-            JOIN ventas v ON dv.venta_id = v.id
-            WHERE DATE(v.fecha_venta) BETWEEN ? AND ?
-            GROUP BY p.id, p.nombre
-            ORDER BY total_vendido DESC
-            LIMIT 10
-        ''', (fecha_inicio, fecha_fin))
-        
-        productos_populares = cursor.fetchall()
-        
-        conn.close()
+            # Productos más vendidos
+            productos_populares = consultas.todos(conn, "reportes.productos_populares", rango)
         
         return {
             'estadisticas': {
@@ -148,42 +93,38 @@ class Reportes:
     @staticmethod
     def generar_reporte_stock():
         """Genera reporte de situación de stock"""
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Productos con stock bajo
-        cursor.execute('''
-            SELECT nombre, stock, stock_minimo, unidad
-            FROM productos 
-            WHERE activo = 1 AND stock <= stock_minimo
-            ORDER BY stock ASC
-        ''')
+        with get_db_connection() as conn:
+            # Productos con stock bajo
+            stock_bajo = consultas.todos(conn, "reportes.stock_bajo")
         
-        stock_bajo = cursor.fetchall()
+            # Productos sin stock
+            sin_stock = consultas.todos(conn, "reportes.sin_stock")
         
-        # Productos sin stock
-        cursor.execute('''
-            SELECT nombre, stock, stock_minimo, unidad
-            FROM productos 
-            WHERE activo = 1 AND stock = 0
-            ORDER BY nombre
-        ''')
-        
-        sin_stock = cursor.fetchall()
-        
-        # Valor total del inventario
-        cursor.execute('''
-            SELECT SUM(stock * precio_compra) as valor_inventario
-            FROM productos 
-            WHERE activo = 1
-        ''')
-        
-        valor_inventario = cursor.fetchone()[0] or 0
-        
-        conn.close()
+            # Valor del inventario, total y por categoría (de los resúmenes
+            # que mantienen los triggers sobre productos)
+            resumen = consultas.uno(conn, "reportes.resumen_inventario")
+            valor_por_categoria = consultas.todos(conn, "reportes.valor_por_categoria")
         
         return {
             'stock_bajo': stock_bajo,
             'sin_stock': sin_stock,
-            'valor_inventario': valor_inventario
-        }
\ No newline at end of file
+            'valor_inventario': resumen[1] if resumen else 0,
+            'valor_por_categoria': valor_por_categoria
+        }
+    
+    @staticmethod
+    def resumen_inventario():
+        """
+        Valor del inventario y conteos de stock de los productos activos.
+        Lee una sola fila, así que se puede consultar cada pocos segundos.
+        """
+        with get_db_connection() as conn:
+            resumen = consultas.uno(conn, "reportes.resumen_inventario")
+        
+        productos, valor, stock_bajo, sin_stock = resumen or (0, 0, 0, 0)
+        return {
+            'productos': productos,
+            'valor_inventario': valor,
+            'stock_bajo': stock_bajo,
+            'sin_stock': sin_stock
+        }
@@ -0,0 +1,51 @@
+import argparse
+import sys
+import time
+from ..models.resumen_model import ResumenVentasModel, ResumenInventarioModel
+
+def main(argv=None):
+    """
+    Mantenimiento de los resúmenes de ventas sin interfaz:
+
+        python -m nailstock.utils.resumenes reconstruir
+        python -m nailstock.utils.resumenes verificar
+
+    `verificar` termina con código 1 si el resumen diario no coincide con
+    las ventas o los resúmenes de inventario no coinciden con los productos.
+    """
+    parser = argparse.ArgumentParser(prog="python -m nailstock.utils.resumenes",
+                                     description="Resúmenes de ventas mantenidos por triggers")
+    comandos = parser.add_subparsers(dest="comando", required=True)
+    comandos.add_parser("reconstruir", help="recalcular los resúmenes desde las ventas")
+    comandos.add_parser("verificar", help="comparar los resúmenes con las ventas y los productos")
+    args = parser.parse_args(argv)
+
+    if args.comando == "reconstruir":
+        for nombre, reconstruir in (
+            ("ventas_diarias", ResumenVentasModel.reconstruir_ventas_diarias),
+            ("ventas_producto_dia", ResumenVentasModel.reconstruir_ventas_producto_dia),
+            ("inventario_categoria", ResumenInventarioModel.reconstruir),
+        ):
+            inicio = time.perf_counter()
+            filas = reconstruir()
+            print(f"{nombre}: {filas} filas ({time.perf_counter() - inicio:.2f} s)")
+        return 0
+
+    diferencias = ResumenVentasModel.verificar_ventas_diarias()
+    for fila in diferencias:
+        print(f"{fila.dia}\tventas {fila.ventas} / {fila.ventas_resumen}\t"
+              f"total {fila.total} / {fila.total_resumen}\t"
+              f"mínimo {fila.minimo} / {fila.minimo_resumen}\t"
+              f"máximo {fila.maximo} / {fila.maximo_resumen}")
+    print(f"{len(diferencias)} días con diferencias")
+
+    inventario = ResumenInventarioModel.verificar()
+    for categoria, calculado, resumen in inventario:
+        nombre = "TOTAL" if categoria is None else categoria or "Sin categoría"
+        print(f"{nombre}\tcalculado {calculado} / resumen {resumen}")
+    print(f"{len(inventario)} diferencias en el inventario")
+    return 1 if diferencias or inventario else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
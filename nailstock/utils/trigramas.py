@@ -0,0 +1,261 @@
+import heapq
+import sys
+import threading
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from math import ceil
+from .busqueda import palabras
+
+# Índice de trigramas en memoria para encontrar nombres aunque estén mal
+# escritos ("dezarmador", "desarmado" -> "Desarmador"), que ni LIKE ni FTS5
+# encuentran.
+#
+# Los trigramas se calculan sobre el vocabulario (las palabras distintas de
+# los nombres, normalizadas como en utils.busqueda), no sobre cada producto:
+# los nombres de un catálogo repiten mucho sus palabras, así una búsqueda
+# recorre listas cortas. Cada palabra se rellena como en pg_trgm
+# ("  desarmador ") y se parte en trigramas; las palabras parecidas a las
+# escritas llevan después a los productos.
+#
+# Para que quepa en poca memoria todo son arreglos: cada producto ocupa una
+# posición (array de ids), cada trigrama tiene un array("I") de palabras y
+# cada palabra un array("I") de posiciones de productos. Las palabras y los
+# nombres se internan.
+
+_VACIA = array("I")
+
+def trigramas(palabra):
+    """Trigramas de una palabra ya normalizada ("  d", " de", "des", ..., "or ")."""
+    relleno = f"  {palabra} "
+    return {relleno[i:i + 3] for i in range(len(relleno) - 2)}
+
+
+class IndiceTrigramas:
+    """
+    Nombres de productos buscables con errores de escritura, con altas,
+    cambios y bajas incrementales.
+
+    Las bajas solo marcan la posición del producto como libre (id 0); el
+    índice se rehace cuando las posiciones libres pasan de
+    PROPORCION_COMPACTAR. Seguro entre hilos: las búsquedas vienen del
+    executor y de la interfaz, los cambios del hilo que guardó el producto.
+    """
+
+    # Fracción mínima de los trigramas de cada palabra escrita que debe
+    # tener la palabra del nombre ("dezarmador" tiene 8 de 11 en "desarmador")
+    SIMILITUD_MINIMA = 0.5
+    # Palabras del vocabulario que se consideran por cada palabra escrita
+    PALABRAS_PARECIDAS = 20
+    PROPORCION_COMPACTAR = 0.25
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._vaciar()
+
+    def _vaciar(self):
+        # Productos
+        self._ids = array("q")        # posición -> id del producto (0: libre)
+        self._nombres = []            # posición -> nombre
+        self._posiciones = {}         # id -> posición
+        self._libres = 0
+        # Vocabulario
+        self._indices = {}            # palabra -> índice
+        self._tamanos = array("H")    # índice -> trigramas de la palabra
+        self._productos = []          # índice -> array("I") de posiciones, ascendentes
+        self._por_trigrama = {}       # trigrama -> array("I") de índices de palabras
+
+    def __len__(self):
+        return len(self._posiciones)
+
+    def cargar(self, productos):
+        """Agrega (id, nombre) de muchos productos; para construir el índice."""
+        with self._lock:
+            for producto_id, nombre in productos:
+                self._agregar(producto_id, nombre)
+
+    def agregar(self, producto_id, nombre):
+        """Agrega el producto o reemplaza su nombre si ya estaba."""
+        with self._lock:
+            self._agregar(producto_id, nombre)
+
+    def renombrar(self, producto_id, nombre):
+        """Cambia el nombre de un producto indexado; los que no están se ignoran."""
+        with self._lock:
+            posicion = self._posiciones.get(producto_id)
+            if posicion is not None and self._nombres[posicion] != nombre:
+                self._agregar(producto_id, nombre)
+
+    def sincronizar(self, productos):
+        """
+        Agrega o renombra, de (id, nombre) de muchos productos, los que el
+        índice no tiene o tiene con otro nombre (cambios de otra terminal).
+        """
+        with self._lock:
+            for producto_id, nombre in productos:
+                posicion = self._posiciones.get(producto_id)
+                if posicion is None or self._nombres[posicion] != nombre:
+                    self._agregar(producto_id, nombre)
+
+    def quitar(self, producto_id):
+        with self._lock:
+            self._quitar(producto_id)
+
+    def _agregar(self, producto_id, nombre):
+        self._quitar(producto_id)
+        posicion = len(self._ids)
+        self._ids.append(producto_id)
+        self._nombres.append(sys.intern(nombre))
+        self._posiciones[producto_id] = posicion
+        for palabra in palabras(nombre):
+            indice = self._indices.get(palabra)
+            if indice is None:
+                indice = self._nueva_palabra(palabra)
+            self._productos[indice].append(posicion)
+
+    def _nueva_palabra(self, palabra):
+        indice = len(self._productos)
+        claves = trigramas(palabra)
+        self._indices[sys.intern(palabra)] = indice
+        self._tamanos.append(min(len(claves), 0xFFFF))
+        self._productos.append(array("I"))
+        for clave in claves:
+            lista = self._por_trigrama.get(clave)
+            if lista is None:
+                lista = self._por_trigrama[sys.intern(clave)] = array("I")
+            lista.append(indice)
+        return indice
+
+    def _quitar(self, producto_id):
+        posicion = self._posiciones.pop(producto_id, None)
+        if posicion is None:
+            return
+        self._ids[posicion] = 0
+        self._nombres[posicion] = None
+        self._libres += 1
+        if self._libres > 1000 and self._libres > len(self._ids) * self.PROPORCION_COMPACTAR:
+            self._compactar()
+
+    def _compactar(self):
+        # Desde cero: así también salen del vocabulario las palabras que ya
+        # no tiene ningún producto
+        vivos = [(producto_id, nombre) for producto_id, nombre in zip(self._ids, self._nombres)
+                 if producto_id]
+        self._vaciar()
+        for producto_id, nombre in vivos:
+            self._agregar(producto_id, nombre)
+
+    def buscar(self, texto, limite=20, minima=None):
+        """
+        Productos cuyo nombre tiene, para cada palabra de `texto`, una palabra
+        parecida, del más al menos parecido: lista de (id, similitud), con la
+        similitud entre 0 y 1 (promedio, por palabra escrita, de la fracción
+        de sus trigramas presentes en la palabra del nombre). A igual
+        similitud quedan en el orden en que se cargaron.
+        """
+        minima = self.SIMILITUD_MINIMA if minima is None else minima
+        escritas = palabras(texto)
+        if not escritas:
+            return []
+
+        with self._lock:
+            parecidas = [self._parecidas(palabra, minima) for palabra in escritas]
+            if not all(parecidas):
+                return []
+            if len(parecidas) == 1:
+                return self._mejores_de_una(parecidas[0], limite)
+            return self._mejores_de_varias(parecidas, limite)
+
+    def _parecidas(self, palabra, minima):
+        """
+        Palabras del vocabulario parecidas a una palabra escrita: lista de
+        (similitud, índice), de la más a la menos parecida. A igual
+        similitud, primero las que tienen menos trigramas de más.
+        """
+        listas = sorted((self._por_trigrama.get(clave, _VACIA) for clave in trigramas(palabra)),
+                        key=len)
+        total = len(listas)
+        necesarios = max(1, ceil(minima * total))
+
+        # Quien comparte `necesarios` trigramas aparece en alguna de las
+        # total - necesarios + 1 listas más cortas: solo esas se cuentan
+        # completas; en las largas solo se buscan esos candidatos (en C)
+        corte = total - necesarios + 1
+        comunes = Counter()
+        for lista in listas[:corte]:
+            comunes.update(lista)
+        if corte < total:
+            candidatos = set(comunes)
+            for lista in listas[corte:]:
+                comunes.update(candidatos.intersection(lista))
+
+        tamanos = self._tamanos
+        mejores = heapq.nlargest(self.PALABRAS_PARECIDAS, (
+            (cantidad / total, cantidad / (total + tamanos[indice] - cantidad), indice)
+            for indice, cantidad in comunes.items()
+            if cantidad >= necesarios
+        ))
+        return [(similitud, indice) for similitud, _, indice in mejores]
+
+    def _mejores_de_una(self, parecidas, limite):
+        # Una sola palabra: los productos de las palabras más parecidas, en
+        # orden, hasta juntar `limite`; no hace falta ver todos
+        ids = self._ids
+        resultado = []
+        vistos = set()
+        for similitud, indice in parecidas:
+            for posicion in self._productos[indice]:
+                if ids[posicion] and posicion not in vistos:
+                    vistos.add(posicion)
+                    resultado.append((ids[posicion], similitud))
+                    if len(resultado) >= limite:
+                        return resultado
+        return resultado
+
+    def _mejores_de_varias(self, parecidas, limite):
+        # La palabra escrita con menos productos guía el recorrido; en las
+        # listas de las demás solo se busca (búsqueda binaria) cada producto
+        # que aparece. Las palabras de la guía van de la más a la menos
+        # parecida y se deja de recorrer cuando ningún producto que falta
+        # puede superar a los `limite` mejores
+        productos, ids = self._productos, self._ids
+        parecidas = sorted(parecidas,
+                           key=lambda lista: sum(len(productos[indice]) for _, indice in lista))
+        guia = parecidas[0]
+        resto = [[(similitud, productos[indice]) for similitud, indice in lista]
+                 for lista in parecidas[1:]]
+        maximo_resto = sum(lista[0][0] for lista in resto)
+
+        # Montículo de (suma de similitudes, -posición, posición): a igual
+        # similitud ganan las posiciones menores, el orden de carga
+        mejores = []
+        vistos = set()
+        for similitud, indice in guia:
+            cota = similitud + maximo_resto
+            if len(mejores) >= limite and mejores[0][0] >= cota:
+                break
+            for posicion in productos[indice]:
+                if not ids[posicion] or posicion in vistos:
+                    continue
+                vistos.add(posicion)
+                suma = similitud
+                for lista in resto:
+                    for similitud_resto, posiciones in lista:
+                        i = bisect_left(posiciones, posicion)
+                        if i < len(posiciones) and posiciones[i] == posicion:
+                            suma += similitud_resto
+                            break
+                    else:
+                        break
+                else:
+                    entrada = (suma, -posicion, posicion)
+                    if len(mejores) < limite:
+                        heapq.heappush(mejores, entrada)
+                    elif entrada > mejores[0]:
+                        heapq.heapreplace(mejores, entrada)
+                    if len(mejores) >= limite and mejores[0][0] >= cota:
+                        break
+
+        total = len(parecidas)
+        return [(ids[posicion], suma / total)
+                for suma, _, posicion in sorted(mejores, reverse=True)]
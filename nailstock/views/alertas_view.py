@@ -0,0 +1,75 @@
+from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QTableWidget,
+                             QTableWidgetItem, QPushButton, QHeaderView, QLabel)
+from PyQt6.QtCore import Qt
+from ..models.alerta_model import AlertaStockModel
+from ..utils.mensajes import Mensajes
+from ..utils.hilos import ResultadoFuture
+
+class AlertasStockDialog(QDialog):
+    """Productos con stock bajo según las alertas abiertas."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.alertas = []
+        self.init_ui()
+        self.cargar_alertas()
+
+    def init_ui(self):
+        self.setWindowTitle("Alertas de stock bajo")
+        self.setModal(True)
+        self.resize(650, 450)
+
+        layout = QVBoxLayout()
+
+        self.resumen_label = QLabel()
+
+        self.table = QTableWidget()
+        self.table.setColumnCount(5)
+        self.table.setHorizontalHeaderLabels(["Producto", "Stock", "Stock Mínimo", "Unidad", "Desde"])
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+
+        btn_layout = QHBoxLayout()
+        btn_vistas = QPushButton("Marcar todas como vistas")
+        btn_vistas.clicked.connect(self.marcar_vistas)
+        btn_cerrar = QPushButton("Cerrar")
+        btn_cerrar.clicked.connect(self.accept)
+        btn_layout.addWidget(btn_vistas)
+        btn_layout.addStretch()
+        btn_layout.addWidget(btn_cerrar)
+
+        layout.addWidget(self.resumen_label)
+        layout.addWidget(self.table)
+        layout.addLayout(btn_layout)
+
+        self.setLayout(layout)
+
+    def cargar_alertas(self):
+        try:
+            self.alertas = AlertaStockModel.obtener_abiertas()
+        except Exception as e:
+            Mensajes.mostrar_error(f"Error cargando alertas: {str(e)}", self)
+            return
+
+        nuevas = sum(1 for alerta in self.alertas if not alerta.vista)
+        self.resumen_label.setText(
+            f"{len(self.alertas)} productos con stock bajo ({nuevas} sin ver)"
+        )
+
+        self.table.setRowCount(len(self.alertas))
+        for row, alerta in enumerate(self.alertas):
+            self.table.setItem(row, 0, QTableWidgetItem(alerta.nombre))
+            self.table.setItem(row, 1, QTableWidgetItem(str(alerta.stock)))
+            self.table.setItem(row, 2, QTableWidgetItem(str(alerta.stock_minimo)))
+            self.table.setItem(row, 3, QTableWidgetItem(alerta.unidad))
+            self.table.setItem(row, 4, QTableWidgetItem(alerta.fecha))
+
+            # Resaltar las que aún no se han visto
+            if not alerta.vista:
+                self.table.item(row, 1).setBackground(Qt.GlobalColor.red)
+
+    def marcar_vistas(self):
+        resultado = ResultadoFuture(AlertaStockModel.encolar_vistas(), self)
+        resultado.terminado.connect(lambda _: self.cargar_alertas())
+        resultado.fallido.connect(lambda error: Mensajes.mostrar_error(
+            f"Error marcando alertas: {str(error)}", self))
@@ -5,10 +5,12 @@ from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QTableWidget,
 from ..models.cliente_model import ClienteModel
 from ..controllers.cliente_controller import ClienteController
 from ..utils.mensajes import Mensajes
+from ..utils.hilos import ResultadoFuture
 
 class ClientesView(QWidget):
     def __init__(self):
         super().__init__()
+        self.siguiente = None
         self.init_ui()
         self.cargar_clientes()
     
@@ -40,32 +42,48 @@ class ClientesView(QWidget):
         header = self.table.horizontalHeader()
         header.setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
         
+        # Los clientes se cargan por páginas
+        self.btn_mas = QPushButton("Cargar más")
+        self.btn_mas.clicked.connect(self.cargar_mas)
+        
         layout.addLayout(search_layout)
         layout.addWidget(self.table)
+        layout.addWidget(self.btn_mas)
         
         self.setLayout(layout)
     
-    def cargar_clientes(self):
-        clientes = ClienteModel.obtener_clientes()
-        self.actualizar_tabla(clientes)
+    def cargar_clientes(self, token=None):
+        """Carga la primera página (token=None) o agrega la siguiente a la tabla"""
+        pagina = ClienteModel.obtener_clientes_pagina(token)
+        self.siguiente = pagina.siguiente
+        self.actualizar_tabla(pagina.filas, agregar=token is not None)
+        self.btn_mas.setEnabled(self.siguiente is not None)
+    
+    def cargar_mas(self):
+        try:
+            self.cargar_clientes(self.siguiente)
+        except Exception as e:
+            Mensajes.mostrar_error(f"Error cargando clientes: {str(e)}", self)
     
     def buscar_clientes(self):
         termino = self.search_input.text().strip()
         if termino:
             clientes = ClienteController.buscar_clientes(termino)
             self.actualizar_tabla(clientes)
+            self.btn_mas.setEnabled(False)
         else:
             self.cargar_clientes()
     
-    def actualizar_tabla(self, clientes):
-        self.table.setRowCount(len(clientes))
-        
-        for row, cliente in enumerate(clientes):
-            self.table.setItem(row, 0, QTableWidgetItem(str(cliente[0])))
-            self.table.setItem(row, 1, QTableWidgetItem(cliente[1]))
-            self.table.setItem(row, 2, QTableWidgetItem(cliente[2] or ""))
-            self.table.setItem(row, 3, QTableWidgetItem(cliente[3] or ""))
-            self.table.setItem(row, 4, QTableWidgetItem(cliente[4] or ""))
+    def actualizar_tabla(self, clientes, agregar=False):
+        inicio = self.table.rowCount() if agregar else 0
+        self.table.setRowCount(inicio + len(clientes))
+        
+        for row, cliente in enumerate(clientes, start=inicio):
+            self.table.setItem(row, 0, QTableWidgetItem(str(cliente.id)))
+            self.table.setItem(row, 1, QTableWidgetItem(cliente.nombre))
+            self.table.setItem(row, 2, QTableWidgetItem(cliente.telefono or ""))
+            self.table.setItem(row, 3, QTableWidgetItem(cliente.direccion or ""))
+            self.table.setItem(row, 4, QTableWidgetItem(cliente.rfc or ""))
             
             # Acciones
             actions_widget = QWidget()
@@ -95,13 +113,14 @@ class ClientesView(QWidget):
             self.cargar_clientes()
     
     def eliminar_cliente(self, cliente):
-        if Mensajes.confirmar(f"¿Está seguro de eliminar al cliente {cliente[1]}?", self):
-            try:
-                ClienteModel.eliminar_cliente(cliente[0])
-                Mensajes.mostrar_exito("Cliente eliminado correctamente", self)
-                self.cargar_clientes()
-            except Exception as e:
-                Mensajes.mostrar_error(str(e), self)
+        if Mensajes.confirmar(f"¿Está seguro de eliminar al cliente {cliente.nombre}?", self):
+            resultado = ResultadoFuture(ClienteModel.encolar_eliminacion(cliente.id), self)
+            resultado.terminado.connect(self.cliente_eliminado)
+            resultado.fallido.connect(lambda error: Mensajes.mostrar_error(str(error), self))
+    
+    def cliente_eliminado(self, _):
+        Mensajes.mostrar_exito("Cliente eliminado correctamente", self)
+        self.cargar_clientes()
 
 class ClienteDialog(QDialog):
     def __init__(self, parent=None, cliente=None):
@@ -124,13 +143,13 @@ class ClienteDialog(QDialog):
         
         # Botones
         btn_layout = QHBoxLayout()
-        btn_guardar = QPushButton("Guardar")
+        self.btn_guardar = QPushButton("Guardar")
         btn_cancelar = QPushButton("Cancelar")
         
-        btn_guardar.clicked.connect(self.guardar)
+        self.btn_guardar.clicked.connect(self.guardar)
         btn_cancelar.clicked.connect(self.reject)
         
-        btn_layout.addWidget(btn_guardar)
+        btn_layout.addWidget(self.btn_guardar)
         btn_layout.addWidget(btn_cancelar)
         
         # Agregar campos al layout
@@ -142,10 +161,10 @@ class ClienteDialog(QDialog):
         
         # Cargar datos si es edición
         if self.cliente:
-            self.nombre_input.setText(self.cliente[1])
-            self.telefono_input.setText(self.cliente[2] or "")
-            self.direccion_input.setText(self.cliente[3] or "")
-            self.rfc_input.setText(self.cliente[4] or "")
+            self.nombre_input.setText(self.cliente.nombre)
+            self.telefono_input.setText(self.cliente.telefono or "")
+            self.direccion_input.setText(self.cliente.direccion or "")
+            self.rfc_input.setText(self.cliente.rfc or "")
         
         self.setLayout(layout)
     
@@ -159,13 +178,24 @@ class ClienteDialog(QDialog):
             }
             
             if self.cliente:
-                ClienteController.actualizar_cliente(self.cliente[0], **data)
-                Mensajes.mostrar_exito("Cliente actualizado correctamente", self)
+                future = ClienteController.encolar_actualizacion(self.cliente.id, **data)
             else:
-                ClienteController.agregar_cliente(**data)
-                Mensajes.mostrar_exito("Cliente agregado correctamente", self)
-            
-            self.accept()
-            
+                future = ClienteController.encolar_cliente(**data)
         except Exception as e:
-            Mensajes.mostrar_error(str(e), self)
\ No newline at end of file
+            Mensajes.mostrar_error(str(e), self)
+            return
+        
+        # Se guarda en el hilo escritor; el diálogo se cierra al confirmarse
+        self.btn_guardar.setEnabled(False)
+        resultado = ResultadoFuture(future, self)
+        resultado.terminado.connect(self.guardado)
+        resultado.fallido.connect(self.guardado_fallido)
+    
+    def guardado(self, _):
+        accion = "actualizado" if self.cliente else "agregado"
+        Mensajes.mostrar_exito(f"Cliente {accion} correctamente", self)
+        self.accept()
+    
+    def guardado_fallido(self, error):
+        self.btn_guardar.setEnabled(True)
+        Mensajes.mostrar_error(str(error), self)
\ No newline at end of file
@@ -1,8 +1,17 @@
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, 
                              QLabel, QFileDialog, QGroupBox, QMessageBox,
-                             QFormLayout, QLineEdit)
+                             QFormLayout, QLineEdit, QInputDialog, QProgressDialog)
 from PyQt6.QtCore import QProcess
 from ..database.backup import crear_respaldo, restaurar_respaldo
+from ..database.db_connection import get_db, sql_tracer
+from ..database.consultas import consultas
+from ..database.reintentos import metricas_contencion
+from ..models.asincrono import (ArchivoAsync, KardexModelAsync, ResumenVentasAsync,
+                                ResumenInventarioAsync)
+from ..models.kardex_model import KardexModel
+from ..models.resumen_model import ResumenVentasModel, ResumenInventarioModel
+from ..utils.archivo import ArchivoVentas
+from ..utils.hilos import puente_asyncio, Progreso
 from ..utils.mensajes import Mensajes
 import os
 import sys
@@ -52,6 +61,33 @@ class ConfiguracionView(QWidget):
         backup_layout.addLayout(open_folder_layout)
         backup_group.setLayout(backup_layout)
         
+        # Sección de historial: archivo de ventas antiguas y kardex
+        archivo_group = QGroupBox("Historial de Ventas y Stock")
+        archivo_layout = QVBoxLayout()
+        
+        archivo_btn_layout = QHBoxLayout()
+        btn_archivar = QPushButton("Archivar ventas antiguas...")
+        btn_archivar.clicked.connect(self.archivar_ventas)
+        self.archivo_label = QLabel("")
+        
+        archivo_btn_layout.addWidget(btn_archivar)
+        archivo_btn_layout.addWidget(self.archivo_label)
+        archivo_btn_layout.addStretch()
+        
+        archivo_layout.addLayout(archivo_btn_layout)
+        
+        kardex_btn_layout = QHBoxLayout()
+        btn_conciliar = QPushButton("Conciliar stock con kardex")
+        btn_conciliar.clicked.connect(self.conciliar_stock)
+        kardex_btn_layout.addWidget(btn_conciliar)
+        btn_resumenes = QPushButton("Verificar resúmenes")
+        btn_resumenes.clicked.connect(self.verificar_resumenes)
+        kardex_btn_layout.addWidget(btn_resumenes)
+        kardex_btn_layout.addStretch()
+        archivo_layout.addLayout(kardex_btn_layout)
+        archivo_group.setLayout(archivo_layout)
+        self.actualizar_estado_archivo()
+        
         # Sección de configuración general
         config_group = QGroupBox("Configuración General")
         config_layout = QFormLayout()
@@ -80,11 +116,22 @@ class ConfiguracionView(QWidget):
         
         info_layout.addRow("Versión:", QLabel("NailStack 1.0.0"))
         info_layout.addRow("Base de Datos:", QLabel("SQLite"))
+        db = get_db()
+        info_layout.addRow("Perfil de BD:", QLabel(f"{db.profile} (journal: {db.journal_mode})"))
+        
+        btn_estadisticas = QPushButton("Estadísticas de consultas")
+        btn_estadisticas.clicked.connect(self.mostrar_estadisticas_consultas)
+        info_layout.addRow(btn_estadisticas)
+        
+        btn_traza = QPushButton("Exportar traza SQL")
+        btn_traza.clicked.connect(self.exportar_traza_sql)
+        info_layout.addRow(btn_traza)
         info_layout.addRow("Desarrollado con:", QLabel("Python 3.13.2 + PyQt6"))
         
         info_group.setLayout(info_layout)
         
         layout.addWidget(backup_group)
+        layout.addWidget(archivo_group)
         layout.addWidget(config_group)
         layout.addWidget(info_group)
         layout.addStretch()
@@ -143,11 +190,189 @@ class ConfiguracionView(QWidget):
         except Exception as e:
             Mensajes.mostrar_error(f"No se pudo abrir la carpeta: {str(e)}", self)
     
+    def actualizar_estado_archivo(self):
+        try:
+            estado = ArchivoVentas.estado()
+        except Exception:
+            estado = None
+        
+        if estado:
+            self.archivo_label.setText(
+                f"{estado['ventas']} ventas archivadas (anteriores a {estado['corte']})"
+            )
+        else:
+            self.archivo_label.setText("Sin ventas archivadas")
+    
+    def archivar_ventas(self):
+        meses, ok = QInputDialog.getInt(
+            self, "Archivar Ventas",
+            "Meses completos que se conservan en la base principal:", 12, 1, 120
+        )
+        if not ok:
+            return
+        
+        corte = ArchivoVentas.fecha_corte(meses)
+        if not Mensajes.confirmar(
+            f"Las ventas anteriores a {corte} se moverán a la base histórica.\n"
+            "Seguirán apareciendo en los reportes. ¿Continuar?", self
+        ):
+            return
+        
+        self.dialogo_archivo = QProgressDialog("Archivando ventas...", None, 0, 0, self)
+        self.dialogo_archivo.setWindowTitle("Archivo de ventas")
+        self.dialogo_archivo.setMinimumDuration(0)
+        self.dialogo_archivo.show()
+        
+        progreso = Progreso(self.dialogo_archivo)
+        progreso.avance.connect(
+            lambda ventas, detalles: self.dialogo_archivo.setLabelText(
+                f"{ventas} ventas archivadas ({detalles} líneas)"
+            )
+        )
+        
+        resultado = puente_asyncio.ejecutar(
+            ArchivoAsync.archivar_ventas(meses, progreso=progreso.avance.emit, compactar=True),
+            self
+        )
+        resultado.terminado.connect(self.archivo_terminado)
+        resultado.fallido.connect(self.archivo_fallido)
+    
+    def archivo_terminado(self, resultado):
+        self.dialogo_archivo.close()
+        self.actualizar_estado_archivo()
+        Mensajes.mostrar_exito(
+            f"{resultado['ventas']} ventas anteriores a {resultado['corte']} archivadas.", self
+        )
+    
+    def archivo_fallido(self, error):
+        self.dialogo_archivo.close()
+        Mensajes.mostrar_error(f"No se pudieron archivar las ventas: {str(error)}", self)
+    
+    def conciliar_stock(self):
+        """Compara el stock de cada producto con su kardex"""
+        try:
+            diferencias = KardexModel.conciliar()
+        except Exception as e:
+            Mensajes.mostrar_error(f"No se pudo conciliar el stock: {str(e)}", self)
+            return
+        
+        if not diferencias:
+            Mensajes.mostrar_exito("El stock de todos los productos coincide con el kardex.", self)
+            return
+        
+        lineas = [
+            f"{fila.nombre}: stock {fila.stock}, kardex {fila.stock_kardex} "
+            f"({fila.diferencia:+d})"
+            for fila in diferencias[:15]
+        ]
+        if len(diferencias) > 15:
+            lineas.append(f"... y {len(diferencias) - 15} más")
+        lineas.append("")
+        lineas.append("¿Anotar movimientos de conciliación para que el kardex coincida "
+                      "con el stock actual?")
+        
+        if Mensajes.confirmar("\n".join(lineas), self):
+            resultado = puente_asyncio.ejecutar(KardexModelAsync.corregir_diferencias(), self)
+            resultado.terminado.connect(lambda corregidos: Mensajes.mostrar_exito(
+                f"{corregidos} productos conciliados.", self))
+            resultado.fallido.connect(lambda error: Mensajes.mostrar_error(
+                f"No se pudo conciliar el stock: {str(error)}", self))
+    
+    def verificar_resumenes(self):
+        """Compara los resúmenes con las ventas y los productos registrados"""
+        try:
+            diferencias = ResumenVentasModel.verificar_ventas_diarias()
+            inventario = ResumenInventarioModel.verificar()
+        except Exception as e:
+            Mensajes.mostrar_error(f"No se pudieron verificar los resúmenes: {str(e)}", self)
+            return
+        
+        if not diferencias and not inventario:
+            Mensajes.mostrar_exito("Los resúmenes coinciden con las ventas y los productos.", self)
+            return
+        
+        lineas = [
+            f"{fila.dia}: {fila.ventas or 0} ventas por ${fila.total or 0:.2f}, "
+            f"resumen {fila.ventas_resumen or 0} por ${fila.total_resumen or 0:.2f}"
+            for fila in diferencias[:15]
+        ]
+        if len(diferencias) > 15:
+            lineas.append(f"... y {len(diferencias) - 15} días más")
+        if inventario:
+            lineas.append(f"Valor del inventario: {len(inventario)} diferencias")
+        lineas.append("")
+        lineas.append("¿Reconstruir los resúmenes?")
+        
+        if Mensajes.confirmar("\n".join(lineas), self):
+            resultado = puente_asyncio.ejecutar(self.reconstruir_resumenes(), self)
+            resultado.terminado.connect(lambda dias: Mensajes.mostrar_exito(
+                f"Resúmenes reconstruidos ({dias} días).", self))
+            resultado.fallido.connect(lambda error: Mensajes.mostrar_error(
+                f"No se pudieron reconstruir los resúmenes: {str(error)}", self))
+    
+    @staticmethod
+    async def reconstruir_resumenes():
+        dias = await ResumenVentasAsync.reconstruir_ventas_diarias()
+        await ResumenVentasAsync.reconstruir_ventas_producto_dia()
+        await ResumenInventarioAsync.reconstruir()
+        return dias
+    
     def reiniciar_aplicacion(self):
         """Reinicia la aplicación después de restaurar un respaldo"""
         QProcess.startDetached(sys.executable, sys.argv)
         sys.exit()
     
+    def mostrar_estadisticas_consultas(self):
+        """Muestra las consultas que más tiempo acumulan en esta sesión"""
+        estadisticas = consultas.estadisticas()[:15]
+        
+        if not estadisticas:
+            Mensajes.mostrar_info("Aún no se ha ejecutado ninguna consulta.", self)
+            return
+        
+        lineas = [
+            f"{e['nombre']}: {e['llamadas']} llamadas, "
+            f"{e['tiempo_total'] * 1000:.1f} ms en total "
+            f"({e['tiempo_promedio'] * 1000:.2f} ms c/u), {e['filas']} filas"
+            for e in estadisticas
+        ]
+        
+        # Contención por el bloqueo de escritura (otras terminales)
+        c = metricas_contencion.resumen()
+        lineas.append("")
+        lineas.append(
+            f"Bloqueo de escritura: {c['transacciones']} transacciones, "
+            f"{c['esperas']} con espera ({c['espera_total_ms']:.0f} ms en total, "
+            f"máx. {c['espera_maxima_ms']:.0f} ms), {c['reintentos']} reintentos, "
+            f"{c['agotados']} agotados"
+        )
+        Mensajes.mostrar_info("\n".join(lineas), self, "Estadísticas de consultas")
+    
+    def exportar_traza_sql(self):
+        """Exporta a JSON el resumen de la instrumentación de SQL"""
+        if not sql_tracer.enabled:
+            Mensajes.mostrar_info(
+                "La traza SQL está desactivada.\n"
+                "Inicia la aplicación con NAILSTOCK_SQL_TRACE=1 para activarla "
+                "(NAILSTOCK_SLOW_QUERY_MS define el umbral de consultas lentas).",
+                self, "Traza SQL"
+            )
+            return
+        
+        try:
+            ruta_archivo, _ = QFileDialog.getSaveFileName(
+                self, "Exportar Traza SQL",
+                f"traza_sql_{self.get_timestamp()}.json",
+                "Archivos JSON (*.json)"
+            )
+            
+            if ruta_archivo:
+                sql_tracer.export_summary(ruta_archivo)
+                Mensajes.mostrar_exito("Traza SQL exportada con éxito.", self)
+        
+        except Exception as e:
+            Mensajes.mostrar_error(f"No se pudo exportar la traza: {str(e)}", self)
+    
     def guardar_configuracion(self):
         # Aquí iría la lógica para guardar la configuración
         Mensajes.mostrar_exito("Configuración guardada correctamente", self)
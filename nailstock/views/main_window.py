@@ -1,6 +1,6 @@
 from PyQt6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
                              QPushButton, QStackedWidget, QLabel, QFrame)
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QTimer
 from PyQt6.QtGui import QFont
 
 from ..views.productos_view import ProductosView
@@ -9,10 +9,18 @@ from ..views.clientes_view import ClientesView
 from ..views.ventas_view import VentasView
 from ..views.reportes_view import ReportesView
 from ..views.configuracion_view import ConfiguracionView
+from ..views.alertas_view import AlertasStockDialog
+from ..models.asincrono import KardexModelAsync, ProductoModelAsync, CodigoModelAsync
+from ..models.alerta_model import AlertaStockModel
+from ..models.reserva_model import ReservaModel
+from ..utils.hilos import puente_asyncio
 
 class MainWindow(QMainWindow):
     def __init__(self): #Es el constructor de la ventana principal
         super().__init__()
+        # Reservas vencidas o de una sesión anterior de esta terminal; el
+        # escritor lo hace antes que cualquier reserva de la caja
+        ReservaModel.encolar_inicio()
         self.init_ui()
     
     def init_ui(self):  #Su proposito es crear toda la interfaz grafica del sistema
@@ -69,6 +77,13 @@ class MainWindow(QMainWindow):
         side_layout.addWidget(self.btn_reportes)
         side_layout.addWidget(self.btn_configuracion)
         
+        # Aviso de alertas de stock bajo sin ver
+        self.btn_alertas = QPushButton()
+        self.btn_alertas.setFixedHeight(40)
+        self.btn_alertas.clicked.connect(self.mostrar_alertas)
+        side_layout.addStretch()
+        side_layout.addWidget(self.btn_alertas)
+        
         side_panel.setLayout(side_layout)
         
         # Área de contenido
@@ -93,6 +108,54 @@ class MainWindow(QMainWindow):
         
         # Mostrar primera vista
         self.cambiar_vista(0)
+        
+        # Foto periódica del kardex, en segundo plano
+        puente_asyncio.ejecutar(KardexModelAsync.tomar_snapshot_si_hace_falta(), self)
+        
+        # Índice de nombres para las búsquedas con errores de escritura:
+        # se construye ahora para que la primera búsqueda no lo espere
+        puente_asyncio.ejecutar(ProductoModelAsync.cargar_indice_nombres(), self)
+        
+        # Lo mismo con el mapa de códigos del escáner en ventas
+        puente_asyncio.ejecutar(CodigoModelAsync.cargar_codigos(), self)
+        
+        # El número de alertas pendientes se lee de un índice parcial: se
+        # puede consultar a menudo sin recorrer los productos
+        self.timer_alertas = QTimer(self)
+        self.timer_alertas.timeout.connect(self.actualizar_alertas)
+        self.timer_alertas.start(AlertaStockModel.INTERVALO_CONSULTA)
+        self.actualizar_alertas()
+    
+    def actualizar_alertas(self):   #actualizar el aviso con el número de alertas de stock sin ver
+        try:
+            pendientes = AlertaStockModel.contar_pendientes()
+        except Exception:
+            return
+        
+        if pendientes:
+            self.btn_alertas.setText(f"Stock bajo ({pendientes})")
+            color = "#e74c3c"
+        else:
+            self.btn_alertas.setText("Sin alertas de stock")
+            color = "transparent"
+        self.btn_alertas.setStyleSheet(f'''
+            QPushButton {{
+                background-color: {color};
+                border: none;
+                color: white;
+                text-align: left;
+                padding-left: 20px;
+                font-size: 14px;
+            }}
+            QPushButton:hover {{
+                background-color: #34495e;
+            }}
+        ''')
+    
+    def mostrar_alertas(self):  #abrir la lista de productos con stock bajo
+        dialog = AlertasStockDialog(self)
+        dialog.exec()
+        self.actualizar_alertas()
     
     def crear_boton_menu(self, texto):  #crear un boton estilizado del menu lateral
         btn = QPushButton(texto)
@@ -1,17 +1,24 @@
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QTableWidget, 
                              QTableWidgetItem, QPushButton, QLineEdit, QComboBox,
                              QHeaderView, QDialog, QFormLayout, 
-                             QSpinBox, QDoubleSpinBox, QLabel)
-from PyQt6.QtCore import Qt
+                             QSpinBox, QDoubleSpinBox, QLabel, QFileDialog,
+                             QProgressDialog, QDateEdit)
+from PyQt6.QtCore import Qt, QDate
 from ..models.producto_model import ProductoModel
 from ..models.proveedor_model import ProveedorModel
+from ..models.ajuste_model import AjusteMasivoModel
+from ..models.kardex_model import KardexModel
+from ..models.codigo_model import CodigoModel
 from ..controllers.producto_controller import ProductoController
 from ..utils.mensajes import Mensajes
+from ..utils.hilos import puente_asyncio, Progreso, ResultadoFuture
+from ..models.asincrono import ProductoModelAsync, ImportacionAsync
 
 class ProductosView(QWidget):
     def __init__(self):
         super().__init__()
         self.productos = []
+        self.siguiente = None
         self.proveedores = []
         self.init_ui()
         self.cargar_productos()
@@ -41,7 +48,15 @@ class ProductosView(QWidget):
         btn_agregar = QPushButton("Agregar Producto")
         btn_agregar.clicked.connect(self.agregar_producto)
         
+        btn_importar = QPushButton("Importar...")
+        btn_importar.clicked.connect(self.importar_productos)
+        
+        btn_ajuste = QPushButton("Ajuste masivo...")
+        btn_ajuste.clicked.connect(self.ajuste_masivo)
+        
         search_layout.addWidget(btn_agregar)
+        search_layout.addWidget(btn_importar)
+        search_layout.addWidget(btn_ajuste)
         
         # Tabla
         self.table = QTableWidget()
@@ -54,30 +69,55 @@ class ProductosView(QWidget):
         header = self.table.horizontalHeader()
         header.setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
         
+        # Los productos se cargan por páginas
+        self.btn_mas = QPushButton("Cargar más")
+        self.btn_mas.clicked.connect(self.cargar_mas)
+        
         layout.addLayout(search_layout)
         layout.addWidget(self.table)
+        layout.addWidget(self.btn_mas)
         
         self.setLayout(layout)
     
     def cargar_productos(self):
         try:
-            self.productos = ProductoModel.obtener_productos()
-            self.actualizar_tabla(self.productos)
-            
-            # Actualizar categorías
-            categorias = set()
-            for producto in self.productos:
-                categoria = producto[3] if producto[3] else "Sin categoría"
-                categorias.add(categoria)
-            
+            # Actualizar categorías sin disparar el filtro
+            categoria_actual = self.categoria_combo.currentData()
+            self.categoria_combo.blockSignals(True)
             self.categoria_combo.clear()
             self.categoria_combo.addItem("Todas las categorías", "")
-            for categoria in sorted(categorias):
+            for categoria in ProductoModel.obtener_categorias():
                 self.categoria_combo.addItem(categoria, categoria)
+            index = self.categoria_combo.findData(categoria_actual)
+            if index >= 0:
+                self.categoria_combo.setCurrentIndex(index)
+            self.categoria_combo.blockSignals(False)
+            
+            self.cargar_pagina()
                 
         except Exception as e:
             Mensajes.mostrar_error(f"Error cargando productos: {str(e)}", self)
     
+    def cargar_pagina(self, token=None):
+        """Carga la primera página (token=None) o agrega la siguiente a la tabla"""
+        pagina = ProductoModel.obtener_productos_pagina(
+            token, categoria=self.categoria_combo.currentData() or None
+        )
+        if token is None:
+            self.productos = list(pagina.filas)
+        else:
+            self.productos.extend(pagina.filas)
+        self.siguiente = pagina.siguiente
+        
+        self.actualizar_tabla(pagina.filas, agregar=token is not None)
+        self.btn_mas.setEnabled(self.siguiente is not None)
+    
+    def cargar_mas(self):
+        try:
+            self.cargar_pagina(self.siguiente)
+        except Exception as e:
+            Mensajes.mostrar_error(f"Error cargando productos: {str(e)}", self)
+    
     def cargar_proveedores(self):
         try:
             self.proveedores = ProveedorModel.obtener_proveedores()
@@ -87,42 +127,59 @@ class ProductosView(QWidget):
     def buscar_productos(self):
         termino = self.search_input.text().strip()
         if termino:
-            try:
-                productos = ProductoModel.buscar_productos(termino)
-                self.actualizar_tabla(productos)
-            except Exception as e:
-                Mensajes.mostrar_error(f"Error buscando productos: {str(e)}", self)
+            # Búsqueda en segundo plano para no frenar la escritura
+            resultado = puente_asyncio.ejecutar(ProductoModelAsync.buscar_productos(termino), self)
+            resultado.terminado.connect(
+                lambda productos, t=termino: self.mostrar_busqueda(t, productos)
+            )
+            resultado.fallido.connect(
+                lambda e: Mensajes.mostrar_error(f"Error buscando productos: {str(e)}", self)
+            )
         else:
             self.actualizar_tabla(self.productos)
+            self.btn_mas.setEnabled(self.siguiente is not None)
+    
+    def mostrar_busqueda(self, termino, productos):
+        # Descartar resultados de búsquedas que ya no corresponden al texto actual
+        if termino == self.search_input.text().strip():
+            self.actualizar_tabla(productos)
+            self.btn_mas.setEnabled(False)
+            
+            # Coincidencias resaltadas al pasar el cursor por el nombre
+            for row, producto in enumerate(productos):
+                resaltado = producto.nombre_resaltado
+                if producto.fragmento:
+                    resaltado += f"\n{producto.fragmento}"
+                self.table.item(row, 1).setToolTip(resaltado)
     
     def filtrar_productos(self):
-        categoria = self.categoria_combo.currentData()
-        if categoria:
-            productos_filtrados = [p for p in self.productos if p[3] == categoria]
-            self.actualizar_tabla(productos_filtrados)
-        else:
-            self.actualizar_tabla(self.productos)
+        # El filtro por categoría se resuelve en la consulta, desde la primera página
+        try:
+            self.cargar_pagina()
+        except Exception as e:
+            Mensajes.mostrar_error(f"Error filtrando productos: {str(e)}", self)
     
-    def actualizar_tabla(self, productos):
+    def actualizar_tabla(self, productos, agregar=False):
         try:
-            self.table.setRowCount(len(productos))
+            inicio = self.table.rowCount() if agregar else 0
+            self.table.setRowCount(inicio + len(productos))
             
-            for row, producto in enumerate(productos):
-                self.table.setItem(row, 0, QTableWidgetItem(str(producto[0])))
-                self.table.setItem(row, 1, QTableWidgetItem(producto[1]))
-                self.table.setItem(row, 2, QTableWidgetItem(producto[3] or "Sin categoría"))
-                self.table.setItem(row, 3, QTableWidgetItem(producto[12] or "Sin proveedor"))
-                self.table.setItem(row, 4, QTableWidgetItem(f"${producto[4]:.2f}"))
-                self.table.setItem(row, 5, QTableWidgetItem(f"${producto[5]:.2f}"))
+            for row, producto in enumerate(productos, start=inicio):
+                self.table.setItem(row, 0, QTableWidgetItem(str(producto.id)))
+                self.table.setItem(row, 1, QTableWidgetItem(producto.nombre))
+                self.table.setItem(row, 2, QTableWidgetItem(producto.categoria or "Sin categoría"))
+                self.table.setItem(row, 3, QTableWidgetItem(producto.proveedor_nombre or "Sin proveedor"))
+                self.table.setItem(row, 4, QTableWidgetItem(f"${producto.precio_compra:.2f}"))
+                self.table.setItem(row, 5, QTableWidgetItem(f"${producto.precio_venta:.2f}"))
                 
                 # Stock
-                stock_item = QTableWidgetItem(str(producto[6]))
-                if producto[6] <= producto[7]:  # stock <= stock_minimo
+                stock_item = QTableWidgetItem(str(producto.stock))
+                if producto.stock_bajo:
                     stock_item.setBackground(Qt.GlobalColor.red)
                     stock_item.setForeground(Qt.GlobalColor.white)
                 self.table.setItem(row, 6, stock_item)
                 
-                self.table.setItem(row, 7, QTableWidgetItem(producto[8]))
+                self.table.setItem(row, 7, QTableWidgetItem(producto.unidad))
                 
                 # Acciones
                 actions_widget = QWidget()
@@ -132,10 +189,14 @@ class ProductosView(QWidget):
                 btn_editar = QPushButton("Editar")
                 btn_editar.clicked.connect(lambda checked, p=producto: self.editar_producto(p))
                 
+                btn_kardex = QPushButton("Kardex")
+                btn_kardex.clicked.connect(lambda checked, p=producto: self.ver_kardex(p))
+                
                 btn_eliminar = QPushButton("Eliminar")
                 btn_eliminar.clicked.connect(lambda checked, p=producto: self.eliminar_producto(p))
                 
                 actions_layout.addWidget(btn_editar)
+                actions_layout.addWidget(btn_kardex)
                 actions_layout.addWidget(btn_eliminar)
                 actions_widget.setLayout(actions_layout)
                 
@@ -149,19 +210,89 @@ class ProductosView(QWidget):
         if dialog.exec():
             self.cargar_productos()
     
+    def ajuste_masivo(self):
+        try:
+            categorias = ProductoModel.obtener_categorias()
+        except Exception as e:
+            Mensajes.mostrar_error(f"Error cargando categorías: {str(e)}", self)
+            return
+        
+        dialog = AjusteMasivoDialog(self, categorias, self.proveedores)
+        dialog.exec()
+        if dialog.hubo_cambios:
+            self.cargar_productos()
+    
+    def importar_productos(self):
+        ruta_archivo, _ = QFileDialog.getOpenFileName(
+            self, "Importar Productos", "",
+            "Catálogos (*.csv *.jsonl);;CSV (*.csv);;JSON Lines (*.jsonl)"
+        )
+        if not ruta_archivo:
+            return
+        
+        # El total de filas no se conoce sin leer el archivo: progreso indeterminado
+        self.dialogo_progreso = QProgressDialog("Importando productos...", None, 0, 0, self)
+        self.dialogo_progreso.setWindowTitle("Importación")
+        self.dialogo_progreso.setMinimumDuration(0)
+        self.dialogo_progreso.show()
+        
+        progreso = Progreso(self.dialogo_progreso)
+        progreso.avance.connect(
+            lambda leidas, errores: self.dialogo_progreso.setLabelText(
+                f"{leidas} filas procesadas, {errores} con errores"
+            )
+        )
+        
+        resultado = puente_asyncio.ejecutar(
+            ImportacionAsync.importar_productos(ruta_archivo, progreso=progreso.avance.emit), self
+        )
+        resultado.terminado.connect(self.importacion_terminada)
+        resultado.fallido.connect(self.importacion_fallida)
+    
+    def importacion_terminada(self, resultado):
+        self.dialogo_progreso.close()
+        
+        mensaje = resultado.resumen()
+        if resultado.errores:
+            lineas = [f"Línea {linea}: {error}" for linea, error in resultado.errores[:10]]
+            if len(resultado.errores) > 10:
+                lineas.append(f"... y {len(resultado.errores) - 10} más")
+            mensaje += "\n\n" + "\n".join(lineas)
+        Mensajes.mostrar_info(mensaje, self, "Importación terminada")
+        self.cargar_productos()
+    
+    def importacion_fallida(self, error):
+        self.dialogo_progreso.close()
+        Mensajes.mostrar_error(f"Error importando productos: {str(error)}", self)
+    
     def editar_producto(self, producto):
+        # Los listados solo traen las columnas de la tabla; el formulario
+        # necesita el producto completo
+        try:
+            producto = ProductoModel.obtener_producto_por_id(producto.id)
+        except Exception as e:
+            Mensajes.mostrar_error(f"Error cargando producto: {str(e)}", self)
+            return
+        
         dialog = ProductoDialog(self, self.proveedores, producto)
         if dialog.exec():
             self.cargar_productos()
     
+    def ver_kardex(self, producto):
+        dialog = KardexDialog(self, producto)
+        dialog.exec()
+        if dialog.hubo_cambios:
+            self.cargar_productos()
+    
     def eliminar_producto(self, producto):
-        if Mensajes.confirmar(f"¿Está seguro de eliminar el producto {producto[1]}?", self):
-            try:
-                ProductoModel.eliminar_producto(producto[0])
-                Mensajes.mostrar_exito("Producto eliminado correctamente", self)
-                self.cargar_productos()
-            except Exception as e:
-                Mensajes.mostrar_error(str(e), self)
+        if Mensajes.confirmar(f"¿Está seguro de eliminar el producto {producto.nombre}?", self):
+            resultado = ResultadoFuture(ProductoModel.encolar_eliminacion(producto.id), self)
+            resultado.terminado.connect(self.producto_eliminado)
+            resultado.fallido.connect(lambda error: Mensajes.mostrar_error(str(error), self))
+    
+    def producto_eliminado(self, _):
+        Mensajes.mostrar_exito("Producto eliminado correctamente", self)
+        self.cargar_productos()
 
 class ProductoDialog(QDialog):
     def __init__(self, parent=None, proveedores=None, producto=None):
@@ -198,20 +329,26 @@ class ProductoDialog(QDialog):
         self.unidad_input = QLineEdit()
         self.unidad_input.setPlaceholderText("pz, kg, m, etc.")
         
+        self.codigo_input = QLineEdit()
+        self.codigo_input.setPlaceholderText("SKU o código de barras de una pieza")
+        
+        self.presentaciones_input = QLineEdit()
+        self.presentaciones_input.setPlaceholderText("7501234567890 x 12, 7501234567891 x 100")
+        
         self.proveedor_combo = QComboBox()
         self.proveedor_combo.addItem("Sin proveedor", None)
         for proveedor in self.proveedores:
-            self.proveedor_combo.addItem(proveedor[1], proveedor[0])
+            self.proveedor_combo.addItem(proveedor.nombre, proveedor.id)
         
         # Botones
         btn_layout = QHBoxLayout()
-        btn_guardar = QPushButton("Guardar")
+        self.btn_guardar = QPushButton("Guardar")
         btn_cancelar = QPushButton("Cancelar")
         
-        btn_guardar.clicked.connect(self.guardar)
+        self.btn_guardar.clicked.connect(self.guardar)
         btn_cancelar.clicked.connect(self.reject)
         
-        btn_layout.addWidget(btn_guardar)
+        btn_layout.addWidget(self.btn_guardar)
         btn_layout.addWidget(btn_cancelar)
         
         # Agregar campos al layout
@@ -223,22 +360,29 @@ class ProductoDialog(QDialog):
         layout.addRow("Stock *:", self.stock_input)
         layout.addRow("Stock Mínimo:", self.stock_minimo_input)
         layout.addRow("Unidad *:", self.unidad_input)
+        layout.addRow("Código:", self.codigo_input)
+        layout.addRow("Códigos por presentación:", self.presentaciones_input)
         layout.addRow("Proveedor:", self.proveedor_combo)
         layout.addRow(btn_layout)
         
         # Cargar datos si es edición
         if self.producto:
-            self.nombre_input.setText(self.producto[1])
-            self.descripcion_input.setText(self.producto[2] or "")
-            self.categoria_input.setText(self.producto[3] or "")
-            self.precio_compra_input.setValue(self.producto[4])
-            self.precio_venta_input.setValue(self.producto[5])
-            self.stock_input.setValue(self.producto[6])
-            self.stock_minimo_input.setValue(self.producto[7])
-            self.unidad_input.setText(self.producto[8])
+            self.nombre_input.setText(self.producto.nombre)
+            self.descripcion_input.setText(self.producto.descripcion or "")
+            self.categoria_input.setText(self.producto.categoria or "")
+            self.precio_compra_input.setValue(self.producto.precio_compra)
+            self.precio_venta_input.setValue(self.producto.precio_venta)
+            self.stock_input.setValue(self.producto.stock)
+            self.stock_minimo_input.setValue(self.producto.stock_minimo)
+            self.unidad_input.setText(self.producto.unidad)
+            self.codigo_input.setText(self.producto.codigo or "")
+            self.presentaciones_input.setText(", ".join(
+                f"{presentacion.codigo} x {presentacion.cantidad}"
+                for presentacion in CodigoModel.obtener_codigos_barras(self.producto.id)
+            ))
             
             # Seleccionar proveedor
-            index = self.proveedor_combo.findData(self.producto[9])
+            index = self.proveedor_combo.findData(self.producto.proveedor_id)
             if index >= 0:
                 self.proveedor_combo.setCurrentIndex(index)
         
@@ -255,17 +399,289 @@ class ProductoDialog(QDialog):
                 'stock': self.stock_input.value(),
                 'stock_minimo': self.stock_minimo_input.value(),
                 'unidad': self.unidad_input.text().strip(),
-                'proveedor_id': self.proveedor_combo.currentData()
+                'proveedor_id': self.proveedor_combo.currentData(),
+                'codigo': self.codigo_input.text(),
+                'presentaciones': self.leer_presentaciones()
             }
             
             if self.producto:
-                ProductoController.actualizar_producto(self.producto[0], **data)
-                Mensajes.mostrar_exito("Producto actualizado correctamente", self)
+                future = ProductoController.encolar_actualizacion(self.producto.id, **data)
             else:
-                ProductoController.agregar_producto(**data)
-                Mensajes.mostrar_exito("Producto agregado correctamente", self)
-            
-            self.accept()
+                future = ProductoController.encolar_producto(**data)
+        except Exception as e:
+            Mensajes.mostrar_error(str(e), self)
+            return
+        
+        # Se guarda en el hilo escritor; el diálogo se cierra al confirmarse
+        self.btn_guardar.setEnabled(False)
+        resultado = ResultadoFuture(future, self)
+        resultado.terminado.connect(self.guardado)
+        resultado.fallido.connect(self.guardado_fallido)
+    
+    def guardado(self, _):
+        accion = "actualizado" if self.producto else "agregado"
+        Mensajes.mostrar_exito(f"Producto {accion} correctamente", self)
+        self.accept()
+    
+    def guardado_fallido(self, error):
+        self.btn_guardar.setEnabled(True)
+        Mensajes.mostrar_error(str(error), self)
+    
+    def leer_presentaciones(self):
+        """Convierte "código x piezas, ..." en [(código, piezas)]."""
+        presentaciones = []
+        for parte in self.presentaciones_input.text().split(","):
+            if not parte.strip():
+                continue
+            codigo, _, piezas = parte.rpartition("x")
+            try:
+                piezas = int(piezas)
+            except ValueError:
+                piezas = 0
+            if not codigo.strip() or piezas <= 0:
+                raise Exception(f"Presentación inválida: '{parte.strip()}' "
+                                f"(use código x piezas, por ejemplo 7501234567890 x 12)")
+            presentaciones.append((codigo.strip(), piezas))
+        return presentaciones
+
+class AjusteMasivoDialog(QDialog):
+    def __init__(self, parent=None, categorias=None, proveedores=None):
+        super().__init__(parent)
+        self.categorias = categorias or []
+        self.proveedores = proveedores or []
+        self.hubo_cambios = False
+        self.init_ui()
+        self.actualizar_vista_previa()
+    
+    def init_ui(self):
+        self.setWindowTitle("Ajuste Masivo de Productos")
+        self.setModal(True)
+        
+        layout = QFormLayout()
+        
+        # Filtro
+        self.categoria_combo = QComboBox()
+        self.categoria_combo.addItem("Todas las categorías", None)
+        for categoria in self.categorias:
+            self.categoria_combo.addItem(categoria, categoria)
+        
+        self.proveedor_combo = QComboBox()
+        self.proveedor_combo.addItem("Todos los proveedores", None)
+        for proveedor in self.proveedores:
+            self.proveedor_combo.addItem(proveedor.nombre, proveedor.id)
+        
+        self.categoria_combo.currentIndexChanged.connect(self.actualizar_vista_previa)
+        self.proveedor_combo.currentIndexChanged.connect(self.actualizar_vista_previa)
+        
+        # Ajuste
+        self.tipo_combo = QComboBox()
+        for tipo, (descripcion, _) in AjusteMasivoModel.TIPOS.items():
+            self.tipo_combo.addItem(descripcion, tipo)
+        
+        self.valor_input = QDoubleSpinBox()
+        self.valor_input.setRange(-999999.99, 999999.99)
+        
+        self.vista_previa_label = QLabel()
+        
+        # Botones
+        btn_layout = QHBoxLayout()
+        self.btn_aplicar = QPushButton("Aplicar")
+        self.btn_deshacer = QPushButton("Deshacer último ajuste")
+        btn_cerrar = QPushButton("Cerrar")
+        
+        self.btn_aplicar.clicked.connect(self.aplicar)
+        self.btn_deshacer.clicked.connect(self.deshacer)
+        btn_cerrar.clicked.connect(self.reject)
+        
+        btn_layout.addWidget(self.btn_aplicar)
+        btn_layout.addWidget(self.btn_deshacer)
+        btn_layout.addWidget(btn_cerrar)
+        
+        layout.addRow("Categoría:", self.categoria_combo)
+        layout.addRow("Proveedor:", self.proveedor_combo)
+        layout.addRow("Ajuste:", self.tipo_combo)
+        layout.addRow("Valor:", self.valor_input)
+        layout.addRow(self.vista_previa_label)
+        layout.addRow(btn_layout)
+        
+        self.setLayout(layout)
+    
+    def actualizar_vista_previa(self):
+        try:
+            cantidad = AjusteMasivoModel.contar_productos(
+                self.categoria_combo.currentData(), self.proveedor_combo.currentData()
+            )
+            self.vista_previa_label.setText(f"Productos afectados: {cantidad}")
+        except Exception as e:
+            self.vista_previa_label.setText(f"Error: {str(e)}")
+    
+    def aplicar(self):
+        descripcion = self.tipo_combo.currentText()
+        valor = self.valor_input.value()
+        if not Mensajes.confirmar(
+            f"¿Aplicar \"{descripcion}\" con valor {valor} a los productos seleccionados?\n"
+            f"{self.vista_previa_label.text()}", self
+        ):
+            return
+        
+        try:
+            future = AjusteMasivoModel.encolar_ajuste(
+                self.tipo_combo.currentData(), valor,
+                self.categoria_combo.currentData(), self.proveedor_combo.currentData()
+            )
+        except Exception as e:
+            Mensajes.mostrar_error(str(e), self)
+            return
+        self.esperar(future, "Ajuste aplicado correctamente")
+    
+    def deshacer(self):
+        try:
+            ajuste = AjusteMasivoModel.obtener_ultimo_ajuste()
+            if ajuste is None:
+                Mensajes.mostrar_info("No hay ajustes para deshacer.", self)
+                return
             
+            descripcion = AjusteMasivoModel.TIPOS[ajuste.tipo][0]
+            if Mensajes.confirmar(
+                f"¿Deshacer \"{descripcion}\" ({ajuste.valor}) del {ajuste.fecha}, "
+                f"que afectó {ajuste.productos_afectados} productos?", self
+            ):
+                self.esperar(AjusteMasivoModel.encolar_deshacer(),
+                             "Ajuste deshecho correctamente")
         except Exception as e:
-            Mensajes.mostrar_error(str(e), self)
\ No newline at end of file
+            Mensajes.mostrar_error(str(e), self)
+    
+    def esperar(self, future, mensaje):
+        # Un ajuste a la vez: los botones vuelven cuando el escritor termina
+        self.bloquear(True)
+        resultado = ResultadoFuture(future, self)
+        resultado.terminado.connect(lambda _: self.ajuste_terminado(mensaje))
+        resultado.fallido.connect(self.ajuste_fallido)
+    
+    def bloquear(self, bloqueado):
+        self.btn_aplicar.setEnabled(not bloqueado)
+        self.btn_deshacer.setEnabled(not bloqueado)
+    
+    def ajuste_terminado(self, mensaje):
+        self.bloquear(False)
+        self.hubo_cambios = True
+        Mensajes.mostrar_exito(mensaje, self)
+        self.actualizar_vista_previa()
+    
+    def ajuste_fallido(self, error):
+        self.bloquear(False)
+        Mensajes.mostrar_error(str(error), self)
+
+class KardexDialog(QDialog):
+    def __init__(self, parent=None, producto=None):
+        super().__init__(parent)
+        self.producto = producto
+        self.hubo_cambios = False
+        self.init_ui()
+        self.cargar_movimientos()
+    
+    def init_ui(self):
+        self.setWindowTitle(f"Kardex - {self.producto.nombre}")
+        self.setModal(True)
+        self.resize(700, 500)
+        
+        layout = QVBoxLayout()
+        
+        # Stock en una fecha
+        fecha_layout = QHBoxLayout()
+        self.fecha_input = QDateEdit()
+        self.fecha_input.setCalendarPopup(True)
+        self.fecha_input.setDate(QDate.currentDate())
+        self.fecha_input.dateChanged.connect(self.actualizar_stock_en_fecha)
+        self.stock_fecha_label = QLabel()
+        
+        fecha_layout.addWidget(QLabel("Stock al cierre del:"))
+        fecha_layout.addWidget(self.fecha_input)
+        fecha_layout.addWidget(self.stock_fecha_label)
+        fecha_layout.addStretch()
+        
+        # Movimientos
+        self.table = QTableWidget()
+        self.table.setColumnCount(5)
+        self.table.setHorizontalHeaderLabels(["Fecha", "Movimiento", "Cantidad", "Saldo", "Nota"])
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        
+        # Entrada de mercancía
+        entrada_layout = QHBoxLayout()
+        self.entrada_input = QSpinBox()
+        self.entrada_input.setRange(1, 999999)
+        self.nota_input = QLineEdit()
+        self.nota_input.setPlaceholderText("Factura, remisión... (opcional)")
+        self.btn_entrada = QPushButton("Registrar entrada")
+        self.btn_entrada.clicked.connect(self.registrar_entrada)
+        
+        entrada_layout.addWidget(QLabel("Entrada:"))
+        entrada_layout.addWidget(self.entrada_input)
+        entrada_layout.addWidget(self.nota_input)
+        entrada_layout.addWidget(self.btn_entrada)
+        
+        btn_cerrar = QPushButton("Cerrar")
+        btn_cerrar.clicked.connect(self.accept)
+        
+        layout.addLayout(fecha_layout)
+        layout.addWidget(self.table)
+        layout.addLayout(entrada_layout)
+        layout.addWidget(btn_cerrar)
+        
+        self.setLayout(layout)
+    
+    def cargar_movimientos(self):
+        try:
+            movimientos = KardexModel.obtener_movimientos(self.producto.id)
+        except Exception as e:
+            Mensajes.mostrar_error(f"Error cargando movimientos: {str(e)}", self)
+            return
+        
+        self.table.setRowCount(len(movimientos))
+        for row, movimiento in enumerate(movimientos):
+            self.table.setItem(row, 0, QTableWidgetItem(movimiento.fecha))
+            tipo = KardexModel.TIPOS.get(movimiento.tipo, movimiento.tipo)
+            if movimiento.referencia is not None:
+                tipo += f" #{movimiento.referencia}"
+            self.table.setItem(row, 1, QTableWidgetItem(tipo))
+            self.table.setItem(row, 2, QTableWidgetItem(f"{movimiento.cantidad:+d}"))
+            self.table.setItem(row, 3, QTableWidgetItem(str(movimiento.saldo)))
+            self.table.setItem(row, 4, QTableWidgetItem(movimiento.nota or ""))
+        
+        self.actualizar_stock_en_fecha()
+    
+    def actualizar_stock_en_fecha(self):
+        fecha = self.fecha_input.date().toString("yyyy-MM-dd")
+        try:
+            stock = KardexModel.stock_en_fecha(self.producto.id, fecha)
+        except Exception as e:
+            self.stock_fecha_label.setText(f"Error: {str(e)}")
+            return
+        
+        if stock is None:
+            self.stock_fecha_label.setText("Sin historial para esa fecha")
+        else:
+            self.stock_fecha_label.setText(f"{stock} {self.producto.unidad}")
+    
+    def registrar_entrada(self):
+        try:
+            future = KardexModel.encolar_entrada(self.producto.id, self.entrada_input.value(),
+                                                 self.nota_input.text().strip() or None)
+        except Exception as e:
+            Mensajes.mostrar_error(str(e), self)
+            return
+        
+        self.btn_entrada.setEnabled(False)
+        resultado = ResultadoFuture(future, self)
+        resultado.terminado.connect(self.entrada_registrada)
+        resultado.fallido.connect(self.entrada_fallida)
+    
+    def entrada_registrada(self, _):
+        self.btn_entrada.setEnabled(True)
+        self.hubo_cambios = True
+        self.nota_input.clear()
+        self.cargar_movimientos()
+    
+    def entrada_fallida(self, error):
+        self.btn_entrada.setEnabled(True)
+        Mensajes.mostrar_error(str(error), self)
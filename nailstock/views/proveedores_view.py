@@ -6,10 +6,12 @@ from PyQt6.QtCore import Qt
 from ..models.proveedor_model import ProveedorModel
 from ..controllers.proveedor_controller import ProveedorController
 from ..utils.mensajes import Mensajes
+from ..utils.hilos import ResultadoFuture
 
 class ProveedoresView(QWidget):
     def __init__(self):
         super().__init__()
+        self.siguiente = None
         self.init_ui()
         self.cargar_proveedores()
     
@@ -41,36 +43,52 @@ class ProveedoresView(QWidget):
         header = self.table.horizontalHeader()
         header.setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
         
+        # Los proveedores se cargan por páginas
+        self.btn_mas = QPushButton("Cargar más")
+        self.btn_mas.clicked.connect(self.cargar_mas)
+        
         layout.addLayout(search_layout)
         layout.addWidget(self.table)
+        layout.addWidget(self.btn_mas)
         
         self.setLayout(layout)
     
-    def cargar_proveedores(self):
-        proveedores = ProveedorModel.obtener_proveedores()
-        self.actualizar_tabla(proveedores)
+    def cargar_proveedores(self, token=None):
+        """Carga la primera página (token=None) o agrega la siguiente a la tabla"""
+        pagina = ProveedorModel.obtener_proveedores_pagina(token)
+        self.siguiente = pagina.siguiente
+        self.actualizar_tabla(pagina.filas, agregar=token is not None)
+        self.btn_mas.setEnabled(self.siguiente is not None)
+    
+    def cargar_mas(self):
+        try:
+            self.cargar_proveedores(self.siguiente)
+        except Exception as e:
+            Mensajes.mostrar_error(f"Error cargando proveedores: {str(e)}", self)
     
     def buscar_proveedores(self):
         termino = self.search_input.text().strip()
         if termino:
             proveedores = ProveedorController.buscar_proveedores(termino)
             self.actualizar_tabla(proveedores)
+            self.btn_mas.setEnabled(False)
         else:
             self.cargar_proveedores()
     
-    def actualizar_tabla(self, proveedores):
-        self.table.setRowCount(len(proveedores))
-        
-        for row, proveedor in enumerate(proveedores):
-            self.table.setItem(row, 0, QTableWidgetItem(str(proveedor[0])))
-            self.table.setItem(row, 1, QTableWidgetItem(proveedor[1]))
-            self.table.setItem(row, 2, QTableWidgetItem(proveedor[2] or ""))
-            self.table.setItem(row, 3, QTableWidgetItem(proveedor[3] or ""))
-            self.table.setItem(row, 4, QTableWidgetItem(proveedor[4] or ""))
-            self.table.setItem(row, 5, QTableWidgetItem(proveedor[5] or ""))
+    def actualizar_tabla(self, proveedores, agregar=False):
+        inicio = self.table.rowCount() if agregar else 0
+        self.table.setRowCount(inicio + len(proveedores))
+        
+        for row, proveedor in enumerate(proveedores, start=inicio):
+            self.table.setItem(row, 0, QTableWidgetItem(str(proveedor.id)))
+            self.table.setItem(row, 1, QTableWidgetItem(proveedor.nombre))
+            self.table.setItem(row, 2, QTableWidgetItem(proveedor.telefono or ""))
+            self.table.setItem(row, 3, QTableWidgetItem(proveedor.direccion or ""))
+            self.table.setItem(row, 4, QTableWidgetItem(proveedor.correo or ""))
+            self.table.setItem(row, 5, QTableWidgetItem(proveedor.rfc or ""))
             
             # Observaciones (truncadas)
-            observaciones = proveedor[6] or ""
+            observaciones = proveedor.observaciones or ""
             if len(observaciones) > 50:
                 observaciones = observaciones[:50] + "..."
             self.table.setItem(row, 6, QTableWidgetItem(observaciones))
@@ -103,13 +121,14 @@ class ProveedoresView(QWidget):
             self.cargar_proveedores()
     
     def eliminar_proveedor(self, proveedor):
-        if Mensajes.confirmar(f"¿Está seguro de eliminar al proveedor {proveedor[1]}?", self):
-            try:
-                ProveedorModel.eliminar_proveedor(proveedor[0])
-                Mensajes.mostrar_exito("Proveedor eliminado correctamente", self)
-                self.cargar_proveedores()
-            except Exception as e:
-                Mensajes.mostrar_error(str(e), self)
+        if Mensajes.confirmar(f"¿Está seguro de eliminar al proveedor {proveedor.nombre}?", self):
+            resultado = ResultadoFuture(ProveedorModel.encolar_eliminacion(proveedor.id), self)
+            resultado.terminado.connect(self.proveedor_eliminado)
+            resultado.fallido.connect(lambda error: Mensajes.mostrar_error(str(error), self))
+    
+    def proveedor_eliminado(self, _):
+        Mensajes.mostrar_exito("Proveedor eliminado correctamente", self)
+        self.cargar_proveedores()
 
 class ProveedorDialog(QDialog):
     def __init__(self, parent=None, proveedor=None):
@@ -135,13 +154,13 @@ class ProveedorDialog(QDialog):
         
         # Botones
         btn_layout = QHBoxLayout()
-        btn_guardar = QPushButton("Guardar")
+        self.btn_guardar = QPushButton("Guardar")
         btn_cancelar = QPushButton("Cancelar")
         
-        btn_guardar.clicked.connect(self.guardar)
+        self.btn_guardar.clicked.connect(self.guardar)
         btn_cancelar.clicked.connect(self.reject)
         
-        btn_layout.addWidget(btn_guardar)
+        btn_layout.addWidget(self.btn_guardar)
         btn_layout.addWidget(btn_cancelar)
         
         # Agregar campos al layout
@@ -155,12 +174,12 @@ class ProveedorDialog(QDialog):
         
         # Cargar datos si es edición
         if self.proveedor:
-            self.nombre_input.setText(self.proveedor[1])
-            self.telefono_input.setText(self.proveedor[2] or "")
-            self.direccion_input.setText(self.proveedor[3] or "")
-            self.correo_input.setText(self.proveedor[4] or "")
-            self.rfc_input.setText(self.proveedor[5] or "")
-            self.observaciones_input.setText(self.proveedor[6] or "")
+            self.nombre_input.setText(self.proveedor.nombre)
+            self.telefono_input.setText(self.proveedor.telefono or "")
+            self.direccion_input.setText(self.proveedor.direccion or "")
+            self.correo_input.setText(self.proveedor.correo or "")
+            self.rfc_input.setText(self.proveedor.rfc or "")
+            self.observaciones_input.setText(self.proveedor.observaciones or "")
         
         self.setLayout(layout)
     
@@ -176,13 +195,24 @@ class ProveedorDialog(QDialog):
             }
             
             if self.proveedor:
-                ProveedorController.actualizar_proveedor(self.proveedor[0], **data)
-                Mensajes.mostrar_exito("Proveedor actualizado correctamente", self)
+                future = ProveedorController.encolar_actualizacion(self.proveedor.id, **data)
             else:
-                ProveedorController.agregar_proveedor(**data)
-                Mensajes.mostrar_exito("Proveedor agregado correctamente", self)
-            
-            self.accept()
-            
+                future = ProveedorController.encolar_proveedor(**data)
         except Exception as e:
-            Mensajes.mostrar_error(str(e), self)
\ No newline at end of file
+            Mensajes.mostrar_error(str(e), self)
+            return
+        
+        # Se guarda en el hilo escritor; el diálogo se cierra al confirmarse
+        self.btn_guardar.setEnabled(False)
+        resultado = ResultadoFuture(future, self)
+        resultado.terminado.connect(self.guardado)
+        resultado.fallido.connect(self.guardado_fallido)
+    
+    def guardado(self, _):
+        accion = "actualizado" if self.proveedor else "agregado"
+        Mensajes.mostrar_exito(f"Proveedor {accion} correctamente", self)
+        self.accept()
+    
+    def guardado_fallido(self, error):
+        self.btn_guardar.setEnabled(True)
+        Mensajes.mostrar_error(str(error), self)
\ No newline at end of file
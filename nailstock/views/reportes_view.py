@@ -6,6 +6,8 @@ from PyQt6.QtCore import QDate, Qt
 from datetime import datetime
 from ..utils.reportes import Reportes
 from ..utils.mensajes import Mensajes
+from ..utils.hilos import puente_asyncio
+from ..models.asincrono import ReportesAsync
 
 class ReportesView(QWidget):
     def __init__(self): #Constructor de la vista de reportes.
@@ -124,12 +126,22 @@ class ReportesView(QWidget):
             Mensajes.mostrar_error(f"Error al exportar clientes: {str(e)}", self)
     
     def generar_reporte_ventas(self):   #generar un reporte completo de ventas para un período definido
+        fecha_inicio = self.fecha_inicio.date().toString('yyyy-MM-dd')
+        fecha_fin = self.fecha_fin.date().toString('yyyy-MM-dd')
+        
+        # El reporte se calcula en segundo plano; la ventana sigue respondiendo
+        resultado = puente_asyncio.ejecutar(
+            ReportesAsync.generar_reporte_ventas_por_periodo(fecha_inicio, fecha_fin), self
+        )
+        resultado.terminado.connect(
+            lambda reporte: self.mostrar_reporte_ventas(reporte, fecha_inicio, fecha_fin)
+        )
+        resultado.fallido.connect(
+            lambda e: Mensajes.mostrar_error(f"Error al generar reporte: {str(e)}", self)
+        )
+    
+    def mostrar_reporte_ventas(self, reporte, fecha_inicio, fecha_fin):   #mostrar las estadísticas y productos populares de un reporte ya calculado
         try:
-            fecha_inicio = self.fecha_inicio.date().toString('yyyy-MM-dd')
-            fecha_fin = self.fecha_fin.date().toString('yyyy-MM-dd')
-            
-            reporte = Reportes.generar_reporte_ventas_por_periodo(fecha_inicio, fecha_fin)
-            
             # Mostrar estadísticas
             estadisticas = reporte['estadisticas']
             mensaje = f"""
@@ -148,11 +160,22 @@ class ReportesView(QWidget):
             Mensajes.mostrar_exito(mensaje, self)
         
         except Exception as e:
-            Mensajes.mostrar_error(f"Error al generar reporte: {str(e)}", self)
+            Mensajes.mostrar_error(f"Error al mostrar reporte: {str(e)}", self)
     
     def generar_reporte_stock(self):    #generar un análisis del stock actual.
+        resultado = puente_asyncio.ejecutar(ReportesAsync.generar_reporte_stock(), self)
+        resultado.terminado.connect(self.mostrar_reporte_stock)
+        resultado.fallido.connect(
+            lambda e: Mensajes.mostrar_error(f"Error al generar reporte: {str(e)}", self)
+        )
+    
+    def mostrar_reporte_stock(self, reporte):    #mostrar el análisis de stock ya calculado.
         try:
-            reporte = Reportes.generar_reporte_stock()
+            # Categorías con más valor en inventario
+            categorias = "\n".join(
+                f"                {fila.categoria or 'Sin categoría'}: ${fila.valor:,.2f}"
+                for fila in reporte['valor_por_categoria'][:5]
+            )
             
             # Mostrar productos con stock bajo
             stock_bajo = reporte['stock_bajo']
@@ -164,6 +187,7 @@ class ReportesView(QWidget):
                 
                 Productos con stock bajo: {len(stock_bajo)}
                 Valor total del inventario: ${reporte['valor_inventario']:,.2f}
+{categorias}
                 
                 Se recomienda reabastecer los productos marcados.
                 """
@@ -173,12 +197,13 @@ class ReportesView(QWidget):
                 
                 ¡Excelente! No hay productos con stock bajo.
                 Valor total del inventario: ${reporte['valor_inventario']:,.2f}
+{categorias}
                 """
             
             Mensajes.mostrar_exito(mensaje, self)
         
         except Exception as e:
-            Mensajes.mostrar_error(f"Error al generar reporte: {str(e)}", self)
+            Mensajes.mostrar_error(f"Error al mostrar reporte: {str(e)}", self)
     
     def mostrar_productos_populares(self, productos):   #mostrar en la tabla los productos más vendidos junto a sus métricas.
         self.table_resultados.setColumnCount(4)
@@ -189,10 +214,10 @@ class ReportesView(QWidget):
         self.table_resultados.setRowCount(len(productos))
         
         for row, producto in enumerate(productos):
-            self.table_resultados.setItem(row, 0, QTableWidgetItem(producto[0]))
-            self.table_resultados.setItem(row, 1, QTableWidgetItem(str(producto[1])))
-            self.table_resultados.setItem(row, 2, QTableWidgetItem(f"${producto[2]:.2f}"))
-            promedio = producto[2] / producto[1] if producto[1] > 0 else 0
+            self.table_resultados.setItem(row, 0, QTableWidgetItem(producto.nombre))
+            self.table_resultados.setItem(row, 1, QTableWidgetItem(str(producto.total_vendido)))
+            self.table_resultados.setItem(row, 2, QTableWidgetItem(f"${producto.ingresos:.2f}"))
+            promedio = producto.ingresos / producto.total_vendido if producto.total_vendido > 0 else 0
             self.table_resultados.setItem(row, 3, QTableWidgetItem(f"${promedio:.2f}"))
         
         header = self.table_resultados.horizontalHeader()
@@ -207,18 +232,18 @@ class ReportesView(QWidget):
         self.table_resultados.setRowCount(len(productos))
         
         for row, producto in enumerate(productos):
-            self.table_resultados.setItem(row, 0, QTableWidgetItem(producto[0]))
+            self.table_resultados.setItem(row, 0, QTableWidgetItem(producto.nombre))
             
-            stock_item = QTableWidgetItem(str(producto[1]))
-            if producto[1] == 0:
+            stock_item = QTableWidgetItem(str(producto.stock))
+            if producto.stock == 0:
                 stock_item.setBackground(Qt.GlobalColor.red)
                 stock_item.setForeground(Qt.GlobalColor.white)
-            elif producto[1] < producto[2]:
+            elif producto.stock < producto.stock_minimo:
                 stock_item.setBackground(Qt.GlobalColor.yellow)
             self.table_resultados.setItem(row, 1, stock_item)
             
-            self.table_resultados.setItem(row, 2, QTableWidgetItem(str(producto[2])))
-            self.table_resultados.setItem(row, 3, QTableWidgetItem(producto[3]))
+            self.table_resultados.setItem(row, 2, QTableWidgetItem(str(producto.stock_minimo)))
+            self.table_resultados.setItem(row, 3, QTableWidgetItem(producto.unidad))
         
         header = self.table_resultados.horizontalHeader()
         header.setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
\ No newline at end of file
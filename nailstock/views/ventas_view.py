@@ -1,18 +1,22 @@
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QTableWidget, 
                              QTableWidgetItem, QPushButton, QComboBox, QSpinBox,
-                             QHeaderView, QMessageBox, QLabel)
+                             QHeaderView, QMessageBox, QLabel, QLineEdit)
 from ..models.cliente_model import ClienteModel
 from ..models.producto_model import ProductoModel
+from ..models.reserva_model import ReservaModel
+from ..models.codigo_model import CodigoModel
 from ..controllers.venta_controller import VentaController
 from ..utils.mensajes import Mensajes
+from ..utils.hilos import ResultadoFuture
 
 class VentasView(QWidget):
     def __init__(self):
         super().__init__()
         self.productos_venta = []
+        self.productos = []
+        self.reservas_pendientes = 0
         self.init_ui()
         self.cargar_clientes()
-        self.cargar_productos()
     
     def init_ui(self):
         layout = QVBoxLayout()
@@ -25,6 +29,15 @@ class VentasView(QWidget):
         cliente_layout.addWidget(self.cliente_combo)
         cliente_layout.addStretch()
         
+        # Escáner: el lector teclea el código y un Enter, cada lectura es
+        # una línea (o una pieza más) en la venta
+        cliente_layout.addWidget(QLabel("Código:"))
+        self.codigo_input = QLineEdit()
+        self.codigo_input.setPlaceholderText("Escanear código...")
+        self.codigo_input.setFixedWidth(220)
+        self.codigo_input.returnPressed.connect(self.escanear)
+        cliente_layout.addWidget(self.codigo_input)
+        
         # Tabla de productos en venta
         self.table_venta = QTableWidget()
         self.table_venta.setColumnCount(6)
@@ -70,18 +83,75 @@ class VentasView(QWidget):
         self.cliente_combo.clear()
         self.cliente_combo.addItem("Seleccionar cliente...", None)
         for cliente in clientes:
-            self.cliente_combo.addItem(cliente[1], cliente[0])
+            self.cliente_combo.addItem(cliente.nombre, cliente.id)
 
     def cargar_productos(self):
-        self.productos = ProductoModel.obtener_productos()
+        # Stock disponible: sin lo reservado por los carritos abiertos
+        self.productos = ReservaModel.obtener_productos_disponibles()
+        # Lo que otra terminal agregó o renombró también se encuentra en el diálogo
+        ProductoModel.sincronizar_indice_nombres(
+            [(producto.id, producto.nombre) for producto in self.productos]
+        )
 
     def mostrar_dialogo_productos(self):
+        # Se leen al abrir el diálogo, con lo reservado hasta ese momento;
+        # las lecturas del escáner no recargan la lista
+        self.cargar_productos()
         dialog = SeleccionProductoDialog(self, self.productos)
         if dialog.exec():
             producto_data = dialog.get_selected_producto()
             self.agregar_producto_venta(producto_data)
 
+    def escanear(self):
+        codigo = self.codigo_input.text().strip()
+        self.codigo_input.clear()
+        if not codigo:
+            return
+        try:
+            producto = CodigoModel.producto_por_codigo(codigo)
+        except Exception as e:
+            Mensajes.mostrar_error(f"Error buscando el código: {str(e)}", self)
+            return
+        if producto is None:
+            Mensajes.mostrar_error(f"No hay un producto con el código {codigo}", self)
+        else:
+            # La presentación (caja de 12...) trae sus piezas
+            self.agregar_producto_venta({
+                'producto_id': producto.id,
+                'nombre': producto.nombre,
+                'precio_unitario': producto.precio_venta,
+                'cantidad': producto.cantidad,
+                'subtotal': producto.cantidad * producto.precio_venta
+            })
+        self.codigo_input.setFocus()
+
     def agregar_producto_venta(self, producto_data):
+        # Reservar el stock mientras el carrito esté abierto. La reserva se
+        # encola en el escritor y la línea aparece cuando termina: la caja
+        # sigue escaneando aunque el escritor esté ocupado (importación)
+        future = ReservaModel.encolar_reserva(producto_data['producto_id'],
+                                              producto_data['cantidad'])
+        self.reservas_pendientes += 1
+        self.btn_registrar_venta.setEnabled(False)
+
+        resultado = ResultadoFuture(future, self)
+        resultado.terminado.connect(lambda _: self.reserva_hecha(producto_data))
+        resultado.fallido.connect(self.reserva_fallida)
+
+    def reserva_terminada(self):
+        # La venta espera a las reservas en curso: la línea todavía no está
+        # en el carrito y la venta liberaría su reserva
+        self.reservas_pendientes -= 1
+        if not self.reservas_pendientes:
+            self.btn_registrar_venta.setEnabled(True)
+
+    def reserva_fallida(self, error):
+        self.reserva_terminada()
+        Mensajes.mostrar_error(str(error), self)
+
+    def reserva_hecha(self, producto_data):
+        self.reserva_terminada()
+
         # Verificar si el producto ya está en la venta
         for i, prod in enumerate(self.productos_venta):
             if prod['producto_id'] == producto_data['producto_id']:
@@ -126,15 +196,46 @@ class VentasView(QWidget):
 
     def actualizar_cantidad(self, row, cantidad):
         if 0 <= row < len(self.productos_venta):
-            self.productos_venta[row]['cantidad'] = cantidad
-            self.productos_venta[row]['subtotal'] = (
-                    cantidad * self.productos_venta[row]['precio_unitario']
+            producto = self.productos_venta[row]
+            diferencia = cantidad - producto['cantidad']
+            if not diferencia:
+                return
+            if diferencia > 0:
+                future = ReservaModel.encolar_reserva(producto['producto_id'], diferencia)
+            else:
+                future = ReservaModel.encolar_liberacion(producto['producto_id'], -diferencia)
+
+            # La cantidad cambia ya (cada paso del QSpinBox parte de la
+            # anterior); si la reserva falla se devuelve
+            self.cambiar_cantidad(producto, cantidad)
+            self.table_venta.setItem(row, 4, QTableWidgetItem(f"${producto['subtotal']:.2f}"))
+            self.actualizar_total()
+
+            resultado = ResultadoFuture(future, self)
+            resultado.fallido.connect(
+                lambda error: self.cantidad_fallida(producto, diferencia, error)
             )
+
+    def cambiar_cantidad(self, producto, cantidad):
+        producto['cantidad'] = cantidad
+        producto['subtotal'] = cantidad * producto['precio_unitario']
+
+    def cantidad_fallida(self, producto, diferencia, error):
+        Mensajes.mostrar_error(str(error), self)
+        if any(linea is producto for linea in self.productos_venta):
+            # Volver a mostrar la cantidad que sí está reservada
+            self.cambiar_cantidad(producto, producto['cantidad'] - diferencia)
             self.actualizar_tabla_venta()
 
     def eliminar_producto_venta(self, row):
         if 0 <= row < len(self.productos_venta):
-            self.productos_venta.pop(row)
+            producto = self.productos_venta.pop(row)
+            future = ReservaModel.encolar_liberacion(producto['producto_id'], producto['cantidad'])
+            # La reserva vence sola; un error no impide quitar la línea
+            resultado = ResultadoFuture(future, self)
+            resultado.fallido.connect(lambda error: Mensajes.mostrar_error(
+                f"No se pudo liberar la reserva: {str(error)}", self
+            ))
             self.actualizar_tabla_venta()
 
     def actualizar_total(self):
@@ -152,26 +253,45 @@ class VentasView(QWidget):
             Mensajes.mostrar_error("Debe agregar al menos un producto a la venta", self)
             return
 
-        try:
-            venta_id = VentaController.registrar_venta(
-                cliente_id, self.productos_venta
-            )
-
-            Mensajes.mostrar_exito(f"Venta registrada correctamente. ID: {venta_id}", self)
-
-            # Limpiar venta
-            self.productos_venta.clear()
-            self.actualizar_tabla_venta()
-            self.cliente_combo.setCurrentIndex(0)
+        # La venta se registra en el hilo escritor; la interfaz sigue
+        # respondiendo y el resultado llega por señal
+        self.bloquear_carrito(True)
+        future = VentaController.encolar_venta(cliente_id, self.productos_venta)
+
+        resultado = ResultadoFuture(future, self)
+        resultado.terminado.connect(self.venta_registrada)
+        resultado.fallido.connect(self.venta_fallida)
+
+    def bloquear_carrito(self, bloqueado):
+        # Mientras la venta está en el escritor el carrito no cambia: al
+        # registrarse se vacía y se liberan todas las reservas de la
+        # terminal, también las de una línea agregada mientras tanto
+        for control in (self.cliente_combo, self.codigo_input, self.table_venta,
+                        self.btn_agregar_producto):
+            control.setEnabled(not bloqueado)
+        self.btn_registrar_venta.setEnabled(not bloqueado and not self.reservas_pendientes)
+        if not bloqueado:
+            self.codigo_input.setFocus()
+
+    def venta_registrada(self, venta_id):
+        self.bloquear_carrito(False)
+        Mensajes.mostrar_exito(f"Venta registrada correctamente. ID: {venta_id}", self)
+
+        # Limpiar venta
+        self.productos_venta.clear()
+        self.actualizar_tabla_venta()
+        self.cliente_combo.setCurrentIndex(0)
 
-        except Exception as e:
-            Mensajes.mostrar_error(str(e), self)
+    def venta_fallida(self, error):
+        self.bloquear_carrito(False)
+        Mensajes.mostrar_error(str(error), self)
 
 
 class SeleccionProductoDialog(QMessageBox):
     def __init__(self, parent, productos):
         super().__init__(parent)
         self.productos = productos
+        self.productos_por_id = {producto.id: producto for producto in productos}
         self.selected_producto = None
         self.init_ui()
 
@@ -182,12 +302,14 @@ class SeleccionProductoDialog(QMessageBox):
         widget = QWidget()
         layout = QVBoxLayout()
 
+        # Búsqueda tolerante a errores de escritura ("dezarmador")
+        self.buscar_input = QLineEdit()
+        self.buscar_input.setPlaceholderText("Buscar producto...")
+        self.buscar_input.textChanged.connect(self.filtrar_productos)
+
         # Combo de productos
         self.producto_combo = QComboBox()
-        for producto in self.productos:
-            if producto[6] > 0:  # Solo productos con stock
-                text = f"{producto[1]} - ${producto[5]:.2f} (Stock: {producto[6]})"
-                self.producto_combo.addItem(text, producto[0])
+        self.llenar_combo(self.productos)
 
         # Cantidad
         self.cantidad_spin = QSpinBox()
@@ -206,6 +328,7 @@ class SeleccionProductoDialog(QMessageBox):
         btn_layout.addWidget(btn_cancelar)
 
         layout.addWidget(QLabel("Producto:"))
+        layout.addWidget(self.buscar_input)
         layout.addWidget(self.producto_combo)
         layout.addWidget(QLabel("Cantidad:"))
         layout.addWidget(self.cantidad_spin)
@@ -214,22 +337,44 @@ class SeleccionProductoDialog(QMessageBox):
         widget.setLayout(layout)
         self.layout().addWidget(widget, 0, 0)
 
+    def llenar_combo(self, productos):
+        self.producto_combo.clear()
+        for producto in productos:
+            if producto.disponible > 0:  # Solo productos con stock disponible
+                text = (f"{producto.nombre} - ${producto.precio_venta:.2f} "
+                        f"(Disponible: {producto.disponible} de {producto.stock})")
+                self.producto_combo.addItem(text, producto.id)
+
+    def filtrar_productos(self, texto):
+        texto = texto.strip()
+        if not texto:
+            self.llenar_combo(self.productos)
+            return
+
+        # Los más parecidos primero; el índice está en memoria, no consulta la base
+        try:
+            parecidos = ProductoModel.buscar_parecidos(texto)
+        except Exception as e:
+            Mensajes.mostrar_error(f"Error buscando productos: {str(e)}", self)
+            return
+        orden = {producto_id: i for i, (producto_id, _) in enumerate(parecidos)}
+        encontrados = sorted((p for p in self.productos if p.id in orden),
+                             key=lambda p: orden[p.id])
+        self.llenar_combo(encontrados)
+
     def aceptar(self):
         producto_id = self.producto_combo.currentData()
         cantidad = self.cantidad_spin.value()
 
         if producto_id:
-            # Buscar producto seleccionado
-            for producto in self.productos:
-                if producto[0] == producto_id:
-                    self.selected_producto = {
-                        'producto_id': producto_id,
-                        'nombre': producto[1],
-                        'precio_unitario': producto[5],
-                        'cantidad': cantidad,
-                        'subtotal': cantidad * producto[5]
-                    }
-                    break
+            producto = self.productos_por_id[producto_id]
+            self.selected_producto = {
+                'producto_id': producto_id,
+                'nombre': producto.nombre,
+                'precio_unitario': producto.precio_venta,
+                'cantidad': cantidad,
+                'subtotal': cantidad * producto.precio_venta
+            }
             
             self.accept()
     
@@ -0,0 +1,24 @@
+import os
+
+import pytest
+
+
+@pytest.fixture(scope="session")
+def base(tmp_path_factory):
+    """
+    La base global de la aplicación (database/nailstock.db relativa al
+    directorio actual), nueva y migrada a la última versión. Importar
+    db_connection la abre: se importa desde un directorio temporal para no
+    tocar la base del proyecto.
+    """
+    anterior = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp("nailstock"))
+    try:
+        from nailstock.database.db_connection import get_db, resource_path
+        from nailstock.database.migraciones import listar_migraciones
+
+        db = get_db()
+        assert db.schema_version == listar_migraciones(resource_path("migrations"))[-1][0]
+        yield db
+    finally:
+        os.chdir(anterior)
@@ -0,0 +1,9 @@
+from nailstock.models.filas import ProductoEncontrado
+
+
+def test_repr_incluye_columnas_heredadas():
+    fila = ProductoEncontrado(7, "Clavo", "Clavos", 1.0, 2.0, 10, 1, "pz", None,
+                              "<b>Clavo</b>", "")
+    assert ProductoEncontrado.campos()[:2] == ("id", "nombre")
+    assert repr(fila).startswith("ProductoEncontrado(id=7, nombre='Clavo', ")
+    assert repr(fila).endswith("nombre_resaltado='<b>Clavo</b>', fragmento='')")
@@ -0,0 +1,77 @@
+"""
+Importación masiva contra una base nueva: filas repetidas en un lote y
+filas con un código que ya es de un producto con otro nombre o proveedor.
+"""
+import itertools
+
+import pytest
+
+_numero = itertools.count(1)
+
+
+@pytest.fixture
+def importar(base, tmp_path):
+    from nailstock.utils.importacion import ImportacionProductos
+
+    def importar(texto):
+        ruta = tmp_path / f"productos_{next(_numero)}.csv"
+        ruta.write_text("nombre,precio_compra,precio_venta,stock,unidad,proveedor_id,codigo\n"
+                        + texto, encoding="utf-8")
+        return ImportacionProductos.importar_productos(str(ruta))
+
+    return importar
+
+
+@pytest.fixture
+def producto(base):
+    from nailstock.models.producto_model import ProductoModel
+    from nailstock.models.proveedor_model import ProveedorModel
+
+    numero = next(_numero)
+    proveedor_id = ProveedorModel.agregar_proveedor(f"Proveedor importación {numero}",
+                                                    None, None, None, None, None)
+    codigo = f"IMP-{numero:04d}"
+    producto_id = ProductoModel.agregar_producto(f"Martillo {numero}", None, "Herramienta",
+                                                 1.0, 2.0, 5, 1, "pz", proveedor_id,
+                                                 codigo=codigo)
+    return ProductoModel.obtener_producto_por_id(producto_id)
+
+
+def test_filas_repetidas_se_reportan(importar, producto):
+    from nailstock.models.producto_model import ProductoModel
+
+    p = producto
+    resultado = importar(
+        f"{p.nombre},1,3,7,pz,{p.proveedor_id},{p.codigo}\n"
+        f"Clavo sin código {p.id},1,2,3,pz,,\n"
+        f"{p.nombre},1,4,8,pz,{p.proveedor_id},{p.codigo}\n"
+        f"Clavo sin código {p.id},1,2,9,pz,,\n"
+    )
+
+    assert resultado.errores == [
+        (2, "Fila reemplazada por la línea 4 (mismo código)"),
+        (3, "Fila reemplazada por la línea 5 (mismo nombre y proveedor)"),
+    ]
+    assert (resultado.insertadas, resultado.actualizadas) == (1, 1)
+    actualizado = ProductoModel.obtener_producto_por_id(p.id)
+    assert (actualizado.precio_venta, actualizado.stock) == (4.0, 8)
+
+
+def test_codigo_de_otro_nombre_o_proveedor_no_renombra(importar, producto):
+    from nailstock.models.producto_model import ProductoModel
+
+    p = producto
+    resultado = importar(
+        f"Martillo renombrado {p.id},1,3,7,pz,{p.proveedor_id},{p.codigo}\n"
+    )
+    assert resultado.errores == [(2, f"El código {p.codigo} ya pertenece a: {p.nombre} "
+                                     "(la fila trae otro nombre o proveedor)")]
+
+    # Sin proveedor tampoco se aplica: no le quita el proveedor al producto
+    resultado = importar(f"{p.nombre},1,3,7,pz,,{p.codigo}\n")
+    assert [linea for linea, _ in resultado.errores] == [2]
+    assert resultado.actualizadas == 0
+
+    sin_cambios = ProductoModel.obtener_producto_por_id(p.id)
+    assert (sin_cambios.nombre, sin_cambios.proveedor_id, sin_cambios.stock) == \
+        (p.nombre, p.proveedor_id, p.stock)
@@ -0,0 +1,84 @@
+"""
+Las consultas críticas no recorren tablas completas (EXPLAIN QUERY PLAN).
+
+Es la verificación de `python -m nailstock.database.planes`, contra una
+base nueva construida con las migraciones:
+
+    python -m pytest tests
+"""
+import sqlite3
+
+import pytest
+
+
+@pytest.fixture(scope="module")
+def planes(base):
+    from nailstock.database import planes
+    return planes
+
+
+@pytest.fixture
+def conn(planes):
+    from nailstock.database.db_connection import resource_path
+    from nailstock.database.migraciones import aplicar_migraciones, listar_migraciones
+
+    conn = sqlite3.connect(":memory:")
+    conn.execute("PRAGMA foreign_keys = ON")
+    directorio = resource_path("migrations")
+    assert aplicar_migraciones(conn, directorio) == listar_migraciones(directorio)[-1][0]
+    yield conn
+    conn.close()
+
+
+def test_consultas_criticas_usan_indices(planes, conn):
+    fallas = planes.verificar_base(conn)
+    assert not fallas, "\n".join(f"{nombre}: {'; '.join(recorridos)}"
+                                 for nombre, recorridos in fallas.items())
+
+
+def test_consultas_criticas_tienen_parametros_de_ejemplo(planes, conn):
+    criticas = planes.consultas.criticas()
+    assert criticas
+
+    sin_ejemplo = [consulta.nombre for consulta in criticas
+                   if "?" in consulta.sql and not consulta.ejemplo]
+    assert not sin_ejemplo, f"Consultas críticas sin parámetros de ejemplo: {sin_ejemplo}"
+
+    # Los ejemplos tienen tantos valores como parámetros la consulta
+    incompletos = []
+    with planes.historico_vacio(conn):
+        for consulta in criticas:
+            try:
+                planes.plan_consulta(conn, consulta.sql, consulta.ejemplo)
+            except sqlite3.ProgrammingError as e:
+                incompletos.append(f"{consulta.nombre}: {e}")
+    assert not incompletos, "\n".join(incompletos)
+
+
+def test_recorrido_de_indice_cuenta_salvo_permitido(planes):
+    assert planes.es_recorrido_completo("SCAN p")
+    assert planes.es_recorrido_completo("SCAN p USING INDEX idx_productos_activos_nombre")
+    assert planes.es_recorrido_completo("SCAN v USING COVERING INDEX idx_ventas_fecha")
+    assert planes.es_recorrido_completo("SCAN p USING INTEGER PRIMARY KEY")
+    assert not planes.es_recorrido_completo("SCAN p USING INDEX idx_productos_activos_nombre",
+                                            permitidos={"idx_productos_activos_nombre"})
+    assert planes.es_recorrido_completo("SCAN p USING COVERING INDEX idx_otro",
+                                        permitidos={"idx_productos_activos_nombre"})
+    assert not planes.es_recorrido_completo("SEARCH p USING INDEX idx_productos_codigo (codigo=?)")
+    assert not planes.es_recorrido_completo("SCAN json_each VIRTUAL TABLE INDEX 1:")
+    assert not planes.es_recorrido_completo("SCAN CONSTANT ROW")
+    assert not planes.es_recorrido_completo("SCAN t", subconsultas={"t"})
+
+
+def test_recorrido_no_permitido_falla(planes, conn):
+    # Un recorrido de índice que no está en RECORRIDOS_PERMITIDOS se reporta
+    plan = planes.plan_consulta(conn, planes.consultas.sql("productos.listar_activos"))
+    assert any(planes.es_recorrido_completo(detalle) for detalle in plan)
+    permitidos = planes.RECORRIDOS_PERMITIDOS["productos.listar_activos"]
+    assert not any(planes.es_recorrido_completo(detalle, permitidos=permitidos)
+                   for detalle in plan)
+
+
+def test_recorridos_permitidos_son_consultas_criticas(planes):
+    criticas = {consulta.nombre for consulta in planes.consultas.criticas()}
+    assert set(planes.RECORRIDOS_PERMITIDOS) <= criticas
@@ -0,0 +1,301 @@
+"""
+Resúmenes y alertas mantenidos por triggers (ventas_producto_dia,
+ventas_diarias, inventario_categoria / inventario_resumen y alertas_stock)
+contra una base nueva: tras registrar, editar y eliminar ventas y
+productos, coinciden con su verificación (resumenes.verificar_*,
+ResumenInventarioModel.verificar) y con un recálculo desde cero.
+"""
+import itertools
+from types import SimpleNamespace
+
+import pytest
+
+_numero = itertools.count(1)
+
+# Días pasados, uno por prueba: los resúmenes de otros días no interfieren
+_dias = (f"2020-{mes:02d}-15" for mes in itertools.count(1))
+
+
+@pytest.fixture
+def modelos(base):
+    from nailstock.models.producto_model import ProductoModel
+    from nailstock.models.cliente_model import ClienteModel
+    from nailstock.models.venta_model import VentaModel
+    from nailstock.models.resumen_model import ResumenVentasModel, ResumenInventarioModel
+    from nailstock.utils.archivo import ArchivoVentas
+
+    return SimpleNamespace(producto=ProductoModel, cliente=ClienteModel, venta=VentaModel,
+                           ventas=ResumenVentasModel, inventario=ResumenInventarioModel,
+                           archivo=ArchivoVentas)
+
+
+@pytest.fixture
+def cliente_id(modelos):
+    return modelos.cliente.agregar_cliente(f"Cliente resumen {next(_numero)}", None, None, None)
+
+
+def nuevo_producto(modelos, stock, stock_minimo=1, categoria="Resúmenes", precio_compra=5.0):
+    return modelos.producto.agregar_producto(
+        f"Producto resumen {next(_numero)}", None, categoria, precio_compra, 10.0,
+        stock, stock_minimo, "pz", None
+    )
+
+
+def actualizar(modelos, producto_id, **cambios):
+    p = modelos.producto.obtener_producto_por_id(producto_id)
+    datos = dict(nombre=p.nombre, descripcion=p.descripcion, categoria=p.categoria,
+                 precio_compra=p.precio_compra, precio_venta=p.precio_venta, stock=p.stock,
+                 stock_minimo=p.stock_minimo, unidad=p.unidad, proveedor_id=p.proveedor_id)
+    datos.update(cambios)
+    modelos.producto.actualizar_producto(producto_id, **datos)
+
+
+def venta_del_dia(cliente_id, dia, lineas):
+    """Registra una venta con fecha pasada: (producto_id, cantidad, precio) por línea."""
+    from nailstock.database.db_connection import get_db_writer
+
+    def registrar(conn):
+        total = sum(cantidad * precio for _, cantidad, precio in lineas)
+        venta_id = conn.execute(
+            "INSERT INTO ventas (cliente_id, total, fecha_venta) VALUES (?, ?, ?)",
+            (cliente_id, total, f"{dia} 12:00:00")
+        ).lastrowid
+        conn.executemany(
+            "INSERT INTO detalle_venta (venta_id, producto_id, cantidad, precio_unitario, "
+            "subtotal) VALUES (?, ?, ?, ?, ?)",
+            [(venta_id, producto_id, cantidad, precio, cantidad * precio)
+             for producto_id, cantidad, precio in lineas]
+        )
+        return venta_id
+
+    return get_db_writer().ejecutar(registrar)
+
+
+def leer(sql, params=()):
+    from nailstock.database.db_connection import get_db_connection
+    from nailstock.utils.archivo import historico_adjunto
+
+    # Con ventas archivadas, el recálculo suma también la base histórica
+    with get_db_connection() as conn, historico_adjunto(conn) as historico:
+        bases = ["main", "historico"] if historico else ["main"]
+        sql = sql.replace("{ventas}", "(" + " UNION ALL ".join(
+            f"SELECT id, fecha_venta, total FROM {b}.ventas" for b in bases) + ")")
+        sql = sql.replace("{detalle}", "(" + " UNION ALL ".join(
+            f"SELECT venta_id, producto_id, cantidad, subtotal FROM {b}.detalle_venta"
+            for b in bases) + ")")
+        return conn.execute(sql, params).fetchall()
+
+
+def ventas_diarias(dia):
+    return leer("SELECT ventas, ROUND(total, 2), minimo, maximo FROM ventas_diarias "
+                "WHERE dia = ?", (dia,))
+
+
+def ventas_producto_dia(dia):
+    return leer("SELECT producto_id, unidades, ROUND(ingresos, 2) FROM ventas_producto_dia "
+                "WHERE dia = ? ORDER BY producto_id", (dia,))
+
+
+def comprobar_ventas():
+    """Los resúmenes de ventas coinciden con la verificación y con un recálculo."""
+    from nailstock.models.resumen_model import ResumenVentasModel
+
+    assert ResumenVentasModel.verificar_ventas_diarias() == []
+    assert leer("SELECT dia, ventas, ROUND(total, 2), minimo, maximo "
+                "FROM ventas_diarias ORDER BY dia") == leer(
+        "SELECT DATE(fecha_venta), COUNT(*), ROUND(SUM(total), 2), MIN(total), MAX(total) "
+        "FROM {ventas} GROUP BY DATE(fecha_venta) ORDER BY 1")
+    assert leer("SELECT dia, producto_id, unidades, ROUND(ingresos, 2) "
+                "FROM ventas_producto_dia ORDER BY dia, producto_id") == leer(
+        "SELECT DATE(v.fecha_venta), dv.producto_id, SUM(dv.cantidad), ROUND(SUM(dv.subtotal), 2) "
+        "FROM {ventas} v JOIN {detalle} dv ON dv.venta_id = v.id "
+        "GROUP BY 1, 2 ORDER BY 1, 2")
+
+
+def comprobar_inventario():
+    """Los resúmenes de inventario y las alertas abiertas coinciden con los productos."""
+    from nailstock.models.resumen_model import ResumenInventarioModel
+
+    assert ResumenInventarioModel.verificar() == []
+    calculado = (
+        "SELECT COALESCE(categoria, ''), COUNT(*), ROUND(SUM(stock * precio_compra), 2), "
+        "SUM(IFNULL(stock <= stock_minimo, 0)), SUM(stock = 0) "
+        "FROM productos WHERE activo = 1 GROUP BY 1"
+    )
+    assert leer("SELECT categoria, productos, ROUND(valor, 2), stock_bajo, sin_stock "
+                "FROM inventario_categoria WHERE productos > 0 ORDER BY 1") == leer(
+        calculado + " ORDER BY 1")
+    assert leer("SELECT productos, ROUND(valor, 2), stock_bajo, sin_stock "
+                "FROM inventario_resumen") == leer(
+        "SELECT COUNT(*), ROUND(COALESCE(SUM(stock * precio_compra), 0), 2), "
+        "COALESCE(SUM(IFNULL(stock <= stock_minimo, 0)), 0), COALESCE(SUM(stock = 0), 0) "
+        "FROM productos WHERE activo = 1")
+    assert leer("SELECT producto_id FROM alertas_stock WHERE resuelta = 0 "
+                "ORDER BY producto_id") == leer(
+        "SELECT id FROM productos WHERE activo = 1 AND stock <= stock_minimo ORDER BY id")
+
+
+def alerta_abierta(producto_id):
+    filas = leer("SELECT stock, stock_minimo FROM alertas_stock "
+                 "WHERE producto_id = ? AND resuelta = 0", (producto_id,))
+    return filas[0] if filas else None
+
+
+def test_ventas_del_dia_se_suman_y_restan(modelos, cliente_id):
+    a = nuevo_producto(modelos, 100)
+    b = nuevo_producto(modelos, 100)
+    dia = next(_dias)
+
+    chica = venta_del_dia(cliente_id, dia, [(a, 1, 5.0)])
+    mediana = venta_del_dia(cliente_id, dia, [(a, 2, 10.0), (b, 1, 0.5)])
+    grande = venta_del_dia(cliente_id, dia, [(b, 5, 10.0)])
+
+    assert ventas_diarias(dia) == [(3, 75.5, 5.0, 50.0)]
+    assert ventas_producto_dia(dia) == [(a, 3, 25.0), (b, 6, 50.5)]
+    comprobar_ventas()
+
+    # Al eliminar la venta mayor o la menor del día se recalculan los extremos
+    modelos.venta.eliminar_venta(grande)
+    assert ventas_diarias(dia) == [(2, 25.5, 5.0, 20.5)]
+    assert ventas_producto_dia(dia) == [(a, 3, 25.0), (b, 1, 0.5)]
+    comprobar_ventas()
+
+    modelos.venta.eliminar_venta(chica)
+    assert ventas_diarias(dia) == [(1, 20.5, 20.5, 20.5)]
+    assert ventas_producto_dia(dia) == [(a, 2, 20.0), (b, 1, 0.5)]
+    comprobar_ventas()
+
+    # La última venta del día borra sus filas de resumen
+    modelos.venta.eliminar_venta(mediana)
+    assert ventas_diarias(dia) == []
+    assert ventas_producto_dia(dia) == []
+    comprobar_ventas()
+
+
+def test_ventas_de_la_caja_en_los_resumenes(modelos, cliente_id):
+    a = nuevo_producto(modelos, 20)
+    linea = {'producto_id': a, 'cantidad': 4, 'precio_unitario': 2.5, 'subtotal': 10.0}
+
+    venta_id = modelos.venta.agregar_venta(cliente_id, [linea])
+    comprobar_ventas()
+    comprobar_inventario()
+
+    modelos.venta.eliminar_venta(venta_id)
+    comprobar_ventas()
+    comprobar_inventario()
+
+
+def test_inventario_sigue_altas_ediciones_y_bajas(modelos):
+    categoria = f"Inventario {next(_numero)}"
+    a = nuevo_producto(modelos, 10, categoria=categoria, precio_compra=2.0)
+    b = nuevo_producto(modelos, 0, categoria=categoria, precio_compra=3.0)
+
+    assert leer("SELECT productos, valor, stock_bajo, sin_stock FROM inventario_categoria "
+                "WHERE categoria = ?", (categoria,)) == [(2, 20.0, 1, 1)]
+    comprobar_inventario()
+
+    # Stock, precio, mínimo sin definir y cambio de categoría
+    actualizar(modelos, a, stock=4, precio_compra=2.5)
+    actualizar(modelos, b, stock_minimo=None)
+    comprobar_inventario()
+    actualizar(modelos, b, categoria=None, stock=3)
+    assert leer("SELECT productos, valor, stock_bajo, sin_stock FROM inventario_categoria "
+                "WHERE categoria = ?", (categoria,)) == [(1, 10.0, 0, 0)]
+    comprobar_inventario()
+
+    # Desactivado deja de contar: la categoría queda vacía
+    modelos.producto.eliminar_producto(a)
+    assert leer("SELECT productos FROM inventario_categoria "
+                "WHERE categoria = ? AND productos > 0", (categoria,)) == []
+    comprobar_inventario()
+
+    modelos.producto.eliminar_producto(b)
+    comprobar_inventario()
+
+
+def test_alertas_se_abren_y_se_resuelven(modelos, cliente_id):
+    a = nuevo_producto(modelos, 5, stock_minimo=2)
+    assert alerta_abierta(a) is None
+
+    # Una venta que cruza el mínimo abre la alerta con el stock de ese momento
+    linea = {'producto_id': a, 'cantidad': 3, 'precio_unitario': 10.0, 'subtotal': 30.0}
+    venta_id = modelos.venta.agregar_venta(cliente_id, [linea])
+    assert alerta_abierta(a) == (2, 2)
+    comprobar_inventario()
+
+    # Seguir bajando no abre otra
+    actualizar(modelos, a, stock=1)
+    assert leer("SELECT COUNT(*) FROM alertas_stock WHERE producto_id = ?", (a,)) == [(1,)]
+
+    # Reponer (devolver la venta) la resuelve
+    modelos.venta.eliminar_venta(venta_id)
+    assert alerta_abierta(a) is None
+    comprobar_inventario()
+
+    # Bajar el mínimo por encima del stock la abre; desactivar la resuelve
+    actualizar(modelos, a, stock_minimo=10)
+    assert alerta_abierta(a) == (4, 10)
+    modelos.producto.eliminar_producto(a)
+    assert alerta_abierta(a) is None
+    assert leer("SELECT COUNT(*) FROM alertas_stock WHERE producto_id = ? AND resuelta = 1",
+                (a,)) == [(2,)]
+    comprobar_inventario()
+
+    # Un producto nuevo que ya entra bajo el mínimo
+    b = nuevo_producto(modelos, 0, stock_minimo=0)
+    assert alerta_abierta(b) == (0, 0)
+    comprobar_inventario()
+
+
+def test_archivar_no_resta_de_los_resumenes(modelos, cliente_id):
+    from nailstock.database.db_connection import get_db_connection, get_db_writer
+
+    a = nuevo_producto(modelos, 50)
+    dia = next(_dias)
+    ids = [venta_del_dia(cliente_id, dia, [(a, cantidad, 4.0)]) for cantidad in (1, 2, 3)]
+    diarias = ventas_diarias(dia)
+    por_producto = ventas_producto_dia(dia)
+    assert diarias == [(3, 24.0, 4.0, 12.0)]
+
+    resultado = modelos.archivo.archivar_ventas(1, tamano_lote=2, compactar=False)
+
+    assert resultado['ventas'] >= 3
+    with get_db_connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM ventas WHERE id IN (?, ?, ?)",
+                            ids).fetchone()[0] == 0
+        assert conn.execute("SELECT activo FROM control_triggers WHERE nombre = 'archivando'"
+                            ).fetchone()[0] == 0
+    # Ni los resúmenes ni el stock devuelven lo archivado
+    assert ventas_diarias(dia) == diarias
+    assert ventas_producto_dia(dia) == por_producto
+    assert modelos.producto.obtener_producto_por_id(a).stock == 50
+    comprobar_ventas()
+    comprobar_inventario()
+
+    # Reconstruir con la base histórica da lo mismo que los triggers
+    modelos.ventas.reconstruir_ventas_diarias()
+    modelos.ventas.reconstruir_ventas_producto_dia()
+    modelos.inventario.reconstruir()
+    assert ventas_diarias(dia) == diarias
+    assert ventas_producto_dia(dia) == por_producto
+    comprobar_ventas()
+    comprobar_inventario()
+
+    # Con la bandera encendida, un borrado directo tampoco resta
+    otro_dia = next(_dias)
+    venta_id = venta_del_dia(cliente_id, otro_dia, [(a, 1, 7.0)])
+
+    def borrar_archivando(conn):
+        conn.execute("UPDATE control_triggers SET activo = 1 WHERE nombre = 'archivando'")
+        conn.execute("DELETE FROM ventas WHERE id = ?", (venta_id,))
+        conn.execute("UPDATE control_triggers SET activo = 0 WHERE nombre = 'archivando'")
+
+    get_db_writer().ejecutar(borrar_archivando)
+    assert ventas_diarias(otro_dia) == [(1, 7.0, 7.0, 7.0)]
+    assert ventas_producto_dia(otro_dia) == [(a, 1, 7.0)]
+    # Sin la venta en ninguna base, la verificación lo reporta y reconstruir lo corrige
+    assert [d.dia for d in modelos.ventas.verificar_ventas_diarias()] == [otro_dia]
+    modelos.ventas.reconstruir_ventas_diarias()
+    modelos.ventas.reconstruir_ventas_producto_dia()
+    assert ventas_diarias(otro_dia) == []
+    comprobar_ventas()
@@ -0,0 +1,118 @@
+"""
+Registro y eliminación de ventas contra una base nueva: descuento de stock
+por conjunto (ventas.faltantes / ventas.descontar_stock), rechazo por
+stock insuficiente y devolución al eliminar la venta.
+"""
+import itertools
+import time
+from types import SimpleNamespace
+
+import pytest
+
+_numero = itertools.count(1)
+
+
+@pytest.fixture
+def modelos(base):
+    from nailstock.models.producto_model import ProductoModel
+    from nailstock.models.cliente_model import ClienteModel
+    from nailstock.models.venta_model import VentaModel
+    from nailstock.models.kardex_model import KardexModel
+    from nailstock.models.reserva_model import ReservaModel, StockInsuficienteError
+
+    return SimpleNamespace(producto=ProductoModel, cliente=ClienteModel, venta=VentaModel,
+                           kardex=KardexModel, reserva=ReservaModel,
+                           StockInsuficienteError=StockInsuficienteError)
+
+
+@pytest.fixture
+def cliente_id(modelos):
+    return modelos.cliente.agregar_cliente(f"Cliente {next(_numero)}", None, None, None)
+
+
+def nuevo_producto(modelos, stock, precio=10.0):
+    return modelos.producto.agregar_producto(
+        f"Producto de prueba {next(_numero)}", None, "Pruebas", 5.0, precio,
+        stock, 1, "pz", None
+    )
+
+
+def linea(producto_id, cantidad, precio=10.0):
+    return {'producto_id': producto_id, 'cantidad': cantidad,
+            'precio_unitario': precio, 'subtotal': cantidad * precio}
+
+
+def stock(modelos, producto_id):
+    return modelos.producto.obtener_producto_por_id(producto_id).stock
+
+
+def test_venta_descuenta_stock_una_vez_por_producto(modelos, cliente_id):
+    a = nuevo_producto(modelos, 10)
+    b = nuevo_producto(modelos, 5)
+
+    # El mismo producto en dos líneas se descuenta sumado
+    modelos.venta.agregar_venta(cliente_id, [linea(a, 2), linea(b, 5), linea(a, 1)])
+
+    assert stock(modelos, a) == 7
+    assert stock(modelos, b) == 0
+    movimientos = modelos.kardex.obtener_movimientos(a)
+    assert movimientos[0].tipo == 'venta' and movimientos[0].cantidad == -3
+    assert movimientos[0].saldo == 7
+
+
+def test_venta_rechazada_por_stock_insuficiente(modelos, cliente_id):
+    a = nuevo_producto(modelos, 3)
+    b = nuevo_producto(modelos, 10)
+
+    with pytest.raises(modelos.StockInsuficienteError) as error:
+        modelos.venta.agregar_venta(cliente_id, [linea(b, 1), linea(a, 2), linea(a, 2)])
+
+    assert error.value.faltantes == [
+        {'producto_id': a, 'nombre': modelos.producto.obtener_producto_por_id(a).nombre,
+         'solicitado': 4, 'disponible': 3},
+    ]
+    # Nada se aplicó, tampoco la línea que sí alcanzaba
+    assert stock(modelos, a) == 3
+    assert stock(modelos, b) == 10
+    assert [m.tipo for m in modelos.kardex.obtener_movimientos(b)] == ['inicial']
+
+
+def test_reservas_de_otra_terminal_limitan_y_las_vencidas_no(modelos, cliente_id):
+    from nailstock.database.db_connection import get_db_connection, get_db_writer
+    from nailstock.database.consultas import consultas
+
+    a = nuevo_producto(modelos, 5)
+
+    def reservar(conn, terminal, cantidad, expira):
+        consultas.ejecutar(conn, "reservas.reservar", (terminal, a, cantidad, expira))
+
+    get_db_writer().ejecutar(reservar, "otra-caja", 4, time.time() + 600)
+    with pytest.raises(modelos.StockInsuficienteError):
+        modelos.venta.agregar_venta(cliente_id, [linea(a, 2)])
+
+    # Vencida: ya no aparta stock y la venta la borra
+    get_db_writer().ejecutar(lambda conn: conn.execute(
+        "UPDATE reservas_stock SET expira = ? WHERE producto_id = ?", (time.time() - 1, a)
+    ))
+    modelos.venta.agregar_venta(cliente_id, [linea(a, 2)])
+    assert stock(modelos, a) == 3
+    with get_db_connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM reservas_stock WHERE producto_id = ?",
+                            (a,)).fetchone()[0] == 0
+
+
+def test_eliminar_venta_devuelve_stock_y_lo_anota(modelos, cliente_id):
+    a = nuevo_producto(modelos, 8)
+    b = nuevo_producto(modelos, 8)
+    venta_id = modelos.venta.agregar_venta(cliente_id, [linea(a, 3), linea(b, 1), linea(a, 2)])
+    assert stock(modelos, a) == 3
+
+    modelos.venta.eliminar_venta(venta_id)
+
+    assert stock(modelos, a) == 8
+    assert stock(modelos, b) == 8
+    devoluciones = [m for m in modelos.kardex.obtener_movimientos(a) if m.tipo == 'devolucion']
+    assert sorted(m.cantidad for m in devoluciones) == [2, 3]
+    assert all(m.referencia == venta_id for m in devoluciones)
+    assert modelos.kardex.obtener_movimientos(a)[0].saldo == 8
+    assert modelos.venta.obtener_detalle_venta(venta_id) == []